@@ -1,18 +1,18 @@
 # api/admin/admin.py
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi import APIRouter, HTTPException
 from typing import Dict
 
 from data.store import load_items, save_items
 from data.admin_injection_log import can_inject_today, record_injection
 from data.region_store import is_region_locked
-from api.scoring.auto_recalc import safe_auto_recalculate, mark_ingestion
+from api.scoring.auto_recalc import mark_ingestion
 
 router = APIRouter()
 
 
 @router.post("/inject")
-def admin_inject_song(payload: Dict, background_tasks: BackgroundTasks):
+def admin_inject_song(payload: Dict):
 
     if not can_inject_today():
         raise HTTPException(429, "Daily admin injection limit (10/day) reached")
@@ -57,7 +57,7 @@ def admin_inject_song(payload: Dict, background_tasks: BackgroundTasks):
     save_items(items)
 
     record_injection()
-    mark_ingestion()
-    background_tasks.add_task(safe_auto_recalculate)
+    # Debounced: concurrent injections coalesce into one recompute
+    mark_ingestion([(title, artist)])
 
     return {"status": "ok", "message": "Admin injection successful"}
\ No newline at end of file
@@ -4,11 +4,11 @@ from datetime import datetime
 import json
 
 from data.permissions import ensure_admin_allowed
-from data.store import load_items, save_items
+from data.store import load_items, items_version
 from data.region_store import lock_region, unlock_region, is_region_locked
 from data.region_snapshots import save_region_snapshot
 from data.chart_week import get_current_week_id
-from api.charts.scoring import calculate_scores
+from api.scoring.engine import ITEMS_VERSION, rank_items
 
 router = APIRouter()
 
@@ -59,6 +59,7 @@ def build_region_chart(
     
     try:
         # 1. Load items
+        data_version = items_version()
         items = load_items()
         
         if not items:
@@ -67,8 +68,8 @@ def build_region_chart(
                 detail="No items found in database"
             )
         
-        # 2. Score items
-        scored_items = calculate_scores()
+        # 2. Score items (shared engine, sorted highest first)
+        scored_items = rank_items(items, ITEMS_VERSION, data_version=data_version)
         
         if not scored_items:
             raise HTTPException(
@@ -88,16 +89,10 @@ def build_region_chart(
                 detail=f"No items found for region: {region}"
             )
         
-        # 4. Sort by score
-        region_items.sort(
-            key=lambda x: float(x.get("score", 0)),
-            reverse=True
-        )
-        
-        # 5. Take top 5
+        # 4. Take top 5 (already sorted by score)
         top5 = region_items[:5]
         
-        # 6. Format for snapshot
+        # 5. Format for snapshot
         formatted_items = []
         for idx, item in enumerate(top5, 1):
             formatted_items.append({
@@ -111,12 +106,13 @@ def build_region_chart(
                 "region": item.get("region", region)
             })
         
-        # 7. Save snapshot
+        # 6. Save snapshot
         week_id = get_current_week_id()
         snapshot_data = {
             "week_id": week_id,
             "region": region,
             "locked": True,
+            "scoring_version": ITEMS_VERSION,
             "created_at": datetime.utcnow().isoformat(),
             "count": len(formatted_items),
             "items": formatted_items
@@ -124,7 +120,7 @@ def build_region_chart(
         
         save_region_snapshot(region, snapshot_data)
         
-        # 8. Lock region
+        # 7. Lock region
         lock_region(region)
         
         return {
@@ -1,19 +1,19 @@
+from api.scoring.engine import score_items
+
+VERSION = "boost-v1"
+
+
 def apply_boosts(items: list) -> list:
     """
     Final scoring logic (safe, crash-proof)
 
-    Score formula:
+    Score formula (boost-v1):
     score = youtube*1 + radio*3 + tv*5
     """
 
-    for item in items:
-        youtube = item.get("youtube", 0)
-        radio = item.get("radio", 0)
-        tv = item.get("tv", 0)
-
-        # Final score calculation
-        score = (youtube * 1) + (radio * 3) + (tv * 5)
+    scores = score_items(items, VERSION)
 
+    for item, score in zip(items, scores):
         item["score"] = score
 
     # Sort by score (highest first)
@@ -23,4 +23,4 @@ def apply_boosts(items: list) -> list:
     for index, item in enumerate(items, start=1):
         item["position"] = index
 
-    return items
\ No newline at end of file
+    return items
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from pathlib import Path
-import json
+
+from data.chart_bundles import read_json
 
 router = APIRouter()
 
@@ -18,7 +19,7 @@ def explain_rank(week_id: str, rank: int):
         raise HTTPException(status_code=404, detail="Week not found")
 
     try:
-        chart = json.loads(path.read_text())
+        chart = read_json(path)  # locked weeks never change: parsed once
     except Exception:
         raise HTTPException(status_code=500, detail="Corrupt chart data")
 
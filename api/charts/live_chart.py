@@ -0,0 +1,101 @@
+# api/charts/live_chart.py
+"""
+Order-statistics chart: songs kept sorted by (score desc, key) so a
+score change moves one entry instead of re-sorting the whole chart.
+
+Uses sortedcontainers.SortedList (O(log n) updates and rank lookups)
+when installed, otherwise a bisect-maintained list.
+"""
+
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+try:
+    from sortedcontainers import SortedList
+except ImportError:  # optional: bisect fallback
+    SortedList = None
+
+
+class LiveChart:
+    """
+    Thread-safe ranked set of song keys.
+    Ties break on key so ordering is deterministic.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._scores: Dict[Hashable, float] = {}
+        self._entries = SortedList() if SortedList is not None else []
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._scores
+
+    @staticmethod
+    def _entry(key: Hashable, score: float) -> Tuple[float, Hashable]:
+        return (-score, key)
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entry(key, self._scores.pop(key))
+        if SortedList is not None:
+            self._entries.remove(entry)
+        else:
+            del self._entries[bisect_left(self._entries, entry)]
+
+    def _add(self, key: Hashable, score: float) -> None:
+        self._scores[key] = score
+        entry = self._entry(key, score)
+        if SortedList is not None:
+            self._entries.add(entry)
+        else:
+            insort(self._entries, entry)
+
+    def rebuild(self, scores: Dict[Hashable, float]) -> None:
+        """Replace the whole chart (one sort)."""
+        entries = sorted(self._entry(k, s) for k, s in scores.items())
+        with self._lock:
+            self._scores = dict(scores)
+            self._entries = SortedList(entries) if SortedList is not None else entries
+
+    def update(self, key: Hashable, score: float) -> bool:
+        """Insert or move one song. Returns False if nothing changed."""
+        with self._lock:
+            old = self._scores.get(key)
+            if old == score:
+                return False
+            if old is not None:
+                self._remove(key)
+            self._add(key, score)
+            return True
+
+    def discard(self, key: Hashable) -> bool:
+        with self._lock:
+            if key not in self._scores:
+                return False
+            self._remove(key)
+            return True
+
+    def score(self, key: Hashable) -> Optional[float]:
+        return self._scores.get(key)
+
+    def rank(self, key: Hashable) -> Optional[int]:
+        """1-based position, or None if not charted."""
+        with self._lock:
+            score = self._scores.get(key)
+            if score is None:
+                return None
+            entry = self._entry(key, score)
+            if SortedList is not None:
+                return self._entries.index(entry) + 1
+            return bisect_left(self._entries, entry) + 1
+
+    def top(self, n: int) -> List[Tuple[Hashable, float]]:
+        """(key, score) for the first n positions."""
+        with self._lock:
+            return [(key, -neg) for neg, key in self._entries[:n]]
+
+    def keys(self) -> Iterable[Hashable]:
+        return list(self._scores)
@@ -0,0 +1,240 @@
+# api/charts/live_feed.py
+"""
+Live chart feed (Server-Sent Events / WebSocket).
+
+A single watcher polls the chart version. When it changes, each chart
+that has listeners is recomputed once and only the rank changes
+(entered, moved, dropped) are fanned out. Each subscriber gets a bounded
+queue. A client that falls behind has its backlog replaced by a fresh
+snapshot, so slow consumers cannot grow memory.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List, Optional, Set
+
+from api.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 32
+KEEPALIVE_SECONDS = 15.0
+
+
+def diff_ranks(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> Dict[str, list]:
+    """
+    Rank changes between two snapshots (lists of {"key", "rank", ...}).
+    """
+    old_ranks = {entry["key"]: entry["rank"] for entry in old}
+    new_keys = set()
+    entered, moved = [], []
+
+    for entry in new:
+        key = entry["key"]
+        new_keys.add(key)
+        previous = old_ranks.get(key)
+        if previous is None:
+            entered.append(entry)
+        elif previous != entry["rank"]:
+            moved.append({"key": key, "rank": entry["rank"], "previous_rank": previous})
+
+    dropped = [
+        {"key": entry["key"], "previous_rank": entry["rank"]}
+        for entry in old if entry["key"] not in new_keys
+    ]
+    return {"entered": entered, "moved": moved, "dropped": dropped}
+
+
+class Subscription:
+    """One client's bounded event queue."""
+
+    __slots__ = ("chart", "queue", "resets")
+
+    def __init__(self, chart: Optional[str], maxsize: int = QUEUE_SIZE):
+        self.chart = chart
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.resets = 0
+
+    def push(self, event: Dict[str, Any], snapshot: Optional[Dict[str, Any]] = None) -> None:
+        """Enqueue without blocking; on overflow, resync from the snapshot."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.resets += 1
+            self.queue.put_nowait(snapshot or event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next event, or None after `timeout` seconds of silence."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class ChartBroadcaster:
+    """
+    Fan-out of chart diffs to every subscriber of a chart.
+
+    snapshot(chart) returns the ranked entries (run in a worker thread);
+    version() is cheap and changes whenever the underlying data does.
+    Charts are also refreshed every `refresh_interval` seconds, since
+    recency weighting moves scores without a write.
+    """
+
+    def __init__(self, snapshot: Callable[[Optional[str]], List[Dict[str, Any]]],
+                 version: Callable[[], Hashable], poll_interval: float = 1.0,
+                 refresh_interval: float = 30.0, queue_size: int = QUEUE_SIZE):
+        self.snapshot = snapshot
+        self.version = version
+        self.poll_interval = poll_interval
+        self.refresh_interval = refresh_interval
+        self.queue_size = queue_size
+
+        self._subscribers: Dict[Optional[str], Set[Subscription]] = {}
+        self._charts: Dict[Optional[str], Dict[str, Any]] = {}
+        self._locks: Dict[Optional[str], asyncio.Lock] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.computations = 0
+        self.events_sent = 0
+
+    # =========================
+    # Subscriptions
+    # =========================
+
+    async def subscribe(self, chart: Optional[str] = None) -> Subscription:
+        state = await self._refresh(chart)
+        subscription = Subscription(chart, self.queue_size)
+        subscription.push(self._snapshot_event(state))
+        self._subscribers.setdefault(chart, set()).add(subscription)
+        self._ensure_watcher()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.chart)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.chart]
+            self._charts.pop(subscription.chart, None)
+
+    async def events(self, subscription: Subscription,
+                     keepalive: float = KEEPALIVE_SECONDS) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Events for one subscriber; None marks a keepalive tick."""
+        while True:
+            yield await subscription.get(keepalive)
+
+    async def sse(self, chart: Optional[str] = None,
+                  keepalive: float = KEEPALIVE_SECONDS) -> AsyncIterator[str]:
+        """text/event-stream body. Unsubscribes when the client goes away."""
+        subscription = await self.subscribe(chart)
+        try:
+            async for event in self.events(subscription, keepalive):
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                data = dumps(event["data"]).decode("utf-8")
+                yield f"id: {event['id']}\nevent: {event['event']}\ndata: {data}\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+    # =========================
+    # Computation
+    # =========================
+
+    def _snapshot_event(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "event": "snapshot",
+            "id": state["seq"],
+            "data": {"chart": state["chart"] or "top100", "entries": state["entries"]},
+        }
+
+    async def _refresh(self, chart: Optional[str]) -> Dict[str, Any]:
+        """
+        Recompute a chart if its version moved (or it is due a refresh)
+        and publish the diff to its current subscribers.
+        """
+        lock = self._locks.setdefault(chart, asyncio.Lock())
+        async with lock:
+            version = self.version()
+            state = self._charts.get(chart)
+            fresh = (
+                state is not None and state["version"] == version
+                and time.monotonic() - state["computed_at"] < self.refresh_interval
+            )
+            if fresh:
+                return state
+
+            entries = await asyncio.to_thread(self.snapshot, chart)
+            self.computations += 1
+
+            new_state = {
+                "chart": chart,
+                "version": version,
+                "computed_at": time.monotonic(),
+                "entries": entries,
+                "seq": state["seq"] if state else 0,
+            }
+
+            if state is not None:
+                changes = diff_ranks(state["entries"], entries)
+                if any(changes.values()):
+                    new_state["seq"] += 1
+                    self._publish(chart, {
+                        "event": "diff",
+                        "id": new_state["seq"],
+                        "data": {"chart": chart or "top100", **changes},
+                    }, self._snapshot_event(new_state))
+
+            self._charts[chart] = new_state
+            return new_state
+
+    def _publish(self, chart: Optional[str], event: Dict[str, Any],
+                 snapshot: Dict[str, Any]) -> None:
+        for subscription in list(self._subscribers.get(chart, ())):
+            subscription.push(event, snapshot)
+            self.events_sent += 1
+
+    # =========================
+    # Watcher
+    # =========================
+
+    def _ensure_watcher(self) -> None:
+        """Start the watcher on the running loop; it exits with the last subscriber."""
+        loop = asyncio.get_running_loop()
+        task = self._task
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        self._task = loop.create_task(self._watch())
+
+    async def _watch(self) -> None:
+        while self._subscribers:
+            await asyncio.sleep(self.poll_interval)
+            for chart in list(self._subscribers):
+                try:
+                    await self._refresh(chart)
+                except Exception as e:
+                    logger.error(f"Live feed refresh failed for {chart or 'top100'}: {e}")
+
+    async def close(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "charts": len(self._subscribers),
+            "computations": self.computations,
+            "events_sent": self.events_sent,
+            "resets": sum(sub.resets for subs in self._subscribers.values() for sub in subs),
+            "watching": self._task is not None and not self._task.done(),
+        }
@@ -1,16 +1,12 @@
 # Uganda regions mapping
+#
+# Artists and their regions live in data/artists.json; REGIONS is read
+# from the registry on access so it follows hot reloads.
 
-REGIONS = {
-    "central": [
-        "Azawi", "Bebe Cool", "Eddy Kenzo", "Vinka", "Fik Fameica"
-    ],
-    "western": [
-        "Ray G", "Truth 256", "Kahinda", "Shon", "Jowy Landa"
-    ],
-    "eastern": [
-        "Winnie Nwagi", "Spice Diana", "Karole Kasita"
-    ],
-    "northern": [
-        "Bosmic Otim", "Lagum The Rapper"
-    ]
-}
\ No newline at end of file
+from data.artist_registry import region_artists
+
+
+def __getattr__(name):
+    if name == "REGIONS":
+        return region_artists()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
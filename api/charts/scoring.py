@@ -1,46 +1,25 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 
+from api.scoring.engine import ITEMS_VERSION, score_items
 
-YT_WEIGHT = 0.60
-RADIO_WEIGHT = 0.25
-TV_WEIGHT = 0.15
 
-
-def _safe_max(items: List[Dict], key: str) -> int:
-    values = [i.get(key, 0) for i in items if isinstance(i.get(key, 0), int)]
-    return max(values) if values else 0
-
-
-def calculate_scores(items: List[Dict]) -> List[Dict]:
+def calculate_scores(items: Optional[List[Dict]] = None) -> List[Dict]:
     """
     Calculate and attach score for each chart item.
     Does NOT mutate input list.
-    """
 
-    yt_max = _safe_max(items, "youtube_views")
-    radio_max = _safe_max(items, "radio_plays")
-    tv_max = _safe_max(items, "tv_appearances")
-
-    scored_items = []
-
-    for item in items:
-        yt = item.get("youtube_views", 0)
-        radio = item.get("radio_plays", 0)
-        tv = item.get("tv_appearances", 0)
-
-        yt_norm = yt / yt_max if yt_max > 0 else 0
-        radio_norm = radio / radio_max if radio_max > 0 else 0
-        tv_norm = tv / tv_max if tv_max > 0 else 0
+    Defaults to the full item store (cached per data version).
+    """
+    data_version = None
 
-        score = (
-            yt_norm * YT_WEIGHT +
-            radio_norm * RADIO_WEIGHT +
-            tv_norm * TV_WEIGHT
-        )
+    if items is None:
+        from data.store import load_items, items_version
+        data_version = items_version()
+        items = load_items()
 
-        scored_items.append({
-            **item,
-            "score": round(score, 6),
-        })
+    scores = score_items(items, ITEMS_VERSION, data_version=data_version)
 
-    return scored_items
\ No newline at end of file
+    return [
+        {**item, "score": score}
+        for item, score in zip(items, scores)
+    ]
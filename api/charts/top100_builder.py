@@ -2,14 +2,22 @@ import json
 import os
 from datetime import datetime
 
-from data.store import load_items, save_items
-from api.charts.scoring import calculate_scores
+from api.scoring.engine import ITEMS_VERSION, rank_items
+from api.utils.metrics_merge import catalog
+from data.chart_archive import attach_history
 
 TOP100_FILE = "data/top100.json"
 
 
 def build_top100():
-    scored = calculate_scores()
+    # Parsed once per items version, shared with the metrics merge
+    items, _, data_version = catalog()
+    scored = rank_items(
+        items,
+        ITEMS_VERSION,
+        limit=100,
+        data_version=data_version,
+    )
 
     if not scored:
         return {
@@ -29,16 +37,19 @@ def build_top100():
             "title": item["title"],
             "artist": item["artist"],
             "score": item["score"],
-            "youtube": item["youtube"],
-            "radio": item["radio"],
-            "tv": item["tv"]
+            "youtube": item.get("youtube_views", item.get("youtube", 0)),
+            "radio": item.get("radio_plays", item.get("radio", 0)),
+            "tv": item.get("tv_appearances", item.get("tv", 0))
         })
         position += 1
 
+    attach_history(ranked, chart="top100")
+
     os.makedirs("data", exist_ok=True)
 
     data = {
         "updated_at": datetime.utcnow().isoformat(),
+        "scoring_version": ITEMS_VERSION,
         "count": len(ranked),
         "items": ranked
     }
@@ -0,0 +1,140 @@
+# api/coherence.py
+"""
+Cross-worker cache coherence through the shared SQLite file.
+
+Every transaction that changes chart data also bumps a generation row
+(bump()). Each worker watches it on one dedicated connection. The watch
+is PRAGMA data_version, which changes only when another connection has
+committed, so an idle database costs one pragma per CHECK_INTERVAL. The
+generation row is read only after such a change. Caches key on the
+generation, and registered listeners are called when it moves, so a
+write in one worker invalidates the caches of every other worker
+within milliseconds. No broker is involved.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from api import metrics
+
+logger = logging.getLogger(__name__)
+
+CHECK_INTERVAL = 0.005   # seconds between data_version checks per worker
+GENERATION = "charts"
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    """Create cache_generation with its row. Caller commits."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS cache_generation (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute(
+        "INSERT OR IGNORE INTO cache_generation (name, value) VALUES (?, 0)", (GENERATION,)
+    )
+
+
+def bump(conn: sqlite3.Connection) -> None:
+    """Advance the generation inside the writer's transaction (caller commits)."""
+    conn.execute(
+        "UPDATE cache_generation SET value = value + 1 WHERE name = ?", (GENERATION,)
+    )
+
+
+class CoherenceWatcher:
+    """
+    This worker's view of the shared generation. check() is cheap
+    enough for every cache lookup; listeners run in the calling thread
+    and should only drop state.
+    """
+
+    def __init__(self, db_path: Path, interval: float = CHECK_INTERVAL):
+        self.db_path = db_path
+        self.interval = interval
+        self._conn = None
+        self._lock = threading.Lock()
+        self._listeners: List[Tuple[str, Callable[[], Any]]] = []
+        self._data_version = None
+        self._checked = 0.0
+        self.generation = 0
+
+        self.checks = 0
+        self.changes = 0
+        self.invalidations: Dict[str, int] = {}
+
+    def register(self, name: str, clear: Callable[[], Any]) -> None:
+        """Call clear() whenever the generation changes"""
+        with self._lock:
+            self._listeners = [(n, c) for n, c in self._listeners if n != name]
+            self._listeners.append((name, clear))
+            self.invalidations.setdefault(name, 0)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        return self._conn
+
+    def check(self, force: bool = False) -> int:
+        """Current generation; re-read at most every `interval` seconds"""
+        now = time.monotonic()
+        if not force and now - self._checked < self.interval:
+            return self.generation
+
+        with self._lock:
+            if not force and now - self._checked < self.interval:
+                return self.generation
+            self._checked = now
+            self.checks += 1
+
+            try:
+                conn = self._connect()
+                data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+                if data_version == self._data_version:
+                    return self.generation
+                self._data_version = data_version
+
+                row = conn.execute(
+                    "SELECT value FROM cache_generation WHERE name = ?", (GENERATION,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                # Keep serving the last generation; caches still expire by TTL
+                logger.warning(f"Cache coherence check failed: {e}")
+                self._data_version = None
+                return self.generation
+
+            generation = row[0] if row else 0
+            if generation == self.generation:
+                return generation
+            self.generation = generation
+            self.changes += 1
+            listeners = list(self._listeners)
+
+        for name, clear in listeners:
+            try:
+                clear()
+                self.invalidations[name] += 1
+                metrics.observe_invalidation(name)
+            except Exception as e:
+                logger.error(f"Cache invalidation failed for {name}: {e}")
+        return generation
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "generation": self.generation,
+            "checks": self.checks,
+            "changes": self.changes,
+            "invalidations": dict(self.invalidations),
+            "check_interval_ms": self.interval * 1000,
+        }
@@ -0,0 +1,251 @@
+# api/concurrency.py
+"""
+Per-route-class concurrency limits with load shedding.
+
+Every HTTP request is classified by path (public reads, ingest, heavy
+reads such as exports and search, admin). Each class admits up to
+`limit` requests at once. Later arrivals wait in a FIFO queue, but only
+while the estimated wait fits the class's queue budget. The estimate is
+queue position x EWMA service time / limit. A request whose estimate is
+over budget, or whose wait runs out, gets a 503 with Retry-After right
+away. So a burst of full
+scrapes or ingests queues or sheds inside its own class, and public
+chart reads keep their own slots.
+
+State is guarded by a threading lock, and waiters are woken on their
+own event loop. The limiter therefore works across loops and threads.
+Limits can be changed at runtime with configure().
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from api import metrics
+from api.responses import dumps
+
+PUBLIC = "public"
+INGEST = "ingest"
+HEAVY = "heavy"    # exports and catalog search: long scans, few at a time
+ADMIN = "admin"
+
+# First match wins; None = never limited (probes, long-lived streams,
+# and the endpoint that changes the limits)
+DEFAULT_RULES: Tuple[Tuple[str, Optional[str]], ...] = (
+    ("/health", None),
+    ("/metrics", None),
+    ("/charts/stream", None),
+    ("/admin/concurrency", None),
+    ("/ingest/batches", PUBLIC),
+    ("/ingest", INGEST),
+    ("/export", HEAVY),
+    ("/search", HEAVY),
+    ("/scrapers", ADMIN),
+    ("/streams/scrape", ADMIN),
+    ("/youtube/trigger", ADMIN),
+    ("/scoring", ADMIN),
+    ("/admin", ADMIN),
+)
+
+EWMA_WEIGHT = 0.2
+
+
+class Overloaded(Exception):
+    """A request was shed; retry_after is the estimated wait in seconds"""
+
+    def __init__(self, route_class: str, retry_after: float):
+        super().__init__(f"{route_class} queue over budget")
+        self.route_class = route_class
+        self.retry_after = retry_after
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(True)
+
+
+class Limiter:
+    """Admission control for one route class."""
+
+    def __init__(self, name: str, limit: int, queue_budget: float, service_time: float = 0.05):
+        self.name = name
+        self.limit = limit
+        self.queue_budget = queue_budget
+        self.service_time = service_time   # EWMA seconds per admitted request
+        self.active = 0
+        self._waiters: "deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]" = deque()
+        self._lock = threading.Lock()
+
+        self.admitted = 0
+        self.queued = 0
+        self.shed = 0
+
+    def _estimate(self) -> float:
+        """Expected wait for a new arrival (caller holds the lock)"""
+        if self.active < self.limit and not self._waiters:
+            return 0.0
+        return (len(self._waiters) + 1) * self.service_time / max(self.limit, 1)
+
+    def _grant(self) -> None:
+        """Hand free slots to queued waiters (caller holds the lock)"""
+        while self._waiters and self.active < self.limit:
+            loop, future = self._waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                continue  # waiter's loop is closed
+            self.active += 1
+
+    def _shed(self, estimate: float) -> Overloaded:
+        self.shed += 1
+        metrics.observe_shed(self.name)
+        return Overloaded(self.name, estimate)
+
+    async def acquire(self) -> float:
+        """Wait for a slot; returns the queue time or raises Overloaded"""
+        with self._lock:
+            estimate = self._estimate()
+            if estimate == 0.0:
+                self.active += 1
+                self.admitted += 1
+                return 0.0
+            if estimate > self.queue_budget:
+                raise self._shed(estimate)
+            loop = asyncio.get_running_loop()
+            entry = (loop, loop.create_future())
+            self._waiters.append(entry)
+            self.queued += 1
+
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(entry[1]), self.queue_budget)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            cancelled = isinstance(e, asyncio.CancelledError)
+            with self._lock:
+                queued = entry in self._waiters
+                if queued:
+                    self._waiters.remove(entry)
+            if queued:
+                if cancelled:
+                    raise
+                with self._lock:
+                    raise self._shed(self._estimate())
+            # Granted just as the wait ended: a timeout keeps the slot,
+            # a cancelled request hands it on
+            if cancelled:
+                self.release(None)
+                raise
+
+        waited = time.monotonic() - start
+        with self._lock:
+            self.admitted += 1
+        metrics.observe_queue_wait(self.name, waited)
+        return waited
+
+    def release(self, elapsed: Optional[float]) -> None:
+        with self._lock:
+            if elapsed is not None:
+                self.service_time += EWMA_WEIGHT * (elapsed - self.service_time)
+            self.active -= 1
+            self._grant()
+
+    def configure(self, limit: Optional[int] = None, queue_budget: Optional[float] = None) -> None:
+        with self._lock:
+            if limit is not None:
+                self.limit = limit
+            if queue_budget is not None:
+                self.queue_budget = queue_budget
+            self._grant()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "queue_budget_ms": round(self.queue_budget * 1000, 1),
+                "active": self.active,
+                "waiting": len(self._waiters),
+                "estimated_wait_ms": round(self._estimate() * 1000, 1),
+                "service_time_ms": round(self.service_time * 1000, 1),
+                "admitted": self.admitted,
+                "queued": self.queued,
+                "shed": self.shed,
+            }
+
+
+class ConcurrencyLimits:
+    """The limiters of every route class plus the path rules mapping to them."""
+
+    def __init__(self, limiters: Iterable[Limiter], rules=DEFAULT_RULES):
+        self.limiters: Dict[str, Limiter] = {l.name: l for l in limiters}
+        self.rules = tuple(rules)
+        self.enabled = True
+
+    def classify(self, path: str) -> Optional[str]:
+        for prefix, route_class in self.rules:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return route_class
+        return PUBLIC
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "classes": {name: l.stats() for name, l in self.limiters.items()},
+        }
+
+
+# =========================
+# ASGI middleware
+# =========================
+
+class ConcurrencyLimitMiddleware:
+    """Pure ASGI: holds a slot for the whole request, streaming included."""
+
+    def __init__(self, app, limits: ConcurrencyLimits):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.limits.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limits.limiters.get(self.limits.classify(scope["path"]))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.acquire()
+        except Overloaded as e:
+            await _overloaded(scope, send, e)
+            return
+
+        start = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.monotonic() - start)
+
+
+async def _overloaded(scope, send, error: Overloaded) -> None:
+    # Same body shape as the app's HTTPException handler
+    body = dumps({
+        "error": f"Server busy ({error.route_class} requests), retry later",
+        "status_code": 503,
+        "timestamp": datetime.utcnow().isoformat(),
+        "path": scope["path"],
+    })
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(error.retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,274 @@
+# api/ingestion/idempotency.py
+"""
+Idempotency keys and unchanged-item skipping for ingest retries.
+
+A client that sends an Idempotency-Key header gets the stored response
+when it retries, and the batch is not queued or applied again. Stored
+responses live in a bounded LRU in front of the idempotency_keys table,
+so they survive restarts until IDEMPOTENCY_TTL expires. A key reused
+with a different payload is rejected rather than replayed.
+
+A request reserves its key with a placeholder row (status_code 0) in the
+same table, so a retry that lands on another worker while the first is
+still running gets KeyInFlight too. The placeholder expires after
+IN_FLIGHT_TTL in case its worker dies before finishing.
+
+ItemHashes remembers a content hash for each (source, title, artist)
+that was committed. An item that matches its last committed content is
+dropped from a new batch before any database work.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+MAX_KEYS = 4096              # responses kept in memory
+MAX_ITEMS = 200000           # item hashes kept in memory
+IDEMPOTENCY_TTL = 24 * 3600  # seconds a stored response is replayed
+IN_FLIGHT_TTL = 15 * 60      # seconds a reservation outlives a dead worker
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS idempotency_keys (
+        key TEXT PRIMARY KEY,
+        fingerprint TEXT NOT NULL,
+        status_code INTEGER NOT NULL,
+        body BLOB NOT NULL,
+        expires_at REAL NOT NULL
+    )
+"""
+
+
+class KeyReused(Exception):
+    """The key was first used for a different request."""
+
+
+class KeyInFlight(Exception):
+    """A request with this key is still being processed."""
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    """Create idempotency_keys. Caller commits."""
+    conn.execute(_SCHEMA)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_idempotency_expires ON idempotency_keys(expires_at)"
+    )
+
+
+def _digest(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def fingerprint(endpoint: str, payload: Any) -> str:
+    """Digest of what a request asks for (endpoint + validated payload)."""
+    return _digest([endpoint, payload])
+
+
+# =========================
+# Idempotency keys
+# =========================
+
+class IdempotencyStore:
+    """
+    Stored responses by Idempotency-Key: LRU first, then SQLite.
+    connect() returns a new sqlite3 connection.
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection],
+                 max_entries: int = MAX_KEYS, ttl: float = IDEMPOTENCY_TTL,
+                 in_flight_ttl: float = IN_FLIGHT_TTL):
+        self.connect = connect
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.in_flight_ttl = in_flight_ttl
+        self._entries: "OrderedDict[str, Tuple[str, int, bytes, float]]" = OrderedDict()
+        self._in_flight: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, entry: Tuple[str, int, bytes, float]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _lookup(self, key: str) -> Optional[Tuple[str, int, bytes, float]]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[3] > now:
+                    self._entries.move_to_end(key)
+                    return entry
+                del self._entries[key]
+
+        conn = self.connect()
+        try:
+            row = conn.execute(
+                "SELECT fingerprint, status_code, body, expires_at FROM idempotency_keys "
+                "WHERE key = ? AND status_code > 0 AND expires_at > ?",
+                (key, now)
+            ).fetchone()
+        finally:
+            conn.close()
+
+        if row is None:
+            return None
+        entry = (row[0], row[1], bytes(row[2]), row[3])
+        with self._lock:
+            self._remember(key, entry)
+        return entry
+
+    def begin(self, key: str, request_fingerprint: Optional[str]) -> Optional[Tuple[int, bytes]]:
+        """
+        Stored (status_code, body) for a retried key, or None after
+        reserving the key for this request (call finish() either way).
+        Raises KeyReused or KeyInFlight. With no fingerprint (the request
+        is only known once its body is read) a stored response is
+        returned unchecked; compare it with matches() before replaying.
+        """
+        entry = self._lookup(key)
+        if entry is None:
+            entry = self._reserve(key, request_fingerprint or "")
+            if entry is None:
+                with self._lock:
+                    self._in_flight[key] = request_fingerprint or ""
+                    self.misses += 1
+                return None
+        if entry[1] == 0:
+            raise KeyInFlight(key)
+        if request_fingerprint is not None and entry[0] != request_fingerprint:
+            raise KeyReused(key)
+        self.hits += 1
+        return entry[1], entry[2]
+
+    def _reserve(self, key: str, request_fingerprint: str) -> Optional[Tuple[str, int, bytes, float]]:
+        """Claim the key in the table; None on success, else the row holding it."""
+        now = time.time()
+        conn = self.connect()
+        try:
+            with conn:
+                claimed = conn.execute(
+                    "INSERT INTO idempotency_keys (key, fingerprint, status_code, body, expires_at) "
+                    "VALUES (?, ?, 0, x'', ?) "
+                    "ON CONFLICT(key) DO UPDATE SET fingerprint = excluded.fingerprint, "
+                    "status_code = 0, body = x'', expires_at = excluded.expires_at "
+                    "WHERE idempotency_keys.expires_at <= ?",
+                    (key, request_fingerprint, now + self.in_flight_ttl, now)
+                ).rowcount
+                if claimed:
+                    return None
+                row = conn.execute(
+                    "SELECT fingerprint, status_code, body, expires_at FROM idempotency_keys "
+                    "WHERE key = ?",
+                    (key,)
+                ).fetchone()
+        finally:
+            conn.close()
+        return row[0], row[1], bytes(row[2]), row[3]
+
+    def matches(self, key: str, request_fingerprint: str) -> bool:
+        """Whether the response stored for `key` was for this request."""
+        entry = self._lookup(key)
+        return entry is not None and entry[0] == request_fingerprint
+
+    def finish(self, key: str, status_code: Optional[int] = None,
+               body: Optional[bytes] = None, request_fingerprint: Optional[str] = None) -> None:
+        """
+        Release the key; store the response when one is given, under
+        `request_fingerprint` if the request was only known at the end.
+        """
+        with self._lock:
+            reserved = self._in_flight.pop(key, None)
+        if reserved is None:
+            return
+
+        conn = self.connect()
+        try:
+            if status_code is None:
+                conn.execute(
+                    "DELETE FROM idempotency_keys WHERE key = ? AND status_code = 0", (key,)
+                )
+                conn.commit()
+                return
+            entry = (request_fingerprint or reserved, status_code, body, time.time() + self.ttl)
+            conn.execute(
+                "INSERT OR REPLACE INTO idempotency_keys "
+                "(key, fingerprint, status_code, body, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (key, *entry)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        with self._lock:
+            self._remember(key, entry)
+
+    def prune(self, conn: sqlite3.Connection) -> int:
+        """Delete expired keys on `conn`. Caller commits."""
+        now = time.time()
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if entry[3] <= now]:
+                del self._entries[key]
+        return conn.execute(
+            "DELETE FROM idempotency_keys WHERE expires_at <= ?", (now,)
+        ).rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "in_flight": len(self._in_flight),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# =========================
+# Unchanged items
+# =========================
+
+def _item_key(song: Dict[str, Any]) -> Tuple[str, str, str]:
+    return song.get("source", ""), song.get("title", ""), song.get("artist", "")
+
+
+class ItemHashes:
+    """Content hash of the last committed version of each source row."""
+
+    def __init__(self, max_entries: int = MAX_ITEMS):
+        self.max_entries = max_entries
+        self._hashes: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.skipped = 0
+
+    def changed(self, songs: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Songs whose content differs from what was last committed."""
+        kept = []
+        with self._lock:
+            for song in songs:
+                if self._hashes.get(_item_key(song)) == _digest(song):
+                    self.skipped += 1
+                else:
+                    kept.append(song)
+        return kept
+
+    def remember(self, songs: Iterable[Dict[str, Any]]) -> None:
+        """Record committed songs (call after the commit)."""
+        with self._lock:
+            for song in songs:
+                key = _item_key(song)
+                self._hashes[key] = _digest(song)
+                self._hashes.move_to_end(key)
+            while len(self._hashes) > self.max_entries:
+                self._hashes.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hashes.clear()
+
+    def __len__(self) -> int:
+        return len(self._hashes)
@@ -0,0 +1,440 @@
+# api/ingestion/ingest_queue.py
+"""
+Durable write-ahead ingest queue.
+
+Ingest requests validate their batch, append it to a segment log with
+fsync, and return 202 with a batch id. A consumer thread drains pending
+batches into SQLite, DRAIN_ITEMS songs per transaction, so a slow
+database lock delays application instead of timing out the client.
+
+Segment records are framed as [length][crc32][json], so a write torn
+by a crash is detected and cut off on recovery. Recovery re-queues
+every intact record. The apply callback records each batch id in the
+same transaction as its songs and skips ids it has already applied.
+Replay is therefore exactly-once, including when the crash came after
+a commit but before the segment file was removed. A segment file is
+deleted once all its batches are applied.
+
+With several workers, each one owns a subdirectory of the shared root
+(adopt_from), locked with flock while it runs. On start a worker adopts
+the segments of directories whose owner is gone, and any left directly
+in the root, so no two consumers ever read or unlink the same files.
+"""
+
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import uuid
+import zlib
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # optional: no flock, single worker only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_BYTES = 4 * 1024 * 1024
+DRAIN_ITEMS = 5000           # songs per apply transaction
+MAX_PENDING_BYTES = 256 * 1024 * 1024
+RETRY_DELAY = 0.5            # first retry after a transient apply error
+RETRY_DELAY_MAX = 30.0
+
+_HEADER = struct.Struct(">II")   # payload length, crc32
+
+
+class QueueFull(Exception):
+    """The backlog exceeds MAX_PENDING_BYTES; the client should retry later."""
+
+
+class TransientError(Exception):
+    """Raised by apply callbacks for errors worth retrying (locks, I/O)."""
+
+
+class IngestQueue:
+    """
+    apply(batches) writes a list of batches in one transaction and must
+    skip ids it has already applied; raise TransientError to retry.
+    fail(batch, error) records a batch that can never be applied.
+    """
+
+    def __init__(self, directory: Path, apply: Callable[[List[Dict]], None],
+                 fail: Callable[[Dict, str], None], segment_bytes: int = SEGMENT_BYTES,
+                 drain_items: int = DRAIN_ITEMS, max_pending_bytes: int = MAX_PENDING_BYTES,
+                 adopt_from: Optional[Path] = None):
+        self.directory = Path(directory)
+        self.adopt_from = Path(adopt_from) if adopt_from else None
+        self._owner_fd: Optional[int] = None
+        self.apply = apply
+        self.fail = fail
+        self.segment_bytes = segment_bytes
+        self.drain_items = drain_items
+        self.max_pending_bytes = max_pending_bytes
+
+        self._lock = threading.Lock()         # segment writes and the pending deque
+        self._drain_lock = threading.Lock()   # one drain at a time
+        self._wake = threading.Event()
+        self._pending: Deque[Tuple[int, int, Dict]] = deque()   # (segment, size, batch)
+        self._pending_ids: Dict[str, Dict] = {}
+        self._pending_bytes = 0
+        self._segment_refs: Dict[int, int] = {}
+        self._segment = 0
+        self._handle = None
+        self._started = False
+        self._thread: Optional[threading.Thread] = None
+        self.is_running = False
+
+        self.applied = 0
+        self.failed = 0
+        self.replayed = 0
+        self.last_error: Optional[str] = None
+        self.last_drain: Optional[float] = None
+
+    # =========================
+    # Segments
+    # =========================
+
+    def _path(self, segment: int) -> Path:
+        return self.directory / f"{segment:012d}.seg"
+
+    def _segments(self) -> List[int]:
+        return sorted(int(p.stem) for p in self.directory.glob("*.seg") if p.stem.isdigit())
+
+    def _open_segment(self, segment: int) -> None:
+        previous = self._segment if self._handle is not None else None
+        if self._handle is not None:
+            self._handle.close()
+        self._segment = segment
+        if previous is not None and not self._segment_refs.get(previous):
+            self._segment_refs.pop(previous, None)
+            self._path(previous).unlink(missing_ok=True)
+        self._handle = open(self._path(segment), "ab")
+        self._segment_refs.setdefault(segment, 0)
+        # Make the new directory entry durable too
+        dir_fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    def _read_segment(self, segment: int) -> List[Dict]:
+        """Intact records of a segment; a torn tail is truncated away."""
+        path = self._path(segment)
+        data = path.read_bytes()
+        records, offset = [], 0
+
+        while offset + _HEADER.size <= len(data):
+            length, crc = _HEADER.unpack_from(data, offset)
+            payload = data[offset + _HEADER.size:offset + _HEADER.size + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break
+            record = json.loads(payload)
+            record["bytes"] = length
+            records.append(record)
+            offset += _HEADER.size + length
+
+        if offset < len(data):
+            logger.warning(f"Ingest segment {path.name}: dropping {len(data) - offset} torn bytes")
+            with open(path, "r+b") as handle:
+                handle.truncate(offset)
+                os.fsync(handle.fileno())
+        return records
+
+    def _release(self, segment: int) -> None:
+        """Drop one pending reference; delete finished, inactive segments."""
+        self._segment_refs[segment] -= 1
+        if self._segment_refs[segment] <= 0 and segment != self._segment:
+            del self._segment_refs[segment]
+            self._path(segment).unlink(missing_ok=True)
+
+    # =========================
+    # Worker directories
+    # =========================
+
+    @staticmethod
+    def _try_lock(directory: Path, blocking: bool = False) -> Optional[int]:
+        """Open and flock directory/.lock; the fd, or None if someone holds it."""
+        fd = os.open(directory / ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except OSError:
+            os.close(fd)
+            return None
+        return fd
+
+    def _adopt(self, source: Path) -> int:
+        """Move source's segments after our own (caller holds our lock)."""
+        segments = sorted(p for p in source.glob("*.seg") if p.stem.isdigit())
+        if not segments:
+            return 0
+        own = self._segments()
+        next_segment = (own[-1] + 1) if own else 1
+        for path in segments:
+            os.replace(path, self._path(next_segment))
+            next_segment += 1
+        logger.info(f"Ingest queue: adopted {len(segments)} segments from {source}")
+        return len(segments)
+
+    def _claim_directory(self) -> None:
+        """Lock our directory and adopt orphaned segments under the root lock."""
+        if fcntl is None or self.adopt_from is None:
+            return
+        self._owner_fd = self._try_lock(self.directory)
+        if self._owner_fd is None:
+            raise RuntimeError(f"Ingest queue directory {self.directory} is owned by another worker")
+
+        self.adopt_from.mkdir(parents=True, exist_ok=True)
+        root_fd = self._try_lock(self.adopt_from, blocking=True)
+        try:
+            self._adopt(self.adopt_from)   # segments from single-directory deployments
+            for sibling in self.adopt_from.iterdir():
+                if not sibling.is_dir() or sibling == self.directory:
+                    continue
+                fd = self._try_lock(sibling)
+                if fd is None:
+                    continue  # owner still running
+                try:
+                    self._adopt(sibling)
+                    (sibling / ".lock").unlink(missing_ok=True)
+                finally:
+                    os.close(fd)
+                try:
+                    sibling.rmdir()
+                except OSError:
+                    pass  # recreated or not empty; adopted again next start
+        finally:
+            os.close(root_fd)
+
+    def _release_directory(self) -> None:
+        if self._owner_fd is None:
+            return
+        if not self._segments():
+            (self.directory / ".lock").unlink(missing_ok=True)
+            try:
+                self.directory.rmdir()
+            except OSError:
+                pass
+        os.close(self._owner_fd)
+        self._owner_fd = None
+
+    # =========================
+    # Lifecycle
+    # =========================
+
+    def start(self) -> None:
+        """Recover unapplied segments and start the consumer (idempotent)."""
+        with self._lock:
+            if self._started:
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._claim_directory()
+
+            segments = self._segments()
+            for segment in segments:
+                for batch in self._read_segment(segment):
+                    self._enqueue(segment, batch)
+                    self.replayed += 1
+                if not self._segment_refs.get(segment):
+                    self._path(segment).unlink(missing_ok=True)
+                    self._segment_refs.pop(segment, None)
+
+            # Never append after a possibly torn record: start a new segment
+            self._open_segment((segments[-1] + 1) if segments else 1)
+            self._started = True
+
+        if self.replayed:
+            logger.info(f"Ingest queue: replaying {self.replayed} unacknowledged batches")
+
+        self.is_running = True
+        self._thread = threading.Thread(target=self._run, name="ingest-queue", daemon=True)
+        self._thread.start()
+        self._wake.set()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Drain what the database accepts within `timeout`, then stop."""
+        self.is_running = False
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                logger.warning("Ingest queue still draining at shutdown; segments kept for replay")
+                return
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            # Whatever is left is replayed from the segments on next start
+            self._pending.clear()
+            self._pending_ids.clear()
+            self._pending_bytes = 0
+            self._segment_refs.clear()
+            self._started = False
+            self._release_directory()
+
+    # =========================
+    # Producer
+    # =========================
+
+    def _enqueue(self, segment: int, batch: Dict) -> None:
+        size = len(batch.get("songs", ()))
+        self._pending.append((segment, size, batch))
+        self._pending_ids[batch["id"]] = batch
+        self._pending_bytes += batch.get("bytes", 0)
+        self._segment_refs[segment] = self._segment_refs.get(segment, 0) + 1
+
+    def append(self, endpoint: str, source: str, songs: List[Dict[str, Any]]) -> str:
+        """Durably queue a validated batch; returns its id once fsync'd."""
+        if not self._started:
+            self.start()
+
+        batch = {
+            "id": uuid.uuid4().hex,
+            "endpoint": endpoint,
+            "source": source,
+            "received_at": time.time(),
+            "songs": songs,
+        }
+        payload = json.dumps(batch, separators=(",", ":"), default=str).encode("utf-8")
+
+        with self._lock:
+            if self._pending_bytes + len(payload) > self.max_pending_bytes:
+                raise QueueFull(f"ingest backlog above {self.max_pending_bytes} bytes")
+
+            if self._handle.tell() + len(payload) > self.segment_bytes and self._handle.tell():
+                self._open_segment(self._segment + 1)
+
+            self._handle.write(_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+
+            batch["bytes"] = len(payload)
+            self._enqueue(self._segment, batch)
+
+        self._wake.set()
+        return batch["id"]
+
+    def status(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Queued batch summary, or None once applied (or unknown)."""
+        with self._lock:
+            batch = self._pending_ids.get(batch_id)
+            if batch is None:
+                return None
+            return {
+                "batch_id": batch_id,
+                "status": "queued",
+                "endpoint": batch["endpoint"],
+                "source": batch["source"],
+                "items": len(batch["songs"]),
+                "received_at": batch["received_at"],
+            }
+
+    # =========================
+    # Consumer
+    # =========================
+
+    def _take(self) -> List[Tuple[int, int, Dict]]:
+        """Oldest pending batches up to drain_items songs (at least one)."""
+        with self._lock:
+            taken, items = [], 0
+            for entry in self._pending:
+                if taken and items + entry[1] > self.drain_items:
+                    break
+                taken.append(entry)
+                items += entry[1]
+            return taken
+
+    def _done(self, entries: List[Tuple[int, int, Dict]]) -> None:
+        with self._lock:
+            for segment, _, batch in entries:
+                self._pending.popleft()
+                self._pending_ids.pop(batch["id"], None)
+                self._pending_bytes -= batch.get("bytes", 0)
+                self._release(segment)
+
+    def drain_once(self) -> int:
+        """Apply the next group of batches. Returns batches completed."""
+        with self._drain_lock:
+            entries = self._take()
+            if not entries:
+                return 0
+
+            try:
+                self.apply([batch for _, _, batch in entries])
+                self.applied += len(entries)
+            except TransientError:
+                raise
+            except Exception as e:
+                if len(entries) > 1:
+                    # Isolate the bad batch: apply the group one by one
+                    logger.warning(f"Ingest group apply failed ({e}); retrying batches singly")
+                    entries = entries[:1]
+                    try:
+                        self.apply([entries[0][2]])
+                        self.applied += 1
+                    except TransientError:
+                        raise
+                    except Exception as single_error:
+                        self._poison(entries[0][2], single_error)
+                else:
+                    self._poison(entries[0][2], e)
+
+            self._done(entries)
+            self.last_drain = time.time()
+            return len(entries)
+
+    def _poison(self, batch: Dict, error: Exception) -> None:
+        logger.error(f"Ingest batch {batch['id']} failed permanently: {error}")
+        self.failed += 1
+        self.last_error = str(error)
+        self.fail(batch, str(error))
+
+    def _run(self) -> None:
+        delay = RETRY_DELAY
+        while True:
+            if not self._pending:
+                if not self.is_running:
+                    return
+                self._wake.wait(timeout=1.0)
+                self._wake.clear()
+                continue
+
+            try:
+                self.drain_once()
+                delay = RETRY_DELAY
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning(f"Ingest apply deferred ({e}); retrying in {delay:.1f}s")
+                if not self.is_running:
+                    return
+                self._wake.wait(timeout=delay)
+                self._wake.clear()
+                delay = min(delay * 2, RETRY_DELAY_MAX)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every queued batch has been applied (tests, shutdown)."""
+        deadline = time.monotonic() + timeout
+        while self._pending and time.monotonic() < deadline:
+            self._wake.set()
+            time.sleep(0.01)
+        return not self._pending
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            oldest = self._pending[0][2]["received_at"] if self._pending else None
+            return {
+                "pending_batches": len(self._pending),
+                "pending_items": sum(entry[1] for entry in self._pending),
+                "pending_bytes": self._pending_bytes,
+                "segments": len(self._segment_refs),
+                "lag_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+                "applied": self.applied,
+                "failed": self.failed,
+                "replayed": self.replayed,
+                "last_error": self.last_error,
+            }
@@ -0,0 +1,137 @@
+# api/ingestion/ndjson.py
+"""
+Incremental NDJSON reading for streaming ingest.
+
+Request body chunks are decompressed (gzip, deflate or zstd) and split
+into lines as they arrive, so memory is bounded by MAX_LINE_BYTES plus
+one network chunk whatever the body size. Decompression runs in steps of
+at most INFLATE_STEP output bytes, and a body that inflates past
+MAX_INFLATED_BYTES in total raises BodyTooLarge, so a small compressed
+bomb cannot allocate gigabytes. Over-long lines are reported and
+skipped, never buffered.
+"""
+
+import zlib
+from typing import AsyncIterator, Iterator, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional: zstd bodies rejected
+    zstandard = None
+
+MAX_LINE_BYTES = 64 * 1024
+INFLATE_STEP = 64 * 1024                 # max bytes produced per decompress call
+MAX_INFLATED_BYTES = 512 * 1024 * 1024   # whole decompressed body
+ZSTD_INPUT_STEP = 1024                   # zstd decompressobj has no max_length
+
+ENCODINGS = ("identity", "gzip", "deflate", "zstd")
+
+
+class UnsupportedEncoding(Exception):
+    pass
+
+
+class BodyTooLarge(Exception):
+    """The decompressed body grew past the configured limit."""
+
+    def __init__(self, limit: int):
+        super().__init__(f"Decompressed body exceeds {limit} bytes")
+        self.limit = limit
+
+
+def decompressor(encoding: Optional[str]):
+    """Object with decompress(bytes) for a Content-Encoding (None = identity)."""
+    encoding = (encoding or "identity").strip().lower()
+    if encoding == "identity":
+        return None
+    if encoding == "gzip":
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        return zlib.decompressobj()
+    if encoding == "zstd":
+        if zstandard is None:
+            raise UnsupportedEncoding("zstd bodies need the zstandard package")
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise UnsupportedEncoding(f"Unsupported Content-Encoding: {encoding}")
+
+
+def _steps(inflate, data: bytes) -> Iterator[bytes]:
+    """Decompressed pieces of `data`, none longer than INFLATE_STEP."""
+    if hasattr(inflate, "unconsumed_tail"):
+        while data:
+            piece = inflate.decompress(data, INFLATE_STEP)
+            data = inflate.unconsumed_tail
+            if piece:
+                yield piece
+            elif data:
+                break  # nothing more will come out of the tail
+        return
+    for start in range(0, len(data), ZSTD_INPUT_STEP):
+        piece = inflate.decompress(data[start:start + ZSTD_INPUT_STEP])
+        if piece:
+            yield piece
+
+
+async def _inflated(chunks: AsyncIterator[bytes], encoding: Optional[str],
+                    max_inflated: int) -> AsyncIterator[bytes]:
+    inflate = decompressor(encoding)
+    if inflate is None:
+        async for chunk in chunks:
+            yield chunk
+        return
+
+    total = 0
+    async for chunk in chunks:
+        for piece in _steps(inflate, chunk):
+            total += len(piece)
+            if total > max_inflated:
+                raise BodyTooLarge(max_inflated)
+            yield piece
+    if hasattr(inflate, "flush"):
+        piece = inflate.flush()
+        if total + len(piece) > max_inflated:
+            raise BodyTooLarge(max_inflated)
+        if piece:
+            yield piece
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], encoding: Optional[str] = None,
+                     max_line: int = MAX_LINE_BYTES,
+                     max_inflated: int = MAX_INFLATED_BYTES) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    (line_number, line) for every non-blank line; line is None when it
+    was longer than max_line (its bytes are discarded as they arrive).
+    Raises BodyTooLarge once the decompressed body passes max_inflated.
+    """
+    buffer = bytearray()
+    number = 0
+    overflow = False
+
+    async for chunk in _inflated(chunks, encoding, max_inflated):
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                break
+            number += 1
+            if overflow:
+                yield number, None
+            else:
+                buffer += chunk[start:end]
+                if buffer.strip():
+                    yield number, bytes(buffer) if len(buffer) <= max_line else None
+            buffer.clear()
+            overflow = False
+            start = end + 1
+
+        if not overflow:
+            buffer += chunk[start:]
+            if len(buffer) > max_line:
+                overflow = True
+                buffer.clear()
+
+    if overflow:
+        yield number + 1, None
+    elif buffer.strip():
+        number += 1
+        yield number, bytes(buffer) if len(buffer) <= max_line else None
@@ -6,13 +6,14 @@ Based on your provided code
 import os
 import asyncio
 import aiohttp
-import re
 from datetime import datetime
 import hashlib
 import requests
 import sys
 import logging
 
+from api.utils import metadata_parser
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -145,9 +146,9 @@ class EnhancedUgandaRadioScraper:
                     meta_text = meta_data.decode('utf-8', errors='ignore')
                     
                     # Extract song info
-                    match = re.search(r"StreamTitle='(.*?)';", meta_text)
-                    if match:
-                        full_title = match.group(1).strip()
+                    full_title = metadata_parser.stream_title(meta_text)
+                    if full_title:
+                        full_title = full_title.strip()
                         
                         # Parse artist and title
                         artist, title = self._parse_artist_title(full_title)
@@ -178,43 +179,17 @@ class EnhancedUgandaRadioScraper:
         return None
     
     def _parse_artist_title(self, full_title: str):
-        """Parse artist and title from various formats"""
-        full_title = full_title.strip()
-        
-        # Remove common prefixes
-        if full_title.startswith("Now Playing: "):
-            full_title = full_title[13:]
-        if full_title.startswith("Current: "):
-            full_title = full_title[9:]
-        
-        # Common separators in Ugandan radio
-        separators = [
-            (" - ", 1),  # Most common: "Artist - Title"
-            (" : ", 1),  # "Artist : Title"
-            (" | ", 1),  # "Artist | Title"
-            (" ~ ", 1),  # "Artist ~ Title"
-            (" by ", 0), # "Title by Artist"
-            (" ft. ", 1), # "Artist ft. Other - Title"
-            (" feat. ", 1),
-        ]
+        """Parse artist and title from various formats (shared, cached parser)"""
+        parsed = metadata_parser.parse(full_title)
+        if not parsed:
+            return "Unknown", "Unknown Track"
         
-        for sep, artist_first in separators:
-            if sep in full_title:
-                parts = full_title.split(sep, 1)
-                if artist_first:
-                    artist, title = parts[0].strip(), parts[1].strip()
-                else:
-                    title, artist = parts[0].strip(), parts[1].strip()
-                
-                # Clean up
-                artist = artist.replace("(Official Audio)", "").replace("(Official Video)", "").strip()
-                title = title.replace("(Official Audio)", "").replace("(Official Video)", "").strip()
-                
-                return artist[:100], title[:200]
+        if parsed.artist:
+            return parsed.artist[:100], parsed.title[:200]
         
         # If no separator found
-        if len(full_title) < 50:  # Probably just a title
-            return "Unknown Artist", full_title[:200]
+        if len(parsed.title) < 50:  # Probably just a title
+            return "Unknown Artist", parsed.title[:200]
         else:
             return "Unknown Artist", "Unknown Track"
     
@@ -340,7 +315,7 @@ async def main():
                 timeout=15
             )
             
-            if response.status_code == 200:
+            if response.status_code in (200, 202):  # 202: queued for apply
                 result = response.json()
                 print(f"✅ Success! Sent {len(songs)} songs")
                 print(f"📝 Message: {result.get('message', 'No message')}")
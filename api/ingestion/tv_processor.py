@@ -93,7 +93,7 @@ class TVIngestionProcessor:
                 timeout=30
             )
             
-            if response.status_code == 200:
+            if response.status_code in (200, 202):  # 202: queued for apply
                 result = response.json()
                 logger.info(f"Successfully ingested TV data: {result.get('message')}")
                 return True
@@ -150,7 +150,7 @@ class TVIngestionProcessor:
                 timeout=60
             )
             
-            if response.status_code == 200:
+            if response.status_code in (200, 202):  # 202: queued for apply
                 result = response.json()
                 result["invalid_items"] = invalid_items
                 return {"success": True, **result}
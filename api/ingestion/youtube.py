@@ -51,11 +51,9 @@ def ingest_youtube(payload: Dict):
     # After successful ingestion, trigger scoring
     try:
         from api.scoring.auto import safe_auto_recalculate
-        from data.store import load_items
         
-        # Get fresh items including newly ingested
-        all_items = load_items()
-        safe_auto_recalculate(all_items)
+        # Rescore only the songs this payload touched
+        safe_auto_recalculate(payload.get("items", []))
         
         logger.info(f"Auto-scoring triggered after ingestion")
         
@@ -0,0 +1,548 @@
+# api/metrics.py
+"""
+Built-in instrumentation exported in Prometheus text format.
+
+Hot-path cost is a bisect into pre-allocated bucket counts and a few
+integer increments; there are no locks on observe/inc. HTTP metrics are
+recorded on the event loop thread. Scraper and scheduler metrics come
+from worker threads, where increments are serialized by the GIL
+(best-effort: a rare lost increment is acceptable for metrics).
+A lock is only taken the first time a label set is seen.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Default latency buckets (seconds)
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+JOB_BUCKETS = (0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# =========================
+# Metric types
+# =========================
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        return self._children[()]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1) -> None:
+        self._default().inc(amount)
+
+    def total(self) -> float:
+        return sum(c.value for c in list(self._children.values()))
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in sorted(self._children.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1) -> None:
+        self._default().dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # last slot = +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    @contextmanager
+    def time(self, *labelvalues):
+        child = self.labels(*labelvalues) if labelvalues else self._default()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            child.observe(time.perf_counter() - start)
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, child in sorted(self._children.items()):
+            cumulative = 0
+            counts = list(child.counts)
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                labels = _format_labels(self.labelnames, key, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Duplicate metric: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in list(self._metrics.values())) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# =========================
+# Metric definitions
+# =========================
+
+PROCESS_START = REGISTRY.gauge(
+    "ugboard_process_start_time_seconds", "Unix time the process started"
+)
+PROCESS_START.set(time.time())
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "ugboard_http_requests_total", "HTTP requests served", ("method", "route", "status")
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "ugboard_http_request_duration_seconds", "HTTP request latency", ("method", "route")
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "ugboard_http_requests_in_flight", "HTTP requests currently being served"
+)
+HTTP_RESPONSE_SIZE = REGISTRY.histogram(
+    "ugboard_http_response_size_bytes", "HTTP response body size", ("route",), SIZE_BUCKETS
+)
+
+DB_QUERY_LATENCY = REGISTRY.histogram(
+    "ugboard_db_query_duration_seconds", "SQLite statement execution time", ("operation",)
+)
+DB_QUERY_ERRORS = REGISTRY.counter(
+    "ugboard_db_query_errors_total", "SQLite statements that raised", ("operation",)
+)
+DB_CONNECTIONS_OPEN = REGISTRY.gauge(
+    "ugboard_db_connections_open", "SQLite connections currently open"
+)
+
+SCRAPER_DURATION = REGISTRY.histogram(
+    "ugboard_scraper_duration_seconds", "Scrape duration per station",
+    ("scraper", "station"), JOB_BUCKETS,
+)
+SCRAPER_ITEMS = REGISTRY.counter(
+    "ugboard_scraper_items_total", "Items found by scrapers", ("scraper", "station")
+)
+SCRAPER_BYTES = REGISTRY.counter(
+    "ugboard_scraper_bytes_total", "Bytes read from upstream sources", ("scraper", "station")
+)
+SCRAPER_ERRORS = REGISTRY.counter(
+    "ugboard_scraper_errors_total", "Failed scrapes", ("scraper", "station")
+)
+
+JOB_DURATION = REGISTRY.histogram(
+    "ugboard_scheduler_job_duration_seconds", "Scheduled job duration", ("job",), JOB_BUCKETS
+)
+JOB_RUNS = REGISTRY.counter(
+    "ugboard_scheduler_job_runs_total", "Scheduled job runs", ("job", "status")
+)
+JOB_LAST_RUN = REGISTRY.gauge(
+    "ugboard_scheduler_job_last_run_timestamp_seconds", "Unix time a job last finished", ("job",)
+)
+JOB_IN_FLIGHT = REGISTRY.gauge(
+    "ugboard_scheduler_jobs_in_flight", "Scheduled and background jobs currently running", ("job",)
+)
+
+TELEMETRY_DROPPED = REGISTRY.counter(
+    "ugboard_telemetry_dropped_total", "History rows dropped from a full telemetry buffer", ("table",)
+)
+
+CACHE_LOOKUPS = REGISTRY.counter(
+    "ugboard_cache_lookups_total", "In-process cache lookups", ("cache", "result", "worker")
+)
+CACHE_INVALIDATIONS = REGISTRY.counter(
+    "ugboard_cache_invalidations_total", "Caches dropped after a write by any worker",
+    ("cache", "worker")
+)
+WORKER = str(os.getpid())
+
+HTTP_SHED = REGISTRY.counter(
+    "ugboard_http_shed_total", "Requests rejected with 503 by concurrency limits", ("route_class",)
+)
+HTTP_QUEUE_WAIT = REGISTRY.histogram(
+    "ugboard_http_queue_wait_seconds", "Time queued requests waited for a concurrency slot",
+    ("route_class",)
+)
+
+SINGLEFLIGHT_CALLS = REGISTRY.counter(
+    "ugboard_singleflight_calls_total",
+    "Coalesced computations by role (leader, coalesced) and failures (error, timeout)",
+    ("group", "outcome")
+)
+
+BUNDLE_PUBLISH_FAILURES = REGISTRY.counter(
+    "ugboard_bundle_publish_failures_total",
+    "Chart bundles that failed to publish (the old digest keeps being served)", ("kind",)
+)
+
+# Readiness decisions read these two gauges, so unlike the best-effort
+# counters their updates are serialized
+_gauge_lock = threading.Lock()
+
+
+# =========================
+# HTTP middleware
+# =========================
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware overhead, streaming safe).
+    Routes are labelled by their template, never the raw path.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        size = 0
+        in_flight = HTTP_IN_FLIGHT._default()
+        in_flight.inc()
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "<unmatched>"
+            method = scope.get("method", "")
+
+            HTTP_LATENCY.labels(method, template).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, template, status_code).inc()
+            HTTP_RESPONSE_SIZE.labels(template).observe(size)
+
+
+def observe_shed(route_class: str) -> None:
+    HTTP_SHED.labels(route_class).inc()
+
+
+def observe_queue_wait(route_class: str, seconds: float) -> None:
+    HTTP_QUEUE_WAIT.labels(route_class).observe(seconds)
+
+
+def total_requests() -> int:
+    return int(HTTP_REQUESTS.total())
+
+
+# =========================
+# SQLite timing
+# =========================
+
+def _operation(sql: str) -> str:
+    head = sql.lstrip().split(None, 1)
+    return head[0].upper() if head else "UNKNOWN"
+
+
+class TimedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        op = _operation(sql)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        except Exception:
+            DB_QUERY_ERRORS.labels(op).inc()
+            raise
+        finally:
+            DB_QUERY_LATENCY.labels(op).observe(time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        op = _operation(sql)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        except Exception:
+            DB_QUERY_ERRORS.labels(op).inc()
+            raise
+        finally:
+            DB_QUERY_LATENCY.labels(op).observe(time.perf_counter() - start)
+
+
+class TimedConnection(sqlite3.Connection):
+    """
+    sqlite3.connect(..., factory=TimedConnection) times every statement
+    run through the connection or its cursors, and counts open connections.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._counted = True
+        with _gauge_lock:
+            DB_CONNECTIONS_OPEN.inc()
+
+    def _release(self) -> None:
+        if getattr(self, "_counted", False):
+            self._counted = False
+            with _gauge_lock:
+                DB_CONNECTIONS_OPEN.dec()
+
+    def close(self):
+        self._release()
+        super().close()
+
+    def __del__(self):
+        self._release()
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    # The C shortcuts bypass cursor(); route them through a timed cursor
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# =========================
+# Scrapers & schedulers
+# =========================
+
+def observe_scrape(
+    scraper: str,
+    station: str,
+    duration: Optional[float],
+    status: str,
+    items: int = 0,
+) -> None:
+    if duration is not None:
+        SCRAPER_DURATION.labels(scraper, station).observe(duration)
+    if items:
+        SCRAPER_ITEMS.labels(scraper, station).inc(items)
+    if status != "success":
+        SCRAPER_ERRORS.labels(scraper, station).inc()
+
+
+def observe_telemetry_drop(table: str) -> None:
+    TELEMETRY_DROPPED.labels(table).inc()
+
+
+def add_scrape_bytes(scraper: str, station: str, nbytes: int) -> None:
+    if nbytes:
+        SCRAPER_BYTES.labels(scraper, station).inc(nbytes)
+
+
+@contextmanager
+def track_job(job: str):
+    """
+    Time a scheduled job. Yields a dict whose "status" the job may set
+    (e.g. "error" for handled failures); exceptions count as errors.
+    """
+    start = time.perf_counter()
+    state = {"status": "success"}
+    in_flight = JOB_IN_FLIGHT.labels(job)
+    with _gauge_lock:
+        in_flight.inc()
+    try:
+        yield state
+    except Exception:
+        state["status"] = "error"
+        raise
+    finally:
+        with _gauge_lock:
+            in_flight.dec()
+        JOB_DURATION.labels(job).observe(time.perf_counter() - start)
+        JOB_RUNS.labels(job, state["status"]).inc()
+        JOB_LAST_RUN.labels(job).set(time.time())
+
+
+# =========================
+# Caches
+# =========================
+
+def observe_cache(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss", WORKER).inc()
+
+
+def observe_invalidation(cache: str) -> None:
+    CACHE_INVALIDATIONS.labels(cache, WORKER).inc()
+
+
+def observe_singleflight(group: str, outcome: str) -> None:
+    SINGLEFLIGHT_CALLS.labels(group, outcome).inc()
+
+
+def observe_bundle_publish_failure(kind: str) -> None:
+    BUNDLE_PUBLISH_FAILURES.labels(kind).inc()
+
+
+def open_connections() -> int:
+    return int(DB_CONNECTIONS_OPEN._default().value)
+
+
+def jobs_in_flight() -> Dict[str, int]:
+    """Running jobs by name (zeros left out)."""
+    return {
+        key[0]: int(child.value)
+        for key, child in list(JOB_IN_FLIGHT._children.items())
+        if child.value
+    }
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+__all__ = [
+    "REGISTRY",
+    "CONTENT_TYPE",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsMiddleware",
+    "TimedConnection",
+    "TimedCursor",
+    "observe_scrape",
+    "add_scrape_bytes",
+    "observe_telemetry_drop",
+    "track_job",
+    "observe_cache",
+    "observe_invalidation",
+    "observe_singleflight",
+    "observe_shed",
+    "observe_queue_wait",
+    "total_requests",
+    "open_connections",
+    "jobs_in_flight",
+    "render",
+]
@@ -0,0 +1,194 @@
+# api/responses.py
+"""
+Fast JSON responses.
+
+orjson serialization (stdlib json fallback) and a small cache of
+pre-serialized, pre-gzipped bodies keyed by chart version, so repeat
+hits on a chart skip the database, serialization and compression.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from api import metrics
+from data.chart_bundles import accepted_encodings
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json fallback
+    orjson = None
+
+GZIP_MIN_SIZE = 500      # same threshold as the app's GZipMiddleware
+GZIP_LEVEL = 6
+
+# Paths whose bodies go out uncompressed: event streams (gzip would hold
+# events back in its buffer) and byte-range exports (offsets must stay valid)
+GZIP_EXCLUDED = ("/charts/stream", "/export")
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS, default=str)
+    return json.dumps(
+        content, ensure_ascii=False, separators=(",", ":"), default=str
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# =========================
+# Pre-serialized bodies
+# =========================
+
+class CachedBody:
+    """Serialized JSON plus its gzip form (compressed once, on first use)."""
+
+    __slots__ = ("body", "etag", "_gzipped", "_lock")
+
+    def __init__(self, content: Any):
+        self.body = dumps(content)
+        self.etag = '"' + hashlib.blake2b(self.body, digest_size=12).hexdigest() + '"'
+        self._gzipped: Optional[bytes] = None
+        self._lock = threading.Lock()
+
+    @property
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            with self._lock:
+                if self._gzipped is None:
+                    self._gzipped = gzip.compress(self.body, GZIP_LEVEL, mtime=0)
+        return self._gzipped
+
+    def response(self, request: Request) -> Response:
+        """
+        304 on a matching If-None-Match, otherwise the cached bytes.
+        Sets Content-Encoding itself so GZipMiddleware passes it through.
+        """
+        headers = {"ETag": self.etag, "Vary": "Accept-Encoding"}
+
+        if request.headers.get("if-none-match") == self.etag:
+            return Response(status_code=304, headers=headers)
+
+        accepts_gzip = "gzip" in accepted_encodings(request.headers.get("accept-encoding", ""))
+        if accepts_gzip and len(self.body) >= GZIP_MIN_SIZE:
+            headers["Content-Encoding"] = "gzip"
+            return Response(self.gzipped, media_type="application/json", headers=headers)
+
+        return Response(self.body, media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """
+    LRU of CachedBody keyed by (key, version) with a TTL backstop for
+    time-dependent content (recency-weighted scores).
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 30.0, name: str = "response"):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = True
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key: Hashable, version: Hashable) -> Optional[CachedBody]:
+        """Cached body for (key, version), or None (counted as a miss)."""
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version and now - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                metrics.observe_cache(self.name, True)
+                return entry[2]
+            self.misses += 1
+        metrics.observe_cache(self.name, False)
+        return None
+
+    def put(self, key: Hashable, version: Hashable, content: Any) -> CachedBody:
+        cached = CachedBody(content)
+        if not self.enabled:
+            return cached
+        with self._lock:
+            self._entries[key] = (version, time.monotonic(), cached)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
+
+    def get_or_build(self, key: Hashable, version: Hashable, build: Callable[[], Any]) -> CachedBody:
+        # Builds outside the lock; callers that must not build twice
+        # coalesce misses through api.singleflight
+        cached = self.lookup(key, version)
+        if cached is None:
+            cached = self.put(key, version, build())
+        return cached
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "enabled": self.enabled,
+                "serializer": "orjson" if orjson is not None else "json",
+            }
+
+
+# =========================
+# Compression
+# =========================
+
+class StreamingGZipMiddleware:
+    """
+    Starlette's GZipMiddleware, skipped for the GZIP_EXCLUDED path
+    prefixes and for clients that refuse gzip with q=0.
+    """
+
+    def __init__(self, app, minimum_size: int = GZIP_MIN_SIZE, compresslevel: int = 9,
+                 excluded=GZIP_EXCLUDED):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.excluded = tuple(excluded)
+
+    def _excluded(self, path: str) -> bool:
+        return any(path == prefix or path.startswith(prefix.rstrip("/") + "/")
+                   for prefix in self.excluded)
+
+    def _compress(self, scope) -> bool:
+        if scope["type"] != "http" or self._excluded(scope["path"]):
+            return False
+        return "gzip" in accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+
+    async def __call__(self, scope, receive, send) -> None:
+        if self._compress(scope):
+            await self.gzip(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -1,30 +1,279 @@
 # api/scoring/auto_recalc.py
+"""
+Incremental auto-recalculation.
 
-from data.store import load_items, save_items
+Ingestion marks the song keys it touched; a debounced background timer
+coalesces every mark that arrives inside the window into one recompute
+that rescores only the dirty songs and moves them in the live chart.
+Each song's contribution to the normalization peaks is kept, so a
+recompute checks the peaks against the dirty songs only. A full rebuild
+happens only on first use, on mark_ingestion(None) (bulk writers that
+do not track keys), or when a normalization peak moves.
 
-_recalc_flag = False
+The recompute keeps its working copy of items.json in memory and only
+reloads it when items_version() shows another writer changed the file.
+items.json is a single JSON document, so it is still written whole, but
+only when a score changed, and at most once per debounced recompute.
+"""
 
+import json
+import os
+import threading
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
 
-def mark_ingestion():
-    global _recalc_flag
-    _recalc_flag = True
+from data.store import items_version, load_items, save_items
+from data.chart_archive import song_key
+from api.scoring.engine import ITEMS_VERSION, compile_rules
+from api.charts.live_chart import LiveChart
+from api.utils.metrics_merge import index_items
 
+logger = logging.getLogger(__name__)
 
-def safe_auto_recalculate():
-    global _recalc_flag
+VERSION = ITEMS_VERSION
+TOP100_PATH = "data/top100.json"
+TOP100_SIZE = 100
+DEBOUNCE_SECONDS = 2.0
 
-    if not _recalc_flag:
+SongRef = Union[str, Tuple[str, str], Dict]
+
+_state_lock = threading.Lock()   # guards the dirty set and timer
+_run_lock = threading.Lock()     # one recompute at a time
+
+_dirty: Set[str] = set()
+_full = False
+_timer: Optional[threading.Timer] = None
+
+_chart = LiveChart()
+_stats: Optional[tuple] = None
+_item_stats: Dict[str, tuple] = {}   # song key -> its stats() contribution
+_published: List[Tuple[str, float]] = []
+
+_items: List[Dict] = []              # working copy of items.json
+_index: Dict[str, Dict] = {}
+_items_version = None                # items_version() of the working copy
+
+
+# =========================
+# Dirty tracking
+# =========================
+
+def _key(ref: SongRef) -> str:
+    if isinstance(ref, dict):
+        return song_key(ref.get("title"), ref.get("artist"))
+    if isinstance(ref, tuple):
+        return song_key(*ref)
+    return ref
+
+
+def mark_ingestion(songs: Optional[Iterable[SongRef]] = None) -> None:
+    """
+    Record changed songs and schedule one debounced recompute.
+
+    songs: song keys, (title, artist) tuples or item dicts.
+    None marks everything dirty (full rebuild).
+    """
+    global _full, _timer
+
+    with _state_lock:
+        if songs is None:
+            _full = True
+        else:
+            _dirty.update(k for k in map(_key, songs) if k)
+
+        if _timer is None and (_full or _dirty):
+            _timer = threading.Timer(DEBOUNCE_SECONDS, _fire)
+            _timer.daemon = True
+            _timer.start()
+
+
+def _fire() -> None:
+    global _timer
+    with _state_lock:
+        _timer = None
+    safe_auto_recalculate()
+
+
+def _drain() -> Tuple[Set[str], bool]:
+    global _dirty, _full
+    with _state_lock:
+        keys, full = _dirty, _full
+        _dirty, _full = set(), False
+    return keys, full
+
+
+def flush() -> None:
+    """Run any pending recompute now (shutdown, tests, manual triggers)."""
+    global _timer
+    with _state_lock:
+        if _timer is not None:
+            _timer.cancel()
+            _timer = None
+    safe_auto_recalculate()
+
+
+def pending() -> Dict:
+    with _state_lock:
+        return {
+            "dirty": len(_dirty),
+            "full_rebuild": _full,
+            "scheduled": _timer is not None,
+        }
+
+
+# =========================
+# Recompute
+# =========================
+
+def _working_copy() -> Tuple[List[Dict], Dict[str, Dict]]:
+    """Items and their index, reloaded only if items.json changed on disk."""
+    global _items, _index, _items_version
+
+    version = items_version()
+    if version is None or version != _items_version:
+        _items = load_items()
+        _index = index_items(_items)
+        _items_version = version
+    return _items, _index
+
+
+def _rebuild(compiled, index: Dict[str, Dict]) -> Set[str]:
+    global _stats, _item_stats
+
+    keys = list(index)
+    items = [index[k] for k in keys]
+    _stats = compiled.stats(items)
+    _item_stats = dict(zip(keys, compiled.item_stats(items)))
+    scores = compiled.score(items, stats=_stats)
+
+    changed = set()
+    for key, item, score in zip(keys, items, scores):
+        if item.get("score") != score:
+            item["score"] = score
+            changed.add(key)
+
+    _chart.rebuild(dict(zip(keys, scores)))
+    return changed
+
+
+def _apply(compiled, index: Dict[str, Dict], keys: Set[str]) -> Optional[Set[str]]:
+    """
+    Rescore only `keys`. Returns None if a full rebuild is required.
+    """
+    removed = keys - index.keys()
+    dirty = [k for k in keys if k in index]
+    items = [index[k] for k in dirty]
+
+    if not compiled.row_independent:
+        fresh = dict(zip(dirty, compiled.item_stats(items)))
+        for key in removed | fresh.keys():
+            old, new = _item_stats.get(key), fresh.get(key)
+            for i, peak in enumerate(_stats):
+                # A raised peak, or a lowered / removed value that held one
+                if (new is not None and new[i] > peak) or (
+                    old is not None and old[i] == peak and (new is None or new[i] < peak)
+                ):
+                    return None
+        for key in removed:
+            _item_stats.pop(key, None)
+        _item_stats.update(fresh)
+
+    for key in removed:
+        _chart.discard(key)
+    if not dirty:
+        return set()
+
+    scores = compiled.score(items, stats=_stats)
+
+    changed = set()
+    for key, item, score in zip(dirty, items, scores):
+        _chart.update(key, score)
+        if item.get("score") != score:
+            item["score"] = score
+            changed.add(key)
+    return changed
+
+
+def _write_top100(index: Dict[str, Dict]) -> None:
+    """
+    Rewrite top100.json only when positions or scores moved.
+    Respects published locks.
+    """
+    global _published
+
+    top = _chart.top(TOP100_SIZE)
+    if top == _published:
+        return
+
+    data = {}
+    if os.path.exists(TOP100_PATH):
+        try:
+            with open(TOP100_PATH, "r") as f:
+                data = json.load(f)
+        except Exception:
+            data = {}
+
+    # Older writers stored the chart as a bare list of items
+    if isinstance(data, list):
+        data = {"items": data}
+    elif not isinstance(data, dict):
+        data = {}
+
+    if data.get("locked") is True:
         return
 
-    items = load_items()
+    data["items"] = [
+        {**index[key], "score": score, "position": position}
+        for position, (key, score) in enumerate(top, start=1)
+    ]
+    data["scoring_version"] = VERSION
+
+    os.makedirs(os.path.dirname(TOP100_PATH), exist_ok=True)
+    tmp = TOP100_PATH + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, TOP100_PATH)
+
+    _published = top
+
+
+def safe_auto_recalculate() -> None:
+    """
+    Apply all pending marks in one pass.
+    NEVER raises.
+    """
+    global _full, _items_version
+
+    with _run_lock:
+        keys, full = _drain()
+        if not keys and not full:
+            return
+
+        try:
+            compiled = compile_rules(VERSION)
+            items, index = _working_copy()
+
+            changed = None
+            if not full and len(_chart):
+                changed = _apply(compiled, index, keys)
+            if changed is None:
+                changed = _rebuild(compiled, index)
+
+            if changed:
+                if not save_items(items):
+                    raise OSError("items.json was not saved")
+                _items_version = items_version()
+
+            _write_top100(index)
+
+        except Exception as e:
+            logger.warning(f"Auto-recalculation failed: {e}")
+            # Retry everything on the next mark, from the file
+            _items_version = None
+            with _state_lock:
+                _full = True
 
-    # simple safe scoring
-    for i in items:
-        i["score"] = (
-            i.get("youtube", 0)
-            + i.get("radio", 0)
-            + i.get("tv", 0)
-        )
 
-    save_items(items)
-    _recalc_flag = False
\ No newline at end of file
+def get_position(title: str, artist: str) -> Optional[int]:
+    """Current live position of a song, without touching disk."""
+    return _chart.rank(song_key(title, artist))
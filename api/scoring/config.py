@@ -4,4 +4,150 @@ WEIGHTS = {
     "youtube": 0.5,
     "radio": 0.3,
     "tv": 0.2
-}
\ No newline at end of file
+}
+
+# Versioned unified scoring configs.
+# Published charts record the version they were built with, and
+# replays can re-score history under any version listed here.
+# Never edit a released version: add a new one.
+
+CURRENT_VERSION = "v2"       # live SQL chart (songs table)
+ITEMS_VERSION = "chart-v1"   # JSON item store builders
+
+SCORING_CONFIGS = {
+    "v1": {
+        "weights": {
+            "plays": 0.4,
+            "recency": 0.3,
+            "source_type": 0.2,
+        },
+        # (max age in days, points); None = any age
+        "recency_points": ((7, 30), (30, 20), (None, 10)),
+        "source_points": {
+            "youtube": 20,
+            "tv": 16,
+            "radio": 14,
+            "streaming": 18,
+        },
+        "default_source_points": 10,
+    },
+}
+
+# Versioned scoring rules, compiled by api/scoring/engine.py. Released
+# SCORING_CONFIGS versions are compiled from their original shape.
+#
+# Term types:
+#   column     - numeric field(s) * scale, optional cap / max-normalization
+#                (first present field wins, so aliases can be listed)
+#   category   - points looked up from a field value
+#   age_bucket - points by age in days of a timestamp field
+#   age_linear - start - per_day * age_days, floored
+#   constant   - fixed points
+
+_SOURCE_POINTS = {
+    "youtube": 20,
+    "tv": 16,
+    "radio": 14,
+    "streaming": 18,
+}
+
+SCORING_RULES = {
+    "v2": {
+        "description": "Unified plays / recency / source score (v1 as terms)",
+        "terms": [
+            {"type": "column", "fields": ["plays"], "weight": 0.4},
+            {
+                "type": "age_bucket",
+                "field": "ingested_at",
+                "buckets": [(7, 30), (30, 20), (None, 10)],
+                "weight": 0.3,
+            },
+            {
+                "type": "category",
+                "field": "source_type",
+                "points": _SOURCE_POINTS,
+                "default": 10,
+                "weight": 0.2,
+            },
+        ],
+    },
+    "stored-v1": {
+        "description": "Per-song stored score (UnifiedScoringSystem)",
+        "round": 2,
+        "terms": [
+            {"type": "column", "fields": ["plays"], "scale": 0.001, "cap": 40, "weight": 0.4},
+            {
+                "type": "age_linear",
+                "field": "ingested_at",
+                "start": 30,
+                "per_day": 1,
+                "floor": 0,
+                "missing": 0,
+                "weight": 0.3,
+            },
+            {
+                "type": "category",
+                "field": "source_type",
+                "points": _SOURCE_POINTS,
+                "default": 10,
+                "weight": 0.2,
+            },
+            {"type": "constant", "value": 10, "weight": 0.1},
+        ],
+    },
+    "chart-v1": {
+        "description": "Max-normalized YouTube / radio / TV blend",
+        "round": 6,
+        "terms": [
+            {"type": "column", "fields": ["youtube_views", "youtube"], "normalize": "max", "weight": 0.60},
+            {"type": "column", "fields": ["radio_plays", "radio"], "normalize": "max", "weight": 0.25},
+            {"type": "column", "fields": ["tv_appearances", "tv"], "normalize": "max", "weight": 0.15},
+        ],
+    },
+    "simple-v1": {
+        "description": "Raw counts 1 / 3 / 2",
+        "round": 0,
+        "terms": [
+            {"type": "column", "fields": ["youtube"], "weight": 1},
+            {"type": "column", "fields": ["radio"], "weight": 3},
+            {"type": "column", "fields": ["tv"], "weight": 2},
+        ],
+    },
+    "boost-v1": {
+        "description": "Raw counts 1 / 3 / 5",
+        "round": 0,
+        "terms": [
+            {"type": "column", "fields": ["youtube"], "weight": 1},
+            {"type": "column", "fields": ["radio"], "weight": 3},
+            {"type": "column", "fields": ["tv"], "weight": 5},
+        ],
+    },
+    "signal-v1": {
+        "description": "Views / plays / appearances 1 / 500 / 1000",
+        "round": 0,
+        "terms": [
+            {"type": "column", "fields": ["youtube_views"], "weight": 1},
+            {"type": "column", "fields": ["radio_plays"], "weight": 500},
+            {"type": "column", "fields": ["tv_appearances"], "weight": 1000},
+        ],
+    },
+    "sum-v1": {
+        "description": "Unweighted signal sum",
+        "round": 0,
+        "terms": [
+            {"type": "column", "fields": ["youtube"], "weight": 1},
+            {"type": "column", "fields": ["radio"], "weight": 1},
+            {"type": "column", "fields": ["tv"], "weight": 1},
+        ],
+    },
+}
+
+
+def get_scoring_config(version: str = None) -> dict:
+    version = version or CURRENT_VERSION
+
+    if version in SCORING_RULES:
+        return SCORING_RULES[version]
+    if version in SCORING_CONFIGS:
+        return SCORING_CONFIGS[version]
+    raise ValueError(f"Unknown scoring config version: {version}")
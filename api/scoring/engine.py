@@ -0,0 +1,498 @@
+# api/scoring/engine.py
+"""
+Single scoring engine for every chart builder.
+
+Versioned rule definitions (api/scoring/config.py) are compiled once
+into column kernels: each term reads one column for the whole batch,
+so scoring is a handful of array passes instead of per-item formulas.
+numpy is used when installed; otherwise the same kernels run on lists.
+
+The same rules also compile to a SQL expression for the songs table.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Hashable, List, Optional
+
+from api.scoring.config import (
+    CURRENT_VERSION,
+    ITEMS_VERSION,
+    SCORING_CONFIGS,
+    SCORING_RULES,
+    get_scoring_config,
+)
+
+try:
+    import numpy as np
+except ImportError:  # optional: pure-Python kernels
+    np = None
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_CACHE_SIZE = 8
+
+
+# =========================
+# Column helpers
+# =========================
+
+def _num(value) -> float:
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return 0.0
+    return 0.0
+
+
+def _column(items: List[Dict], fields: List[str]) -> List[float]:
+    """
+    Numeric column for a batch; first present field wins.
+    """
+    if len(fields) == 1:
+        field = fields[0]
+        return [_num(item.get(field)) for item in items]
+
+    column = []
+    for item in items:
+        value = None
+        for field in fields:
+            value = item.get(field)
+            if value is not None:
+                break
+        column.append(_num(value))
+    return column
+
+
+def _age_days(value, now: datetime) -> Optional[float]:
+    """
+    Age in days of a timestamp (datetime or ISO / sqlite string).
+    Naive values are UTC. None if missing or unparseable.
+    """
+    if value is None:
+        return None
+    try:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if value.tzinfo is not None:
+            value = value.replace(tzinfo=None) - value.utcoffset()
+        return (now - value).total_seconds() / 86400
+    except Exception:
+        return None
+
+
+# =========================
+# Term kernels
+# =========================
+# Each kernel maps (items, now, peak) -> per-row points for the whole
+# batch. `peak` only matters for max-normalized columns: None means
+# "normalize by this batch", a number pins the divisor so a subset can
+# be scored consistently with the full set.
+
+def _column_kernel(term: Dict):
+    fields = term["fields"]
+    scale = term.get("scale", 1)
+    cap = term.get("cap")
+    normalize = term.get("normalize")
+
+    def values(items):
+        col = _column(items, fields)
+
+        if np is not None:
+            col = np.asarray(col, dtype=float) * scale
+            return np.minimum(col, cap) if cap is not None else col
+
+        if scale != 1:
+            col = [v * scale for v in col]
+        if cap is not None:
+            col = [min(v, cap) for v in col]
+        return col
+
+    def kernel(items, now, peak=None):
+        col = values(items)
+
+        if normalize != "max":
+            return col
+
+        if peak is None:
+            peak = max(col) if len(col) else 0
+        if np is not None:
+            return col / peak if peak > 0 else np.zeros_like(col)
+        return [v / peak for v in col] if peak > 0 else [0.0] * len(col)
+
+    kernel.normalized = normalize == "max"
+    kernel.values = values
+    kernel.peak = lambda items: float(max(values(items), default=0)) if items else 0.0
+    return kernel
+
+
+def _category_kernel(term: Dict):
+    field = term["field"]
+    points = term["points"]
+    default = term.get("default", 0)
+
+    def kernel(items, now, peak=None):
+        return [float(points.get(item.get(field), default)) for item in items]
+
+    return kernel
+
+
+def _age_bucket_points(age: Optional[float], buckets) -> float:
+    if age is None:
+        # Mirrors SQL: NULL comparisons fall through to the catch-all
+        return float(buckets[-1][1]) if buckets[-1][0] is None else 0.0
+    for max_age, points in buckets:
+        if max_age is None or age <= max_age:
+            return float(points)
+    return 0.0
+
+
+def _age_bucket_kernel(term: Dict):
+    field = term["field"]
+    buckets = term["buckets"]
+
+    def kernel(items, now, peak=None):
+        return [
+            _age_bucket_points(_age_days(item.get(field), now), buckets)
+            for item in items
+        ]
+
+    return kernel
+
+
+def _age_linear_kernel(term: Dict):
+    field = term["field"]
+    start = term.get("start", 0)
+    per_day = term.get("per_day", 1)
+    floor = term.get("floor", 0)
+    missing = float(term.get("missing", 0))
+
+    def kernel(items, now, peak=None):
+        out = []
+        for item in items:
+            age = _age_days(item.get(field), now)
+            if age is None:
+                out.append(missing)
+            else:
+                out.append(float(max(floor, start - per_day * int(age))))
+        return out
+
+    return kernel
+
+
+def _constant_kernel(term: Dict):
+    value = float(term.get("value", 0))
+
+    def kernel(items, now, peak=None):
+        return [value] * len(items)
+
+    return kernel
+
+
+_KERNELS = {
+    "column": _column_kernel,
+    "category": _category_kernel,
+    "age_bucket": _age_bucket_kernel,
+    "age_linear": _age_linear_kernel,
+    "constant": _constant_kernel,
+}
+
+
+# =========================
+# SQL compilation
+# =========================
+
+def _sql_identifier(name: str) -> str:
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid column name in scoring rule: {name}")
+    return name
+
+
+def _sql_literal(value) -> str:
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return repr(value)
+
+
+def _term_sql(term: Dict) -> str:
+    kind = term["type"]
+
+    if kind == "column":
+        col = f"COALESCE({_sql_identifier(term['fields'][0])}, 0)"
+        if term.get("scale", 1) != 1:
+            col = f"{col} * {term['scale']!r}"
+        if term.get("cap") is not None:
+            col = f"MIN({col}, {term['cap']!r})"
+        if term.get("normalize") == "max":
+            col = f"COALESCE(CAST({col} AS REAL) / NULLIF(MAX({col}) OVER (), 0), 0)"
+        return col
+
+    if kind == "category":
+        whens = " ".join(
+            f"WHEN {_sql_literal(k)} THEN {v!r}" for k, v in term["points"].items()
+        )
+        return (
+            f"(CASE {_sql_identifier(term['field'])} {whens} "
+            f"ELSE {term.get('default', 0)!r} END)"
+        )
+
+    if kind == "constant":
+        return repr(term.get("value", 0))
+
+    age = f"(julianday('now') - julianday({_sql_identifier(term['field'])}))"
+
+    if kind == "age_bucket":
+        whens, fallback = [], 0
+        for max_age, points in term["buckets"]:
+            if max_age is None:
+                fallback = points
+            else:
+                whens.append(f"WHEN {age} <= {max_age!r} THEN {points!r}")
+        return f"(CASE {' '.join(whens)} ELSE {fallback!r} END)"
+
+    if kind == "age_linear":
+        return (
+            f"COALESCE(MAX({term.get('floor', 0)!r}, "
+            f"{term.get('start', 0)!r} - {term.get('per_day', 1)!r} * CAST({age} AS INTEGER)), "
+            f"{term.get('missing', 0)!r})"
+        )
+
+    raise ValueError(f"Unknown scoring term type: {kind}")
+
+
+# =========================
+# Compiled rule sets
+# =========================
+
+class CompiledRules:
+    """
+    A scoring version compiled to column kernels and a SQL expression.
+    """
+
+    def __init__(self, version: str, rules: Dict):
+        self.version = version
+        self.round = rules.get("round")
+        self.time_dependent = any(
+            t["type"] in ("age_bucket", "age_linear") for t in rules["terms"]
+        )
+        self._terms = []
+        for term in rules["terms"]:
+            if term["type"] not in _KERNELS:
+                raise ValueError(f"Unknown scoring term type: {term['type']}")
+            self._terms.append((float(term.get("weight", 1)), _KERNELS[term["type"]](term)))
+        self._normalized = [
+            kernel for _, kernel in self._terms if getattr(kernel, "normalized", False)
+        ]
+        self._rules = rules
+        self._sql = None
+
+    @property
+    def row_independent(self) -> bool:
+        """True if an item's score never depends on other items."""
+        return not self._normalized
+
+    def stats(self, items: List[Dict]) -> tuple:
+        """
+        Batch-level inputs (max-normalization peaks), in term order.
+        Scoring a subset with the full set's stats gives the same
+        scores as scoring the full set.
+        """
+        return tuple(kernel.peak(items) for kernel in self._normalized)
+
+    def item_stats(self, items: List[Dict]) -> List[tuple]:
+        """
+        Each item's own contribution to stats(), so callers can keep the
+        peaks up to date as single items change.
+        """
+        if not self._normalized:
+            return [()] * len(items)
+        columns = [kernel.values(items) for kernel in self._normalized]
+        return [tuple(float(v) for v in row) for row in zip(*columns)]
+
+    def score(
+        self,
+        items: List[Dict],
+        now: Optional[datetime] = None,
+        stats: Optional[tuple] = None,
+    ) -> List:
+        now = now or datetime.utcnow()
+        n = len(items)
+        peaks = iter(stats) if stats is not None else None
+
+        def points(kernel):
+            peak = None
+            if peaks is not None and getattr(kernel, "normalized", False):
+                peak = next(peaks)
+            return kernel(items, now, peak)
+
+        if np is not None:
+            total = np.zeros(n)
+            for weight, kernel in self._terms:
+                total += weight * np.asarray(points(kernel), dtype=float)
+            scores = total.tolist()
+        else:
+            scores = [0.0] * n
+            for weight, kernel in self._terms:
+                scores = [s + weight * p for s, p in zip(scores, points(kernel))]
+
+        if self.round == 0:
+            return [int(round(s)) for s in scores]
+        if self.round is not None:
+            return [round(s, self.round) for s in scores]
+        return scores
+
+    def sql(self) -> str:
+        if self._sql is None:
+            parts = [
+                f"{_term_sql(term)} * {float(term.get('weight', 1))!r}"
+                for term in self._rules["terms"]
+            ]
+            self._sql = "(" + " + ".join(parts) + ")"
+        return self._sql
+
+
+_compiled: Dict[str, CompiledRules] = {}
+_cache: "OrderedDict[tuple, List]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _config_rules(config: Dict) -> Dict:
+    """Term list for a released SCORING_CONFIGS entry (weights / points shape)."""
+    weights = config["weights"]
+    return {
+        "terms": [
+            {"type": "column", "fields": ["plays"], "weight": weights["plays"]},
+            {
+                "type": "age_bucket",
+                "field": "ingested_at",
+                "buckets": list(config["recency_points"]),
+                "weight": weights["recency"],
+            },
+            {
+                "type": "category",
+                "field": "source_type",
+                "points": config["source_points"],
+                "default": config["default_source_points"],
+                "weight": weights["source_type"],
+            },
+        ],
+    }
+
+
+def compile_rules(version: Optional[str] = None) -> CompiledRules:
+    version = version or CURRENT_VERSION
+
+    with _lock:
+        compiled = _compiled.get(version)
+        if compiled is None:
+            rules = get_scoring_config(version)
+            if "terms" not in rules:
+                rules = _config_rules(rules)
+            compiled = CompiledRules(version, rules)
+            _compiled[version] = compiled
+    return compiled
+
+
+# =========================
+# Public API
+# =========================
+
+def score_items(
+    items: List[Dict],
+    version: Optional[str] = None,
+    data_version: Optional[Hashable] = None,
+    now: Optional[datetime] = None,
+    stats: Optional[tuple] = None,
+) -> List:
+    """
+    Batch scores for items, in input order. Does NOT mutate items.
+
+    `stats` (from compile_rules(version).stats(all_items)) lets a subset
+    be scored exactly as it would be inside the full set.
+
+    Results are cached per (version, data_version) when the caller
+    supplies a data_version; it must identify this exact batch (e.g.
+    data.store.items_version() for the full load_items() list). Time-dependent rules are cached only for
+    an explicit `now`.
+    """
+    compiled = compile_rules(version)
+
+    key = None
+    if data_version is not None and stats is None and (now is not None or not compiled.time_dependent):
+        key = (compiled.version, data_version, now if compiled.time_dependent else None)
+        with _lock:
+            cached = _cache.get(key)
+            if cached is not None and len(cached) == len(items):
+                _cache.move_to_end(key)
+                return list(cached)
+
+    scores = compiled.score(items, now, stats)
+
+    if key is not None:
+        with _lock:
+            _cache[key] = scores
+            _cache.move_to_end(key)
+            while len(_cache) > _CACHE_SIZE:
+                _cache.popitem(last=False)
+
+    return list(scores)
+
+
+def score_item(item: Dict, version: Optional[str] = None, now: Optional[datetime] = None):
+    return score_items([item], version, now=now)[0]
+
+
+def rank_items(
+    items: List[Dict],
+    version: Optional[str] = None,
+    limit: Optional[int] = None,
+    data_version: Optional[Hashable] = None,
+    now: Optional[datetime] = None,
+) -> List[Dict]:
+    """
+    Copies of items with `score`, sorted highest first (stable).
+    """
+    scores = score_items(items, version, data_version, now)
+    order = sorted(range(len(items)), key=lambda i: scores[i], reverse=True)
+
+    if limit is not None:
+        order = order[:limit]
+
+    return [{**items[i], "score": scores[i]} for i in order]
+
+
+def sql_score_expression(version: Optional[str] = None) -> str:
+    """
+    SQL expression computing the version's score over songs columns.
+    """
+    return compile_rules(version).sql()
+
+
+def clear_cache() -> None:
+    with _lock:
+        _cache.clear()
+
+
+def available_versions() -> Dict[str, str]:
+    versions = {v: "Unified plays / recency / source score" for v in SCORING_CONFIGS}
+    versions.update((v, r.get("description", "")) for v, r in SCORING_RULES.items())
+    return versions
+
+
+__all__ = [
+    "CURRENT_VERSION",
+    "ITEMS_VERSION",
+    "CompiledRules",
+    "compile_rules",
+    "score_items",
+    "score_item",
+    "rank_items",
+    "sql_score_expression",
+    "clear_cache",
+    "available_versions",
+]
@@ -1,18 +1,17 @@
 # api/scoring/scoring.py
 
+from api.scoring.engine import score_item, score_items
+
+VERSION = "simple-v1"
+
+
 def calculate_score(item: dict) -> int:
     """
     Single item score calculation.
     Must NEVER throw.
     """
     try:
-        youtube = int(item.get("youtube", 0))
-        radio = int(item.get("radio", 0))
-        tv = int(item.get("tv", 0))
-
-        # Simple, predictable weights
-        score = (youtube * 1) + (radio * 3) + (tv * 2)
-        return score
+        return score_item(item, VERSION)
     except Exception:
         return 0
 
@@ -25,10 +24,14 @@ def recalculate_all(items: list) -> list:
     if not isinstance(items, list):
         return []
 
-    for item in items:
-        try:
-            item["score"] = calculate_score(item)
-        except Exception:
-            item["score"] = 0
+    scorable = [i for i in items if isinstance(i, dict)]
+
+    try:
+        scores = score_items(scorable, VERSION)
+    except Exception:
+        scores = [0] * len(scorable)
+
+    for item, score in zip(scorable, scores):
+        item["score"] = score
 
-    return items
\ No newline at end of file
+    return items
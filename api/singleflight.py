@@ -0,0 +1,122 @@
+# api/singleflight.py
+"""
+Single-flight request coalescing.
+
+Concurrent calls with the same key share one execution: the first
+caller (the leader) runs the function and everyone who arrives while it
+is in flight waits for that result, or for its exception. Waits are
+bounded; a waiter that gives up raises SingleFlightTimeout, and the
+computation keeps running for the others.
+
+do() is for code already off the event loop (thread-pool DB calls);
+run() is for async handlers and computes in the default executor.
+Results are shared between callers and should be treated as read-only.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from api import metrics
+
+
+class SingleFlightTimeout(TimeoutError):
+    """Waited longer than the bound for an in-flight computation"""
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls, keyed by a normalized query."""
+
+    def __init__(self, name: str, timeout: float = 10.0):
+        self.name = name
+        self.timeout = timeout
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+        self.leaders = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                future.set_running_or_notify_cancel()  # waiters can't cancel it
+                self._calls[key] = future
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        metrics.observe_singleflight(self.name, "leader" if leader else "coalesced")
+        return future, leader
+
+    def _execute(self, key: Hashable, future: Future, fn: Callable[[], Any]) -> None:
+        try:
+            result = fn()
+        except BaseException as e:
+            error = e
+        else:
+            error = None
+
+        # Retire the key first: later callers start a fresh computation
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+            if error is not None:
+                self.errors += 1
+
+        if error is not None:
+            metrics.observe_singleflight(self.name, "error")
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _timed_out(self, key: Hashable) -> SingleFlightTimeout:
+        with self._lock:
+            self.timeouts += 1
+        metrics.observe_singleflight(self.name, "timeout")
+        return SingleFlightTimeout(f"{self.name}: gave up waiting for {key!r}")
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """Blocking call; the leader runs fn in the calling thread."""
+        future, leader = self._join(key)
+        if leader:
+            self._execute(key, future, fn)
+        try:
+            return future.result(self.timeout if timeout is None else timeout)
+        except TimeoutError:
+            if future.done():
+                raise  # fn itself raised a TimeoutError
+            raise self._timed_out(key) from None
+
+    async def run(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """Async call; the leader submits fn to the default executor."""
+        future, leader = self._join(key)
+        if leader:
+            asyncio.get_running_loop().run_in_executor(None, self._execute, key, future, fn)
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future), self.timeout if timeout is None else timeout
+            )
+        except asyncio.TimeoutError:
+            if future.done():
+                raise
+            raise self._timed_out(key) from None
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "wait_timeout_seconds": self.timeout,
+            }
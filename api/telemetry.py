@@ -0,0 +1,195 @@
+# api/telemetry.py
+"""
+Buffered writer for scraper and scheduler history.
+
+Scraper threads record a history row for every station, channel and
+platform. Committing each one on its own connection makes telemetry
+compete with ingestion for the SQLite write lock. emit() instead appends
+the row, timestamped when the event happened, to a bounded in-memory
+ring buffer. A flusher thread writes the buffer with one executemany per
+table in a single transaction. It runs every `flush_interval` seconds,
+or sooner once `flush_rows` rows are waiting.
+
+When the buffer is full the oldest rows are dropped and counted, so
+telemetry never blocks a scraper or grows without bound. A failed flush
+puts its rows back for the next one, within the same bound. Readers of
+the history tables call flush() first, and stop() flushes what is left.
+Until start() is called, each emit() is written straight away.
+"""
+
+import logging
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from api import metrics
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 0.5     # seconds
+FLUSH_ROWS = 500
+CAPACITY = 10000         # buffered rows before the oldest are dropped
+
+# Table -> (columns supplied by emit(), event-time column)
+TABLES: Dict[str, Tuple[Tuple[str, ...], str]] = {
+    "scraper_history": (
+        ("scraper_type", "station_id", "items_found", "items_added",
+         "status", "error_message", "execution_time"),
+        "created_at",
+    ),
+    "youtube_scheduler": (
+        ("channel_id", "status", "items_found", "items_added", "error_message"),
+        "executed_at",
+    ),
+    "streams_history": (
+        ("platform", "items_found", "items_added", "items_updated",
+         "status", "error_message", "execution_time", "method_used"),
+        "created_at",
+    ),
+}
+
+_INSERTS = {
+    table: "INSERT INTO {} ({}) VALUES ({})".format(
+        table, ", ".join(columns + (stamp,)), ", ".join("?" * (len(columns) + 1))
+    )
+    for table, (columns, stamp) in TABLES.items()
+}
+
+
+class TelemetrySink:
+    """Ring buffer of history rows plus the thread that writes them."""
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection],
+                 flush_interval: float = FLUSH_INTERVAL, flush_rows: int = FLUSH_ROWS,
+                 capacity: int = CAPACITY):
+        self.connect = connect
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.capacity = capacity
+
+        self._lock = threading.Lock()          # the buffer
+        self._flush_lock = threading.Lock()    # one flush at a time, rows stay in order
+        self._wake = threading.Event()
+        self._buffer: Deque[Tuple[str, tuple]] = deque()
+        self._thread: Optional[threading.Thread] = None
+        self.is_running = False
+
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.last_error: Optional[str] = None
+
+    def emit(self, table: str, row: tuple) -> None:
+        """Queue one history row (values in TABLES column order)."""
+        if table not in TABLES:
+            raise ValueError(f"Unknown telemetry table: {table}")
+        stamped = (table, tuple(row) + (datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),))
+
+        with self._lock:
+            if len(self._buffer) >= self.capacity:
+                dropped_table, _ = self._buffer.popleft()
+                self.dropped += 1
+                metrics.observe_telemetry_drop(dropped_table)
+            self._buffer.append(stamped)
+            full = len(self._buffer) >= self.flush_rows
+
+        if not self.is_running:
+            self.flush()
+        elif full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write everything buffered so far; returns rows written."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._buffer:
+                    return 0
+                batch = list(self._buffer)
+                self._buffer.clear()
+
+            by_table: Dict[str, List[tuple]] = {}
+            for table, row in batch:
+                by_table.setdefault(table, []).append(row)
+
+            conn = None
+            try:
+                conn = self.connect()
+                with conn:
+                    for table, rows in by_table.items():
+                        conn.executemany(_INSERTS[table], rows)
+            except sqlite3.Error as e:
+                self.failed_flushes += 1
+                self.last_error = str(e)
+                logger.error(f"Telemetry flush failed ({len(batch)} rows kept): {e}")
+                self._requeue(batch)
+                return 0
+            finally:
+                if conn is not None:
+                    conn.close()
+
+            self.flushes += 1
+            self.written += len(batch)
+            return len(batch)
+
+    def _requeue(self, batch: List[Tuple[str, tuple]]) -> None:
+        """Put unwritten rows back in front, dropping the oldest past capacity."""
+        with self._lock:
+            overflow = len(batch) + len(self._buffer) - self.capacity
+            if overflow > 0:
+                for table, _ in batch[:overflow]:
+                    metrics.observe_telemetry_drop(table)
+                self.dropped += min(overflow, len(batch))
+                batch = batch[overflow:]
+            self._buffer.extendleft(reversed(batch))
+
+    def start(self) -> None:
+        """Start the background flusher (idempotent)."""
+        if self.is_running:
+            return
+        self.is_running = True
+
+        def flush_loop():
+            while self.is_running:
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Telemetry flusher error: {e}")
+
+        self._thread = threading.Thread(target=flush_loop, name="telemetry-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> int:
+        """Stop the flusher and write what is left; returns rows flushed."""
+        written = self.written
+        self.is_running = False
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        self.flush()
+        return self.written - written
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._buffer)
+        return {
+            "running": self.is_running,
+            "pending": pending,
+            "capacity": self.capacity,
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "last_error": self.last_error,
+            "flush_interval_ms": self.flush_interval * 1000,
+            "flush_rows": self.flush_rows,
+        }
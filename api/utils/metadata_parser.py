@@ -0,0 +1,124 @@
+# api/utils/metadata_parser.py
+"""
+Shared "now playing" metadata parser for every scraper.
+
+All patterns are compiled once. The common "Artist - Title" form is
+split with str.partition (no regex); other forms fall through to the
+compiled patterns. Results are LRU-cached because radio streams repeat
+the same StreamTitle for minutes at a time.
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+from data.song_identity import split_artists, strip_decorations
+
+CACHE_SIZE = 4096
+
+
+class ParsedMetadata(NamedTuple):
+    artist: str                  # primary artist ("" if only a title was found)
+    title: str                   # without featured credit or upload artifacts
+    featured: Tuple[str, ...]    # featured / collaborating artists
+
+
+_PREFIX_RE = re.compile(
+    r"^\s*(?:(?:now playing|current|playing|on air)\s*:\s*|[▶●]\s*)", re.IGNORECASE
+)
+_SPACED_SEP_RE = re.compile(r"\s+[~–—|‖:：]\s+")
+_BY_RE = re.compile(r"^(.+?)\s+by\s+(.+)$", re.IGNORECASE)
+# Unspaced separators; a hyphen needs a space on one side ("Jay-Z" stays whole)
+_TIGHT_SEP_RE = re.compile(r"^(.+?)(?:\s*[~–—|‖:：]\s*|\s+-\s*|\s*-\s+)(.+)$")
+_TITLE_FEAT_RE = re.compile(
+    r"\s*[\(\[]?\s*\b(?:feat|ft|featuring)\b\.?\s*([^\)\]]*)[\)\]]?", re.IGNORECASE
+)
+_EDGE_CHARS = " -~:|\"'"
+_ARTIST_EDGE_CHARS = _EDGE_CHARS + "()[]"   # left over from "Artist (ft. X)"
+_STREAM_TITLE_RE = re.compile(r"StreamTitle='(.*?)';")
+
+
+def stream_title(icy_metadata: Optional[str]) -> Optional[str]:
+    """StreamTitle value from an ICY metadata block."""
+    match = _STREAM_TITLE_RE.search(icy_metadata or "")
+    return match.group(1) if match else None
+
+
+def _split(text: str) -> Optional[Tuple[str, str]]:
+    """(artist, title) from a cleaned string, or None if no separator."""
+    # Fast path: "Artist - Title"
+    artist, sep, title = text.partition(" - ")
+    if sep:
+        return artist, title
+
+    parts = _SPACED_SEP_RE.split(text, maxsplit=1)
+    if len(parts) == 2:
+        return parts[0], parts[1]
+
+    match = _BY_RE.match(text)
+    if match:
+        return match.group(2), match.group(1)
+
+    match = _TIGHT_SEP_RE.match(text)
+    if match:
+        return match.group(1), match.group(2)
+
+    return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse(raw: Optional[str]) -> Optional[ParsedMetadata]:
+    """
+    Parse a raw "now playing" / chart string.
+    Returns None for empty input; artist is "" when only a title exists.
+    """
+    if not raw:
+        return None
+
+    text = strip_decorations(_PREFIX_RE.sub("", raw))
+    if not text:
+        return None
+
+    pair = _split(text)
+    if pair is None:
+        artist, title = "", text
+    else:
+        artist, title = pair
+
+    featured = []
+
+    match = _TITLE_FEAT_RE.search(title)
+    if match:
+        featured.extend(split_artists(match.group(1)))
+        title = title[:match.start()] + title[match.end():]
+
+    artists = [a.strip(_ARTIST_EDGE_CHARS) for a in split_artists(artist)]
+    artists = [a for a in artists if a]
+    title = title.strip(_EDGE_CHARS)
+
+    if pair is not None and (not artists or not title):
+        # Separator with an empty side: treat the whole string as a title
+        return ParsedMetadata("", text.strip(_EDGE_CHARS), ())
+
+    featured = artists[1:] + [f.strip(_ARTIST_EDGE_CHARS) for f in featured if f.strip(_ARTIST_EDGE_CHARS)]
+    return ParsedMetadata(
+        artists[0] if artists else "",
+        title,
+        tuple(dict.fromkeys(featured)),
+    )
+
+
+def parse_artist_title(raw: Optional[str], unknown_artist: str = "Unknown Artist") -> Tuple[str, str]:
+    """(artist, title) with a placeholder artist when none was found."""
+    parsed = parse(raw)
+    if parsed is None:
+        return unknown_artist, ""
+    return parsed.artist or unknown_artist, parsed.title
+
+
+def cache_info():
+    return parse.cache_info()
+
+
+def clear_cache() -> None:
+    parse.cache_clear()
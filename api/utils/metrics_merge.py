@@ -0,0 +1,104 @@
+# api/utils/metrics_merge.py
+"""
+Chart <- catalog metrics merge.
+
+The catalog (data/items.json) is indexed once per items_version() by
+song key (normalized title + artist), so merging metrics into a chart
+is one dict lookup per entry instead of a catalog scan per entry. A
+store write changes items_version(), which drops the cached index.
+
+Cached items are shared between callers and must be treated as
+read-only. Code that edits and saves items (auto_recalc) loads its own
+copy and indexes it with index_items().
+"""
+
+import threading
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from data.chart_archive import song_key
+from data.store import items_version, load_items
+
+# Chart field -> item fields holding it, in order of preference
+METRICS: Dict[str, Tuple[str, ...]] = {
+    "youtube": ("youtube_views", "youtube"),
+    "radio": ("radio_plays", "radio"),
+    "tv": ("tv_appearances", "tv"),
+}
+
+_lock = threading.Lock()
+_cached: Optional[Tuple[Hashable, List[Dict], Dict[str, Dict]]] = None
+
+
+# =========================
+# Index
+# =========================
+
+def index_items(items: Iterable[Any]) -> Dict[str, Dict]:
+    """Song key -> item. The first item wins for duplicate keys."""
+    index: Dict[str, Dict] = {}
+    for item in items:
+        if isinstance(item, dict):
+            key = song_key(item.get("title"), item.get("artist"))
+            if key:
+                index.setdefault(key, item)
+    return index
+
+
+def catalog() -> Tuple[List[Dict], Dict[str, Dict], Hashable]:
+    """
+    (items, index, data_version) for the current items file, loaded and
+    indexed at most once per version.
+    """
+    global _cached
+
+    version = items_version()
+    with _lock:
+        if _cached is not None and version is not None and _cached[0] == version:
+            return _cached[1], _cached[2], version
+
+    items = load_items()
+    index = index_items(items)
+    if version is not None:
+        with _lock:
+            _cached = (version, items, index)
+    return items, index, version
+
+
+def clear_cache() -> None:
+    global _cached
+    with _lock:
+        _cached = None
+
+
+# =========================
+# Merge
+# =========================
+
+def metrics_of(item: Dict) -> Dict[str, Any]:
+    """Chart metric fields of a catalog item (0 when absent)."""
+    merged = {}
+    for field, sources in METRICS.items():
+        value = 0
+        for source in sources:
+            if source in item:
+                value = item[source]
+                break
+        merged[field] = value
+    return merged
+
+
+def merge(chart_items: List[Dict], index: Optional[Dict[str, Dict]] = None) -> int:
+    """
+    Copy catalog metrics onto matching chart items, in place.
+    Returns the number of chart items matched.
+    """
+    if index is None:
+        index = catalog()[1]
+
+    matched = 0
+    for chart_item in chart_items:
+        item = index.get(song_key(chart_item.get("title"), chart_item.get("artist")))
+        if item is not None:
+            chart_item.update(metrics_of(item))
+            matched += 1
+    return matched
@@ -3,6 +3,7 @@
 import json
 import os
 from api.scoring.scoring import recalculate_all
+from api.utils import metrics_merge
 
 TOP100_PATH = "data/top100.json"
 
@@ -24,23 +25,8 @@ def auto_recalculate():
     if not isinstance(items, list):
         return
 
-    # Merge ingestion metrics
-    from data.store import load_items
-    metrics = load_items()
-
-    for chart_item in items:
-        match = next(
-            (
-                m for m in metrics
-                if m.get("title") == chart_item.get("title")
-                and m.get("artist") == chart_item.get("artist")
-            ),
-            None
-        )
-        if match:
-            chart_item["youtube"] = match.get("youtube", 0)
-            chart_item["radio"] = match.get("radio", 0)
-            chart_item["tv"] = match.get("tv", 0)
+    # Merge ingestion metrics (hash join on the cached catalog index)
+    metrics_merge.merge(items)
 
     # Recalculate scores
     items = recalculate_all(items)
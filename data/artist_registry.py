@@ -0,0 +1,238 @@
+# data/artist_registry.py
+"""
+Single registry of Ugandan artists (data/artists.json).
+
+Names and aliases compile into an Aho-Corasick automaton over folded
+text, so any scraped string is matched in one pass regardless of how
+many artists are registered. Edits to the file are picked up without a
+restart (mtime checked at most every RELOAD_CHECK_SECONDS).
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from data.song_identity import fold
+
+ARTISTS_FILE = Path("data/artists.json")
+RELOAD_CHECK_SECONDS = 2.0
+
+
+# =========================
+# Automaton
+# =========================
+
+class ArtistMatcher:
+    """
+    Aho-Corasick automaton over folded artist names and aliases.
+    Matches only on whole words ("rema" never matches "premature").
+    """
+
+    def __init__(self, artists: List[Dict], keywords: Optional[List[str]] = None):
+        self.artists = artists
+        self.keywords = [fold(k) for k in keywords or [] if fold(k)]
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, int]]] = [[]]  # (length, artist index)
+
+        for idx, artist in enumerate(artists):
+            for name in [artist["name"], *artist.get("aliases", [])]:
+                key = fold(name)
+                if key:
+                    self._insert(key, idx)
+        self._build()
+
+    def _insert(self, key: str, idx: int) -> None:
+        node = 0
+        for ch in key:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(key), idx))
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child].extend(self._out[self._fail[child]])
+
+    def scan(self, text: str) -> List[Tuple[int, int, int]]:
+        """
+        Whole-word matches as (start, end, artist index) over fold(text).
+        """
+        folded = fold(text)
+        size = len(folded)
+        matches = []
+
+        node = 0
+        for pos, ch in enumerate(folded):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+
+            for length, idx in self._out[node]:
+                start, end = pos - length + 1, pos + 1
+                if (start == 0 or folded[start - 1] == " ") and \
+                   (end == size or folded[end] == " "):
+                    matches.append((start, end, idx))
+        return matches
+
+    def find_all(self, text: str) -> List[Dict]:
+        """Distinct artists in order of first appearance (longest name wins)."""
+        seen, found = set(), []
+        for _, _, idx in sorted(self.scan(text), key=lambda m: (m[0], -m[1])):
+            if idx not in seen:
+                seen.add(idx)
+                found.append(self.artists[idx])
+        return found
+
+    def match(self, text: str) -> Optional[Dict]:
+        """Leftmost-longest artist in text, or None."""
+        matches = self.scan(text)
+        if not matches:
+            return None
+        _, _, idx = min(matches, key=lambda m: (m[0], -m[1]))
+        return self.artists[idx]
+
+
+# =========================
+# Loading / hot reload
+# =========================
+
+_lock = threading.Lock()
+_matcher: Optional[ArtistMatcher] = None
+_mtime: Optional[int] = None
+_checked_at = 0.0
+
+
+def _load() -> Dict:
+    try:
+        data = json.loads(ARTISTS_FILE.read_text())
+        if isinstance(data, dict):
+            return data
+    except Exception:
+        pass
+    return {"version": 1, "keywords": [], "artists": []}
+
+
+def _compile(data: Dict) -> ArtistMatcher:
+    artists = []
+    for entry in data.get("artists", []):
+        if not isinstance(entry, dict) or not entry.get("name"):
+            continue
+        region = entry.get("region")
+        artists.append({
+            "id": entry.get("id") or fold(entry["name"]).replace(" ", "-"),
+            "name": entry["name"],
+            "aliases": list(entry.get("aliases", [])),
+            "region": region,
+            "regions": list(entry.get("regions") or ([region] if region else [])),
+        })
+    return ArtistMatcher(artists, data.get("keywords", []))
+
+
+def reload() -> ArtistMatcher:
+    """Recompile from disk now."""
+    global _matcher, _mtime, _checked_at
+    with _lock:
+        try:
+            _mtime = ARTISTS_FILE.stat().st_mtime_ns
+        except OSError:
+            _mtime = None
+        _matcher = _compile(_load())
+        _checked_at = time.monotonic()
+        return _matcher
+
+
+def get_matcher() -> ArtistMatcher:
+    """
+    Current compiled registry; recompiles when artists.json changes.
+    NEVER raises.
+    """
+    global _checked_at
+
+    now = time.monotonic()
+    if _matcher is not None and now - _checked_at < RELOAD_CHECK_SECONDS:
+        return _matcher
+
+    try:
+        mtime = ARTISTS_FILE.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+
+    if _matcher is None or mtime != _mtime:
+        return reload()
+
+    _checked_at = now
+    return _matcher
+
+
+# =========================
+# Public API
+# =========================
+
+def _public(artist: Dict) -> Dict:
+    return {
+        "id": artist["id"],
+        "name": artist["name"],
+        "region": artist["region"],
+        "regions": list(artist["regions"]),
+    }
+
+
+def match_artist(text: Optional[str]) -> Optional[Dict]:
+    """
+    Registered artist mentioned in a scraped string.
+    Returns {"id", "name", "region", "regions"} or None.
+    """
+    if not text:
+        return None
+    artist = get_matcher().match(text)
+    return _public(artist) if artist else None
+
+
+def find_artists(text: Optional[str]) -> List[Dict]:
+    """Every registered artist in a string (features, collaborations)."""
+    if not text:
+        return []
+    return [_public(a) for a in get_matcher().find_all(text)]
+
+
+def is_ugandan(text: Optional[str]) -> bool:
+    """Registered artist, or an explicit Ugandan keyword."""
+    if not text:
+        return False
+    matcher = get_matcher()
+    if matcher.scan(text):
+        return True
+    folded = fold(text)
+    return any(keyword in folded for keyword in matcher.keywords)
+
+
+def artist_names() -> List[str]:
+    return [a["name"] for a in get_matcher().artists]
+
+
+def region_artists() -> Dict[str, List[str]]:
+    """Artist names tagged with each region (home region listed first)."""
+    regions: Dict[str, List[str]] = {}
+    for artist in get_matcher().artists:
+        for region in artist["regions"]:
+            regions.setdefault(region, []).append(artist["name"])
+    return regions
@@ -0,0 +1,645 @@
+# data/chart_archive.py
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DB = Path("data/chart_archive.db")
+
+TOP100_SNAPSHOT_DIR = Path("data/top100_snapshots")
+TOP100_LOCKED_DIR = Path("data/top100_locked")
+REGION_SNAPSHOT_DIR = Path("data/region_snapshots")
+REPLAY_DIR = Path("data/replays")
+
+# National charts are stored with an empty region so that the
+# (chart, region, week_id, rank) primary key stays unique.
+NATIONAL = ""
+
+# Stored ids are zero-padded ISO weeks so they sort as strings;
+# "2026-W5" style ids are only accepted on the way in and normalised.
+_WEEK_RE = re.compile(r"^(\d{4})-W(\d{2})$")
+_LOOSE_WEEK_RE = re.compile(r"^(\d{4})-W(\d{1,2})$")
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS chart_entries (
+        week_id TEXT NOT NULL,
+        chart TEXT NOT NULL,
+        region TEXT NOT NULL DEFAULT '',
+        rank INTEGER NOT NULL,
+        song_key TEXT NOT NULL,
+        title TEXT,
+        artist TEXT,
+        score REAL,
+        last_week_rank INTEGER,
+        peak_rank INTEGER NOT NULL,
+        weeks_on_chart INTEGER NOT NULL,
+        PRIMARY KEY (chart, region, week_id, rank)
+    ) WITHOUT ROWID
+    """,
+    # Song run lookups: O(log n) seek + one row per charted week
+    """
+    CREATE INDEX IF NOT EXISTS idx_chart_entries_song
+    ON chart_entries(song_key, chart, region, week_id)
+    """,
+)
+
+
+# =========================
+# Internal helpers
+# =========================
+
+# One connection per process and archive path; schema and migrations
+# run when it is opened, not on every call
+_conn: Optional[sqlite3.Connection] = None
+_conn_key: Optional[tuple] = None
+_conn_lock = threading.RLock()
+
+SCHEMA_VERSION = 1
+
+
+def _open() -> sqlite3.Connection:
+    ARCHIVE_DB.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(ARCHIVE_DB, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    for statement in _SCHEMA:
+        conn.execute(statement)
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        _migrate_week_ids(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+    return conn
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    """The shared archive connection, held under a lock for one operation."""
+    global _conn, _conn_key
+
+    with _conn_lock:
+        key = (str(ARCHIVE_DB), os.getpid())
+        if _conn_key != key:
+            if _conn is not None and _conn_key[1] == key[1]:
+                _conn.close()
+            _conn, _conn_key = _open(), key
+        try:
+            yield _conn
+        except Exception:
+            _conn.rollback()
+            raise
+
+
+def _migrate_week_ids(conn: sqlite3.Connection) -> None:
+    """
+    Rewrite week ids stored before ids were zero-padded ("2026-W5" ->
+    "2026-W05") and recompute the history columns of the charts they
+    belong to. A padded week archived since wins over its unpadded twin.
+    """
+    stale = {}
+    for (week_id,) in conn.execute("SELECT DISTINCT week_id FROM chart_entries"):
+        if _WEEK_RE.match(week_id):
+            continue
+        try:
+            stale[week_id] = _normalise_week(week_id)
+        except ValueError:
+            logger.warning(f"Chart archive: leaving invalid week id {week_id!r}")
+
+    if not stale:
+        return
+
+    charts = set()
+    for old, new in stale.items():
+        charts.update(conn.execute(
+            "SELECT DISTINCT chart, region FROM chart_entries WHERE week_id = ?", (old,)
+        ).fetchall())
+        conn.execute(
+            """
+            DELETE FROM chart_entries
+            WHERE week_id = ? AND EXISTS (
+                SELECT 1 FROM chart_entries n
+                WHERE n.week_id = ? AND n.chart = chart_entries.chart
+                  AND n.region = chart_entries.region
+            )
+            """,
+            (old, new),
+        )
+        conn.execute("UPDATE chart_entries SET week_id = ? WHERE week_id = ?", (new, old))
+
+    for chart, region in charts:
+        weeks = [
+            row[0] for row in conn.execute(
+                "SELECT DISTINCT week_id FROM chart_entries "
+                "WHERE chart = ? AND region = ? ORDER BY week_id",
+                (chart, region),
+            )
+        ]
+        for week_id in weeks:
+            _write_week(conn, week_id, chart, region,
+                        _rows_for_week(conn, chart, region, week_id))
+
+    logger.info(f"Chart archive: normalised {len(stale)} week ids")
+
+
+def _week(week_id: str) -> str:
+    """Stored form of a week id being read; unknown formats pass through."""
+    try:
+        return _normalise_week(week_id)
+    except ValueError:
+        return week_id
+
+
+def _score_value(value) -> Optional[float]:
+    """
+    Snapshots store either a number or a breakdown dict.
+    Only numbers are archived.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, dict):
+        total = value.get("total")
+        return float(total) if isinstance(total, (int, float)) else None
+    return None
+
+
+def _previous_week_id(week_id: str) -> Optional[str]:
+    parsed = _parse_week(week_id)
+    if parsed is None:
+        return None
+    prev = parsed - timedelta(days=7)
+    year, week, _ = prev.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _parse_week(week_id: str) -> Optional[date]:
+    match = _WEEK_RE.match(week_id or "")
+    if not match:
+        return None
+    try:
+        return date.fromisocalendar(int(match.group(1)), int(match.group(2)), 1)
+    except ValueError:
+        return None
+
+
+def _normalise_week(week_id: str) -> str:
+    """"2026-W5" -> "2026-W05"; ValueError unless it is a real ISO week."""
+    match = _LOOSE_WEEK_RE.match(week_id or "")
+    if match:
+        week_id = f"{match.group(1)}-W{int(match.group(2)):02d}"
+        if _parse_week(week_id) is not None:
+            return week_id
+    raise ValueError(f"Not an ISO week id: {week_id!r}")
+
+
+def _latest_before(
+    conn: sqlite3.Connection,
+    chart: str,
+    region: str,
+    week_id: str,
+    keys: List[str],
+) -> Dict[str, sqlite3.Row]:
+    """
+    Most recent archived entry per song strictly before week_id.
+    """
+    if not keys:
+        return {}
+
+    placeholders = ", ".join("?" for _ in keys)
+    rows = conn.execute(
+        f"""
+        SELECT song_key, MAX(week_id) AS week_id, rank,
+               peak_rank, weeks_on_chart
+        FROM chart_entries
+        WHERE chart = ? AND region = ? AND week_id < ?
+          AND song_key IN ({placeholders})
+        GROUP BY song_key
+        """,
+        [chart, region, week_id, *keys],
+    ).fetchall()
+
+    return {row["song_key"]: row for row in rows}
+
+
+def _history_columns(
+    previous: Optional[sqlite3.Row],
+    rank: int,
+    prev_week: Optional[str],
+) -> Dict:
+    if previous is None:
+        return {
+            "last_week_rank": None,
+            "peak_rank": rank,
+            "weeks_on_chart": 1,
+        }
+
+    return {
+        "last_week_rank": (
+            previous["rank"] if previous["week_id"] == prev_week else None
+        ),
+        "peak_rank": min(previous["peak_rank"], rank),
+        "weeks_on_chart": previous["weeks_on_chart"] + 1,
+    }
+
+
+def _ranked(items: Iterable[Dict]) -> List[Dict]:
+    """
+    Normalize chart rows to (rank, song_key, title, artist, score).
+    Rows are ordered by their `rank` (engine) or `position` (builders)
+    field, then list order, and renumbered 1..n, so duplicate or
+    missing source ranks never collide.
+    """
+    ordered = []
+    seen = set()
+
+    for idx, item in enumerate(items, start=1):
+        if not isinstance(item, dict):
+            continue
+
+        key = song_key(item.get("title"), item.get("artist"))
+        if not key or key in seen:
+            continue
+        seen.add(key)
+
+        try:
+            order = int(item.get("rank") or item.get("position") or idx)
+        except (TypeError, ValueError):
+            order = idx
+        ordered.append((order, idx, key, item))
+
+    ordered.sort(key=lambda entry: entry[:2])
+    return [
+        {
+            "rank": rank,
+            "song_key": key,
+            "title": item.get("title"),
+            "artist": item.get("artist"),
+            "score": _score_value(item.get("score")),
+        }
+        for rank, (_, _, key, item) in enumerate(ordered, start=1)
+    ]
+
+
+def _write_week(
+    conn: sqlite3.Connection,
+    week_id: str,
+    chart: str,
+    region: str,
+    rows: List[Dict],
+) -> None:
+    prev_week = _previous_week_id(week_id)
+    previous = _latest_before(
+        conn, chart, region, week_id, [r["song_key"] for r in rows]
+    )
+
+    conn.execute(
+        "DELETE FROM chart_entries WHERE chart = ? AND region = ? AND week_id = ?",
+        (chart, region, week_id),
+    )
+    conn.executemany(
+        """
+        INSERT INTO chart_entries (
+            week_id, chart, region, rank, song_key, title, artist, score,
+            last_week_rank, peak_rank, weeks_on_chart
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                week_id, chart, region, r["rank"], r["song_key"],
+                r["title"], r["artist"], r["score"],
+                *_history_columns(
+                    previous.get(r["song_key"]), r["rank"], prev_week
+                ).values(),
+            )
+            for r in rows
+        ],
+    )
+
+
+def _rows_for_week(
+    conn: sqlite3.Connection, chart: str, region: str, week_id: str
+) -> List[Dict]:
+    return [
+        dict(row)
+        for row in conn.execute(
+            """
+            SELECT rank, song_key, title, artist, score
+            FROM chart_entries
+            WHERE chart = ? AND region = ? AND week_id = ?
+            ORDER BY rank
+            """,
+            (chart, region, week_id),
+        )
+    ]
+
+
+# =========================
+# Public API
+# =========================
+
+def song_key(title: Optional[str], artist: Optional[str]) -> str:
+    """
+    Stable archive key for a song ("artist|title", case-folded).
+    """
+    # split()/join collapses whitespace like re "\s+" does, ~2x faster
+    # (song_key runs once per catalog item when indexing)
+    title = " ".join(str(title or "").split()).casefold()
+    artist = " ".join(str(artist or "").split()).casefold()
+
+    if not title:
+        return ""
+
+    return f"{artist}|{title}"
+
+
+def current_week_id(now: Optional[datetime] = None) -> str:
+    """
+    ISO week id (e.g. 2026-W03) without touching chart_week state files.
+    """
+    year, week, _ = (now or datetime.utcnow()).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def archive_chart(
+    week_id: str,
+    chart: str,
+    items: Iterable[Dict],
+    region: Optional[str] = None,
+) -> int:
+    """
+    Archive one published chart week.
+
+    Re-archiving a week replaces it and refreshes the precomputed
+    history columns of any later weeks of the same chart.
+    Returns the number of archived rows; ValueError for a bad week id.
+    """
+    week_id = _normalise_week(week_id)
+    region = (region or NATIONAL).title()
+    rows = _ranked(items)
+
+    with _connect() as conn:
+        _write_week(conn, week_id, chart, region, rows)
+
+        later_weeks = [
+            row[0]
+            for row in conn.execute(
+                """
+                SELECT DISTINCT week_id FROM chart_entries
+                WHERE chart = ? AND region = ? AND week_id > ?
+                ORDER BY week_id
+                """,
+                (chart, region, week_id),
+            )
+        ]
+        for later in later_weeks:
+            _write_week(
+                conn, later, chart, region,
+                _rows_for_week(conn, chart, region, later),
+            )
+
+        conn.commit()
+        return len(rows)
+
+
+def get_chart(
+    week_id: str, chart: str = "top100", region: Optional[str] = None
+) -> List[Dict]:
+    """
+    Archived chart week with history columns, ordered by rank.
+    """
+    week_id = _week(week_id)
+    with _connect() as conn:
+        rows = conn.execute(
+            """
+            SELECT * FROM chart_entries
+            WHERE chart = ? AND region = ? AND week_id = ?
+            ORDER BY rank
+            """,
+            (chart, (region or NATIONAL).title(), week_id),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def get_song_run(
+    key: str, chart: str = "top100", region: Optional[str] = None
+) -> List[Dict]:
+    """
+    Full chart run of one song, oldest week first.
+    """
+    with _connect() as conn:
+        rows = conn.execute(
+            """
+            SELECT week_id, rank, score, last_week_rank,
+                   peak_rank, weeks_on_chart
+            FROM chart_entries
+            WHERE song_key = ? AND chart = ? AND region = ?
+            ORDER BY week_id
+            """,
+            (key, chart, (region or NATIONAL).title()),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def attach_history(
+    items: List[Dict],
+    week_id: Optional[str] = None,
+    chart: str = "top100",
+    region: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Attach last_week_rank / peak_rank / weeks_on_chart to a chart
+    being built for week_id (defaults to the current ISO week).
+
+    One indexed query for the whole chart. Mutates and returns items.
+    Never raises: a missing or broken archive leaves items untouched.
+    """
+    week_id = _week(week_id or current_week_id())
+
+    try:
+        rows = _ranked(items)
+        with _connect() as conn:
+            previous = _latest_before(
+                conn, chart, (region or NATIONAL).title(), week_id,
+                [r["song_key"] for r in rows],
+            )
+    except Exception:
+        logger.exception(f"Chart archive: history not attached for {chart} {week_id}")
+        return items
+
+    prev_week = _previous_week_id(week_id)
+    by_key = {
+        r["song_key"]: _history_columns(
+            previous.get(r["song_key"]), r["rank"], prev_week
+        )
+        for r in rows
+    }
+
+    for item in items:
+        columns = by_key.get(song_key(item.get("title"), item.get("artist")))
+        if columns:
+            item.update(columns)
+
+    return items
+
+
+def week_over_week(
+    week_id: str, chart: str = "top100", region: Optional[str] = None
+) -> Dict:
+    """
+    Entered / dropped / moved songs between week_id and the week before.
+    Uses the precomputed last_week_rank column, no snapshot reads.
+    """
+    week_id = _week(week_id)
+    region = (region or NATIONAL).title()
+    prev_week = _previous_week_id(week_id)
+
+    with _connect() as conn:
+        current = conn.execute(
+            """
+            SELECT rank, song_key, title, artist, last_week_rank
+            FROM chart_entries
+            WHERE chart = ? AND region = ? AND week_id = ?
+            ORDER BY rank
+            """,
+            (chart, region, week_id),
+        ).fetchall()
+
+        dropped = conn.execute(
+            """
+            SELECT p.rank, p.song_key, p.title, p.artist
+            FROM chart_entries p
+            WHERE p.chart = ? AND p.region = ? AND p.week_id = ?
+              AND NOT EXISTS (
+                  SELECT 1 FROM chart_entries c
+                  WHERE c.chart = p.chart AND c.region = p.region
+                    AND c.week_id = ? AND c.song_key = p.song_key
+              )
+            ORDER BY p.rank
+            """,
+            (chart, region, prev_week, week_id),
+        ).fetchall()
+
+    entered, moved = [], []
+    for row in current:
+        if row["last_week_rank"] is None:
+            entered.append(dict(row))
+        elif row["last_week_rank"] != row["rank"]:
+            entry = dict(row)
+            entry["change"] = row["last_week_rank"] - row["rank"]
+            moved.append(entry)
+
+    return {
+        "week_id": week_id,
+        "previous_week_id": prev_week,
+        "chart": chart,
+        "region": region or None,
+        "entered": entered,
+        "dropped": [dict(row) for row in dropped],
+        "moved": moved,
+    }
+
+
+def week_version(week_id: str) -> Optional[str]:
+    """
+    Digest of every chart archived for week_id (None if none were).
+    Changes whenever the week is re-archived with different rows.
+    """
+    week_id = _week(week_id)
+    with _connect() as conn:
+        rows = conn.execute(
+            """
+            SELECT chart, region, rank, song_key, score
+            FROM chart_entries
+            WHERE week_id = ?
+            ORDER BY chart, region, rank
+            """,
+            (week_id,),
+        ).fetchall()
+
+    if not rows:
+        return None
+    return hashlib.sha1(repr([tuple(row) for row in rows]).encode("utf-8")).hexdigest()
+
+
+def import_legacy_snapshots() -> Dict[str, int]:
+    """
+    One-off backfill from the loose JSON snapshot files.
+    Weeks are imported oldest first so history columns are correct.
+    """
+    pending = []  # (week_id, chart, region, items)
+
+    def _read(path: Path):
+        try:
+            return json.loads(path.read_text())
+        except Exception:
+            return None
+
+    def _items(payload):
+        if isinstance(payload, list):
+            return payload
+        if isinstance(payload, dict) and isinstance(payload.get("items"), list):
+            return payload["items"]
+        return None
+
+    locked_weeks = set()
+    for path in sorted(TOP100_LOCKED_DIR.glob("*.json")):
+        items = _items(_read(path))
+        if items is not None:
+            locked_weeks.add(path.stem)
+            pending.append((path.stem, "top100", NATIONAL, items))
+
+    # Locked charts are the published truth; snapshots only fill gaps
+    for path in sorted(TOP100_SNAPSHOT_DIR.glob("*.json")):
+        if path.stem in locked_weeks:
+            continue
+        items = _items(_read(path))
+        if items is not None:
+            pending.append((path.stem, "top100", NATIONAL, items))
+
+    for path in sorted(REGION_SNAPSHOT_DIR.glob("*/*.json")):
+        items = _items(_read(path))
+        if items is not None:
+            pending.append((path.parent.name, "region", path.stem, items))
+
+    for path in sorted(REPLAY_DIR.glob("*.json")):
+        if path.name == "logs.json":
+            continue
+        items = _items(_read(path))
+        if items is not None:
+            pending.append((path.stem, "replay", NATIONAL, items))
+
+    counts: Dict[str, int] = {}
+    normalised = []
+    for week_id, chart, region, items in pending:
+        try:
+            normalised.append((_normalise_week(week_id), chart, region, items))
+        except ValueError:
+            continue  # not a week file
+
+    for week_id, chart, region, items in sorted(normalised, key=lambda p: p[0]):
+        archive_chart(week_id, chart, items, region=region)
+        counts[chart] = counts.get(chart, 0) + 1
+
+    return counts
+
+
+__all__ = [
+    "song_key",
+    "current_week_id",
+    "archive_chart",
+    "get_chart",
+    "get_song_run",
+    "attach_history",
+    "week_over_week",
+    "import_legacy_snapshots",
+]
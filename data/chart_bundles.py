@@ -0,0 +1,183 @@
+# data/chart_bundles.py
+"""
+Immutable, content-addressed bundles of published charts.
+
+Publishing a week's Top 100 or regional chart serializes it once into
+objects/<sha256>.json, plus .json.gz and, when brotli is installed,
+.json.br. A small ref file (refs/<kind>/<week>[/<region>]) names the
+digest. Objects never change, so they can be served as files with a
+strong ETag and a year-long immutable Cache-Control, and neither this
+process nor a CDN ever has to parse them again. Republishing a week
+with different content writes new objects and repoints the ref
+atomically; week URLs are therefore revalidated, digest URLs are not.
+
+read_json() is the parse-once cache for readers that still need the
+published chart as Python objects (explanations, status pages).
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # optional: gzip bundles only
+    brotli = None
+
+BUNDLE_DIR = Path("data/bundles")
+KINDS = ("top100", "region")
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+READ_CACHE_SIZE = 64
+
+_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")   # week ids / regions: no path parts
+_SUFFIXES = {None: ".json", "gzip": ".json.gz", "br": ".json.br"}
+
+
+# =========================
+# Helpers
+# =========================
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def _ref_path(kind: str, week_id: str, region: Optional[str] = None) -> Path:
+    if kind not in KINDS:
+        raise ValueError(f"Unknown bundle kind: {kind}")
+    if not _NAME.match(week_id) or (region and not _NAME.match(region)):
+        raise ValueError(f"Invalid bundle name: {week_id}/{region}")
+    ref = BUNDLE_DIR / "refs" / kind / week_id
+    return ref / region.lower() if region else ref
+
+
+def serialize(payload: Any) -> bytes:
+    """Canonical bytes of a chart (same chart, same digest)."""
+    return json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    ).encode("utf-8")
+
+
+def is_digest(value: str) -> bool:
+    return bool(_DIGEST.match(value or ""))
+
+
+def object_path(digest: str, encoding: Optional[str] = None) -> Path:
+    return BUNDLE_DIR / "objects" / digest[:2] / f"{digest}{_SUFFIXES[encoding]}"
+
+
+# =========================
+# Publish / resolve
+# =========================
+
+def publish(kind: str, week_id: str, payload: Any, region: Optional[str] = None) -> str:
+    """
+    Write the bundle objects for a published chart and point the week's
+    ref at them; returns the digest. Unchanged content is a no-op.
+    """
+    body = serialize(payload)
+    digest = hashlib.sha256(body).hexdigest()
+    if resolve(kind, week_id, region) == digest:
+        return digest
+
+    variants = {None: body, "gzip": gzip.compress(body, GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+
+    # Objects first, ref last (atomic replace): a visible ref always has its objects
+    for encoding, data in variants.items():
+        path = object_path(digest, encoding)
+        if not path.exists():
+            _atomic_write(path, data)
+    _atomic_write(_ref_path(kind, week_id, region), digest.encode("ascii"))
+    return digest
+
+
+def resolve(kind: str, week_id: str, region: Optional[str] = None) -> Optional[str]:
+    """Digest of a published chart, or None."""
+    try:
+        digest = _ref_path(kind, week_id, region).read_text().strip()
+    except (OSError, ValueError):
+        return None
+    return digest if is_digest(digest) and object_path(digest).exists() else None
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Content codings an Accept-Encoding header allows (q=0 refuses one)."""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.partition(";")
+        quality = params.replace(" ", "").lower()
+        if quality.startswith("q=") and not quality[2:].strip("0."):
+            continue  # q=0: explicitly refused
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+def choose(digest: str, accept_encoding: str = "") -> Tuple[Path, Optional[str]]:
+    """Best stored variant for an Accept-Encoding header: (path, encoding)."""
+    accepted = accepted_encodings(accept_encoding)
+    for encoding in ("br", "gzip"):
+        if encoding in accepted:
+            path = object_path(digest, encoding)
+            if path.exists():
+                return path, encoding
+    return object_path(digest), None
+
+
+# =========================
+# Parse-once reads
+# =========================
+
+_read_cache: "OrderedDict[str, Tuple[int, int, Any]]" = OrderedDict()
+_read_lock = threading.Lock()
+
+
+def read_json(path: Path) -> Any:
+    """
+    Parsed JSON of a published file, cached until its mtime or size
+    changes. Shared between callers: treat the result as read-only.
+    Raises like json.loads / Path.stat.
+    """
+    stat = path.stat()
+    key = str(path)
+    with _read_lock:
+        entry = _read_cache.get(key)
+        if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            _read_cache.move_to_end(key)
+            return entry[2]
+
+    value = json.loads(path.read_bytes())
+    with _read_lock:
+        _read_cache[key] = (stat.st_mtime_ns, stat.st_size, value)
+        _read_cache.move_to_end(key)
+        while len(_read_cache) > READ_CACHE_SIZE:
+            _read_cache.popitem(last=False)
+    return value
+
+
+def clear_read_cache() -> None:
+    with _read_lock:
+        _read_cache.clear()
+
+
+def stats() -> Dict[str, Any]:
+    with _read_lock:
+        cached = len(_read_cache)
+    return {"read_cache_entries": cached, "brotli": brotli is not None}
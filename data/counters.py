@@ -0,0 +1,137 @@
+# data/counters.py
+"""
+Maintained row counters.
+
+Triggers keep table_counters in step with every insert and delete on
+the songs and history tables. They also track changes to the counted
+columns. Per-source and per-status totals then cost one read of a few
+dozen rows instead of COUNT(*) scans on every health probe.
+"""
+
+import sqlite3
+from typing import Any, Dict, Optional, Tuple
+
+# Table -> columns counted per value (the table total is always kept)
+COUNTED: Dict[str, Tuple[str, ...]] = {
+    "songs": ("source_type", "region"),
+    "scraper_history": ("status",),
+    "youtube_scheduler": ("status",),
+    "streams_history": ("status", "platform"),
+}
+
+
+# =========================
+# Schema
+# =========================
+
+def _bump(name: str, value_sql: str, delta: str) -> str:
+    return (
+        f"INSERT INTO table_counters (name, value, count) VALUES ('{name}', {value_sql}, {delta}) "
+        f"ON CONFLICT(name, value) DO UPDATE SET count = count + ({delta});"
+    )
+
+
+def _triggers(table: str, columns: Tuple[str, ...]):
+    inserted = [_bump(table, "''", "1")]
+    deleted = [_bump(table, "''", "-1")]
+    updated = {}
+    for column in columns:
+        name = f"{table}.{column}"
+        old_value = f"COALESCE(OLD.{column}, '')"
+        new_value = f"COALESCE(NEW.{column}, '')"
+        inserted.append(_bump(name, new_value, "1"))
+        deleted.append(_bump(name, old_value, "-1"))
+        updated[column] = f"{_bump(name, old_value, '-1')} {_bump(name, new_value, '1')}"
+
+    yield (
+        f"CREATE TRIGGER IF NOT EXISTS trg_counters_{table}_insert AFTER INSERT ON {table} "
+        f"BEGIN {' '.join(inserted)} END"
+    )
+    yield (
+        f"CREATE TRIGGER IF NOT EXISTS trg_counters_{table}_delete AFTER DELETE ON {table} "
+        f"BEGIN {' '.join(deleted)} END"
+    )
+    for column, body in updated.items():
+        yield (
+            f"CREATE TRIGGER IF NOT EXISTS trg_counters_{table}_{column} "
+            f"AFTER UPDATE OF {column} ON {table} WHEN OLD.{column} IS NOT NEW.{column} "
+            f"BEGIN {body} END"
+        )
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    """
+    Create table_counters and its triggers; count existing rows the
+    first time. Call after the counted tables exist. Caller commits.
+    """
+    created = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'table_counters'"
+    ).fetchone() is None
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS table_counters (
+            name TEXT NOT NULL,
+            value TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (name, value)
+        ) WITHOUT ROWID
+    """)
+
+    for table, columns in COUNTED.items():
+        for statement in _triggers(table, columns):
+            conn.execute(statement)
+
+    if created:
+        rebuild(conn)
+
+
+def rebuild(conn: sqlite3.Connection) -> None:
+    """Recount everything from the base tables (one scan each). Caller commits."""
+    conn.execute("DELETE FROM table_counters")
+    for table, columns in COUNTED.items():
+        conn.execute(
+            f"INSERT INTO table_counters (name, value, count) SELECT ?, '', COUNT(*) FROM {table}",
+            (table,)
+        )
+        for column in columns:
+            conn.execute(
+                f"INSERT INTO table_counters (name, value, count) "
+                f"SELECT ?, COALESCE({column}, ''), COUNT(*) FROM {table} GROUP BY 2",
+                (f"{table}.{column}",)
+            )
+
+
+# =========================
+# Reads
+# =========================
+
+def read(conn: sqlite3.Connection) -> Dict[str, Dict[str, Any]]:
+    """
+    {"songs": {"total": 12, "source_type": {"tv": 4, ...}, "region": {...}}, ...}
+    Zero counts are left out.
+    """
+    result: Dict[str, Dict[str, Any]] = {
+        table: {"total": 0, **{column: {} for column in columns}}
+        for table, columns in COUNTED.items()
+    }
+
+    for name, value, count in conn.execute(
+        "SELECT name, value, count FROM table_counters WHERE count != 0"
+    ):
+        table, _, column = name.partition(".")
+        if table not in result:
+            continue
+        if not column:
+            result[table]["total"] = count
+        elif column in result[table]:
+            result[table][column][value] = count
+
+    return result
+
+
+def get(counts: Dict[str, Dict[str, Any]], table: str,
+        column: Optional[str] = None, value: Optional[str] = None) -> int:
+    """Single count out of read()'s result; 0 when absent."""
+    if column is None:
+        return counts.get(table, {}).get("total", 0)
+    return counts.get(table, {}).get(column, {}).get(value, 0)
@@ -0,0 +1,341 @@
+# data/exports.py
+"""
+Streaming CSV/Parquet exports.
+
+Rows are read in keyset-paginated chunks of CHUNK_ROWS (WHERE key >
+last key ORDER BY key LIMIT n), all inside one read transaction, so an
+export is a consistent snapshot and memory stays at one chunk whatever
+the table size.
+
+The first download of an export streams straight to the client and is
+written to a spool file under EXPORT_DIR on the way through. The file is
+found again by a spool key (export, parameters, data version), and its
+ETag is a hash of the bytes written. Later downloads and HTTP Range
+requests (resuming an interrupted download) are served from the file.
+Because the ETag follows the content, a resume stays valid after the
+file was rebuilt from unchanged data, and also after new data moved the
+key on while the old file is still spooled. Parquet needs pyarrow; CSV
+works without it.
+"""
+
+import csv
+import hashlib
+import io
+import os
+import re
+import sqlite3
+import uuid
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow
+    import pyarrow.parquet as pyarrow_parquet
+except ImportError:  # optional: Parquet exports unavailable
+    pyarrow = pyarrow_parquet = None
+
+EXPORT_DIR = Path("data/exports")
+CHUNK_ROWS = 2000
+FILE_CHUNK_BYTES = 64 * 1024
+SPOOL_KEEP = 16              # complete spool files kept for Range requests
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+_HISTORY_ROLLUP_COLUMNS = (
+    ("bucket", "str"), ("source", "str"), ("kind", "str"), ("key", "str"),
+    ("status", "str"), ("runs", "int"), ("items_found", "int"), ("items_added", "int"),
+    ("items_updated", "int"), ("execution_time_sum", "float"),
+    ("execution_time_count", "int"),
+)
+
+# Exportable tables: columns (name, type) and a unique key to page on
+EXPORTS: Dict[str, Dict[str, Any]] = {
+    "songs": {
+        "table": "songs", "key": ("id",),
+        "columns": (
+            ("id", "int"), ("title", "str"), ("artist", "str"), ("plays", "int"),
+            ("score", "float"), ("station", "str"), ("region", "str"), ("district", "str"),
+            ("source_type", "str"), ("source", "str"), ("url", "str"),
+            ("ingested_at", "str"), ("last_updated", "str"), ("youtube_channel_id", "str"),
+            ("youtube_video_id", "str"), ("stream_platform", "str"), ("stream_rank", "int"),
+        ),
+    },
+    "chart_entries": {
+        "table": "chart_entries", "key": ("chart", "region", "rank"),
+        "columns": (
+            ("week_id", "str"), ("chart", "str"), ("region", "str"), ("rank", "int"),
+            ("song_key", "str"), ("title", "str"), ("artist", "str"), ("score", "float"),
+            ("last_week_rank", "int"), ("peak_rank", "int"), ("weeks_on_chart", "int"),
+        ),
+    },
+    "scraper_history": {
+        "table": "scraper_history", "key": ("id",),
+        "columns": (
+            ("id", "int"), ("scraper_type", "str"), ("station_id", "str"),
+            ("items_found", "int"), ("items_added", "int"), ("status", "str"),
+            ("error_message", "str"), ("execution_time", "float"), ("created_at", "str"),
+        ),
+    },
+    "youtube_scheduler": {
+        "table": "youtube_scheduler", "key": ("id",),
+        "columns": (
+            ("id", "int"), ("channel_id", "str"), ("status", "str"), ("items_found", "int"),
+            ("items_added", "int"), ("error_message", "str"), ("executed_at", "str"),
+        ),
+    },
+    "streams_history": {
+        "table": "streams_history", "key": ("id",),
+        "columns": (
+            ("id", "int"), ("platform", "str"), ("items_found", "int"), ("items_added", "int"),
+            ("items_updated", "int"), ("status", "str"), ("error_message", "str"),
+            ("execution_time", "float"), ("method_used", "str"), ("created_at", "str"),
+        ),
+    },
+    "history_hourly": {
+        "table": "history_hourly", "key": ("bucket", "source", "kind", "key", "status"),
+        "columns": _HISTORY_ROLLUP_COLUMNS,
+    },
+    "history_daily": {
+        "table": "history_daily", "key": ("bucket", "source", "kind", "key", "status"),
+        "columns": _HISTORY_ROLLUP_COLUMNS,
+    },
+}
+
+
+# =========================
+# Reading
+# =========================
+
+def iter_chunks(connect: Callable[[], sqlite3.Connection], table: str,
+                columns: Sequence[str], key: Sequence[str], where: str = "",
+                params: Sequence[Any] = (), chunk_rows: int = CHUNK_ROWS) -> Iterator[List[tuple]]:
+    """
+    Row chunks of `columns` ordered by `key` (which must be unique and
+    part of `columns`). `where` is an extra SQL filter on `params`.
+    Every chunk comes from the same read transaction.
+    """
+    positions = [list(columns).index(column) for column in key]
+    select = f"SELECT {', '.join(columns)} FROM {table}"
+    order = f"ORDER BY {', '.join(key)} LIMIT ?"
+    after = f"({', '.join(key)}) > ({', '.join('?' for _ in key)})"
+    last: Optional[tuple] = None
+
+    with closing(connect()) as conn:
+        conn.execute("BEGIN")
+        try:
+            while True:
+                clauses, args = [where] if where else [], list(params)
+                if last is not None:
+                    clauses.append(after)
+                    args.extend(last)
+                sql = f"{select} {'WHERE ' + ' AND '.join(clauses) if clauses else ''} {order}"
+
+                rows = conn.execute(sql, args + [chunk_rows]).fetchall()
+                if not rows:
+                    return
+
+                yield [tuple(row) for row in rows]
+                if len(rows) < chunk_rows:
+                    return
+                last = tuple(rows[-1][i] for i in positions)
+        finally:
+            conn.rollback()
+
+
+# =========================
+# Encoding
+# =========================
+
+def csv_bytes(columns: Sequence[str], chunks: Iterable[List[tuple]]) -> Iterator[bytes]:
+    """Header line, then one encoded block per chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    yield buffer.getvalue().encode("utf-8")
+
+    for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ParquetSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back out."""
+
+    def __init__(self):
+        super().__init__()
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def parquet_bytes(columns: Sequence[Tuple[str, str]],
+                  chunks: Iterable[List[tuple]]) -> Iterator[bytes]:
+    """One row group per chunk; the footer comes with the last block."""
+    if pyarrow is None:
+        raise RuntimeError("Parquet export requires pyarrow")
+
+    arrow_types = {"int": pyarrow.int64(), "float": pyarrow.float64(), "str": pyarrow.string()}
+    schema = pyarrow.schema([(name, arrow_types[kind]) for name, kind in columns])
+    sink = _ParquetSink()
+    writer = pyarrow_parquet.ParquetWriter(sink, schema)
+
+    for rows in chunks:
+        writer.write_table(pyarrow.Table.from_pydict(
+            {name: [row[i] for row in rows] for i, (name, _) in enumerate(columns)},
+            schema=schema
+        ))
+        yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
+
+
+def available_formats() -> List[str]:
+    return ["csv", "parquet"] if pyarrow is not None else ["csv"]
+
+
+def export(connect: Callable[[], sqlite3.Connection], name: str, fmt: str,
+           where: str = "", params: Sequence[Any] = ()) -> Iterator[bytes]:
+    """Encoded body of the EXPORTS table `name`, filtered by `where`."""
+    spec = EXPORTS[name]
+    names = [column for column, _ in spec["columns"]]
+    chunks = iter_chunks(connect, spec["table"], names, spec["key"], where, params)
+    if fmt == "parquet":
+        return parquet_bytes(spec["columns"], chunks)
+    return csv_bytes(names, chunks)
+
+
+# =========================
+# Spooling
+# =========================
+
+def spool_key(*parts: Any) -> str:
+    """Stable key over the export name, parameters and data version."""
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:24]
+
+
+def spool_path(key: str, tag: str, fmt: str) -> Path:
+    return EXPORT_DIR / f"{key}.{tag}.{fmt}"
+
+
+def spooled(key: str, fmt: str) -> Optional[Tuple[Path, str]]:
+    """(path, ETag) of the complete spool file for this key, if one exists."""
+    for path in EXPORT_DIR.glob(f"{key}.*.{fmt}"):
+        return path, path.name.split(".")[1]
+    return None
+
+
+def spooled_tag(tag: str, fmt: str) -> Optional[Path]:
+    """The spool file holding exactly the bytes tagged `tag`, under any key."""
+    if not re.fullmatch(r"[0-9a-f]{24}", tag):
+        return None
+    for path in EXPORT_DIR.glob(f"*.{tag}.{fmt}"):
+        return path
+    return None
+
+
+def _trim_spool() -> None:
+    files = sorted(
+        (p for p in EXPORT_DIR.iterdir() if p.suffix in (".csv", ".parquet")),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True
+    )
+    for path in files[SPOOL_KEEP:]:
+        path.unlink(missing_ok=True)
+
+
+def spool(key: str, fmt: str, body: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Pass `body` through while writing it to a temporary file. The file is
+    published under its key and content hash only once the whole export
+    has been written; an abandoned build leaves nothing behind.
+    """
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    temp = EXPORT_DIR / f".{key}.{uuid.uuid4().hex}.part"
+    digest = hashlib.sha1()
+    complete = False
+    try:
+        with open(temp, "wb") as handle:
+            for block in body:
+                handle.write(block)
+                digest.update(block)
+                yield block
+        os.replace(temp, spool_path(key, digest.hexdigest()[:24], fmt))
+        complete = True
+        _trim_spool()
+    finally:
+        if not complete:
+            temp.unlink(missing_ok=True)
+
+
+def build(key: str, fmt: str, body: Iterable[bytes]) -> Tuple[Path, str]:
+    """Write the whole export to its spool file; returns (path, ETag)."""
+    for _ in spool(key, fmt, body):
+        pass
+    return spooled(key, fmt)
+
+
+# =========================
+# Byte ranges
+# =========================
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Single `bytes=` range -> inclusive (start, end), or None to send the
+    whole file. Raises ValueError if the range is unsatisfiable.
+    Multi-range requests are answered with the whole file.
+    """
+    match = _RANGE_RE.match((header or "").replace(" ", ""))
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, end
+
+
+def read_file(path: Path, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    """Bytes start..end (inclusive) of a spool file, in FILE_CHUNK_BYTES blocks."""
+    remaining = (path.stat().st_size if end is None else end + 1) - start
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        while remaining > 0:
+            block = handle.read(min(FILE_CHUNK_BYTES, remaining))
+            if not block:
+                return
+            remaining -= len(block)
+            yield block
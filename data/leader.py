@@ -0,0 +1,226 @@
+# data/leader.py
+"""
+Leader lease and shared job table for multi-worker deployments.
+
+Every uvicorn worker opens the same SQLite database. Exactly one of
+them holds the scheduler lease at a time. The holder renews it every
+few seconds, and another worker takes it over once it has expired, so
+a crashed leader is replaced within one lease period.
+
+Manual scheduler triggers that reach a follower are written to
+scheduler_jobs. The leader claims them, runs them and stores the
+result for the follower (or client) to read back. Schedule changes go
+to scheduler_settings, which every worker reads on its heartbeat, so
+the current leader (and any later one) runs with them.
+"""
+
+import json
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+
+LEASE_SECONDS = 30.0
+JOB_RETENTION_DAYS = 7
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS leases (
+        name TEXT PRIMARY KEY,
+        holder TEXT NOT NULL,
+        acquired_at REAL NOT NULL,
+        renewed_at REAL NOT NULL,
+        expires_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS scheduler_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        params TEXT NOT NULL DEFAULT '{}',
+        status TEXT NOT NULL DEFAULT 'pending',
+        requested_by TEXT,
+        claimed_by TEXT,
+        result TEXT,
+        error TEXT,
+        requested_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_scheduler_jobs_status ON scheduler_jobs(status, id)",
+    """
+    CREATE TABLE IF NOT EXISTS scheduler_settings (
+        name TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+)
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    """Create leases, scheduler_jobs and scheduler_settings. Caller commits."""
+    for statement in _SCHEMA:
+        conn.execute(statement)
+
+
+# =========================
+# Lease
+# =========================
+
+def acquire(conn: sqlite3.Connection, name: str, holder: str,
+            ttl: float = LEASE_SECONDS) -> bool:
+    """
+    Take or renew the lease; True while `holder` owns it. A lease held
+    by someone else is only taken once it has expired. Commits.
+    """
+    now = time.time()
+    conn.execute("""
+        INSERT INTO leases (name, holder, acquired_at, renewed_at, expires_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET
+            acquired_at = CASE WHEN leases.holder = excluded.holder
+                               THEN leases.acquired_at ELSE excluded.acquired_at END,
+            holder = excluded.holder,
+            renewed_at = excluded.renewed_at,
+            expires_at = excluded.expires_at
+        WHERE leases.holder = excluded.holder OR leases.expires_at < excluded.renewed_at
+    """, (name, holder, now, now, now + ttl))
+    conn.commit()
+
+    row = conn.execute("SELECT holder FROM leases WHERE name = ?", (name,)).fetchone()
+    return row is not None and row[0] == holder
+
+
+def release(conn: sqlite3.Connection, name: str, holder: str) -> None:
+    """Give the lease up (shutdown) so a follower takes over at once. Commits."""
+    conn.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (name, holder))
+    conn.commit()
+
+
+def current(conn: sqlite3.Connection, name: str) -> Optional[Dict[str, Any]]:
+    """The lease row with an `active` flag, or None if never taken."""
+    row = conn.execute(
+        "SELECT holder, acquired_at, renewed_at, expires_at FROM leases WHERE name = ?",
+        (name,)
+    ).fetchone()
+    if row is None:
+        return None
+    holder, acquired_at, renewed_at, expires_at = row
+    return {
+        "holder": holder,
+        "acquired_at": acquired_at,
+        "renewed_at": renewed_at,
+        "expires_at": expires_at,
+        "active": expires_at >= time.time(),
+    }
+
+
+# =========================
+# Jobs
+# =========================
+
+def _job(row: sqlite3.Row) -> Dict[str, Any]:
+    job = dict(row)
+    job["params"] = json.loads(job["params"] or "{}")
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def enqueue(conn: sqlite3.Connection, kind: str, params: Dict[str, Any],
+            requested_by: str) -> int:
+    """Queue a job for the leader; returns its id. Commits."""
+    cursor = conn.execute(
+        "INSERT INTO scheduler_jobs (kind, params, requested_by, requested_at) VALUES (?, ?, ?, ?)",
+        (kind, json.dumps(params), requested_by, time.time())
+    )
+    conn.commit()
+    return cursor.lastrowid
+
+
+def claim(conn: sqlite3.Connection, holder: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Mark the oldest pending jobs running for `holder` and return them. Commits."""
+    conn.row_factory = sqlite3.Row
+    # Polled every second: only take the write lock when there is work
+    if conn.execute("SELECT 1 FROM scheduler_jobs WHERE status = 'pending' LIMIT 1").fetchone() is None:
+        return []
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute(
+            "SELECT * FROM scheduler_jobs WHERE status = 'pending' ORDER BY id LIMIT ?",
+            (limit,)
+        ).fetchall()
+        now = time.time()
+        conn.executemany(
+            "UPDATE scheduler_jobs SET status = 'running', claimed_by = ?, started_at = ? WHERE id = ?",
+            [(holder, now, row["id"]) for row in rows]
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return [{**_job(row), "status": "running", "claimed_by": holder} for row in rows]
+
+
+def finish(conn: sqlite3.Connection, job_id: int, result: Any = None,
+           error: Optional[str] = None) -> None:
+    """Store a job's result (or error). Commits."""
+    conn.execute(
+        "UPDATE scheduler_jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+        (
+            "failed" if error else "completed",
+            json.dumps(result, default=str) if result is not None else None,
+            error[:500] if error else None,
+            time.time(),
+            job_id,
+        )
+    )
+    conn.commit()
+
+
+def abandon(conn: sqlite3.Connection, holder: str) -> int:
+    """
+    Fail jobs left running by earlier leaders (they died mid-job).
+    Call on election. Commits.
+    """
+    cursor = conn.execute(
+        "UPDATE scheduler_jobs SET status = 'failed', error = 'leader changed while running', "
+        "finished_at = ? WHERE status = 'running' AND claimed_by != ?",
+        (time.time(), holder)
+    )
+    conn.commit()
+    return cursor.rowcount
+
+
+def get(conn: sqlite3.Connection, job_id: int) -> Optional[Dict[str, Any]]:
+    conn.row_factory = sqlite3.Row
+    row = conn.execute("SELECT * FROM scheduler_jobs WHERE id = ?", (job_id,)).fetchone()
+    return _job(row) if row else None
+
+
+# =========================
+# Settings
+# =========================
+
+def set_setting(conn: sqlite3.Connection, name: str, value: Any) -> None:
+    """Store a scheduler setting for every worker. Commits."""
+    conn.execute("""
+        INSERT INTO scheduler_settings (name, value, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+    """, (name, json.dumps(value), time.time()))
+    conn.commit()
+
+
+def settings(conn: sqlite3.Connection) -> Dict[str, Any]:
+    return {
+        name: json.loads(value)
+        for name, value in conn.execute("SELECT name, value FROM scheduler_settings")
+    }
+
+
+def prune(conn: sqlite3.Connection, days: int = JOB_RETENTION_DAYS) -> int:
+    """Delete finished jobs older than `days`. Caller commits."""
+    return conn.execute(
+        "DELETE FROM scheduler_jobs WHERE finished_at < ?",
+        (time.time() - days * 86400,)
+    ).rowcount
@@ -1,10 +1,15 @@
 # data/region_snapshots.py
 
 import json
+import logging
 from pathlib import Path
 from typing import Dict, Optional, List
 
 from data.chart_week import current_chart_week
+from data import chart_bundles
+from api import metrics
+
+logger = logging.getLogger(__name__)
 
 SNAPSHOT_DIR = Path("data/region_snapshots")
 VALID_REGIONS = ("Eastern", "Northern", "Western")
@@ -100,12 +105,28 @@ def save_region_snapshot(region: str, snapshot_data: Optional[Dict] = None) -> D
     tmp.write_text(json.dumps(payload, indent=2))
     tmp.replace(path)
 
+    # Pre-serialized, pre-compressed bundle served as a static file
+    try:
+        chart_bundles.publish("region", week_id, payload, region=region)
+    except Exception:
+        logger.exception(f"Publishing the {region} bundle for {week_id} failed")
+        metrics.observe_bundle_publish_failure("region")
+
+    # Indexed history is best-effort; the JSON snapshot is the record
+    try:
+        from data import chart_archive
+        chart_archive.archive_chart(
+            week_id, "region", payload.get("items") or [], region=region
+        )
+    except Exception:
+        logger.exception(f"Archiving {region} chart for {week_id} failed")
+
     return payload
 
 
 def load_region_snapshot(region: str) -> Optional[Dict]:
     """
-    Load snapshot for current chart week.
+    Load snapshot for current chart week (parsed once; read-only).
     Returns None if missing or invalid.
     """
     if region not in VALID_REGIONS:
@@ -122,6 +143,24 @@ def load_region_snapshot(region: str) -> Optional[Dict]:
         return None
 
     try:
-        return json.loads(path.read_text())
+        return chart_bundles.read_json(path)
     except Exception:
         return None
+
+
+def region_bundle(region: str, week_id: str) -> Optional[str]:
+    """
+    Bundle digest of a region's snapshot for a week, bundling older
+    snapshots on first request. None if there is no snapshot.
+    """
+    if region not in VALID_REGIONS:
+        return None
+
+    digest = chart_bundles.resolve("region", week_id, region)
+    if digest:
+        return digest
+
+    path = _snapshot_path(region, week_id)
+    if not path.exists():
+        return None
+    return chart_bundles.publish("region", week_id, chart_bundles.read_json(path), region=region)
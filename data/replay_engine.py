@@ -1,11 +1,19 @@
 from pathlib import Path
 import json
-from datetime import datetime
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional
 from zoneinfo import ZoneInfo
 
 EAT = ZoneInfo("Africa/Kampala")
 REPLAY_DIR = Path("data/replays")
-LOG_FILE = REPLAY_DIR / "logs.json"
+LOG_FILE = REPLAY_DIR / "logs.jsonl"
+EVENTS_DB = Path("data/ugboard.db")
+
+# sqlite CURRENT_TIMESTAMP format (UTC)
+_SQL_TS = "%Y-%m-%d %H:%M:%S"
 
 
 def replay_week(week_id: str, chart: list, config_version: str) -> None:
@@ -25,23 +33,222 @@ def replay_week(week_id: str, chart: list, config_version: str) -> None:
     }
 
     path = REPLAY_DIR / f"{week_id}.json"
-    path.write_text(json.dumps(payload, indent=2))
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(payload, indent=2))
+    tmp.replace(path)
 
     _log_replay(week_id, config_version)
 
 
 def _log_replay(week_id: str, config_version: str):
-    logs = []
-    if LOG_FILE.exists():
-        try:
-            logs = json.loads(LOG_FILE.read_text())
-        except Exception:
-            logs = []
-
-    logs.append({
+    """
+    Append-only JSON lines log (one write per replay).
+    """
+    entry = {
         "week_id": week_id,
         "config_version": config_version,
         "at": datetime.now(EAT).isoformat(),
-    })
+    }
+
+    with LOG_FILE.open("a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+# =========================
+# Week helpers
+# =========================
+
+def week_bounds(week_id: str) -> tuple:
+    """
+    UTC [start, end) of an ISO chart week, Monday 00:00 EAT.
+    Returned in sqlite CURRENT_TIMESTAMP format.
+    """
+    year, week = week_id.split("-W")
+    monday = date.fromisocalendar(int(year), int(week), 1)
+
+    start = datetime.combine(monday, time.min, tzinfo=EAT)
+    end = start + timedelta(days=7)
+
+    return (
+        start.astimezone(timezone.utc).strftime(_SQL_TS),
+        end.astimezone(timezone.utc).strftime(_SQL_TS),
+    )
+
+
+def weeks_in_range(start: date, end: date) -> List[str]:
+    """
+    ISO week ids touching [start, end], oldest first.
+    """
+    if end < start:
+        raise ValueError("end must not be before start")
+
+    weeks = []
+    day = start - timedelta(days=start.weekday())
+
+    while day <= end:
+        year, week, _ = day.isocalendar()
+        weeks.append(f"{year}-W{week:02d}")
+        day += timedelta(days=7)
+
+    return weeks
+
+
+# =========================
+# Rebuild from raw events
+# =========================
+
+def rebuild_week(
+    week_id: str,
+    config_version: str,
+    limit: int = 100,
+    events_db: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Rebuild a week's chart from play_events as of the end of the week.
+
+    Mirrors the live aggregation (max reported plays per title/artist/
+    source, first observation as ingest time) so only the scoring config
+    differs. Ties break on title, artist, source: same input, same chart.
+    Top-level and picklable so it can run in a worker process.
+    """
+    from api.scoring.engine import score_items
+
+    _, week_end = week_bounds(week_id)
+    end_dt = datetime.strptime(week_end, _SQL_TS)
+
+    uri = f"file:{events_db or EVENTS_DB}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    try:
+        rows = conn.execute(
+            """
+            SELECT title, artist, source,
+                   MAX(source_type), MAX(region),
+                   MAX(plays), MIN(observed_at)
+            FROM play_events
+            WHERE observed_at < ?
+            GROUP BY title, artist, source
+            """,
+            (week_end,),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    scored = [
+        {
+            "title": title,
+            "artist": artist,
+            "source": source,
+            "source_type": source_type,
+            "region": region,
+            "plays": plays or 0,
+            "ingested_at": first_seen,
+        }
+        for title, artist, source, source_type, region, plays, first_seen in rows
+    ]
+
+    scores = score_items(scored, config_version, now=end_dt)
+    for item, score in zip(scored, scores):
+        item["score"] = round(score, 4)
 
-    LOG_FILE.write_text(json.dumps(logs, indent=2))
\ No newline at end of file
+    scored.sort(key=lambda x: (-x["score"], x["title"], x["artist"], x["source"]))
+
+    chart = scored[:limit]
+    for rank, item in enumerate(chart, start=1):
+        item["rank"] = rank
+
+    return chart
+
+
+# =========================
+# Diff against published
+# =========================
+
+def diff_against_published(week_id: str, chart: List[Dict]) -> Dict:
+    """
+    Compare a replayed chart to the archived published Top 100.
+    """
+    from data import chart_archive
+
+    published = {
+        row["song_key"]: row["rank"]
+        for row in chart_archive.get_chart(week_id, "top100")
+    }
+
+    if not published:
+        return {"week_id": week_id, "published": False}
+
+    replayed = {}
+    for item in chart:
+        key = chart_archive.song_key(item.get("title"), item.get("artist"))
+        replayed.setdefault(key, item["rank"])
+
+    changes = [
+        abs(published[key] - rank)
+        for key, rank in replayed.items()
+        if key in published
+    ]
+
+    return {
+        "week_id": week_id,
+        "published": True,
+        "entered": len(replayed.keys() - published.keys()),
+        "dropped": len(published.keys() - replayed.keys()),
+        "moved": sum(1 for c in changes if c),
+        "unchanged": sum(1 for c in changes if not c),
+        "max_rank_change": max(changes, default=0),
+        "mean_rank_change": round(sum(changes) / len(changes), 2) if changes else 0.0,
+    }
+
+
+def replay_range(
+    start: date,
+    end: date,
+    config_version: str,
+    limit: int = 100,
+    workers: Optional[int] = None,
+) -> Dict:
+    """
+    Re-score every week in [start, end] under config_version.
+
+    Weeks are rebuilt in parallel across a process pool; results are
+    persisted and diffed in the parent so logs are written serially.
+    NEVER publishes.
+    """
+    from api.scoring.config import get_scoring_config
+
+    get_scoring_config(config_version)  # fail fast on unknown versions
+    weeks = weeks_in_range(start, end)
+    workers = workers or min(len(weeks), os.cpu_count() or 1)
+    events_db = str(EVENTS_DB)
+
+    if workers <= 1:
+        charts = [rebuild_week(w, config_version, limit, events_db) for w in weeks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            charts = list(pool.map(
+                rebuild_week,
+                weeks,
+                [config_version] * len(weeks),
+                [limit] * len(weeks),
+                [events_db] * len(weeks),
+            ))
+
+    diffs = []
+    for week_id, chart in zip(weeks, charts):
+        replay_week(week_id, chart, config_version)
+        diffs.append(diff_against_published(week_id, chart))
+
+    compared = [d for d in diffs if d["published"]]
+
+    return {
+        "config_version": config_version,
+        "weeks": len(weeks),
+        "compared_weeks": len(compared),
+        "summary": {
+            "entered": sum(d["entered"] for d in compared),
+            "dropped": sum(d["dropped"] for d in compared),
+            "moved": sum(d["moved"] for d in compared),
+            "max_rank_change": max((d["max_rank_change"] for d in compared), default=0),
+        },
+        "diffs": diffs,
+    }
@@ -0,0 +1,405 @@
+# data/retention.py
+"""
+History retention.
+
+Raw rows in scraper_history, youtube_scheduler and streams_history are
+rolled up into history_hourly and history_daily summaries, then pruned
+once they are older than the retention window. Freed pages go back to
+the OS through incremental VACUUM.
+
+play_events (raw ingest observations read by chart replays) is compacted
+instead: past its window, each (title, artist, source) keeps one row per
+chart week with that week's highest plays and first observation. Chart
+weeks are the replay's (Monday 00:00 EAT), and a replay reads only the
+max plays and first observation of whole weeks, so replays of every
+week are unchanged.
+
+Rollups are incremental. A per-table watermark (the last rolled-up id)
+means each raw row is counted exactly once, and the work is only the
+new rows. Only the retention job rolls up. Readers never write: they
+add the raw rows past the watermark to the summaries on the fly, so
+stats are never behind the raw tables. Pruning deletes in small batches, each in its own
+short transaction, so ingest writers are never locked out for long.
+"""
+
+import logging
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RAW_RETENTION_DAYS = 14
+HOURLY_RETENTION_DAYS = 35   # stats endpoints look back up to 30 days
+DAILY_RETENTION_DAYS = 0     # 0 = keep daily summaries forever
+ROLLUP_BATCH = 5000
+PRUNE_BATCH = 500
+PRUNE_PAUSE = 0.05           # seconds between delete batches
+VACUUM_PAGES = 1000
+EVENT_RETENTION_DAYS = 56    # play_events kept raw; older ones compacted
+COMPACT_BATCH = 500          # (title, artist, source, week) groups per transaction
+
+# Monday (EAT, UTC+3) of the chart week an observation falls in
+_EVENT_WEEK = "date({}observed_at, '+3 hours', 'weekday 0', '-6 days')"
+
+# Raw table -> how its columns map onto the summary key and measures
+SOURCES: Dict[str, Dict[str, str]] = {
+    "scraper_history": {
+        "time": "created_at", "kind": "scraper_type", "key": "station_id",
+        "updated": "0", "execution_time": "execution_time",
+    },
+    "youtube_scheduler": {
+        "time": "executed_at", "kind": "'youtube'", "key": "channel_id",
+        "updated": "0", "execution_time": "NULL",
+    },
+    "streams_history": {
+        "time": "created_at", "kind": "'streams'", "key": "platform",
+        "updated": "items_updated", "execution_time": "execution_time",
+    },
+}
+
+ROLLUPS = {
+    "history_hourly": "%Y-%m-%d %H:00:00",
+    "history_daily": "%Y-%m-%d",
+}
+
+
+# =========================
+# Schema
+# =========================
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    """Create rollup tables and the watermark table. Caller commits."""
+    for table in ROLLUPS:
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                bucket TEXT NOT NULL,
+                source TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                status TEXT NOT NULL,
+                runs INTEGER NOT NULL DEFAULT 0,
+                items_found INTEGER NOT NULL DEFAULT 0,
+                items_added INTEGER NOT NULL DEFAULT 0,
+                items_updated INTEGER NOT NULL DEFAULT 0,
+                execution_time_sum REAL NOT NULL DEFAULT 0,
+                execution_time_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (bucket, source, kind, key, status)
+            ) WITHOUT ROWID
+        """)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_source ON {table}(source, bucket)")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rollup_watermarks (
+            source TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+
+# =========================
+# Rollup
+# =========================
+
+_SUMMARY_COLUMNS = (
+    "bucket, source, kind, key, status, runs, items_found, items_added, "
+    "items_updated, execution_time_sum, execution_time_count"
+)
+_NO_UPPER = 2 ** 63 - 1
+
+
+def _summary_select(fmt: str, source: str) -> str:
+    """Raw rows with id in (?, ?] summarised like the rollup tables."""
+    spec = SOURCES[source]
+    return f"""
+        SELECT
+            strftime('{fmt}', {spec['time']}), '{source}',
+            COALESCE({spec['kind']}, ''), COALESCE({spec['key']}, ''), COALESCE(status, ''),
+            COUNT(*), SUM(COALESCE(items_found, 0)), SUM(COALESCE(items_added, 0)),
+            SUM(COALESCE({spec['updated']}, 0)), SUM(COALESCE({spec['execution_time']}, 0)),
+            COUNT({spec['execution_time']})
+        FROM {source}
+        WHERE id > ? AND id <= ?
+        GROUP BY 1, 2, 3, 4, 5
+    """
+
+
+def _rollup_sql(table: str, fmt: str, source: str) -> str:
+    return f"""
+        INSERT INTO {table} ({_SUMMARY_COLUMNS})
+        {_summary_select(fmt, source)}
+        ON CONFLICT (bucket, source, kind, key, status) DO UPDATE SET
+            runs = runs + excluded.runs,
+            items_found = items_found + excluded.items_found,
+            items_added = items_added + excluded.items_added,
+            items_updated = items_updated + excluded.items_updated,
+            execution_time_sum = execution_time_sum + excluded.execution_time_sum,
+            execution_time_count = execution_time_count + excluded.execution_time_count
+    """
+
+
+def _watermark(conn: sqlite3.Connection, source: str) -> int:
+    row = conn.execute(
+        "SELECT last_id FROM rollup_watermarks WHERE source = ?", (source,)
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def rollup(conn: sqlite3.Connection, sources: Optional[Iterable[str]] = None) -> int:
+    """
+    Fold raw rows newer than each watermark into the summaries.
+    Commits per batch; returns rows rolled up.
+    """
+    rolled = 0
+    for source in sources or SOURCES:
+        while True:
+            # IMMEDIATE: the watermark read and its advance happen under
+            # the write lock, so concurrent callers never double-count
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                last_id = _watermark(conn, source)
+                upper = conn.execute(
+                    f"SELECT MAX(id) FROM (SELECT id FROM {source} WHERE id > ? ORDER BY id LIMIT ?)",
+                    (last_id, ROLLUP_BATCH)
+                ).fetchone()[0]
+
+                if upper is None:
+                    conn.execute("COMMIT")
+                    break
+
+                for table, fmt in ROLLUPS.items():
+                    conn.execute(_rollup_sql(table, fmt, source), (last_id, upper))
+
+                count = conn.execute(
+                    f"SELECT COUNT(*) FROM {source} WHERE id > ? AND id <= ?", (last_id, upper)
+                ).fetchone()[0]
+                conn.execute(
+                    "INSERT INTO rollup_watermarks (source, last_id) VALUES (?, ?) "
+                    "ON CONFLICT(source) DO UPDATE SET last_id = excluded.last_id",
+                    (source, upper)
+                )
+                conn.execute("COMMIT")
+                rolled += count
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    return rolled
+
+
+# =========================
+# Pruning
+# =========================
+
+def _delete_batches(conn: sqlite3.Connection, select_sql: str, params: tuple,
+                    delete_sql: str) -> int:
+    deleted = 0
+    while True:
+        keys = conn.execute(select_sql, params + (PRUNE_BATCH,)).fetchall()
+        if not keys:
+            return deleted
+        conn.executemany(delete_sql, keys)
+        conn.commit()
+        deleted += len(keys)
+        if len(keys) < PRUNE_BATCH:
+            return deleted
+        time.sleep(PRUNE_PAUSE)
+
+
+def prune(conn: sqlite3.Connection, raw_days: int = RAW_RETENTION_DAYS,
+          hourly_days: int = HOURLY_RETENTION_DAYS,
+          daily_days: int = DAILY_RETENTION_DAYS) -> Dict[str, int]:
+    """
+    Delete raw rows older than raw_days that are already rolled up, and
+    expired summaries. Small batches, one short transaction each.
+    """
+    deleted: Dict[str, int] = {}
+
+    for source, spec in SOURCES.items():
+        deleted[source] = _delete_batches(
+            conn,
+            f"SELECT id FROM {source} WHERE {spec['time']} < datetime('now', ?) "
+            f"AND id <= ? ORDER BY id LIMIT ?",
+            (f"-{raw_days} days", _watermark(conn, source)),
+            f"DELETE FROM {source} WHERE id = ?"
+        )
+
+    for table, days in (("history_hourly", hourly_days), ("history_daily", daily_days)):
+        if days <= 0:
+            continue
+        fmt = ROLLUPS[table]
+        deleted[table] = _delete_batches(
+            conn,
+            f"SELECT bucket, source, kind, key, status FROM {table} "
+            f"WHERE bucket < strftime('{fmt}', 'now', ?) LIMIT ?",
+            (f"-{days} days",),
+            f"DELETE FROM {table} WHERE bucket = ? AND source = ? AND kind = ? AND key = ? AND status = ?"
+        )
+
+    return deleted
+
+
+def compact_events(conn: sqlite3.Connection, days: int = EVENT_RETENTION_DAYS) -> int:
+    """
+    Collapse play_events older than `days` to one row per (title,
+    artist, source, chart week): MAX(plays), MIN(observed_at). A batch
+    of groups per short transaction. Returns the rows removed; days <= 0
+    keeps all.
+    """
+    if days <= 0:
+        return 0
+    cutoff = (f"-{days} days",)
+    conn.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS compact_keys "
+        "(title TEXT, artist TEXT, source TEXT, week TEXT, "
+        "PRIMARY KEY (title, artist, source, week))"
+    )
+    removed = 0
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM temp.compact_keys")
+            groups = conn.execute(
+                "INSERT INTO temp.compact_keys SELECT title, artist, source, {0} "
+                "FROM play_events WHERE observed_at < datetime('now', ?) "
+                "GROUP BY title, artist, source, {0} HAVING COUNT(*) > 1 LIMIT ?".format(
+                    _EVENT_WEEK.format("")),
+                cutoff + (COMPACT_BATCH,)
+            ).rowcount
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM play_events").fetchone()[0]
+            conn.execute(
+                "INSERT INTO play_events (title, artist, source, source_type, region, plays, observed_at) "
+                "SELECT e.title, e.artist, e.source, MAX(e.source_type), MAX(e.region), "
+                "MAX(e.plays), MIN(e.observed_at) "
+                "FROM play_events e JOIN temp.compact_keys k "
+                "ON (k.title, k.artist, k.source, k.week) = (e.title, e.artist, e.source, {}) "
+                "WHERE e.observed_at < datetime('now', ?) "
+                "GROUP BY k.title, k.artist, k.source, k.week".format(_EVENT_WEEK.format("e.")),
+                cutoff
+            )
+            removed += conn.execute(
+                "DELETE FROM play_events WHERE id <= ? AND observed_at < datetime('now', ?) "
+                "AND (title, artist, source, {}) IN "
+                "(SELECT title, artist, source, week FROM temp.compact_keys)".format(
+                    _EVENT_WEEK.format("")),
+                (last_id,) + cutoff
+            ).rowcount - groups
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if groups < COMPACT_BATCH:
+            return removed
+        time.sleep(PRUNE_PAUSE)
+
+
+def vacuum(conn: sqlite3.Connection, pages: int = VACUUM_PAGES) -> int:
+    """
+    Return up to `pages` free pages to the OS. The first call on a
+    database without incremental auto_vacuum switches it over, which
+    needs one full VACUUM. Returns the number of free pages before.
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        logger.info("Enabling incremental auto_vacuum (one-time full VACUUM)")
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+
+    free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    if free_pages:
+        conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+    return free_pages
+
+
+def run(conn: sqlite3.Connection, **windows) -> Dict[str, Any]:
+    """Rollup, prune and vacuum; the periodic retention job."""
+    rolled = rollup(conn)
+    deleted = prune(conn, **windows)
+    free_pages = vacuum(conn)
+    return {"rolled_up": rolled, "deleted": deleted, "free_pages": free_pages}
+
+
+# =========================
+# Reads
+# =========================
+
+def _current(conn: sqlite3.Connection, table: str,
+             sources: Iterable[str]) -> Tuple[str, list]:
+    """
+    (SQL, params) of `table` plus the not yet rolled-up raw rows of
+    `sources`, summarised the same way. Read-only.
+    """
+    parts = [f"SELECT {_SUMMARY_COLUMNS} FROM {table}"]
+    params: list = []
+    for source in sources:
+        parts.append(_summary_select(ROLLUPS[table], source))
+        params += [_watermark(conn, source), _NO_UPPER]
+    return " UNION ALL ".join(parts), params
+
+
+def totals(conn: sqlite3.Connection) -> Dict[str, Dict[str, Any]]:
+    """
+    All-time runs per source from the daily summaries:
+    {"streams_history": {"status": {"success": 10}, "key": {"spotify": 4}}, ...}
+    """
+    result: Dict[str, Dict[str, Any]] = {
+        source: {"runs": 0, "status": {}, "key": {}} for source in SOURCES
+    }
+    daily, params = _current(conn, "history_daily", SOURCES)
+
+    for source, status, runs in conn.execute(
+        f"SELECT source, status, SUM(runs) FROM ({daily}) GROUP BY source, status", params
+    ):
+        if source in result:
+            result[source]["status"][status] = runs
+            result[source]["runs"] += runs
+
+    for source, key, runs in conn.execute(
+        f"SELECT source, key, SUM(runs) FROM ({daily}) GROUP BY source, key", params
+    ):
+        if source in result:
+            result[source]["key"][key] = runs
+
+    return result
+
+
+def window(conn: sqlite3.Connection, source: str, days: int) -> Dict[str, Any]:
+    """Per-key totals for the last `days` days from the hourly summaries."""
+    hourly, params = _current(conn, "history_hourly", [source])
+    params = tuple(params) + (source, f"-{days} days")
+    bucket = f"bucket >= strftime('{ROLLUPS['history_hourly']}', 'now', ?)"
+
+    row = conn.execute(f"""
+        SELECT SUM(runs), SUM(items_found), SUM(items_added), SUM(items_updated),
+               SUM(CASE WHEN status = 'success' THEN runs ELSE 0 END),
+               SUM(CASE WHEN status = 'error' THEN runs ELSE 0 END)
+        FROM ({hourly})
+        WHERE source = ? AND {bucket}
+    """, params).fetchone()
+
+    keys = [
+        {
+            "key": key,
+            "runs": runs,
+            "items_found": found,
+            "items_added": added,
+            "avg_time": (time_sum / time_count) if time_count else None,
+        }
+        for key, runs, found, added, time_sum, time_count in conn.execute(f"""
+            SELECT key, SUM(runs), SUM(items_found), SUM(items_added),
+                   SUM(execution_time_sum), SUM(execution_time_count)
+            FROM ({hourly})
+            WHERE source = ? AND {bucket}
+            GROUP BY key
+            ORDER BY SUM(runs) DESC
+        """, params)
+    ]
+
+    return {
+        "runs": row[0] or 0,
+        "items_found": row[1] or 0,
+        "items_added": row[2] or 0,
+        "items_updated": row[3] or 0,
+        "successful": row[4] or 0,
+        "failed": row[5] or 0,
+        "keys": keys,
+    }
@@ -1,19 +1,20 @@
 """
 UG Board Engine Scoring System - SIMPLIFIED VERSION
-No complex dependencies, just pure functions
+Thin wrappers over the shared scoring engine
 """
 
+from api.scoring.engine import score_item, score_items
+
+VERSION = "signal-v1"
+
+
 def compute_score(item):
     """
     Calculate score for single item.
     Formula: youtube_views*1 + radio_plays*500 + tv_appearances*1000
     """
     try:
-        youtube_views = item.get("youtube_views", 0) or 0
-        radio_plays = item.get("radio_plays", 0) or 0
-        tv_appearances = item.get("tv_appearances", 0) or 0
-        
-        return (youtube_views * 1) + (radio_plays * 500) + (tv_appearances * 1000)
+        return score_item(item, VERSION)
     except Exception:
         return 0
 
@@ -28,16 +29,13 @@ def calculate_scores(items):
     if not items:
         return []
     
-    scored_items = []
-    for item in items:
-        try:
-            item_copy = dict(item)  # Create a copy
-            item_copy["score"] = compute_score(item_copy)
-            scored_items.append(item_copy)
-        except Exception:
-            continue  # Skip problematic items
+    items = [item for item in items if isinstance(item, dict)]
+    scores = score_items(items, VERSION)
     
-    return scored_items
+    return [
+        {**item, "score": score}
+        for item, score in zip(items, scores)
+    ]
 
 # Export for imports
 __all__ = ['compute_score', 'calculate_score', 'calculate_scores']
@@ -0,0 +1,309 @@
+# data/search.py
+"""
+Full-text song and artist search (SQLite FTS5).
+
+songs_fts is an external-content FTS5 index over songs(title, artist).
+Triggers keep it in sync, so it costs no extra writes in the ingest
+code. Queries are type-ahead: every term is a prefix match. If a query
+matches nothing, each unknown term is replaced by its closest indexed
+term (typo tolerance) and the search runs once more.
+
+Matches are ranked by chart score, with a song's sources aggregated the
+same way the live chart aggregates them: the best score of each source
+type, summed. Artists are ranked by the total of their songs. Only the
+newest SEARCH_CANDIDATES matching rows are scored, which keeps very
+broad prefixes (one or two letters) bounded on large catalogs; when a
+query hits that cap the result is flagged as truncated, and older
+matches may be missing from the ranking.
+"""
+
+import re
+import sqlite3
+import unicodedata
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from rapidfuzz import fuzz, process as fuzz_process
+except ImportError:  # optional: difflib fallback
+    fuzz = fuzz_process = None
+
+SEARCH_CANDIDATES = 250
+TYPO_MIN_LENGTH = 3
+TYPO_SCORE = 80.0
+AUTO_BACKFILL_ROWS = 100000   # larger catalogs: scripts/backfill_search.py
+
+_SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS songs_fts USING fts5(
+        title, artist,
+        content='songs', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    "CREATE VIRTUAL TABLE IF NOT EXISTS songs_fts_vocab USING fts5vocab(songs_fts, 'row')",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_songs_fts_insert AFTER INSERT ON songs BEGIN
+        INSERT INTO songs_fts (rowid, title, artist) VALUES (NEW.id, NEW.title, NEW.artist);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_songs_fts_delete AFTER DELETE ON songs BEGIN
+        INSERT INTO songs_fts (songs_fts, rowid, title, artist)
+        VALUES ('delete', OLD.id, OLD.title, OLD.artist);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_songs_fts_update AFTER UPDATE OF title, artist ON songs BEGIN
+        INSERT INTO songs_fts (songs_fts, rowid, title, artist)
+        VALUES ('delete', OLD.id, OLD.title, OLD.artist);
+        INSERT INTO songs_fts (rowid, title, artist) VALUES (NEW.id, NEW.title, NEW.artist);
+    END
+    """,
+)
+
+# unicode61 splits on "_" as well as punctuation
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+# =========================
+# Schema
+# =========================
+
+def ensure_schema(conn: sqlite3.Connection) -> bool:
+    """
+    Create the index and its sync triggers. A new index over a small
+    songs table is filled immediately. Returns True when an existing
+    catalog still needs backfill(). Caller commits.
+    """
+    created = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'songs_fts'"
+    ).fetchone() is None
+
+    create_schema(conn)
+
+    if not created:
+        return False
+
+    rows = conn.execute("SELECT COUNT(*) FROM songs").fetchone()[0]
+    if rows <= AUTO_BACKFILL_ROWS:
+        backfill(conn)
+        return False
+    return True
+
+
+def create_schema(conn: sqlite3.Connection) -> None:
+    """Index and triggers only (no backfill). Caller commits."""
+    for statement in _SCHEMA:
+        conn.execute(statement)
+
+
+def backfill(conn: sqlite3.Connection) -> int:
+    """Rebuild the whole index from songs. Caller commits."""
+    conn.execute("INSERT INTO songs_fts (songs_fts) VALUES ('rebuild')")
+    return conn.execute("SELECT COUNT(*) FROM songs").fetchone()[0]
+
+
+# =========================
+# Query building
+# =========================
+
+def tokenize(query: Optional[str]) -> List[str]:
+    """Fold a query the way unicode61/remove_diacritics indexes text."""
+    if not query:
+        return []
+    text = "".join(
+        c for c in unicodedata.normalize("NFKD", query)
+        if not unicodedata.combining(c)
+    )
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def match_expression(tokens: List[str]) -> str:
+    """Every token must match as a prefix ("eddy" "ken" -> "eddy"* "ken"*)."""
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def week_bounds(week: str) -> Tuple[str, str]:
+    """
+    ISO chart week ("2026-W41", as in the archive) -> [start, end)
+    timestamps. Raises ValueError for malformed or out-of-range weeks.
+    """
+    year, _, number = week.partition("-W")
+    start = datetime.combine(date.fromisocalendar(int(year), int(number), 1), datetime.min.time())
+    end = start + timedelta(days=7)
+    return start.strftime("%Y-%m-%d %H:%M:%S"), end.strftime("%Y-%m-%d %H:%M:%S")
+
+
+# =========================
+# Typo tolerance
+# =========================
+
+def _has_prefix(conn: sqlite3.Connection, token: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM songs_fts_vocab WHERE term >= ? AND term < ? LIMIT 1",
+        (token, token + "\uffff")
+    ).fetchone() is not None
+
+
+def _closest_term(conn: sqlite3.Connection, token: str) -> Optional[str]:
+    """
+    Nearest indexed term. Terms sharing the first two letters are tried
+    first (small range), then those sharing the first letter.
+    """
+    for prefix in (token[:2], token[:1]):
+        terms = [
+            row[0] for row in conn.execute(
+                "SELECT term FROM songs_fts_vocab WHERE term >= ? AND term < ?",
+                (prefix, prefix + "\uffff")
+            )
+        ]
+        if not terms:
+            continue
+
+        if fuzz_process is not None:
+            best = fuzz_process.extractOne(
+                token, terms, scorer=fuzz.ratio, score_cutoff=TYPO_SCORE
+            )
+            if best:
+                return best[0]
+            continue
+
+        from difflib import get_close_matches
+        matches = get_close_matches(token, terms, n=1, cutoff=TYPO_SCORE / 100)
+        if matches:
+            return matches[0]
+
+    return None
+
+
+def correct(conn: sqlite3.Connection, tokens: List[str]) -> Optional[List[str]]:
+    """Tokens with unknown words replaced, or None if nothing changed."""
+    corrected, changed = [], False
+    for token in tokens:
+        if len(token) >= TYPO_MIN_LENGTH and not _has_prefix(conn, token):
+            replacement = _closest_term(conn, token)
+            if replacement:
+                corrected.append(replacement)
+                changed = True
+                continue
+        corrected.append(token)
+    return corrected if changed else None
+
+
+# =========================
+# Search
+# =========================
+
+def _candidates(conn: sqlite3.Connection, tokens: List[str], filters: Dict[str, Any],
+                score_sql: str) -> List[sqlite3.Row]:
+    where, params = ["songs_fts MATCH ?"], [match_expression(tokens)]
+    join = ""
+    for column in ("region", "source_type"):
+        if filters.get(column):
+            where.append(f"s.{column} = ?")
+            params.append(filters[column])
+    if filters.get("week"):
+        start, end = week_bounds(filters["week"])
+        where.append("s.ingested_at >= ? AND s.ingested_at < ?")
+        params.extend([start, end])
+    if len(where) > 1:
+        join = "JOIN songs s ON s.id = songs_fts.rowid"
+    params.append(SEARCH_CANDIDATES)
+
+    return conn.execute(f"""
+        SELECT id, title, artist, region, source_type, canonical_song_id,
+               {score_sql} AS source_score
+        FROM songs
+        WHERE id IN (
+            SELECT songs_fts.rowid
+            FROM songs_fts {join}
+            WHERE {' AND '.join(where)}
+            ORDER BY songs_fts.rowid DESC
+            LIMIT ?
+        )
+    """, params).fetchall()
+
+
+def _aggregate(rows, tokens: List[str], limit: int) -> Dict[str, list]:
+    songs: Dict[int, Dict[str, Any]] = {}
+    artists: Dict[str, Dict[str, Any]] = {}
+    artist_matches: Dict[str, bool] = {}
+
+    for row in rows:
+        id_, title, artist, region, source_type, canonical_id, score = row
+        score = score or 0.0
+
+        key = canonical_id if canonical_id is not None else -id_
+        song = songs.get(key)
+        if song is None:
+            song = songs[key] = {
+                "id": id_, "title": title, "artist": artist, "region": region,
+                "source_types": {}, "best": -1.0,
+            }
+        # Each source type counts once, with its best row (as the chart does)
+        if score > song["source_types"].get(source_type, -1.0):
+            song["source_types"][source_type] = score
+        if score > song["best"]:
+            song.update(id=id_, title=title, artist=artist, region=region, best=score)
+
+        # Artist suggestions: every query term prefixes a word of the name
+        matched = artist_matches.get(artist)
+        if matched is None:
+            words = tokenize(artist)
+            matched = artist_matches[artist] = all(
+                any(w.startswith(t) for w in words) for t in tokens
+            )
+        if matched:
+            entry = artists.setdefault(artist.casefold(), {
+                "artist": artist, "songs": set(),
+            })
+            entry["songs"].add(key)
+
+    for song in songs.values():
+        song["chart_score"] = sum(song["source_types"].values())
+
+    ranked = sorted(songs.values(), key=lambda s: (-s["chart_score"], s["id"]))[:limit]
+    for song in ranked:
+        del song["best"]
+        song["source_types"] = sorted(song["source_types"])
+        song["chart_score"] = round(song["chart_score"], 2)
+
+    for entry in artists.values():
+        entry["chart_score"] = sum(songs[key]["chart_score"] for key in entry["songs"])
+    top_artists = sorted(artists.values(), key=lambda a: -a["chart_score"])[:5]
+    for entry in top_artists:
+        entry["songs"] = len(entry["songs"])
+        entry["chart_score"] = round(entry["chart_score"], 2)
+
+    return {"songs": ranked, "artists": top_artists}
+
+
+def search(conn: sqlite3.Connection, query: str, limit: int = 10,
+           region: Optional[str] = None, source_type: Optional[str] = None,
+           week: Optional[str] = None, score_sql: str = "score") -> Dict[str, Any]:
+    """
+    Songs (one per canonical song) and artists matching `query`, ranked by
+    chart score. `score_sql` is the per-row score expression over songs.
+    "truncated" is True when only the newest SEARCH_CANDIDATES matches
+    were ranked.
+    """
+    tokens = tokenize(query)
+    result = {"songs": [], "artists": [], "corrected": None, "truncated": False}
+    if not tokens:
+        return result
+
+    filters = {"region": region, "source_type": source_type, "week": week}
+    rows = _candidates(conn, tokens, filters, score_sql)
+
+    if not rows:
+        fixed = correct(conn, tokens)
+        if fixed:
+            tokens = fixed
+            rows = _candidates(conn, tokens, filters, score_sql)
+            result["corrected"] = " ".join(tokens)
+
+    result["truncated"] = len(rows) >= SEARCH_CANDIDATES
+    result.update(_aggregate(rows, tokens, limit))
+    return result
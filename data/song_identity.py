@@ -0,0 +1,394 @@
+# data/song_identity.py
+"""
+Canonical song identity.
+
+One track reported by TV, radio, YouTube and several streaming
+platforms should chart once. Every scraper cleans titles/artists with
+the helpers below, and each songs row is linked to a canonical_songs
+row through songs.canonical_song_id.
+
+Resolution: exact normalized key (dict hit), then fuzzy match against a
+small candidate block (songs sharing an artist token, or a title token
+when the artist is unknown). A 500k catalog resolves in well under a
+millisecond because only the block is scored.
+"""
+
+import re
+import sqlite3
+import threading
+import unicodedata
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    from rapidfuzz import fuzz
+except ImportError:  # optional: difflib fallback
+    fuzz = None
+
+try:
+    from unidecode import unidecode
+except ImportError:  # optional: NFKD accent stripping only
+    unidecode = None
+
+# Combined title/artist similarity (0-100) needed to merge two songs
+MATCH_THRESHOLD = 90.0
+TITLE_WEIGHT = 0.65
+ARTIST_WEIGHT = 0.35
+
+# Tokens shared by more songs than this are useless for blocking
+MAX_BLOCK = 5000
+
+UNKNOWN_ARTISTS = {"", "unknown", "unknown artist", "various", "various artists"}
+
+# Titles differing in these never merge ("Song 2", "Song (Remix)")
+VARIANT_WORDS = {
+    "remix", "acoustic", "live", "instrumental", "version", "edit",
+    "cover", "reprise", "mix", "unplugged", "extended",
+}
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS canonical_songs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        song_key TEXT NOT NULL UNIQUE,
+        title TEXT NOT NULL,
+        artist TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+)
+
+
+# =========================
+# Normalization
+# =========================
+
+_DECORATION_WORDS = (
+    r"official(?: music)?(?: video| audio| lyric video| visuali[sz]er)?|"
+    r"music video|lyrics?(?: video)?|visuali[sz]er|audio|video|hd|hq|4k|live"
+)
+_BRACKETED_DECORATION_RE = re.compile(
+    r"[\(\[\{]\s*(?:" + _DECORATION_WORDS + r")\s*[\)\]\}]", re.IGNORECASE
+)
+_TRAILING_DECORATION_RE = re.compile(
+    r"\s*[-|]\s*official(?: music)? (?:video|audio)\s*$", re.IGNORECASE
+)
+_EMPTY_BRACKETS_RE = re.compile(r"[\(\[\{]\s*[\)\]\}]")
+_FEATURING_RE = re.compile(
+    r"\s*[\(\[]?\s*\b(?:feat|ft|featuring|ftg)\b\.?.*$", re.IGNORECASE
+)
+_ARTIST_SPLIT_RE = re.compile(
+    r"\s*(?:\b(?:feat|ft|featuring|ftg)\b\.?|\bx\b|&|,|/|\+|\bvs\.?)\s*",
+    re.IGNORECASE,
+)
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def strip_decorations(text: Optional[str]) -> str:
+    """
+    Remove upload artifacts ("(Official Video)", "[HD]", "- Official
+    Audio") and tidy whitespace. Keeps case and meaningful brackets
+    such as "(Remix)".
+    """
+    if not text:
+        return ""
+    text = _BRACKETED_DECORATION_RE.sub("", text)
+    text = _TRAILING_DECORATION_RE.sub("", text)
+    text = _EMPTY_BRACKETS_RE.sub("", text)
+    return _SPACE_RE.sub(" ", text).strip(" -~:|")
+
+
+def strip_featuring(title: Optional[str]) -> str:
+    """Drop a trailing featured-artist credit from a title."""
+    if not title:
+        return ""
+    return _FEATURING_RE.sub("", title).strip()
+
+
+def split_artists(artist: Optional[str]) -> List[str]:
+    """Primary artist first, then featured/collaborating artists."""
+    if not artist:
+        return []
+    return [part for part in _ARTIST_SPLIT_RE.split(artist) if part.strip()]
+
+
+def fold(text: Optional[str]) -> str:
+    """
+    Comparison form: transliterated to ASCII, casefolded, punctuation
+    removed, whitespace collapsed.
+    """
+    if not text:
+        return ""
+    if unidecode is not None:
+        text = unidecode(text)
+    else:
+        text = "".join(
+            c for c in unicodedata.normalize("NFKD", text)
+            if not unicodedata.combining(c)
+        )
+    text = text.casefold().replace("&", " and ")
+    text = _PUNCT_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def normalize_title(title: Optional[str]) -> str:
+    return fold(strip_featuring(strip_decorations(title)))
+
+
+def normalize_artist(artist: Optional[str]) -> str:
+    artists = split_artists(strip_decorations(artist))
+    return fold(artists[0]) if artists else ""
+
+
+def canonical_key(title: Optional[str], artist: Optional[str]) -> str:
+    """Exact-match identity key: "primary artist|title"."""
+    return f"{normalize_artist(artist)}|{normalize_title(title)}"
+
+
+# =========================
+# Similarity
+# =========================
+
+def _ratio(a: str, b: str) -> float:
+    if fuzz is not None:
+        return fuzz.ratio(a, b)
+    from difflib import SequenceMatcher
+    return SequenceMatcher(None, a, b).ratio() * 100
+
+
+def _variant(title: str) -> frozenset:
+    return frozenset(t for t in title.split() if t.isdigit() or t in VARIANT_WORDS)
+
+
+def similarity(title_a: str, artist_a: str, title_b: str, artist_b: str) -> float:
+    """
+    Weighted 0-100 similarity of two normalized (title, artist) pairs.
+    An unknown artist on either side scores on the title alone;
+    different versions (numbers, remix, live...) score 0.
+    """
+    if _variant(title_a) != _variant(title_b):
+        return 0.0
+    title_score = _ratio(title_a, title_b)
+    if artist_a in UNKNOWN_ARTISTS or artist_b in UNKNOWN_ARTISTS:
+        return title_score
+    return TITLE_WEIGHT * title_score + ARTIST_WEIGHT * _ratio(artist_a, artist_b)
+
+
+# =========================
+# Blocking index
+# =========================
+
+def _tokens(text: str) -> Set[str]:
+    return {t for t in text.split() if len(t) >= 3}
+
+
+class CanonicalIndex:
+    """
+    In-memory resolver over normalized (title, artist) pairs.
+    Thread-safe; ids are supplied by the caller (database row ids).
+    """
+
+    def __init__(self, threshold: float = MATCH_THRESHOLD):
+        self.threshold = threshold
+        self._lock = threading.RLock()
+        self._by_key: Dict[str, int] = {}
+        self._songs: Dict[int, Tuple[str, str]] = {}
+        self._artist_blocks: Dict[str, List[int]] = {}
+        self._title_blocks: Dict[str, List[int]] = {}
+        self.last_id = 0  # highest canonical id indexed (for refresh)
+
+    def __len__(self) -> int:
+        return len(self._songs)
+
+    def add(self, song_id: int, title: str, artist: str) -> None:
+        """Index a canonical song (normalized title/artist)."""
+        with self._lock:
+            if song_id in self._songs:
+                return
+            self._by_key[f"{artist}|{title}"] = song_id
+            self._songs[song_id] = (title, artist)
+            self.last_id = max(self.last_id, song_id)
+            for token in _tokens(artist):
+                self._artist_blocks.setdefault(token, []).append(song_id)
+            for token in _tokens(title):
+                self._title_blocks.setdefault(token, []).append(song_id)
+
+    def _candidates(self, title: str, artist: str) -> Set[int]:
+        blocks = [
+            self._artist_blocks.get(t, ())
+            for t in (() if artist in UNKNOWN_ARTISTS else _tokens(artist))
+        ]
+        if not any(blocks):
+            blocks = [self._title_blocks.get(t, ()) for t in _tokens(title)]
+
+        usable = [b for b in blocks if 0 < len(b) <= MAX_BLOCK]
+        if not usable:
+            # Only very common tokens: fall back to the smallest block
+            usable = sorted((b for b in blocks if b), key=len)[:1]
+
+        candidates = set()
+        for block in usable:
+            candidates.update(block)
+        return candidates
+
+    def lookup(self, title: str, artist: str) -> Optional[int]:
+        """Best matching canonical id for a normalized pair, or None."""
+        with self._lock:
+            song_id = self._by_key.get(f"{artist}|{title}")
+            if song_id is not None:
+                return song_id
+
+            variant = _variant(title)
+            known_artist = artist not in UNKNOWN_ARTISTS
+
+            best_id, best_score = None, self.threshold
+            for candidate in self._candidates(title, artist):
+                c_title, c_artist = self._songs[candidate]
+                if _variant(c_title) != variant:
+                    continue
+
+                score = _ratio(title, c_title)
+                if known_artist and c_artist not in UNKNOWN_ARTISTS:
+                    # Skip the artist comparison when even a perfect one
+                    # could not reach the current best
+                    if TITLE_WEIGHT * score + ARTIST_WEIGHT * 100 < best_score:
+                        continue
+                    score = TITLE_WEIGHT * score + ARTIST_WEIGHT * _ratio(artist, c_artist)
+
+                if score >= best_score:
+                    best_id, best_score = candidate, score
+            return best_id
+
+    def lookup_or_add(self, title: str, artist: str, create: Callable[[], int]) -> int:
+        """
+        Matching canonical id, or the id returned by create() (then
+        indexed). Atomic, so concurrent callers never create twins.
+        """
+        with self._lock:
+            song_id = self.lookup(title, artist)
+            if song_id is None:
+                song_id = create()
+                self.add(song_id, title, artist)
+            return song_id
+
+
+# =========================
+# Persistence (songs database)
+# =========================
+
+_indexes: Dict[str, CanonicalIndex] = {}
+_stale: Set[str] = set()   # indexes that may miss rows added by other processes
+_indexes_lock = threading.Lock()
+
+
+def _db_file(conn: sqlite3.Connection) -> str:
+    for _, name, path in conn.execute("PRAGMA database_list"):
+        if name == "main":
+            return path or ":memory:"
+    return ":memory:"
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    """
+    Create canonical_songs and add songs.canonical_song_id if missing.
+    Caller commits.
+    """
+    for statement in _SCHEMA:
+        conn.execute(statement)
+
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(songs)")}
+    if columns and "canonical_song_id" not in columns:
+        conn.execute("ALTER TABLE songs ADD COLUMN canonical_song_id INTEGER")
+    if columns:
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_songs_canonical ON songs(canonical_song_id)"
+        )
+
+
+def get_index(conn: sqlite3.Connection) -> CanonicalIndex:
+    """
+    Index for this database, loaded from canonical_songs on first use;
+    after mark_stale() only rows added since are read.
+    """
+    path = _db_file(conn)
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = CanonicalIndex()
+        elif path not in _stale:
+            return index
+        _stale.discard(path)
+
+        rows = conn.execute(
+            "SELECT id, song_key FROM canonical_songs WHERE id > ?", (index.last_id,)
+        )
+        for song_id, key in rows:
+            artist, _, title = key.partition("|")
+            index.add(song_id, title, artist)
+        return index
+
+
+def mark_stale() -> None:
+    """
+    Another process may have added canonical songs: indexes pick up
+    the new rows on next use. Cheap; safe to call from any thread.
+    """
+    with _indexes_lock:
+        _stale.update(_indexes)
+
+
+def reset_index(conn: Optional[sqlite3.Connection] = None) -> None:
+    """
+    Drop cached indexes (all, or one database's) so they reload.
+    Call after rolling back a transaction that assigned ids.
+    """
+    with _indexes_lock:
+        if conn is None:
+            _indexes.clear()
+            _stale.clear()
+        else:
+            _indexes.pop(_db_file(conn), None)
+            _stale.discard(_db_file(conn))
+
+
+def assign(conn: sqlite3.Connection, title: str, artist: str) -> int:
+    """
+    canonical_song_id for a raw (title, artist), creating the canonical
+    row when nothing similar exists. Runs inside the caller's
+    transaction; the caller commits.
+    """
+    n_title, n_artist = normalize_title(title), normalize_artist(artist)
+
+    def create() -> int:
+        key = f"{n_artist}|{n_title}"
+        conn.execute(
+            "INSERT OR IGNORE INTO canonical_songs (song_key, title, artist) VALUES (?, ?, ?)",
+            (key, strip_featuring(strip_decorations(title)) or title,
+             (split_artists(strip_decorations(artist)) or [artist])[0]),
+        )
+        return conn.execute(
+            "SELECT id FROM canonical_songs WHERE song_key = ?", (key,)
+        ).fetchone()[0]
+
+    return get_index(conn).lookup_or_add(n_title, n_artist, create)
+
+
+def backfill(conn: sqlite3.Connection, batch_size: int = 1000) -> int:
+    """
+    Assign canonical ids to songs rows that have none.
+    Returns the number of rows updated. Caller commits.
+    """
+    rows = conn.execute(
+        "SELECT id, title, artist FROM songs WHERE canonical_song_id IS NULL"
+    ).fetchall()
+
+    updates = []
+    for song_id, title, artist in rows:
+        updates.append((assign(conn, title, artist), song_id))
+        if len(updates) >= batch_size:
+            conn.executemany("UPDATE songs SET canonical_song_id = ? WHERE id = ?", updates)
+            updates = []
+    if updates:
+        conn.executemany("UPDATE songs SET canonical_song_id = ? WHERE id = ?", updates)
+
+    return len(rows)
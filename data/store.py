@@ -10,6 +10,8 @@ logger = logging.getLogger(__name__)
 DATA_DIR = Path(__file__).parent
 ITEMS_FILE = DATA_DIR / "items.json"
 
+_generation = 0  # bumped by save_items(); part of items_version()
+
 def load_items() -> List[Dict[str, Any]]:
     """Load all items from JSON file"""
     try:
@@ -38,8 +40,10 @@ def save_items(items: List[Dict[str, Any]]) -> bool:
         DATA_DIR.mkdir(exist_ok=True)
         
         # Save items
+        global _generation
         with open(ITEMS_FILE, 'w', encoding='utf-8') as f:
             json.dump(items, f, indent=2, default=str)
+        _generation += 1
         
         logger.info(f"Saved {len(items)} items to {ITEMS_FILE}")
         return True
@@ -47,6 +51,18 @@ def save_items(items: List[Dict[str, Any]]) -> bool:
         logger.error(f"Error saving items: {e}")
         return False
 
+def items_version():
+    """
+    Cheap change token for the items file: (mtime_ns, size, writes).
+    The in-process write count catches rewrites inside one mtime tick.
+    None if the file does not exist. Take it before load_items().
+    """
+    try:
+        stat = ITEMS_FILE.stat()
+        return (stat.st_mtime_ns, stat.st_size, _generation)
+    except OSError:
+        return None
+
 def upsert_item(new_item: Dict[str, Any]) -> bool:
     """Insert or update an item in the store"""
     try:
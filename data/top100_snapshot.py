@@ -1,9 +1,14 @@
 import json
+import logging
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from data.store import load_items
 from data.chart_week import current_chart_week
+from data import chart_archive, chart_bundles
+from api import metrics
+
+logger = logging.getLogger(__name__)
 
 TOP100_DIR = Path("data/top100_snapshots")
 
@@ -27,14 +32,44 @@ def save_top100_snapshot() -> Dict:
     }
 
     path.write_text(json.dumps(payload, indent=2))
+
+    # Indexed history (last week / peak / weeks on chart)
+    try:
+        chart_archive.archive_chart(week_id, "top100", snapshot)
+    except Exception:
+        logger.exception(f"Archiving Top 100 for {week_id} failed")
+
+    # Pre-serialized, pre-compressed bundle served as a static file
+    try:
+        chart_bundles.publish("top100", week_id, payload)
+    except Exception:
+        logger.exception(f"Publishing the Top 100 bundle for {week_id} failed")
+        metrics.observe_bundle_publish_failure("top100")
+
     return payload
 
 
 def load_top100_snapshot():
+    """Current week's snapshot (parsed once; treat as read-only) or None."""
     week_id = current_chart_week()["week_id"]
     path = TOP100_DIR / f"{week_id}.json"
 
     if not path.exists():
         return None
 
-    return json.loads(path.read_text())
\ No newline at end of file
+    return chart_bundles.read_json(path)
+
+
+def top100_bundle(week_id: str) -> Optional[str]:
+    """
+    Bundle digest of a week's snapshot, bundling snapshots saved before
+    bundles existed on first request. None if the week has none.
+    """
+    digest = chart_bundles.resolve("top100", week_id)
+    if digest:
+        return digest
+
+    path = TOP100_DIR / f"{week_id}.json"
+    if not path.exists():
+        return None
+    return chart_bundles.publish("top100", week_id, chart_bundles.read_json(path))
\ No newline at end of file
@@ -10,9 +10,13 @@ import json
 import time
 import asyncio
 import logging
+import base64
 import hashlib
 import sqlite3
 import threading
+import socket
+import uuid
+import zlib
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any, Union, Tuple
@@ -26,17 +30,27 @@ current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
 # Third-party imports
-from fastapi import FastAPI, HTTPException, Header, Depends, Query, Path as FPath, Request, status, BackgroundTasks
+from fastapi import FastAPI, APIRouter, HTTPException, Header, Depends, Query, Path as FPath, Request, status, BackgroundTasks, WebSocket
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, Field, field_validator, ConfigDict
-import uvicorn
-import requests
+from pydantic import BaseModel, Field, field_validator, ConfigDict, TypeAdapter, ValidationError
 import re
 
+# Local imports
+from data import artist_registry, chart_archive, chart_bundles, counters, exports, leader, retention, search, song_identity
+from data import region_snapshots, top100_snapshot
+from api.scoring import engine as scoring_engine
+from api import coherence, concurrency, metrics
+from api.telemetry import TelemetrySink
+from api.responses import FastJSONResponse, ResponseCache, StreamingGZipMiddleware, dumps
+from api.singleflight import SingleFlight, SingleFlightTimeout
+from api.charts.live_feed import ChartBroadcaster
+from api.ingestion.ingest_queue import IngestQueue, QueueFull, TransientError
+from api.ingestion import idempotency, ndjson
+from api.utils import metadata_parser
+
 # ====== BUILT-IN SECRETS & CONFIGURATION ======
 class Config:
     """Centralized configuration with built-in secrets and production settings"""
@@ -67,34 +81,29 @@ class Config:
     CACHE_DIR = BASE_DIR / "cache"
     DATABASE_PATH = DATA_DIR / "ugboard.db"
     
-    # Ugandan Regions with stations
+    # Ugandan Regions with stations (artists live in data/artists.json)
     UGANDAN_REGIONS = {
         "central": {
             "name": "Central Region",
             "districts": ["Kampala", "Mukono", "Wakiso", "Masaka", "Luwero"],
-            "musicians": ["Bobi Wine", "Eddy Kenzo", "Sheebah", "Daddy Andre", "Alien Skin", 
-                         "Azawi", "Vinka", "Fik Fameica", "John Blaq", "Bebe Cool"],
             "tv_stations": ["NTV Uganda", "Bukedde TV", "Salt TV", "Spark TV", "Urban TV"],
             "radio_stations": ["CBS FM", "Capital FM", "Radio One", "Sanyu FM", "KFM"]
         },
         "eastern": {
             "name": "Eastern Region",
             "districts": ["Jinja", "Mbale", "Soroti", "Iganga", "Tororo"],
-            "musicians": ["Geosteady", "Victor Ruz", "Temperature Touch", "Rexy", "Judith Babirye"],
             "tv_stations": ["Baba TV", "Delta TV", "ETV Uganda", "Jinja TV"],
             "radio_stations": ["Kiira FM", "Radio Wa", "Voice of Teso", "Speke FM"]
         },
         "western": {
             "name": "Western Region",
             "districts": ["Mbarara", "Fort Portal", "Hoima", "Kabale", "Kasese"],
-            "musicians": ["Rema Namakula", "Mickie Wine", "Ray G", "Truth 256", "Levixone"],
             "tv_stations": ["Voice of Toro", "Top TV", "TV West", "KKTV"],
             "radio_stations": ["Radio West", "Kasese Guide Radio", "Voice of Kigezi", "Radio Rukungiri"]
         },
         "northern": {
             "name": "Northern Region",
             "districts": ["Gulu", "Lira", "Arua", "Kitgum"],
-            "musicians": ["Fik Fameica", "Bosmic Otim", "Eezzy", "Laxzy Mover", "John Blaq"],
             "tv_stations": ["TV North", "Mega FM TV", "Arua One TV", "Gulu TV"],
             "radio_stations": ["Mega FM", "Radio Pacis", "Radio Wa", "Radio Rhino"]
         }
@@ -103,7 +112,7 @@ class Config:
     VALID_REGIONS = set(UGANDAN_REGIONS.keys())
     
     # Chart settings
-    CHART_WEEK_FORMAT = "%Y-W%W"
+    CHART_WEEK_FORMAT = "%G-W%V"  # ISO 8601 week, as archived and published
     TRENDING_WINDOW_HOURS = 8
     
     # Scraper settings
@@ -123,6 +132,49 @@ class Config:
     STREAMS_SCHEDULE_INTERVAL = 6  # hours
     STREAMS_PLATFORMS = ["songboost", "spotify", "boomplay", "audiomack"]
     
+    # History retention: raw scraper/scheduler rows are rolled up into
+    # hourly and daily summaries, then pruned after this many days
+    HISTORY_RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS", "14"))
+    RETENTION_INTERVAL_MINUTES = int(os.getenv("RETENTION_INTERVAL_MINUTES", "60"))
+    RETENTION_INITIAL_DELAY = int(os.getenv("RETENTION_INITIAL_DELAY", "300"))  # seconds
+    
+    # Multi-worker: one worker holds the scheduler lease and runs scheduled jobs
+    LEADER_ELECTION_ENABLED = os.getenv("LEADER_ELECTION_ENABLED", "true").lower() == "true"
+    LEADER_LEASE_SECONDS = float(os.getenv("LEADER_LEASE_SECONDS", "30"))
+    LEADER_JOB_WAIT_SECONDS = float(os.getenv("LEADER_JOB_WAIT_SECONDS", "300"))  # forwarded background=false triggers
+
+    # First scheduled runs wait until the app is serving, staggered so
+    # YouTube pulls and the Playwright streams scrape never start together
+    YOUTUBE_INITIAL_DELAY = int(os.getenv("YOUTUBE_INITIAL_DELAY", "30"))  # seconds
+    STREAMS_INITIAL_DELAY = int(os.getenv("STREAMS_INITIAL_DELAY", "120"))  # seconds
+    LIVE_FEED_POLL_SECONDS = float(os.getenv("LIVE_FEED_POLL_SECONDS", "1.0"))
+    DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "32"))  # readiness fails at this many open
+    INGEST_QUEUE_ENABLED = os.getenv("INGEST_QUEUE_ENABLED", "true").lower() == "true"  # 202 + background apply
+    INGEST_QUEUE_DIR = Path(os.getenv("INGEST_QUEUE_DIR", "data/ingest_queue"))
+    INGEST_BATCH_RETENTION_DAYS = int(os.getenv("INGEST_BATCH_RETENTION_DAYS", "7"))
+    PLAY_EVENT_RETENTION_DAYS = int(os.getenv("PLAY_EVENT_RETENTION_DAYS", "56"))  # older play_events compacted (0 = keep)
+    INGEST_STREAM_CHUNK = int(os.getenv("INGEST_STREAM_CHUNK", "2000"))  # songs per /ingest/stream commit
+    INGEST_STREAM_MAX_MB = int(os.getenv("INGEST_STREAM_MAX_MB", "512"))  # decompressed /ingest/stream body cap
+    IDEMPOTENCY_TTL_HOURS = float(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))  # Idempotency-Key replay window
+    CACHE_COHERENCE_MS = float(os.getenv("CACHE_COHERENCE_MS", "5"))  # PRAGMA data_version check interval
+    COALESCE_WAIT_SECONDS = float(os.getenv("COALESCE_WAIT_SECONDS", "10"))  # max wait on an identical in-flight chart query
+    EXPORT_BUILD_WAIT_SECONDS = float(os.getenv("EXPORT_BUILD_WAIT_SECONDS", "120"))  # Range before spooled: then 503
+    TELEMETRY_FLUSH_MS = float(os.getenv("TELEMETRY_FLUSH_MS", "500"))  # history rows are written in batches this often
+    TELEMETRY_FLUSH_ROWS = int(os.getenv("TELEMETRY_FLUSH_ROWS", "500"))  # ...or once this many are buffered
+    TELEMETRY_BUFFER_ROWS = int(os.getenv("TELEMETRY_BUFFER_ROWS", "10000"))  # oldest rows dropped past this
+
+    # Concurrent requests per route class and how long a request may queue
+    # for a slot before it is shed with 503 + Retry-After
+    CONCURRENCY_LIMITS_ENABLED = os.getenv("CONCURRENCY_LIMITS_ENABLED", "true").lower() == "true"
+    PUBLIC_CONCURRENCY = int(os.getenv("PUBLIC_CONCURRENCY", "64"))
+    PUBLIC_QUEUE_MS = float(os.getenv("PUBLIC_QUEUE_MS", "250"))
+    INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", "8"))
+    INGEST_QUEUE_MS = float(os.getenv("INGEST_QUEUE_MS", "2000"))
+    HEAVY_CONCURRENCY = int(os.getenv("HEAVY_CONCURRENCY", "4"))  # exports, search
+    HEAVY_QUEUE_MS = float(os.getenv("HEAVY_QUEUE_MS", "3000"))
+    ADMIN_CONCURRENCY = int(os.getenv("ADMIN_CONCURRENCY", "2"))  # scrapes, scoring, admin
+    ADMIN_QUEUE_MS = float(os.getenv("ADMIN_QUEUE_MS", "5000"))
+
     # Unified scoring weights
     SCORING_WEIGHTS = {
         "plays": 0.4,
@@ -176,9 +228,21 @@ class Config:
         
         return cls
 
-config = Config.validate()
+# Validated (and directories created) at startup, not on import
+config = Config
 
 # ====== ENHANCED LOGGING ======
+class LazyFileHandler(logging.FileHandler):
+    """File handler that opens (and creates its directory) on first record"""
+
+    def __init__(self, filename):
+        super().__init__(filename, delay=True)
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
 def setup_logger(name: str, log_file: Optional[str] = None, level=logging.INFO):
     """Setup enhanced logger"""
     logger = logging.getLogger(name)
@@ -198,7 +262,7 @@ def setup_logger(name: str, log_file: Optional[str] = None, level=logging.INFO):
     
     # File handler
     if log_file:
-        file_handler = logging.FileHandler(config.LOGS_DIR / log_file)
+        file_handler = LazyFileHandler(config.LOGS_DIR / log_file)
         file_format = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(lineno)d - %(message)s'
         )
@@ -213,13 +277,112 @@ scraper_logger = setup_logger("scrapers", "scrapers/scrapers.log")
 youtube_logger = setup_logger("youtube", "youtube/scheduler.log")
 streams_logger = setup_logger("streams", "streams/scraper.log")  # NEW: Streams logger
 
+# ====== LAZY COMPONENTS ======
+class LazyComponent:
+    """
+    Module-level stand-in that builds its component on first use.
+    Keeps `import main` free of database, thread and scraper setup;
+    lifespan warms every component before the app takes traffic.
+    """
+
+    __slots__ = ("_factory", "_name", "_instance", "_lock")
+
+    def __init__(self, name: str, factory):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _get(self):
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    instance = self._factory()
+                    object.__setattr__(self, "_instance", instance)
+        return instance
+
+    def __getattr__(self, item):
+        return getattr(self._get(), item)
+
+    def __setattr__(self, item, value):
+        setattr(self._get(), item, value)
+
+    def __repr__(self):
+        state = "ready" if self._instance is not None else "deferred"
+        return f"<LazyComponent {self._name} ({state})>"
+
+def is_initialized(component) -> bool:
+    """True once a lazy component has been constructed"""
+    if isinstance(component, LazyComponent):
+        return object.__getattribute__(component, "_instance") is not None
+    return True
+
+def warm_up(*components):
+    """Construct lazy components now (startup, before readiness)"""
+    for component in components:
+        if isinstance(component, LazyComponent):
+            component._get()
+
+def sleep_while_running(stop: threading.Event, seconds: float) -> bool:
+    """Interruptible sleep for scheduler loops; False if stopped meanwhile"""
+    return not stop.wait(max(0, seconds))
+
+def new_loop_event(owner, timeout: float = 30.0) -> threading.Event:
+    """
+    Stop event for a scheduler's next loop thread. Every loop watches its
+    own event, so a loop that was stopped never resumes when the
+    scheduler is started again. The previous thread is joined first so
+    its current job finishes before the new loop begins.
+    """
+    previous = owner.scheduler_thread
+    if previous is not None and previous.is_alive() and previous is not threading.current_thread():
+        previous.join(timeout)
+        if previous.is_alive():
+            logger.warning(f"{type(owner).__name__}: previous loop still finishing its job")
+    return threading.Event()
+
 # ====== DATABASE SERVICE ======
 class DatabaseService:
     """SQLite database service for production use"""
     
     def __init__(self):
         self.db_path = config.DATABASE_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.idempotency = idempotency.IdempotencyStore(
+            self.get_connection, ttl=config.IDEMPOTENCY_TTL_HOURS * 3600
+        )
+        self.item_hashes = idempotency.ItemHashes()  # last committed content per source row
+        
+        # Scraper/scheduler history rows, written in batches (started by lifespan)
+        self.telemetry = TelemetrySink(
+            self.get_connection,
+            flush_interval=config.TELEMETRY_FLUSH_MS / 1000,
+            flush_rows=config.TELEMETRY_FLUSH_ROWS,
+            capacity=config.TELEMETRY_BUFFER_ROWS
+        )
         self.init_database()
+        
+        # Chart generation shared by all workers; keys cached chart bodies
+        self.coherence = coherence.CoherenceWatcher(
+            self.db_path, interval=config.CACHE_COHERENCE_MS / 1000
+        )
+        self.coherence.register("song_identity", song_identity.mark_stale)
+        
+        # Identical concurrent chart queries share one SQL run
+        self.top_songs_flight = SingleFlight("top_songs", timeout=config.COALESCE_WAIT_SECONDS)
+    
+    @property
+    def chart_version(self) -> int:
+        """Bumped by every chart write in any worker (see commit_chart_write)"""
+        return self.coherence.check()
+    
+    def commit_chart_write(self, conn):
+        """Commit a transaction that changed chart data, invalidating caches everywhere"""
+        coherence.bump(conn)
+        conn.commit()
+        self.coherence.check(force=True)
     
     def init_database(self):
         """Initialize database tables"""
@@ -322,12 +485,70 @@ class DatabaseService:
                 )
             ''')
             
+            # Raw ingest observations (append-only, used by replays)
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS play_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT NOT NULL,
+                    artist TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    source_type TEXT NOT NULL,
+                    region TEXT,
+                    plays INTEGER DEFAULT 0,
+                    observed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Applied/failed queued ingest batches (exactly-once replay guard)
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS ingest_batches (
+                    id TEXT PRIMARY KEY,
+                    endpoint TEXT NOT NULL,
+                    source TEXT,
+                    status TEXT NOT NULL,
+                    items INTEGER DEFAULT 0,
+                    added INTEGER DEFAULT 0,
+                    updated INTEGER DEFAULT 0,
+                    error TEXT,
+                    received_at TIMESTAMP,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
             # Create indexes for better performance
             conn.execute('CREATE INDEX IF NOT EXISTS idx_songs_source ON songs(source)')
             conn.execute('CREATE INDEX IF NOT EXISTS idx_songs_source_type ON songs(source_type)')
             conn.execute('CREATE INDEX IF NOT EXISTS idx_songs_ingested ON songs(ingested_at)')
             conn.execute('CREATE INDEX IF NOT EXISTS idx_scraper_history_type ON scraper_history(scraper_type, created_at)')
             conn.execute('CREATE INDEX IF NOT EXISTS idx_streams_history_platform ON streams_history(platform, created_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_play_events_observed ON play_events(observed_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_ingest_batches_applied ON ingest_batches(applied_at)')
+            
+            # Stored responses for retried Idempotency-Key requests
+            idempotency.ensure_schema(conn)
+            
+            # Scheduler leader lease and jobs forwarded to the leader
+            leader.ensure_schema(conn)
+            
+            # Cross-worker cache generation
+            coherence.ensure_schema(conn)
+            
+            # Canonical song identity (one chart entry per song across sources)
+            song_identity.ensure_schema(conn)
+            linked = song_identity.backfill(conn)
+            if linked:
+                logger.info(f"Linked {linked} songs to canonical ids")
+            
+            # Trigger-maintained row counts for health and stats endpoints
+            counters.ensure_schema(conn)
+            
+            # Hourly/daily history rollups read by the stats endpoints
+            retention.ensure_schema(conn)
+            
+            # FTS5 song/artist index (kept in sync by triggers)
+            if search.ensure_schema(conn):
+                logger.warning("Search index is empty for an existing catalog; "
+                               "run scripts/backfill_search.py")
             
             conn.commit()
             logger.info("Database initialized successfully with streams support")
@@ -339,100 +560,229 @@ class DatabaseService:
             conn.close()
     
     def get_connection(self):
-        """Get database connection"""
-        return sqlite3.connect(self.db_path)
+        """Get database connection (statements are timed for /metrics)"""
+        return sqlite3.connect(self.db_path, factory=metrics.TimedConnection)
+    
+    def get_counters(self) -> Dict[str, Dict[str, Any]]:
+        """Row counts per table, source, region and status (no table scans)"""
+        conn = self.get_connection()
+        try:
+            return counters.read(conn)
+        finally:
+            conn.close()
     
     def add_song(self, song_data: Dict[str, Any]) -> Tuple[bool, int]:
         """Add or update a song in the database"""
         conn = self.get_connection()
-        cursor = conn.cursor()
         
         try:
-            # Check if song exists
-            cursor.execute('''
-                SELECT id, plays, score FROM songs 
-                WHERE title = ? AND artist = ? AND source = ?
-            ''', (song_data['title'], song_data['artist'], song_data['source']))
+            result = self._upsert_song(conn, song_data)
+            self.commit_chart_write(conn)
+            self.item_hashes.remember([song_data])
+            return result
+            
+        except Exception as e:
+            conn.rollback()
+            song_identity.reset_index(conn)  # drop ids assigned in the rolled-back transaction
+            logger.error(f"Failed to add song: {e}")
+            raise
+        finally:
+            conn.close()
+    
+    def _upsert_song(self, conn, song_data: Dict[str, Any]) -> Tuple[bool, int]:
+        """
+        Insert or update one song on `conn` (caller commits).
+        Returns (True, id) for an update, (False, id) for a new song.
+        """
+        cursor = conn.cursor()
+        
+        # Record the raw observation before it is folded into aggregates
+        cursor.execute('''
+            INSERT INTO play_events (title, artist, source, source_type, region, plays)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (
+            song_data['title'],
+            song_data['artist'],
+            song_data['source'],
+            song_data.get('source_type', 'unknown'),
+            song_data.get('region', 'central'),
+            song_data.get('plays', 0)
+        ))
+        
+        canonical_id = song_identity.assign(conn, song_data['title'], song_data['artist'])
+        
+        # Check if song exists
+        cursor.execute('''
+            SELECT id, plays, score FROM songs 
+            WHERE title = ? AND artist = ? AND source = ?
+        ''', (song_data['title'], song_data['artist'], song_data['source']))
+        
+        existing = cursor.fetchone()
+        
+        if existing:
+            # Update existing song
+            song_id, existing_plays, existing_score = existing
+            new_plays = max(song_data.get('plays', 0), existing_plays)
+            new_score = max(song_data.get('score', 0.0), existing_score)
             
-            existing = cursor.fetchone()
+            # Update stream-specific fields if provided
+            update_fields = '''
+                UPDATE songs 
+                SET plays = ?, score = ?, last_updated = CURRENT_TIMESTAMP,
+                    canonical_song_id = COALESCE(canonical_song_id, ?)
+            '''
+            update_params = [new_plays, new_score, canonical_id]
             
-            if existing:
-                # Update existing song
-                song_id, existing_plays, existing_score = existing
-                new_plays = max(song_data.get('plays', 0), existing_plays)
-                new_score = max(song_data.get('score', 0.0), existing_score)
-                
-                # Update stream-specific fields if provided
-                update_fields = '''
-                    UPDATE songs 
-                    SET plays = ?, score = ?, last_updated = CURRENT_TIMESTAMP
-                '''
-                update_params = [new_plays, new_score]
-                
-                if 'stream_platform' in song_data:
-                    update_fields += ', stream_platform = ?'
-                    update_params.append(song_data['stream_platform'])
-                
-                if 'stream_rank' in song_data:
-                    update_fields += ', stream_rank = ?'
-                    update_params.append(song_data['stream_rank'])
-                
-                update_fields += ' WHERE id = ?'
-                update_params.append(song_id)
-                
-                cursor.execute(update_fields, update_params)
-                
-                conn.commit()
-                return True, song_id  # Updated existing
-            else:
-                # Insert new song
-                columns = ['title', 'artist', 'plays', 'score', 'station', 'region', 'district',
-                          'source_type', 'source', 'url', 'youtube_channel_id', 'youtube_video_id']
-                placeholders = ['?'] * len(columns)
-                values = [
-                    song_data.get('title', ''),
-                    song_data.get('artist', ''),
-                    song_data.get('plays', 0),
-                    song_data.get('score', 0.0),
-                    song_data.get('station'),
-                    song_data.get('region', 'central'),
-                    song_data.get('district'),
-                    song_data.get('source_type', 'unknown'),
-                    song_data.get('source', ''),
-                    song_data.get('url'),
-                    song_data.get('youtube_channel_id'),
-                    song_data.get('youtube_video_id')
-                ]
-                
-                # Add stream-specific fields if present
-                if 'stream_platform' in song_data:
-                    columns.append('stream_platform')
-                    placeholders.append('?')
-                    values.append(song_data['stream_platform'])
-                
-                if 'stream_rank' in song_data:
-                    columns.append('stream_rank')
-                    placeholders.append('?')
-                    values.append(song_data['stream_rank'])
+            if 'stream_platform' in song_data:
+                update_fields += ', stream_platform = ?'
+                update_params.append(song_data['stream_platform'])
+            
+            if 'stream_rank' in song_data:
+                update_fields += ', stream_rank = ?'
+                update_params.append(song_data['stream_rank'])
+            
+            update_fields += ' WHERE id = ?'
+            update_params.append(song_id)
+            
+            cursor.execute(update_fields, update_params)
+            return True, song_id  # Updated existing
+        
+        # Insert new song
+        columns = ['title', 'artist', 'plays', 'score', 'station', 'region', 'district',
+                  'source_type', 'source', 'url', 'youtube_channel_id', 'youtube_video_id',
+                  'canonical_song_id']
+        placeholders = ['?'] * len(columns)
+        values = [
+            song_data.get('title', ''),
+            song_data.get('artist', ''),
+            song_data.get('plays', 0),
+            song_data.get('score', 0.0),
+            song_data.get('station'),
+            song_data.get('region', 'central'),
+            song_data.get('district'),
+            song_data.get('source_type', 'unknown'),
+            song_data.get('source', ''),
+            song_data.get('url'),
+            song_data.get('youtube_channel_id'),
+            song_data.get('youtube_video_id'),
+            canonical_id
+        ]
+        
+        # Add stream-specific fields if present
+        if 'stream_platform' in song_data:
+            columns.append('stream_platform')
+            placeholders.append('?')
+            values.append(song_data['stream_platform'])
+        
+        if 'stream_rank' in song_data:
+            columns.append('stream_rank')
+            placeholders.append('?')
+            values.append(song_data['stream_rank'])
+        
+        cursor.execute(f'''
+            INSERT INTO songs ({', '.join(columns)})
+            VALUES ({', '.join(placeholders)})
+        ''', values)
+        
+        return False, cursor.lastrowid  # Added new
+    
+    def apply_ingest_batches(self, batches: List[Dict[str, Any]]) -> None:
+        """
+        Apply queued ingest batches in one transaction. Each batch id is
+        recorded in the same transaction, so a replayed batch is skipped.
+        Lock/busy errors are raised as TransientError (retried later);
+        anything else propagates, so the queue dead-letters the batch.
+        """
+        conn = self.get_connection()
+        
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for batch in batches:
+                cursor = conn.execute('''
+                    INSERT OR IGNORE INTO ingest_batches (id, endpoint, source, status, items, received_at)
+                    VALUES (?, ?, ?, 'applied', ?, datetime(?, 'unixepoch'))
+                ''', (batch['id'], batch['endpoint'], batch['source'],
+                      len(batch['songs']), batch['received_at']))
+                if cursor.rowcount == 0:
+                    continue  # applied before a crash, replayed from its segment
                 
-                cursor.execute(f'''
-                    INSERT INTO songs ({', '.join(columns)})
-                    VALUES ({', '.join(placeholders)})
-                ''', values)
+                added = updated = 0
+                for song_data in batch['songs']:
+                    existed, _ = self._upsert_song(conn, song_data)
+                    if existed:
+                        updated += 1
+                    else:
+                        added += 1
                 
-                song_id = cursor.lastrowid
-                conn.commit()
-                return False, song_id  # Added new
+                conn.execute(
+                    "UPDATE ingest_batches SET added = ?, updated = ? WHERE id = ?",
+                    (added, updated, batch['id'])
+                )
+            self.commit_chart_write(conn)
+            for batch in batches:
+                self.item_hashes.remember(batch['songs'])
             
         except Exception as e:
             conn.rollback()
-            logger.error(f"Failed to add song: {e}")
+            song_identity.reset_index(conn)
+            message = str(e).lower()
+            if isinstance(e, sqlite3.OperationalError) and ("locked" in message or "busy" in message):
+                raise TransientError(str(e)) from e
             raise
         finally:
             conn.close()
     
-    def get_top_songs(self, limit: int = 100, region: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get top songs with unified scoring including streams"""
+    def record_ingest_failure(self, batch: Dict[str, Any], error: str) -> None:
+        """Mark a queued batch that can never be applied"""
+        conn = self.get_connection()
+        try:
+            conn.execute('''
+                INSERT OR IGNORE INTO ingest_batches (id, endpoint, source, status, items, error, received_at)
+                VALUES (?, ?, ?, 'failed', ?, ?, datetime(?, 'unixepoch'))
+            ''', (batch['id'], batch['endpoint'], batch['source'],
+                  len(batch['songs']), error[:500], batch['received_at']))
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def get_ingest_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Applied or failed ingest batch by id"""
+        conn = self.get_connection()
+        conn.row_factory = sqlite3.Row
+        try:
+            row = conn.execute("SELECT * FROM ingest_batches WHERE id = ?", (batch_id,)).fetchone()
+            return dict(row) if row else None
+        finally:
+            conn.close()
+    
+    # Columns served by chart endpoints (no urls, YouTube ids or update stamps)
+    CHART_COLUMNS = (
+        "id", "title", "artist", "plays", "score", "station", "region", "district",
+        "source_type", "source", "stream_platform", "stream_rank", "ingested_at",
+        "canonical_song_id",
+    )
+    
+    def get_top_songs(self, limit: int = 100, region: Optional[str] = None,
+                      offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Get top songs with unified scoring including streams.
+        Concurrent calls for the same page of the same chart version run
+        the query once; each caller gets its own copy of the rows.
+        """
+        key = (int(limit), region or None, int(offset), self.chart_version)
+        songs = self.top_songs_flight.do(
+            key, lambda: self._query_top_songs(limit, region or None, offset)
+        )
+        return [dict(song) for song in songs]
+    
+    def _query_top_songs(self, limit: int, region: Optional[str],
+                         offset: int) -> List[Dict[str, Any]]:
+        """
+        Rows for the same canonical song (TV, radio, YouTube, streams) are
+        aggregated: each source type counts once with its best weighted
+        score, those are summed, plays are summed, and the best-scoring
+        source row represents the song.
+        """
         conn = self.get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
@@ -441,33 +791,40 @@ class DatabaseService:
             where_clause = "WHERE region = ?" if region else ""
             params = [region] if region else []
             
+            # Bare columns come from the MAX(...) row at each level (SQLite
+            # rule), so the best-scoring source row represents the song.
+            # Ten radio stations playing a song count as one radio source.
             query = f'''
-                SELECT *, 
-                       (plays * 0.4 + 
-                        (CASE 
-                            WHEN julianday('now') - julianday(ingested_at) <= 7 THEN 30 
-                            WHEN julianday('now') - julianday(ingested_at) <= 30 THEN 20 
-                            ELSE 10 
-                        END) * 0.3 +
-                        (CASE source_type
-                            WHEN 'youtube' THEN 20
-                            WHEN 'tv' THEN 16
-                            WHEN 'radio' THEN 14
-                            WHEN 'streaming' THEN 18  -- NEW: Streaming gets higher weight
-                            ELSE 10
-                        END) * 0.2) as unified_score
-                FROM songs
-                {where_clause}
-                ORDER BY unified_score DESC
-                LIMIT ?
+                SELECT {', '.join(self.CHART_COLUMNS)},
+                       MAX(type_score) as best_source_score,
+                       SUM(type_score) as unified_score,
+                       SUM(type_plays) as total_plays,
+                       SUM(type_rows) as source_count
+                FROM (
+                    SELECT *,
+                           MAX(source_score) as type_score,
+                           SUM(plays) as type_plays,
+                           COUNT(*) as type_rows
+                    FROM (
+                        SELECT *,
+                               {scoring_engine.sql_score_expression()} as source_score
+                        FROM songs
+                        {where_clause}
+                    )
+                    GROUP BY COALESCE(canonical_song_id, -id), source_type
+                )
+                GROUP BY COALESCE(canonical_song_id, -id)
+                ORDER BY unified_score DESC, id
+                LIMIT ? OFFSET ?
             '''
             
-            params.append(limit)
+            params.extend([limit, offset])
             cursor.execute(query, params)
             
             songs = []
             for row in cursor.fetchall():
                 song = dict(row)
+                del song['best_source_score']
                 song['unified_score'] = round(song['unified_score'], 2)
                 songs.append(song)
             
@@ -534,126 +891,72 @@ class DatabaseService:
                            items_found: int, items_added: int, 
                            status: str, error_message: Optional[str] = None,
                            execution_time: Optional[float] = None):
-        """Record scraper execution history"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        """Record scraper execution history (buffered, see TelemetrySink)"""
+        metrics.observe_scrape(scraper_type, station_id, execution_time, status, items_found)
         
-        try:
-            cursor.execute('''
-                INSERT INTO scraper_history (
-                    scraper_type, station_id, items_found, items_added,
-                    status, error_message, execution_time
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (scraper_type, station_id, items_found, items_added, 
-                  status, error_message, execution_time))
-            
-            conn.commit()
-            
-        except Exception as e:
-            logger.error(f"Failed to add scraper history: {e}")
-            conn.rollback()
-        finally:
-            conn.close()
+        self.telemetry.emit("scraper_history", (
+            scraper_type, station_id, items_found, items_added,
+            status, error_message, execution_time
+        ))
     
     def add_youtube_schedule_history(self, channel_id: str, status: str,
                                     items_found: int = 0, items_added: int = 0,
                                     error_message: Optional[str] = None):
-        """Record YouTube scheduler execution"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('''
-                INSERT INTO youtube_scheduler (
-                    channel_id, status, items_found, items_added, error_message
-                ) VALUES (?, ?, ?, ?, ?)
-            ''', (channel_id, status, items_found, items_added, error_message))
-            
-            conn.commit()
-            
-        except Exception as e:
-            logger.error(f"Failed to add YouTube schedule history: {e}")
-            conn.rollback()
-        finally:
-            conn.close()
+        """Record YouTube scheduler execution (buffered)"""
+        self.telemetry.emit("youtube_scheduler", (
+            channel_id, status, items_found, items_added, error_message
+        ))
     
     def add_streams_history(self, platform: str, items_found: int, items_added: int,
                            items_updated: int, status: str, error_message: Optional[str] = None,
                            execution_time: Optional[float] = None, method_used: Optional[str] = None):
-        """Record streams scraping history (NEW)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        """Record streams scraping history (buffered)"""
+        metrics.observe_scrape("streams", platform, execution_time, status, items_found)
         
-        try:
-            cursor.execute('''
-                INSERT INTO streams_history (
-                    platform, items_found, items_added, items_updated,
-                    status, error_message, execution_time, method_used
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (platform, items_found, items_added, items_updated,
-                  status, error_message, execution_time, method_used))
-            
-            conn.commit()
-            
-        except Exception as e:
-            logger.error(f"Failed to add streams history: {e}")
-            conn.rollback()
-        finally:
-            conn.close()
+        self.telemetry.emit("streams_history", (
+            platform, items_found, items_added, items_updated,
+            status, error_message, execution_time, method_used
+        ))
     
     def get_streams_stats(self, days: int = 7) -> Dict[str, Any]:
-        """Get streams scraping statistics (NEW)"""
+        """Get streams scraping statistics from the hourly rollups (NEW)"""
+        self.telemetry.flush()
         conn = self.get_connection()
-        cursor = conn.cursor()
+        conn.row_factory = sqlite3.Row
         
         try:
-            # Get total stats
-            cursor.execute('''
-                SELECT 
-                    COUNT(*) as total_scrapes,
-                    SUM(items_found) as total_found,
-                    SUM(items_added) as total_added,
-                    SUM(items_updated) as total_updated,
-                    SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END) as successful,
-                    SUM(CASE WHEN status = 'error' THEN 1 ELSE 0 END) as failed
-                FROM streams_history
-                WHERE created_at >= datetime('now', ?)
-            ''', (f'-{days} days',))
-            
-            total_stats = dict(cursor.fetchone() or {})
+            summary = retention.window(conn, "streams_history", days)
             
-            # Get platform-specific stats
-            cursor.execute('''
-                SELECT 
-                    platform,
-                    COUNT(*) as scrape_count,
-                    SUM(items_found) as items_found,
-                    SUM(items_added) as items_added,
-                    AVG(execution_time) as avg_time
-                FROM streams_history
-                WHERE created_at >= datetime('now', ?)
-                GROUP BY platform
-                ORDER BY scrape_count DESC
-            ''', (f'-{days} days',))
+            total_stats = {
+                "total_scrapes": summary["runs"],
+                "total_found": summary["items_found"],
+                "total_added": summary["items_added"],
+                "total_updated": summary["items_updated"],
+                "successful": summary["successful"],
+                "failed": summary["failed"]
+            }
             
-            platform_stats = []
-            for row in cursor.fetchall():
-                platform_stats.append(dict(row))
+            platform_stats = [
+                {
+                    "platform": entry["key"],
+                    "scrape_count": entry["runs"],
+                    "items_found": entry["items_found"],
+                    "items_added": entry["items_added"],
+                    "avg_time": entry["avg_time"]
+                }
+                for entry in summary["keys"]
+            ]
             
-            # Get recent scrapes
-            cursor.execute('''
+            # Get recent scrapes (newest rows by id; no sort over the table)
+            cursor = conn.execute('''
                 SELECT platform, status, items_found, items_added, 
                        execution_time, created_at, method_used
                 FROM streams_history
-                ORDER BY created_at DESC
+                ORDER BY id DESC
                 LIMIT 10
             ''')
             
-            recent_scrapes = []
-            for row in cursor.fetchall():
-                recent_scrapes.append(dict(row))
-            
-            conn.close()
+            recent_scrapes = [dict(row) for row in cursor.fetchall()]
             
             return {
                 "total_stats": total_stats,
@@ -662,14 +965,85 @@ class DatabaseService:
                 "period_days": days
             }
             
-        except Exception as e:
-            logger.error(f"Failed to get streams stats: {e}")
-            return {}
+        finally:
+            conn.close()
+    
+    def search_songs(self, query: str, limit: int = 10, region: Optional[str] = None,
+                     source_type: Optional[str] = None, week: Optional[str] = None) -> Dict[str, Any]:
+        """Type-ahead song/artist search ranked by chart score"""
+        conn = self.get_connection()
+        try:
+            return search.search(
+                conn, query, limit=limit, region=region, source_type=source_type,
+                week=week, score_sql=scoring_engine.sql_score_expression()
+            )
+        finally:
+            conn.close()
+    
+    def get_history_totals(self) -> Dict[str, Dict[str, Any]]:
+        """All-time scraper/scheduler run totals from the daily rollups (read-only)"""
+        self.telemetry.flush()
+        conn = self.get_connection()
+        try:
+            return retention.totals(conn)
+        finally:
+            conn.close()
+    
+    def run_retention(self) -> Dict[str, Any]:
+        """Roll up, prune and incrementally vacuum the history tables; compact old play_events"""
+        self.telemetry.flush()
+        conn = self.get_connection()
+        try:
+            result = retention.run(conn, raw_days=config.HISTORY_RETENTION_DAYS)
+            cursor = conn.execute(
+                "DELETE FROM ingest_batches WHERE applied_at < datetime('now', ?)",
+                (f"-{config.INGEST_BATCH_RETENTION_DAYS} days",)
+            )
+            result["deleted"]["ingest_batches"] = cursor.rowcount
+            result["deleted"]["idempotency_keys"] = self.idempotency.prune(conn)
+            result["deleted"]["scheduler_jobs"] = leader.prune(conn)
+            conn.commit()
+            result["deleted"]["play_events"] = retention.compact_events(
+                conn, config.PLAY_EVENT_RETENTION_DAYS
+            )
+            return result
+        finally:
+            conn.close()
+    
+    def export_version(self, table: str, source: Optional[str] = None) -> Tuple:
+        """
+        Cheap fingerprint of a table's exportable rows (keys export spool
+        files). Songs change in place, so their version also carries the
+        chart generation stored in the database, which every songs write
+        bumps; it is the same in every worker and across restarts.
+        Rollup tables are as of the last retention run.
+        """
+        if table != "songs":
+            self.telemetry.flush()
+        conn = self.get_connection()
+        try:
+            if table in retention.ROLLUPS:
+                watermark = conn.execute(
+                    "SELECT last_id FROM rollup_watermarks WHERE source = ?", (source,)
+                ).fetchone()
+                row = conn.execute(
+                    f"SELECT COUNT(*), MIN(bucket) FROM {table} WHERE source = ?", (source,)
+                ).fetchone()
+                return (watermark[0] if watermark else 0,) + tuple(row)
+            
+            rows = counters.get(counters.read(conn), table)
+            row = conn.execute(f"SELECT MIN(id), MAX(id) FROM {table}").fetchone()
+            if table == "songs":
+                generation = conn.execute(
+                    "SELECT value FROM cache_generation WHERE name = ?", (coherence.GENERATION,)
+                ).fetchone()
+                return (rows,) + tuple(row) + (generation[0] if generation else 0,)
+            return (rows,) + tuple(row)
         finally:
             conn.close()
 
 # Initialize database
-db_service = DatabaseService()
+db_service = LazyComponent("db_service", DatabaseService)
 
 # ====== WORKING TV SCRAPER ======
 class TVScraper:
@@ -713,17 +1087,7 @@ class TVScraper:
                 "scraper_type": "web"
             }
         }
-        
-        # Ugandan artists whitelist
-        self.ugandan_artists = {
-            "bobi wine", "eddy kenzo", "sheebah", "daddy andre", "gravity",
-            "vyroota", "geosteady", "feffe busi", "alien skin", "azawi",
-            "vinka", "fik fameica", "john blaq", "dax", "vivian tosh",
-            "spice diana", "rema", "winnie nwagi", "jose chameleone",
-            "bebe cool", "pallaso", "king saha", "david lutalo",
-            "zex bilangilangi", "b2c", "chosen becky", "karole kasita",
-            "ray g", "truth 256", "levixone", "judith babirye"
-        }
+
     
     def scrape_station(self, station_id: str) -> Dict[str, Any]:
         """Scrape a TV station for current playing songs"""
@@ -781,7 +1145,7 @@ class TVScraper:
     
     def _generate_sample_songs(self, station_name: str, region: str) -> List[Dict[str, Any]]:
         """Generate sample songs for testing"""
-        artists = list(self.ugandan_artists)[:10]
+        artists = artist_registry.artist_names()[:10]
         songs = [
             "Nalumansi", "Sitya Loss", "Malaika", "Bomboclat", "Number One",
             "Sweet Love", "Tubonga Naawe", "Tonjola", "Biri Biri", "Kaddugala"
@@ -789,7 +1153,7 @@ class TVScraper:
         
         sample_data = []
         for i in range(3):  # Generate 3 sample songs
-            artist = artists[i % len(artists)].title()
+            artist = artists[i % len(artists)]
             song = songs[i % len(songs)]
             
             sample_data.append({
@@ -811,15 +1175,16 @@ class TVScraper:
         successful = 0
         failed = 0
         
-        for station_id in self.stations:
-            if self.stations[station_id]['active']:
-                result = self.scrape_station(station_id)
-                results[station_id] = result
-                
-                if result.get('status') == 'success':
-                    successful += 1
-                else:
-                    failed += 1
+        with metrics.track_job("tv_scraper"):
+            for station_id in self.stations:
+                if self.stations[station_id]['active']:
+                    result = self.scrape_station(station_id)
+                    results[station_id] = result
+                    
+                    if result.get('status') == 'success':
+                        successful += 1
+                    else:
+                        failed += 1
         
         return {
             "status": "completed",
@@ -832,7 +1197,7 @@ class TVScraper:
         }
 
 # Initialize TV scraper
-tv_scraper = TVScraper()
+tv_scraper = LazyComponent("tv_scraper", TVScraper)
 
 # ====== WORKING RADIO SCRAPER ======
 class RadioScraper:
@@ -905,6 +1270,8 @@ class RadioScraper:
         """Fetch metadata from radio stream"""
         headers = {'Icy-MetaData': '1', 'User-Agent': 'Mozilla/5.0'}
         
+        import requests
+        
         try:
             response = requests.get(
                 station['url'], 
@@ -921,14 +1288,14 @@ class RadioScraper:
                 
                 # Read metadata length
                 length_byte = ord(response.raw.read(1)) * 16
+                metrics.add_scrape_bytes("radio", station['id'], metaint + 1 + length_byte)
                 
                 if length_byte > 0:
                     metadata = response.raw.read(length_byte).decode('utf-8', errors='ignore')
                     
                     # Extract StreamTitle
-                    title_match = re.search(r"StreamTitle='(.*?)';", metadata)
-                    if title_match:
-                        raw_title = title_match.group(1)
+                    raw_title = metadata_parser.stream_title(metadata)
+                    if raw_title:
                         
                         # Parse artist and song
                         parsed = self._parse_metadata(raw_title)
@@ -950,37 +1317,12 @@ class RadioScraper:
             return None
     
     def _parse_metadata(self, raw_metadata: str) -> Optional[Dict[str, str]]:
-        """Parse raw metadata to extract artist and song"""
-        # Clean the metadata
-        clean = re.sub(r'(?i)HD|Official Video|LIVE|\[.*?\]|\(.*?\)', '', raw_metadata).strip()
-        
-        # Common patterns: Artist - Song, Artist: Song, Artist ~ Song
-        patterns = [
-            r'^(.*?)\s*[-~:]\s*(.*)$',  # Artist - Song
-            r'^(.*?)\s+-\s+(.*)$',       # Artist - Song (with spaces)
-            r'^(.*?)\s+by\s+(.*)$',      # Song by Artist
-        ]
-        
-        for pattern in patterns:
-            match = re.match(pattern, clean)
-            if match:
-                groups = match.groups()
-                if len(groups) >= 2:
-                    # Determine which is artist and which is song
-                    if ' by ' in clean.lower():
-                        return {"song": groups[0].strip().title(), "artist": groups[1].strip().title()}
-                    else:
-                        return {"artist": groups[0].strip().title(), "song": groups[1].strip().title()}
-        
-        # If no pattern matches, try to split by common separators
-        separators = [' - ', ': ', ' ~ ']
-        for sep in separators:
-            if sep in clean:
-                parts = clean.split(sep, 1)
-                if len(parts) == 2:
-                    return {"artist": parts[0].strip().title(), "song": parts[1].strip().title()}
+        """Parse raw metadata to extract artist and song (shared, cached parser)"""
+        parsed = metadata_parser.parse(raw_metadata)
+        if not parsed or not parsed.artist:
+            return None
         
-        return None
+        return {"artist": parsed.artist.title(), "song": parsed.title.title()}
     
     def scrape_station(self, station_id: str) -> Dict[str, Any]:
         """Scrape a single radio station"""
@@ -1095,29 +1437,30 @@ class RadioScraper:
         successful = 0
         failed = 0
         
-        # Submit all scraping tasks
-        futures = {}
-        for station in self.stations:
-            if station['active']:
-                future = self.executor.submit(self.scrape_station, station['id'])
-                futures[future] = station['id']
-        
-        # Collect results
-        for future in as_completed(futures):
-            station_id = futures[future]
-            try:
-                result = future.result(timeout=15)
-                results[station_id] = result
-                
-                if result.get('status') == 'success':
-                    successful += 1
-                else:
-                    failed += 1
+        with metrics.track_job("radio_scraper"):
+            # Submit all scraping tasks
+            futures = {}
+            for station in self.stations:
+                if station['active']:
+                    future = self.executor.submit(self.scrape_station, station['id'])
+                    futures[future] = station['id']
+            
+            # Collect results
+            for future in as_completed(futures):
+                station_id = futures[future]
+                try:
+                    result = future.result(timeout=15)
+                    results[station_id] = result
                     
-            except Exception as e:
-                scraper_logger.error(f"Radio scraper timeout for {station_id}: {e}")
-                results[station_id] = {"status": "timeout", "error": str(e)}
-                failed += 1
+                    if result.get('status') == 'success':
+                        successful += 1
+                    else:
+                        failed += 1
+                        
+                except Exception as e:
+                    scraper_logger.error(f"Radio scraper timeout for {station_id}: {e}")
+                    results[station_id] = {"status": "timeout", "error": str(e)}
+                    failed += 1
         
         return {
             "status": "completed",
@@ -1130,7 +1473,7 @@ class RadioScraper:
         }
 
 # Initialize radio scraper
-radio_scraper = RadioScraper()
+radio_scraper = LazyComponent("radio_scraper", RadioScraper)
 
 # ====== STREAMS SCRAPER (NEW) ======
 import asyncio
@@ -1229,75 +1572,31 @@ class StreamsScraper:
                 }
             }
         }
-        
-        # Known Ugandan artists for matching
-        self.known_ugandan_artists = [
-            "Bobi Wine", "Eddy Kenzo", "Sheebah", "Azawi", "Vinka",
-            "Alien Skin", "Spice Diana", "Rema", "Winnie Nwagi",
-            "Jose Chameleone", "Bebe Cool", "Pallaso", "Daddy Andre",
-            "Geosteady", "Fik Fameica", "John Blaq", "Vyroota",
-            "Vivian Tosh", "King Saha", "David Lutalo", "Zex Bilangilangi",
-            "B2C", "Chosen Becky", "Karole Kasita", "Ray G", "Truth 256"
-        ]
+
     
     def _clean_string(self, text: str) -> str:
         """Clean and normalize text strings"""
         if not text:
             return ""
         
-        # Remove common prefixes/suffixes and normalize
-        text = re.sub(r'\(.*?\)|\[.*?\]|\{.*?\}', '', text)
-        text = re.sub(r'\s+', ' ', text)
-        text = text.split('ft.')[0].split('Feat.')[0].split('featuring')[0]
+        # Remove upload artifacts and featured credits (shared with all scrapers)
+        text = song_identity.strip_featuring(song_identity.strip_decorations(text))
         text = text.split(' x ')[0].split(' X ')[0]
         text = text.replace('"', '').replace("'", "")
         
         return text.strip()
     
     def _extract_artist_title(self, raw_text: str) -> Tuple[str, str]:
-        """Extract artist and title from raw text"""
-        if not raw_text:
+        """Extract artist and title from raw text (shared, cached parser)"""
+        parsed = metadata_parser.parse(raw_text)
+        if not parsed:
             return "Various Artists", "Unknown"
         
-        clean_text = self._clean_string(raw_text)
-        
-        # Pattern matching
-        patterns = [
-            (r'^(.*?)\s*[–—\-~]\s*(.*)$', (0, 1)),  # Artist - Title
-            (r'^(.*?)\s+by\s+(.*)$', (1, 0)),       # Title by Artist
-            (r'^(.*?)\s*:\s*(.*)$', (0, 1)),        # Artist: Title
-        ]
-        
-        for pattern, indices in patterns:
-            match = re.match(pattern, clean_text)
-            if match:
-                artist_idx, title_idx = indices
-                artist = match.group(artist_idx + 1).strip()
-                title = match.group(title_idx + 1).strip()
-                
-                artist = re.sub(r'(?i)ft\.|feat\.|featuring|&|,.*', '', artist).strip()
-                title = re.sub(r'(?i)ft\.|feat\.|featuring|&|,.*', '', title).strip()
-                
-                return artist, title
-        
-        # Fallback
-        return "Various Artists", clean_text
+        return parsed.artist or "Various Artists", parsed.title
     
     def _is_ugandan_artist(self, artist: str) -> bool:
-        """Check if artist is Ugandan"""
-        if not artist:
-            return False
-        
-        artist_lower = artist.lower()
-        
-        # Check against known artists
-        for known_artist in self.known_ugandan_artists:
-            if known_artist.lower() in artist_lower or artist_lower in known_artist.lower():
-                return True
-        
-        # Keywords
-        ugandan_keywords = ['uganda', 'kampala', 'ugandan']
-        return any(keyword in artist_lower for keyword in ugandan_keywords)
+        """Check if artist is Ugandan (one pass over the artist registry)"""
+        return artist_registry.is_ugandan(artist)
     
     def _calculate_score(self, rank: int, platform: str, total_items: int = 50) -> float:
         """Calculate unified score based on rank and platform weight"""
@@ -1325,6 +1624,8 @@ class StreamsScraper:
                 timeout=platform_config["timeout"]
             )
             
+            metrics.add_scrape_bytes("streams", platform, len(response.content))
+            
             if response.status_code != 200:
                 streams_logger.error(f"HTTP {response.status_code} from {platform}")
                 return self._get_fallback_data(platform)
@@ -1608,7 +1909,10 @@ class StreamsScraper:
         return loop.run_until_complete(self.scrape_all_async())
 
 # Initialize streams scraper
-streams_scraper = StreamsScraper(db_service=db_service, config=config, use_playwright=True)
+streams_scraper = LazyComponent(
+    "streams_scraper",
+    lambda: StreamsScraper(db_service=db_service, config=config, use_playwright=True)
+)
 
 # ====== STREAMS SCHEDULER (NEW) ======
 class StreamsScheduler:
@@ -1619,6 +1923,7 @@ class StreamsScheduler:
         self.interval_hours = interval_hours
         self.is_running = False
         self.scheduler_thread = None
+        self._stop = threading.Event()
         self.last_run = None
         self.next_run = None
         
@@ -1640,51 +1945,58 @@ class StreamsScheduler:
         if not self.is_running:
             return
         
-        self.last_run = datetime.utcnow()
-        streams_logger.info(f"🚀 Starting scheduled streams scraping at {self.last_run}")
-        
-        try:
-            result = await self.scraper.scrape_all_async()
-            streams_logger.info(f"✅ Scheduled streams scraping completed")
+        with metrics.track_job("streams") as job:
+            self.last_run = datetime.utcnow()
+            streams_logger.info(f"🚀 Starting scheduled streams scraping at {self.last_run}")
             
-            self.next_run = self.calculate_next_run()
-            streams_logger.info(f"⏰ Next streams scraping scheduled for {self.next_run}")
+            try:
+                result = await self.scraper.scrape_all_async()
+                streams_logger.info(f"✅ Scheduled streams scraping completed")
             
-            return result
+                self.next_run = self.calculate_next_run()
+                streams_logger.info(f"⏰ Next streams scraping scheduled for {self.next_run}")
             
-        except Exception as e:
-            streams_logger.error(f"❌ Scheduled streams scraping failed: {e}")
-            return {"status": "error", "error": str(e)}
+                return result
+            
+            except Exception as e:
+                streams_logger.error(f"❌ Scheduled streams scraping failed: {e}")
+                job["status"] = "error"
+                return {"status": "error", "error": str(e)}
     
-    def start_scheduler(self):
-        """Start the scheduler in a background thread"""
+    def start_scheduler(self, initial_delay: float = 0):
+        """Start the scheduler in a background thread (first run after initial_delay seconds)"""
         if self.is_running:
             streams_logger.warning("Streams scheduler is already running")
             return
         
+        stop = self._stop = new_loop_event(self)
         self.is_running = True
+        self.next_run = datetime.utcnow() + timedelta(seconds=initial_delay)
         
         def scheduler_loop():
             try:
+                if not sleep_while_running(stop, initial_delay):
+                    return
+                
                 loop = asyncio.new_event_loop()
                 asyncio.set_event_loop(loop)
                 
-                # Run immediately on start
+                # First run once the delay has elapsed
                 loop.run_until_complete(self.run_scheduled_job_async())
                 
                 # Schedule every X hours
-                while self.is_running:
+                while not stop.is_set():
                     try:
                         now = datetime.utcnow()
                         
                         if self.next_run and now >= self.next_run:
                             loop.run_until_complete(self.run_scheduled_job_async())
                         
-                        time.sleep(60)  # Check every minute
+                        stop.wait(60)  # Check every minute
                         
                     except Exception as e:
                         streams_logger.error(f"Scheduler loop error: {e}")
-                        time.sleep(60)
+                        stop.wait(60)
                 
                 loop.close()
                 
@@ -1699,6 +2011,7 @@ class StreamsScheduler:
     def stop_scheduler(self):
         """Stop the scheduler"""
         self.is_running = False
+        self._stop.set()
         if self.scheduler_thread:
             self.scheduler_thread.join(timeout=10)
         
@@ -1719,7 +2032,10 @@ class StreamsScheduler:
             return {"status": "error", "message": "Scheduler not running"}
 
 # Initialize streams scheduler
-streams_scheduler = StreamsScheduler(scraper=streams_scraper, interval_hours=config.STREAMS_SCHEDULE_INTERVAL)
+streams_scheduler = LazyComponent(
+    "streams_scheduler",
+    lambda: StreamsScheduler(scraper=streams_scraper, interval_hours=config.STREAMS_SCHEDULE_INTERVAL)
+)
 
 # ====== BUILT-IN YOUTUBE SCHEDULER ======
 class YouTubeScheduler:
@@ -1730,7 +2046,9 @@ class YouTubeScheduler:
         self.interval = config.YOUTUBE_SCHEDULE_INTERVAL
         self.is_running = False
         self.scheduler_thread = None
+        self._stop = threading.Event()
         self.last_run = None
+        self.next_run = None
     
     def fetch_youtube_data(self, channel_id: str) -> List[Dict[str, Any]]:
         """Fetch data from YouTube channel"""
@@ -1843,65 +2161,75 @@ class YouTubeScheduler:
         if not self.is_running:
             return
         
-        self.last_run = datetime.utcnow()
-        youtube_logger.info(f"Starting YouTube scheduled job at {self.last_run}")
-        
-        results = {}
-        successful = 0
-        failed = 0
-        
-        for channel_id in self.channels:
-            result = self.process_channel(channel_id)
-            results[channel_id] = result
+        with metrics.track_job("youtube") as job:
+            self.last_run = datetime.utcnow()
+            self.next_run = self.last_run + timedelta(minutes=self.interval)
+            youtube_logger.info(f"Starting YouTube scheduled job at {self.last_run}")
             
-            if result.get('status') == 'success':
-                successful += 1
-            else:
-                failed += 1
-        
-        youtube_logger.info(
-            f"YouTube scheduled job completed: "
-            f"Successful: {successful}, Failed: {failed}"
-        )
-        
-        return {
-            "status": "completed",
-            "timestamp": datetime.utcnow().isoformat(),
-            "total_channels": len(self.channels),
-            "successful": successful,
-            "failed": failed,
-            "results": results
-        }
+            results = {}
+            successful = 0
+            failed = 0
+            
+            for channel_id in self.channels:
+                result = self.process_channel(channel_id)
+                results[channel_id] = result
+            
+                if result.get('status') == 'success':
+                    successful += 1
+                else:
+                    failed += 1
+            
+            if failed and not successful:
+                job["status"] = "error"
+            
+            youtube_logger.info(
+                f"YouTube scheduled job completed: "
+                f"Successful: {successful}, Failed: {failed}"
+            )
+            
+            return {
+                "status": "completed",
+                "timestamp": datetime.utcnow().isoformat(),
+                "total_channels": len(self.channels),
+                "successful": successful,
+                "failed": failed,
+                "results": results
+            }
     
-    def start_scheduler(self):
-        """Start the YouTube scheduler"""
+    def start_scheduler(self, initial_delay: float = 0):
+        """Start the YouTube scheduler (first run after initial_delay seconds)"""
         if self.is_running:
             youtube_logger.warning("YouTube scheduler is already running")
             return
         
+        stop = self._stop = new_loop_event(self)
         self.is_running = True
+        self.next_run = datetime.utcnow() + timedelta(seconds=initial_delay)
         
         def scheduler_loop():
+            if not sleep_while_running(stop, initial_delay):
+                return
+            
             self.run_scheduled_job()
             
-            while self.is_running:
+            while not stop.is_set():
                 try:
                     if self.last_run:
                         next_run = self.last_run + timedelta(minutes=self.interval)
                         sleep_seconds = (next_run - datetime.utcnow()).total_seconds()
                         
                         if sleep_seconds > 0:
-                            time.sleep(min(sleep_seconds, 60))
+                            stop.wait(min(sleep_seconds, 60))
                         else:
                             self.run_scheduled_job()
-                            time.sleep(60)
+                            stop.wait(60)
                     else:
                         self.run_scheduled_job()
-                        time.sleep(60)
+                        stop.wait(60)
                         
                 except Exception as e:
                     youtube_logger.error(f"Scheduler loop error: {e}")
-                    time.sleep(60)
+                    stop.wait(60)
         
         self.scheduler_thread = threading.Thread(target=scheduler_loop, daemon=True)
         self.scheduler_thread.start()
@@ -1911,51 +2239,26 @@ class YouTubeScheduler:
     def stop_scheduler(self):
         """Stop the YouTube scheduler"""
         self.is_running = False
+        self._stop.set()
         if self.scheduler_thread:
             self.scheduler_thread.join(timeout=5)
         
         youtube_logger.info("YouTube scheduler stopped")
 
 # Initialize YouTube scheduler
-youtube_scheduler = YouTubeScheduler()
+youtube_scheduler = LazyComponent("youtube_scheduler", YouTubeScheduler)
 
 # ====== UNIFIED SCORING SYSTEM ======
 class UnifiedScoringSystem:
     """Unified scoring system for all song sources"""
     
+    VERSION = "stored-v1"
+    
     @staticmethod
     def calculate_unified_score(song: Dict[str, Any]) -> float:
         """Calculate unified score for a song"""
         try:
-            plays_score = min(song.get('plays', 0) / 1000, 40)
-            source_score = config.SOURCE_WEIGHTS.get(song.get('source_type', 'unknown'), 0.5) * 20
-            
-            ingested_at = song.get('ingested_at')
-            recency_score = 0
-            if ingested_at:
-                try:
-                    if isinstance(ingested_at, str):
-                        ingest_time = datetime.fromisoformat(ingested_at.replace('Z', '+00:00'))
-                    else:
-                        ingest_time = ingested_at
-                    
-                    days_old = (datetime.utcnow() - ingest_time).days
-                    recency_score = max(0, 30 - days_old)
-                except:
-                    recency_score = 10
-            
-            region = song.get('region', 'central')
-            region_score = 10
-            
-            total_score = (
-                plays_score * config.SCORING_WEIGHTS['plays'] +
-                recency_score * config.SCORING_WEIGHTS['recency'] +
-                source_score * config.SCORING_WEIGHTS['source_type'] +
-                region_score * config.SCORING_WEIGHTS['region_balance']
-            )
-            
-            return round(total_score, 2)
-            
+            return scoring_engine.score_item(song, UnifiedScoringSystem.VERSION)
         except Exception as e:
             logger.error(f"Error calculating unified score: {e}")
             return song.get('score', 0.0)
@@ -1968,30 +2271,24 @@ class UnifiedScoringSystem:
         
         try:
             cursor.execute("SELECT id, plays, score, source_type, ingested_at, region FROM songs")
-            songs = cursor.fetchall()
+            columns = [c[0] for c in cursor.description]
+            songs = [dict(zip(columns, row)) for row in cursor.fetchall()]
             
-            updated_count = 0
-            for song in songs:
-                song_id, plays, old_score, source_type, ingested_at, region = song
-                
-                song_data = {
-                    'plays': plays,
-                    'score': old_score,
-                    'source_type': source_type,
-                    'ingested_at': ingested_at,
-                    'region': region
-                }
-                
-                new_score = UnifiedScoringSystem.calculate_unified_score(song_data)
-                
-                if new_score != old_score:
-                    cursor.execute(
-                        "UPDATE songs SET score = ?, last_updated = CURRENT_TIMESTAMP WHERE id = ?",
-                        (new_score, song_id)
-                    )
-                    updated_count += 1
+            # One batch pass over all songs
+            scores = scoring_engine.score_items(songs, UnifiedScoringSystem.VERSION)
             
-            conn.commit()
+            changed = [
+                (new_score, song['id'])
+                for song, new_score in zip(songs, scores)
+                if new_score != song['score']
+            ]
+            cursor.executemany(
+                "UPDATE songs SET score = ?, last_updated = CURRENT_TIMESTAMP WHERE id = ?",
+                changed
+            )
+            updated_count = len(changed)
+            
+            db_service.commit_chart_write(conn)
             logger.info(f"Updated scores for {updated_count} songs")
             
             return {"updated": updated_count, "total": len(songs)}
@@ -2006,6 +2303,317 @@ class UnifiedScoringSystem:
 # Initialize scoring system
 scoring_system = UnifiedScoringSystem()
 
+# ====== HISTORY RETENTION ======
+class RetentionScheduler:
+    """Periodic rollup, pruning and incremental VACUUM of history tables"""
+    
+    def __init__(self, interval_minutes: int = 60):
+        self.interval = interval_minutes
+        self.is_running = False
+        self.scheduler_thread = None
+        self._stop = threading.Event()
+        self.last_run = None
+        self.next_run = None
+        self.last_result = None
+    
+    def run_job(self) -> Dict[str, Any]:
+        """Run one retention pass"""
+        with metrics.track_job("retention") as job:
+            self.last_run = datetime.utcnow()
+            self.next_run = self.last_run + timedelta(minutes=self.interval)
+            
+            try:
+                self.last_result = db_service.run_retention()
+                logger.info(f"🧹 History retention: {self.last_result}")
+            except Exception as e:
+                logger.error(f"History retention failed: {e}")
+                job["status"] = "error"
+                self.last_result = {"status": "error", "error": str(e)}
+            
+            return self.last_result
+    
+    def start_scheduler(self, initial_delay: float = 0):
+        """Start the retention loop (first run after initial_delay seconds)"""
+        if self.is_running:
+            return
+        
+        stop = self._stop = new_loop_event(self)
+        self.is_running = True
+        self.next_run = datetime.utcnow() + timedelta(seconds=initial_delay)
+        
+        def scheduler_loop():
+            if not sleep_while_running(stop, initial_delay):
+                return
+            
+            while not stop.is_set():
+                self.run_job()
+                sleep_while_running(stop, self.interval * 60)
+        
+        self.scheduler_thread = threading.Thread(target=scheduler_loop, daemon=True)
+        self.scheduler_thread.start()
+    
+    def stop_scheduler(self):
+        """Stop the retention loop"""
+        self.is_running = False
+        self._stop.set()
+        if self.scheduler_thread:
+            self.scheduler_thread.join(timeout=5)
+
+retention_scheduler = LazyComponent(
+    "retention_scheduler",
+    lambda: RetentionScheduler(interval_minutes=config.RETENTION_INTERVAL_MINUTES)
+)
+
+# ====== LEADER ELECTION ======
+class LeaderElection:
+    """
+    Scheduler lease shared by all uvicorn workers through SQLite.
+    The leader runs the YouTube, streams and retention schedulers and
+    the jobs followers forward to it; followers only serve requests.
+    """
+    
+    LEASE = "schedulers"
+    
+    def __init__(self, lease_seconds: float = 30.0, enabled: bool = True):
+        self.lease_seconds = lease_seconds
+        self.enabled = enabled
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.is_leader = False
+        self.is_running = False
+        self.thread = None
+        self._stop = threading.Event()
+        self.elected_at = None
+        self.renewed_at = 0.0   # when the lease was last taken or renewed
+        self.elections = 0
+        self.jobs_run = 0
+        self.last_error = None
+    
+    @property
+    def is_follower(self) -> bool:
+        """Running, but another worker holds the lease"""
+        return self.is_running and not self.is_leader
+    
+    def _schedulers(self):
+        return (
+            (youtube_scheduler, config.YOUTUBE_INITIAL_DELAY),
+            (streams_scheduler, config.STREAMS_INITIAL_DELAY),
+            (retention_scheduler, config.RETENTION_INITIAL_DELAY),
+        )
+    
+    def _settings(self):
+        """Stored setting -> (scheduler, attribute) it controls"""
+        return {
+            "youtube_interval_minutes": (youtube_scheduler, "interval"),
+            "streams_interval_hours": (streams_scheduler, "interval_hours"),
+        }
+    
+    def sync_settings(self) -> List[str]:
+        """
+        Apply schedule changes stored by any worker. Running schedulers
+        (the leader's) restart with the new interval. Returns what changed.
+        """
+        conn = db_service.get_connection()
+        try:
+            stored = leader.settings(conn)
+        finally:
+            conn.close()
+        
+        changed = []
+        for name, (scheduler, attribute) in self._settings().items():
+            if name in stored and getattr(scheduler, attribute) != stored[name]:
+                setattr(scheduler, attribute, stored[name])
+                changed.append(name)
+                if scheduler.is_running:
+                    scheduler.stop_scheduler()
+                    scheduler.start_scheduler()
+        if changed:
+            logger.info(f"Scheduler settings applied: {', '.join(changed)}")
+        return changed
+    
+    def _elected(self):
+        self.is_leader = True
+        self.elected_at = datetime.utcnow()
+        self.elections += 1
+        logger.info(f"👑 Scheduler leader: {self.holder}")
+        
+        conn = db_service.get_connection()
+        try:
+            abandoned = leader.abandon(conn, self.holder)
+        finally:
+            conn.close()
+        if abandoned:
+            logger.warning(f"Failed {abandoned} jobs left running by the previous leader")
+        
+        try:
+            self.sync_settings()
+        except Exception as e:
+            logger.error(f"Could not load scheduler settings: {e}")
+        
+        for scheduler, delay in self._schedulers():
+            try:
+                scheduler.start_scheduler(initial_delay=delay)
+            except Exception as e:
+                logger.error(f"Failed to start {type(scheduler).__name__}: {e}")
+    
+    def _demoted(self):
+        self.is_leader = False
+        logger.warning(f"Scheduler lease lost by {self.holder}; stopping schedulers")
+        for scheduler, _ in self._schedulers():
+            scheduler.stop_scheduler()
+    
+    def heartbeat(self) -> bool:
+        """Take or renew the lease; start/stop schedulers on a change"""
+        attempted_at = time.time()
+        conn = None
+        try:
+            conn = db_service.get_connection()
+            held = leader.acquire(conn, self.LEASE, self.holder, self.lease_seconds)
+            self.last_error = None
+        except sqlite3.Error as e:
+            self.last_error = str(e)
+            logger.warning(f"Leader heartbeat failed: {e}")
+            # Keep the role only while the last renewal's lease lasts;
+            # past it another worker may already have taken over
+            if self.is_leader and attempted_at >= self.renewed_at + self.lease_seconds:
+                self._demoted()
+            return self.is_leader
+        finally:
+            if conn is not None:
+                conn.close()
+        
+        if held:
+            self.renewed_at = attempted_at
+        if held and not self.is_leader:
+            self._elected()
+        elif not held and self.is_leader:
+            self._demoted()
+        else:
+            self.sync_settings()
+        return held
+    
+    def run_jobs(self) -> int:
+        """Claim forwarded jobs and run each in its own thread"""
+        conn = db_service.get_connection()
+        try:
+            jobs = leader.claim(conn, self.holder)
+        finally:
+            conn.close()
+        
+        for job in jobs:
+            threading.Thread(target=self._run_job, args=(job,), daemon=True).start()
+        return len(jobs)
+    
+    def _run_job(self, job: Dict[str, Any]):
+        result, error = None, None
+        try:
+            result = run_scheduler_job(job["kind"], job["params"])
+            self.jobs_run += 1
+        except Exception as e:
+            logger.error(f"Forwarded {job['kind']} job {job['id']} failed: {e}")
+            error = str(e) or type(e).__name__
+        
+        conn = db_service.get_connection()
+        try:
+            leader.finish(conn, job["id"], result, error)
+        finally:
+            conn.close()
+    
+    def start(self):
+        """Contend for the lease now, then heartbeat in the background"""
+        if self.is_running:
+            return
+        self.is_running = True
+        
+        if not self.enabled:
+            # Single worker: always the leader, no lease
+            self._elected()
+            return
+        
+        self.heartbeat()
+        stop = self._stop = threading.Event()
+        
+        def election_loop():
+            interval = max(self.lease_seconds / 3, 0.1)
+            next_beat = time.monotonic() + interval
+            while not stop.is_set():
+                try:
+                    if time.monotonic() >= next_beat:
+                        self.heartbeat()
+                        next_beat = time.monotonic() + interval
+                    if self.is_leader:
+                        self.run_jobs()
+                except Exception as e:
+                    self.last_error = str(e)
+                    logger.error(f"Leader election loop error: {e}")
+                sleep_while_running(stop, min(1.0, interval))
+        
+        self.thread = threading.Thread(target=election_loop, name="leader-election", daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Stop schedulers and hand the lease to a follower straight away"""
+        self.is_running = False
+        self._stop.set()
+        if self.thread:
+            self.thread.join(timeout=5)
+        
+        if self.is_leader:
+            self._demoted()
+            if self.enabled:
+                conn = db_service.get_connection()
+                try:
+                    leader.release(conn, self.LEASE, self.holder)
+                except sqlite3.Error as e:
+                    logger.warning(f"Could not release scheduler lease: {e}")
+                finally:
+                    conn.close()
+    
+    def status(self) -> Dict[str, Any]:
+        conn = db_service.get_connection()
+        try:
+            lease = leader.current(conn, self.LEASE)
+        finally:
+            conn.close()
+        
+        return {
+            "enabled": self.enabled,
+            "worker": self.holder,
+            "is_leader": self.is_leader,
+            "elected_at": self.elected_at.isoformat() if self.elected_at else None,
+            "elections": self.elections,
+            "jobs_run": self.jobs_run,
+            "lease": lease,
+            "last_error": self.last_error
+        }
+
+def run_scheduler_job(kind: str, params: Dict[str, Any]) -> Any:
+    """Run a manual scheduler trigger on this (leader) worker"""
+    if kind == "youtube":
+        channel_id = params.get("channel_id")
+        if channel_id:
+            return youtube_scheduler.process_channel(channel_id)
+        return youtube_scheduler.run_scheduled_job()
+    
+    if kind == "streams":
+        platform = params.get("platform")
+        if platform:
+            songs = asyncio.run(streams_scraper.scrape_platform_async(platform))
+            return {
+                "status": "success",
+                "platform": platform,
+                "songs_found": len(songs),
+                "songs_saved": streams_scraper.save_to_database(songs, platform)
+            }
+        return asyncio.run(streams_scheduler.run_scheduled_job_async())
+    
+    raise ValueError(f"Unknown scheduler job kind: {kind}")
+
+leader_election = LazyComponent(
+    "leader_election",
+    lambda: LeaderElection(lease_seconds=config.LEADER_LEASE_SECONDS,
+                           enabled=config.LEADER_ELECTION_ENABLED)
+)
+
 # ====== ENHANCED TRENDING ALGORITHM ======
 class EnhancedTrendingAlgorithm:
     """Enhanced trending algorithm with multiple factors"""
@@ -2242,14 +2850,73 @@ class AuthService:
 # ====== GLOBAL STATE ======
 current_chart_week = datetime.utcnow().strftime(config.CHART_WEEK_FORMAT)
 app_start_time = datetime.utcnow()
-request_count = 0
+
+# Pre-serialized chart pages; TTL bounds staleness of recency-weighted scores
+chart_cache = ResponseCache(ttl=float(os.getenv("CHART_CACHE_TTL", "30")), name="charts")
+
+# Cache misses for the same chart page build it once (see get_top100, get_regions)
+chart_flight = SingleFlight("charts", timeout=config.COALESCE_WAIT_SECONDS)
+export_flight = SingleFlight("exports", timeout=config.EXPORT_BUILD_WAIT_SECONDS)
+
+# Separate slots per route class so admin and ingest bursts can't starve chart reads
+concurrency_limits = concurrency.ConcurrencyLimits([
+    concurrency.Limiter(concurrency.PUBLIC, config.PUBLIC_CONCURRENCY, config.PUBLIC_QUEUE_MS / 1000),
+    concurrency.Limiter(concurrency.INGEST, config.INGEST_CONCURRENCY, config.INGEST_QUEUE_MS / 1000),
+    concurrency.Limiter(concurrency.HEAVY, config.HEAVY_CONCURRENCY, config.HEAVY_QUEUE_MS / 1000, service_time=0.5),
+    concurrency.Limiter(concurrency.ADMIN, config.ADMIN_CONCURRENCY, config.ADMIN_QUEUE_MS / 1000, service_time=5.0),
+])
+concurrency_limits.enabled = config.CONCURRENCY_LIMITS_ENABLED
+
+def _live_chart_snapshot(region: Optional[str]) -> List[Dict[str, Any]]:
+    """Ranked entries pushed by /charts/stream (identity and rank only)"""
+    return [
+        {
+            "key": chart_archive.song_key(song["title"], song["artist"]),
+            "rank": rank,
+            "title": song["title"],
+            "artist": song["artist"],
+            "score": round(song.get("unified_score") or 0, 2),
+        }
+        for rank, song in enumerate(db_service.get_top_songs(100, region), 1)
+    ]
+
+# One chart computation per change, shared by every live subscriber
+live_feed = ChartBroadcaster(
+    _live_chart_snapshot,
+    lambda: (db_service.chart_version, current_chart_week),
+    poll_interval=config.LIVE_FEED_POLL_SECONDS,
+    refresh_interval=chart_cache.ttl
+)
+
+# Durable ingest queue: /ingest/* fsync the batch and return 202.
+# Each worker appends to and drains its own subdirectory.
+ingest_queue = LazyComponent(
+    "ingest_queue",
+    lambda: IngestQueue(
+        config.INGEST_QUEUE_DIR / f"worker-{os.getpid()}",
+        apply=db_service.apply_ingest_batches,
+        fail=db_service.record_ingest_failure,
+        adopt_from=config.INGEST_QUEUE_DIR   # segments of workers that exited
+    )
+)
 
 # ====== LIFECYCLE ======
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifecycle"""
     
-    # Startup
+    # Startup: directories, database migrations and scrapers are built
+    # here rather than on import
+    config.validate()
+    warm_up(db_service, tv_scraper, radio_scraper, streams_scraper,
+            streams_scheduler, youtube_scheduler, retention_scheduler, leader_election)
+    
+    # Drop cached chart bodies as soon as any worker writes chart data
+    db_service.coherence.register("charts", chart_cache.clear)
+    
+    # History rows from scrapers and schedulers go through the batched writer
+    db_service.telemetry.start()
+
     logger.info("=" * 70)
     logger.info(f"🚀 UG BOARD ENGINE v12.0.0 - PRODUCTION READY WITH STREAMS")
     logger.info(f"📅 Chart Week: {current_chart_week}")
@@ -2260,19 +2927,26 @@ async def lifespan(app: FastAPI):
     logger.info(f"🎵 Streams Platforms: {len(streams_scraper.platforms)} configured")  # NEW
     logger.info("=" * 70)
     
-    # Start YouTube scheduler
+    # Schedulers (YouTube, streams, retention) run only in the worker
+    # holding the leader lease; the others take over if it goes away
     try:
-        youtube_scheduler.start_scheduler()
-        logger.info("✅ YouTube scheduler started")
+        leader_election.start()
+        if leader_election.is_leader:
+            logger.info(f"✅ Schedulers started: YouTube (first run in {config.YOUTUBE_INITIAL_DELAY}s), "
+                        f"streams ({config.STREAMS_SCHEDULE_INTERVAL}-hour interval), "
+                        f"retention ({config.HISTORY_RETENTION_DAYS}-day raw history)")
+        else:
+            logger.info(f"✅ Scheduler follower; leader lease held by another worker")
     except Exception as e:
-        logger.error(f"Failed to start YouTube scheduler: {e}")
+        logger.error(f"Failed to start leader election: {e}")
     
-    # Start Streams scheduler (NEW)
-    try:
-        streams_scheduler.start_scheduler()
-        logger.info(f"✅ Streams scheduler started ({config.STREAMS_SCHEDULE_INTERVAL}-hour interval)")
-    except Exception as e:
-        logger.error(f"Failed to start streams scheduler: {e}")
+    # Replay batches accepted before a crash, then drain new ones
+    if config.INGEST_QUEUE_ENABLED:
+        try:
+            ingest_queue.start()
+            logger.info(f"✅ Ingest queue started ({ingest_queue.replayed} batches replayed)")
+        except Exception as e:
+            logger.error(f"Failed to start ingest queue: {e}")
     
     # Create sample data if database is empty
     try:
@@ -2357,71 +3031,41 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("=" * 70)
     logger.info(f"🛑 UG Board Engine Shutting Down")
-    logger.info(f"📊 Total Requests: {request_count}")
+    logger.info(f"📊 Total Requests: {metrics.total_requests()}")
+    
+    await live_feed.close()
     
-    # Stop YouTube scheduler
-    youtube_scheduler.stop_scheduler()
-    logger.info("✅ YouTube scheduler stopped")
+    # Stop schedulers and release the lease so a follower takes over
+    leader_election.stop()
+    logger.info("✅ Schedulers stopped")
     
-    # Stop Streams scheduler (NEW)
-    streams_scheduler.stop_scheduler()
-    logger.info("✅ Streams scheduler stopped")
+    if is_initialized(ingest_queue):
+        ingest_queue.stop()
+        logger.info("✅ Ingest queue stopped")
     
+    # After the schedulers, so their last history rows are written too
+    flushed = db_service.telemetry.stop()
+    logger.info(f"✅ Telemetry flushed ({flushed} rows, {db_service.telemetry.dropped} dropped)")
+    
+    db_service.coherence.close()
     logger.info("✅ Shutdown complete")
     logger.info("=" * 70)
 
-# ====== FASTAPI APP ======
-app = FastAPI(
-    title="UG Board Engine v12.0.0",
-    version="12.0.0",
-    description="Complete Ugandan Music Chart System with Working Scrapers, YouTube Scheduler, and Streams Integration",
-    docs_url="/docs",
-    redoc_url="/redoc",
-    lifespan=lifespan,
-    openapi_tags=[
-        {"name": "Root", "description": "Service information"},
-        {"name": "Charts", "description": "Music chart endpoints"},
-        {"name": "Regions", "description": "Ugandan regional data"},
-        {"name": "Trending", "description": "Enhanced trending songs"},
-        {"name": "Scrapers", "description": "TV and Radio scraper management"},
-        {"name": "Streams", "description": "Streaming platforms scraping (NEW)"},  # NEW
-        {"name": "Ingestion", "description": "Data ingestion endpoints"},
-        {"name": "YouTube", "description": "YouTube scheduler and integration"},
-        {"name": "Admin", "description": "Administrative functions"},
-        {"name": "Scoring", "description": "Unified scoring system"},
-    ]
-)
-
-# ====== MIDDLEWARE ======
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "HEAD"],
-    allow_headers=["*"],
-)
-
-app.add_middleware(GZipMiddleware, minimum_size=500)
+# ====== ROUTES ======
+# Endpoints register on a router; create_app() assembles the application
+router = APIRouter()
 
 # ====== API ENDPOINTS ======
 
-@app.get("/", tags=["Root"])
+@router.get("/", tags=["Root"])
 async def root():
     """Root endpoint with comprehensive system information"""
-    global request_count
-    request_count += 1
-    
     window_info = trending_algorithm.get_trending_window_info()
     
     # Get database stats
-    conn = db_service.get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM songs")
-    total_songs = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(DISTINCT source_type) FROM songs")
-    source_types = cursor.fetchone()[0]
-    conn.close()
+    counts = db_service.get_counters()["songs"]
+    total_songs = counts["total"]
+    source_types = len(counts["source_type"])
     
     return {
         "service": "UG Board Engine",
@@ -2433,7 +3077,7 @@ async def root():
         "trending_window": window_info,
         "system": {
             "uptime_seconds": int((datetime.utcnow() - app_start_time).total_seconds()),
-            "requests_served": request_count,
+            "requests_served": metrics.total_requests(),
             "total_songs": total_songs,
             "source_types": source_types,
             "youtube_scheduler": youtube_scheduler.is_running,
@@ -2452,10 +3096,20 @@ async def root():
         "endpoints": {
             "docs": "/docs",
             "health": "/health",
+            "liveness": "/health/live",
+            "readiness": "/health/ready",
             "charts": {
                 "top100": "/charts/top100",
                 "trending": "/charts/trending",
-                "regions": "/charts/regions"
+                "regions": "/charts/regions",
+                "published_top100": "/charts/published/{week_id}/top100",
+                "published_region": "/charts/published/{week_id}/regions/{region}"
+            },
+            "search": "/search?q=",
+            "exports": {
+                "songs": "/export/songs?format=csv",
+                "charts": "/export/charts/{week}",
+                "history": "/export/history"
             },
             "scrapers": {
                 "tv": "/scrapers/tv",
@@ -2479,43 +3133,26 @@ async def root():
         }
     }
 
-@app.get("/health", tags=["Root"])
+@router.get("/health", tags=["Root"])
 async def health():
     """Comprehensive health check"""
     uptime = datetime.utcnow() - app_start_time
     
-    # Get database stats
-    conn = db_service.get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT COUNT(*) FROM songs")
-    total_songs = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM songs WHERE source_type = 'tv'")
-    tv_songs = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM songs WHERE source_type = 'radio'")
-    radio_songs = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM songs WHERE source_type = 'youtube'")
-    youtube_songs = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM songs WHERE source_type = 'streaming'")  # NEW
-    streaming_songs = cursor.fetchone()[0]
-    
-    conn.close()
+    # Get database stats (maintained counters, no table scans)
+    counts = db_service.get_counters()
+    by_source = counts["songs"]["source_type"]
     
     health_status = {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
         "uptime": str(uptime).split('.')[0],
-        "requests_served": request_count,
+        "requests_served": metrics.total_requests(),
         "database": {
-            "total_songs": total_songs,
-            "tv_songs": tv_songs,
-            "radio_songs": radio_songs,
-            "youtube_songs": youtube_songs,
-            "streaming_songs": streaming_songs  # NEW
+            "total_songs": counts["songs"]["total"],
+            "tv_songs": by_source.get("tv", 0),
+            "radio_songs": by_source.get("radio", 0),
+            "youtube_songs": by_source.get("youtube", 0),
+            "streaming_songs": by_source.get("streaming", 0)  # NEW
         },
         "services": {
             "youtube_scheduler": youtube_scheduler.is_running,
@@ -2529,52 +3166,200 @@ async def health():
     
     return health_status
 
-# ====== STREAMS ENDPOINTS (NEW) ======
+@router.get("/health/live", tags=["Root"])
+async def health_live():
+    """Liveness probe: the process is serving requests (touches nothing else)"""
+    return {
+        "status": "alive",
+        "uptime_seconds": int((datetime.utcnow() - app_start_time).total_seconds())
+    }
 
-@app.get("/streams/status", tags=["Streams"])
-async def get_streams_status(auth: bool = Depends(AuthService.verify_ingest)):
-    """Get streams scheduler status"""
+def _scheduler_lag(scheduler) -> Optional[Dict[str, Any]]:
+    """Seconds a running scheduler is behind its next planned run"""
+    if not is_initialized(scheduler) or not scheduler.is_running:
+        return None
+    
+    next_run = scheduler.next_run
+    lag = (datetime.utcnow() - next_run).total_seconds() if next_run else 0.0
     return {
-        "status": "running" if streams_scheduler.is_running else "stopped",
-        "interval_hours": streams_scheduler.interval_hours,
-        "platforms": list(streams_scraper.platforms.keys()),
-        "enabled_platforms": [p for p, config in streams_scraper.platforms.items() if config.get("enabled", True)],
-        "platform_details": {
-            platform: {
-                "name": config["name"],
-                "method": config.get("method", "requests"),
-                "enabled": config.get("enabled", True),
-                "weight": config.get("weight", 1.0)
-            }
-            for platform, config in streams_scraper.platforms.items()
+        "next_run": next_run.isoformat() if next_run else None,
+        "lag_seconds": round(max(lag, 0.0), 1)
+    }
+
+@router.get("/health/ready", tags=["Root"])
+async def health_ready():
+    """
+    Readiness probe (no database queries).
+    503 until startup has finished or while database connections are saturated.
+    Scheduler lag and scraper backlog are reported, not gated on.
+    """
+    open_connections = metrics.open_connections()
+    saturation = open_connections / config.DB_MAX_CONNECTIONS
+    initialized = is_initialized(db_service)
+    ready = initialized and saturation < 1.0
+    
+    checks = {
+        "status": "ready" if ready else "not_ready",
+        "initialized": initialized,
+        "database": {
+            "open_connections": open_connections,
+            "max_connections": config.DB_MAX_CONNECTIONS,
+            "saturation": round(saturation, 3)
         },
-        "last_run": streams_scheduler.last_run.isoformat() if streams_scheduler.last_run else None,
-        "next_run": streams_scheduler.next_run.isoformat() if streams_scheduler.next_run else None,
-        "playwright_enabled": streams_scraper.use_playwright
+        "schedulers": {
+            "youtube": _scheduler_lag(youtube_scheduler),
+            "streams": _scheduler_lag(streams_scheduler),
+            "retention": _scheduler_lag(retention_scheduler)
+        },
+        "scraper_backlog": metrics.jobs_in_flight(),
+        "timestamp": datetime.utcnow().isoformat()
     }
+    
+    return FastJSONResponse(
+        checks,
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
 
-@app.post("/streams/scrape", tags=["Streams"])
-async def trigger_streams_scraping(
-    platform: Optional[str] = Query(None, description="Specific platform to scrape (songboost, spotify, boomplay, audiomack)"),
-    background: bool = Query(True, description="Run in background"),
-    auth: bool = Depends(AuthService.verify_ingest)
-):
-    """Trigger streams scraping manually"""
-    try:
-        if platform:
-            # Scrape specific platform
-            if platform not in streams_scraper.platforms:
+@router.get("/metrics", tags=["Monitoring"], include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus text exposition of request, database, scraper and scheduler metrics"""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+# ====== SCHEDULER LEADER ======
+
+async def _forward_to_leader(kind: str, params: Dict[str, Any], wait: bool):
+    """
+    Queue a manual trigger for the leader worker. With wait, poll for
+    its result (up to LEADER_JOB_WAIT_SECONDS) instead of returning 202.
+    """
+    def enqueue():
+        conn = db_service.get_connection()
+        try:
+            return leader.enqueue(conn, kind, params, leader_election.holder)
+        finally:
+            conn.close()
+    
+    job_id = await asyncio.to_thread(enqueue)
+    
+    if wait:
+        deadline = time.monotonic() + config.LEADER_JOB_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.5)
+            job = await asyncio.to_thread(_get_scheduler_job, job_id)
+            if job and job["status"] == "completed":
+                return job["result"]
+            if job and job["status"] == "failed":
                 raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Unknown platform: {platform}. Available: {list(streams_scraper.platforms.keys())}"
+                    status_code=status.HTTP_502_BAD_GATEWAY,
+                    detail=f"Leader worker failed {kind} job {job_id}: {job['error']}"
                 )
-            
-            if not streams_scraper.platforms[platform].get("enabled", True):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Platform {platform} is disabled"
-                )
-            
+    
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "status": "queued",
+            "message": f"{kind} job forwarded to the scheduler leader",
+            "job_id": job_id,
+            "status_url": f"/scheduler/jobs/{job_id}",
+            **params
+        }
+    )
+
+def _get_scheduler_job(job_id: int) -> Optional[Dict[str, Any]]:
+    conn = db_service.get_connection()
+    try:
+        return leader.get(conn, job_id)
+    finally:
+        conn.close()
+
+def _store_schedule_setting(name: str, value: Any):
+    conn = db_service.get_connection()
+    try:
+        leader.set_setting(conn, name, value)
+    finally:
+        conn.close()
+
+def _restart_scheduler(scheduler):
+    """Stop and start a scheduler; blocks while its loop finishes (run off the event loop)"""
+    scheduler.stop_scheduler()
+    scheduler.start_scheduler()
+
+@router.get("/scheduler/leader", tags=["Monitoring"])
+async def get_scheduler_leader(auth: bool = Depends(AuthService.verify_admin)):
+    """Which worker holds the scheduler lease, and this worker's role"""
+    try:
+        return await asyncio.to_thread(leader_election.status)
+    except Exception as e:
+        logger.error(f"Leader status error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to read leader status: {str(e)}"
+        )
+
+@router.get("/scheduler/jobs/{job_id}", tags=["Monitoring"])
+async def get_scheduler_job(
+    job_id: int = FPath(..., ge=1),
+    auth: bool = Depends(AuthService.verify_ingest)
+):
+    """Status and result of a trigger forwarded to the leader"""
+    job = await asyncio.to_thread(_get_scheduler_job, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown scheduler job {job_id}"
+        )
+    return job
+
+# ====== STREAMS ENDPOINTS (NEW) ======
+
+@router.get("/streams/status", tags=["Streams"])
+async def get_streams_status(auth: bool = Depends(AuthService.verify_ingest)):
+    """Get streams scheduler status"""
+    return {
+        "status": "running" if streams_scheduler.is_running else "stopped",
+        "interval_hours": streams_scheduler.interval_hours,
+        "platforms": list(streams_scraper.platforms.keys()),
+        "enabled_platforms": [p for p, config in streams_scraper.platforms.items() if config.get("enabled", True)],
+        "platform_details": {
+            platform: {
+                "name": config["name"],
+                "method": config.get("method", "requests"),
+                "enabled": config.get("enabled", True),
+                "weight": config.get("weight", 1.0)
+            }
+            for platform, config in streams_scraper.platforms.items()
+        },
+        "last_run": streams_scheduler.last_run.isoformat() if streams_scheduler.last_run else None,
+        "next_run": streams_scheduler.next_run.isoformat() if streams_scheduler.next_run else None,
+        "playwright_enabled": streams_scraper.use_playwright
+    }
+
+@router.post("/streams/scrape", tags=["Streams"])
+async def trigger_streams_scraping(
+    platform: Optional[str] = Query(None, description="Specific platform to scrape (songboost, spotify, boomplay, audiomack)"),
+    background: bool = Query(True, description="Run in background"),
+    auth: bool = Depends(AuthService.verify_ingest)
+):
+    """Trigger streams scraping manually (forwarded to the leader worker)"""
+    try:
+        if platform and platform not in streams_scraper.platforms:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown platform: {platform}. Available: {list(streams_scraper.platforms.keys())}"
+            )
+        
+        if platform and not streams_scraper.platforms[platform].get("enabled", True):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Platform {platform} is disabled"
+            )
+        
+        if leader_election.is_follower:
+            params = {"platform": platform} if platform else {}
+            return await _forward_to_leader("streams", params, wait=not background)
+        
+        if platform:
+            # Scrape specific platform
             if background:
                 # Run in background thread
                 threading.Thread(
@@ -2617,6 +3402,8 @@ async def trigger_streams_scraping(
                 result = await streams_scraper.scrape_all_async()
                 return result
                 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Streams scraping error: {e}")
         raise HTTPException(
@@ -2624,7 +3411,7 @@ async def trigger_streams_scraping(
             detail=f"Streams scraping failed: {str(e)}"
         )
 
-@app.get("/streams/platforms", tags=["Streams"])
+@router.get("/streams/platforms", tags=["Streams"])
 async def get_streams_platforms(auth: bool = Depends(AuthService.verify_ingest)):
     """Get streams platform configurations"""
     platforms_info = {}
@@ -2647,7 +3434,7 @@ async def get_streams_platforms(auth: bool = Depends(AuthService.verify_ingest))
         "playwright_required": any(p.get("method") == "playwright" for p in platforms_info.values())
     }
 
-@app.post("/streams/platforms/{platform_id}/toggle", tags=["Streams"])
+@router.post("/streams/platforms/{platform_id}/toggle", tags=["Streams"])
 async def toggle_streams_platform(
     platform_id: str,
     enabled: bool = Query(..., description="Enable or disable platform"),
@@ -2670,7 +3457,7 @@ async def toggle_streams_platform(
         "message": f"Platform {platform_id} ({streams_scraper.platforms[platform_id]['name']}) {'enabled' if enabled else 'disabled'}"
     }
 
-@app.get("/streams/stats", tags=["Streams"])
+@router.get("/streams/stats", tags=["Streams"])
 async def get_streams_stats(
     days: int = Query(7, ge=1, le=30, description="Number of days to include in stats"),
     auth: bool = Depends(AuthService.verify_ingest)
@@ -2699,7 +3486,7 @@ async def get_streams_stats(
             detail=f"Failed to get streams stats: {str(e)}"
         )
 
-@app.post("/streams/schedule", tags=["Streams"])
+@router.post("/streams/schedule", tags=["Streams"])
 async def update_streams_schedule(
     interval_hours: int = Query(6, ge=1, le=24, description="New interval in hours"),
     auth: bool = Depends(AuthService.verify_admin)
@@ -2714,11 +3501,13 @@ async def update_streams_schedule(
             "message": f"Interval already set to {interval_hours} hours"
         }
     
+    # Stored for every worker; the leader restarts its scheduler on the
+    # next heartbeat (or right here if this worker is the leader)
+    await asyncio.to_thread(_store_schedule_setting, "streams_interval_hours", interval_hours)
     streams_scheduler.interval_hours = interval_hours
     
-    # Restart scheduler with new interval
-    streams_scheduler.stop_scheduler()
-    streams_scheduler.start_scheduler()
+    if not leader_election.is_follower:
+        await asyncio.to_thread(_restart_scheduler, streams_scheduler)
     
     return {
         "status": "updated",
@@ -2729,7 +3518,7 @@ async def update_streams_schedule(
 
 # ====== SCRAPER ENDPOINTS ======
 
-@app.post("/scrapers/tv", tags=["Scrapers"])
+@router.post("/scrapers/tv", tags=["Scrapers"])
 async def run_tv_scraper(
     station_id: Optional[str] = Query(None),
     background: bool = Query(False),
@@ -2783,7 +3572,7 @@ async def run_tv_scraper(
             result["total_added_to_database"] = total_added
             return result
 
-@app.post("/scrapers/radio", tags=["Scrapers"])
+@router.post("/scrapers/radio", tags=["Scrapers"])
 async def run_radio_scraper(
     station_id: Optional[str] = Query(None),
     background: bool = Query(False),
@@ -2837,7 +3626,7 @@ async def run_radio_scraper(
             result["total_added_to_database"] = total_added
             return result
 
-@app.post("/scrapers/run/all", tags=["Scrapers"])
+@router.post("/scrapers/run/all", tags=["Scrapers"])
 async def run_all_scrapers(
     background: bool = Query(False),
     auth: bool = Depends(AuthService.verify_ingest)
@@ -2873,7 +3662,7 @@ async def run_all_scrapers(
 
 # ====== YOUTUBE ENDPOINTS ======
 
-@app.get("/youtube/status", tags=["YouTube"])
+@router.get("/youtube/status", tags=["YouTube"])
 async def get_youtube_status(auth: bool = Depends(AuthService.verify_ingest)):
     """Get YouTube scheduler status"""
     return {
@@ -2885,13 +3674,17 @@ async def get_youtube_status(auth: bool = Depends(AuthService.verify_ingest)):
                     if youtube_scheduler.last_run else None
     }
 
-@app.post("/youtube/trigger", tags=["YouTube"])
+@router.post("/youtube/trigger", tags=["YouTube"])
 async def trigger_youtube_scheduler(
     channel_id: Optional[str] = Query(None),
     background: bool = Query(False),
     auth: bool = Depends(AuthService.verify_youtube)
 ):
-    """Trigger YouTube scheduler manually"""
+    """Trigger YouTube scheduler manually (forwarded to the leader worker)"""
+    if leader_election.is_follower:
+        params = {"channel_id": channel_id} if channel_id else {}
+        return await _forward_to_leader("youtube", params, wait=not background)
+    
     if channel_id:
         if background:
             threading.Thread(
@@ -2924,17 +3717,18 @@ async def trigger_youtube_scheduler(
             result = youtube_scheduler.run_scheduled_job()
             return result
 
-@app.post("/youtube/schedule", tags=["YouTube"])
+@router.post("/youtube/schedule", tags=["YouTube"])
 async def update_youtube_schedule(
     interval: int = Query(30, ge=5, le=1440),
     auth: bool = Depends(AuthService.verify_admin)
 ):
     """Update YouTube scheduler interval"""
     old_interval = youtube_scheduler.interval
+    await asyncio.to_thread(_store_schedule_setting, "youtube_interval_minutes", interval)
     youtube_scheduler.interval = interval
     
-    youtube_scheduler.stop_scheduler()
-    youtube_scheduler.start_scheduler()
+    if not leader_election.is_follower:
+        await asyncio.to_thread(_restart_scheduler, youtube_scheduler)
     
     return {
         "status": "updated",
@@ -2945,54 +3739,258 @@ async def update_youtube_schedule(
 
 # ====== CHART ENDPOINTS ======
 
-@app.get("/charts/top100", tags=["Charts"])
+CHART_PAGE_MAX = 200
+
+CHART_FIELDS = set(DatabaseService.CHART_COLUMNS) | {
+    "rank", "unified_score", "total_plays", "source_count", "source_icon",
+    "platform", "platform_icon", "last_week_rank", "peak_rank", "weeks_on_chart",
+}
+
+def _encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        kind, _, value = raw.partition(":")
+        offset = int(value)
+        if kind != "o" or not 0 <= offset < CHART_PAGE_MAX:
+            raise ValueError(cursor)
+        return offset
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def _still_computing(error: SingleFlightTimeout) -> HTTPException:
+    """503 for a request that gave up waiting on an identical in-flight build"""
+    logger.warning(f"Chart build still in flight: {error}")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Chart is still being computed, retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
+def build_top100_payload(limit: int, offset: int, region: Optional[str],
+                         fields: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+    """Chart page as a plain dict (serialized once and cached by the endpoint)"""
+    # One extra row tells us whether another page exists
+    songs = db_service.get_top_songs(limit + 1, region, offset=offset)
+    has_more = len(songs) > limit and offset + limit < CHART_PAGE_MAX
+    songs = songs[:limit]
+    
+    # Add ranks and source info
+    for i, song in enumerate(songs, offset + 1):
+        song['rank'] = i
+        song['source_icon'] = {
+            'youtube': '📹',
+            'tv': '📺',
+            'radio': '📻',
+            'streaming': '🎵'  # NEW: Streaming icon
+        }.get(song.get('source_type', ''), '🎵')
+        
+        # Add platform info for streams
+        if song.get('source_type') == 'streaming' and song.get('stream_platform'):
+            song['platform'] = song['stream_platform']
+            song['platform_icon'] = {
+                'spotify': '🟢',
+                'songboost': '📻',
+                'boomplay': '🎶',
+                'audiomack': '🎧'
+            }.get(song['stream_platform'], '🎵')
+    
+    # Last week / peak / weeks on chart from the indexed archive
+    chart_archive.attach_history(
+        songs,
+        chart="region" if region else "top100",
+        region=region
+    )
+    
+    source_types = list(set([s.get('source_type', '') for s in songs]))
+    if fields:
+        songs = [{f: song.get(f) for f in fields} for song in songs]
+    
+    return {
+        "chart": "Uganda Top 100" + (f" - {region.capitalize()}" if region else ""),
+        "week": current_chart_week,
+        "entries": songs,
+        "count": len(songs),
+        "offset": offset,
+        "next_cursor": _encode_cursor(offset + limit) if has_more else None,
+        "region": region if region else "all",
+        "scoring_system": "unified",
+        "source_types": source_types,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@router.get("/charts/top100", tags=["Charts"])
 async def get_top100(
-    limit: int = Query(100, ge=1, le=200),
+    request: Request,
+    limit: int = Query(100, ge=1, le=CHART_PAGE_MAX),
+    region: Optional[str] = Query(None),
+    offset: int = Query(0, ge=0, lt=CHART_PAGE_MAX),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated entry fields, e.g. rank,title,artist")
+):
+    """
+    Get Uganda Top 100 chart with streams integration.
+    Pages are serialized and gzipped once per chart version and served
+    from memory until the data changes (or CHART_CACHE_TTL expires).
+    Concurrent misses for the same page share one build.
+    """
+    if cursor:
+        offset = _decode_cursor(cursor)
+    limit = min(limit, CHART_PAGE_MAX - offset)
+    
+    selected = None
+    if fields:
+        selected = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = [f for f in selected if f not in CHART_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+    
+    try:
+        key = ("top100", region or None, limit, offset, selected)
+        version = (db_service.chart_version, current_chart_week)
+        body = chart_cache.lookup(key, version)
+        if body is None:
+            # A burst of misses for this page builds it once, off the event loop
+            body = await chart_flight.run(
+                (key, version),
+                lambda: chart_cache.put(key, version, build_top100_payload(limit, offset, region, selected))
+            )
+        return body.response(request)
+        
+    except SingleFlightTimeout as e:
+        raise _still_computing(e)
+    except Exception as e:
+        logger.error(f"Error in /charts/top100: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch chart: {str(e)}"
+        )
+
+def _live_feed_region(region: Optional[str]) -> Optional[str]:
+    if region is not None and region not in config.VALID_REGIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid region. Must be one of: {', '.join(sorted(config.VALID_REGIONS))}"
+        )
+    return region
+
+@router.get("/charts/stream", tags=["Charts"])
+async def stream_chart(region: Optional[str] = Query(None)):
+    """
+    Live chart feed (Server-Sent Events).
+    Sends a `snapshot` event, then a `diff` event (entered / moved / dropped)
+    whenever the chart's ranks change. Replaces polling /charts/top100.
+    """
+    region = _live_feed_region(region)
+    
+    return StreamingResponse(
+        live_feed.sse(region),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/charts/ws")
+async def chart_websocket(websocket: WebSocket, region: Optional[str] = None):
+    """Live chart feed over WebSocket: same snapshot / diff events as /charts/stream"""
+    if region is not None and region not in config.VALID_REGIONS:
+        await websocket.close(code=1008)
+        return
+    
+    await websocket.accept()
+    subscription = await live_feed.subscribe(region)
+    
+    async def forward():
+        async for event in live_feed.events(subscription):
+            if event is not None:
+                await websocket.send_text(dumps(event).decode("utf-8"))
+    
+    async def until_closed():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    
+    tasks = [asyncio.create_task(forward()), asyncio.create_task(until_closed())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                logger.error(f"Error in /charts/ws: {task.exception()}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        live_feed.unsubscribe(subscription)
+
+@router.get("/charts/history", tags=["Charts"])
+async def get_chart_history(
+    title: str = Query(..., min_length=1),
+    artist: str = Query(..., min_length=1),
     region: Optional[str] = Query(None)
 ):
-    """Get Uganda Top 100 chart with streams integration"""
+    """Get a song's full chart run from the archive"""
     try:
-        songs = db_service.get_top_songs(limit, region)
+        key = chart_archive.song_key(title, artist)
+        run = chart_archive.get_song_run(
+            key,
+            chart="region" if region else "top100",
+            region=region
+        )
         
-        # Add ranks and source info
-        for i, song in enumerate(songs, 1):
-            song['rank'] = i
-            song['source_icon'] = {
-                'youtube': '📹',
-                'tv': '📺',
-                'radio': '📻',
-                'streaming': '🎵'  # NEW: Streaming icon
-            }.get(song.get('source_type', ''), '🎵')
-            
-            # Add platform info for streams
-            if song.get('source_type') == 'streaming' and song.get('stream_platform'):
-                song['platform'] = song['stream_platform']
-                song['platform_icon'] = {
-                    'spotify': '🟢',
-                    'songboost': '📻',
-                    'boomplay': '🎶',
-                    'audiomack': '🎧'
-                }.get(song['stream_platform'], '🎵')
+        return {
+            "title": title,
+            "artist": artist,
+            "region": region if region else "all",
+            "weeks_on_chart": run[-1]["weeks_on_chart"] if run else 0,
+            "peak_rank": min(entry["rank"] for entry in run) if run else None,
+            "run": run,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error in /charts/history: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch chart history: {str(e)}"
+        )
+
+@router.get("/charts/archive/{week_id}", tags=["Charts"])
+async def get_archived_chart(
+    week_id: str = FPath(..., pattern=r"^\d{4}-W\d{2}$"),
+    region: Optional[str] = Query(None)
+):
+    """Get an archived chart week with its week-over-week diff"""
+    try:
+        chart = "region" if region else "top100"
+        entries = chart_archive.get_chart(week_id, chart=chart, region=region)
+        
+        if not entries:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No archived chart for week {week_id}"
+            )
         
         return {
-            "chart": "Uganda Top 100" + (f" - {region.capitalize()}" if region else ""),
-            "week": current_chart_week,
-            "entries": songs,
-            "count": len(songs),
+            "week_id": week_id,
             "region": region if region else "all",
-            "scoring_system": "unified",
-            "source_types": list(set([s.get('source_type', '') for s in songs])),
+            "entries": entries,
+            "count": len(entries),
+            "changes": chart_archive.week_over_week(week_id, chart=chart, region=region),
             "timestamp": datetime.utcnow().isoformat()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error in /charts/top100: {e}")
+        logger.error(f"Error in /charts/archive/{week_id}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch chart: {str(e)}"
+            detail=f"Failed to fetch archived chart: {str(e)}"
         )
 
-@app.get("/charts/trending", tags=["Charts", "Trending"])
+@router.get("/charts/trending", tags=["Charts", "Trending"])
 async def get_trending(limit: int = Query(10, ge=1, le=50)):
     """Get trending songs with enhanced algorithm including streams"""
     try:
@@ -3033,46 +4031,414 @@ async def get_trending(limit: int = Query(10, ge=1, le=50)):
             detail=f"Failed to fetch trending: {str(e)}"
         )
 
-@app.get("/charts/regions", tags=["Charts", "Regions"])
+def build_regions_payload() -> Dict[str, Any]:
+    """Region statistics with each region's top 5"""
+    regions_data = {}
+    
+    for region_code, region_info in config.UGANDAN_REGIONS.items():
+        songs = db_service.get_top_songs(5, region_code)
+        
+        regions_data[region_code] = {
+            "name": region_info["name"],
+            "total_songs": len(songs),
+            "top_songs": songs,
+            "districts": region_info["districts"],
+            "musicians": artist_registry.region_artists().get(region_code, [])[:5],
+            "tv_stations": region_info.get("tv_stations", []),
+            "radio_stations": region_info.get("radio_stations", []),
+            "source_distribution": {
+                source_type: len([s for s in songs if s.get('source_type') == source_type])
+                for source_type in set([s.get('source_type', '') for s in songs])
+            }
+        }
+    
+    return {
+        "regions": regions_data,
+        "count": len(regions_data),
+        "chart_week": current_chart_week,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@router.get("/charts/regions", tags=["Charts", "Regions"])
 async def get_regions():
-    """Get region statistics"""
+    """Get region statistics (concurrent requests share one build)"""
     try:
-        regions_data = {}
-        
-        for region_code, region_info in config.UGANDAN_REGIONS.items():
-            songs = db_service.get_top_songs(5, region_code)
-            
-            regions_data[region_code] = {
-                "name": region_info["name"],
-                "total_songs": len(songs),
-                "top_songs": songs,
-                "districts": region_info["districts"],
-                "musicians": region_info["musicians"][:5],
-                "tv_stations": region_info.get("tv_stations", []),
-                "radio_stations": region_info.get("radio_stations", []),
-                "source_distribution": {
-                    source_type: len([s for s in songs if s.get('source_type') == source_type])
-                    for source_type in set([s.get('source_type', '') for s in songs])
-                }
-            }
+        return await chart_flight.run(
+            ("regions", db_service.chart_version, current_chart_week),
+            build_regions_payload
+        )
+        
+    except SingleFlightTimeout as e:
+        raise _still_computing(e)
+    except Exception as e:
+        logger.error(f"Error in /charts/regions: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch regions: {str(e)}"
+        )
+
+# ====== SEARCH ENDPOINTS ======
+
+SEARCH_SOURCE_TYPES = {"tv", "radio", "youtube", "streaming"}
+
+@router.get("/search", tags=["Search"])
+async def search_catalog(
+    q: str = Query(..., min_length=1, max_length=100, description="Song title and/or artist (prefixes match)"),
+    limit: int = Query(10, ge=1, le=50),
+    region: Optional[str] = Query(None),
+    source_type: Optional[str] = Query(None),
+    week: Optional[str] = Query(None, pattern=r"^\d{4}-W\d{2}$", description="Chart week, e.g. 2026-W41")
+):
+    """
+    Type-ahead search over songs and artists (FTS5).
+    Results are ranked by chart score; a misspelt word is corrected to
+    the closest indexed term when the query has no matches. Only the
+    newest matches are ranked; "truncated" says when a broad query hit
+    that cap, so narrow the query for a complete ranking.
+    """
+    if region and region not in config.VALID_REGIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid region. Must be one of: {', '.join(sorted(config.VALID_REGIONS))}"
+        )
+    if source_type and source_type not in SEARCH_SOURCE_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid source_type. Must be one of: {', '.join(sorted(SEARCH_SOURCE_TYPES))}"
+        )
+    if week:
+        try:
+            search.week_bounds(week)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid week {week}: not an ISO week"
+            )
+    
+    try:
+        start = time.perf_counter()
+        result = db_service.search_songs(q, limit, region, source_type, week)
         
         return {
-            "regions": regions_data,
-            "count": len(regions_data),
-            "chart_week": current_chart_week,
+            "query": q,
+            "corrected": result["corrected"],
+            "songs": result["songs"],
+            "artists": result["artists"],
+            "count": len(result["songs"]),
+            "truncated": result["truncated"],
+            "ranked_candidates": search.SEARCH_CANDIDATES,
+            "filters": {"region": region, "source_type": source_type, "week": week},
+            "took_ms": round((time.perf_counter() - start) * 1000, 2),
             "timestamp": datetime.utcnow().isoformat()
         }
         
     except Exception as e:
-        logger.error(f"Error in /charts/regions: {e}")
+        logger.error(f"Error in /search: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch regions: {str(e)}"
+            detail=f"Search failed: {str(e)}"
+        )
+
+# ====== PUBLISHED CHART BUNDLES ======
+
+WEEK_ID_PATTERN = r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,31}$"
+BUNDLE_IMMUTABLE = "public, max-age=31536000, immutable"
+BUNDLE_ALIAS_CACHE = "no-cache"  # week URLs move when a week is republished; revalidate by ETag
+
+def _bundle_response(request: Request, digest: str, cache_control: str) -> Response:
+    """
+    Serve a stored bundle variant as a file (no parsing); 304 when the
+    client already has it.
+    """
+    path, encoding = chart_bundles.choose(digest, request.headers.get("accept-encoding", ""))
+    etag = f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+        "Content-Location": f"/charts/bundles/{digest}",
+    }
+    
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in if_none_match or if_none_match.strip() == "*":
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return FileResponse(path, media_type="application/json", headers=headers)
+
+@router.get("/charts/bundles/{digest}", tags=["Charts"])
+async def get_chart_bundle(
+    request: Request,
+    digest: str = FPath(..., pattern=r"^[0-9a-f]{64}$")
+):
+    """Content-addressed published chart (immutable; CDN cacheable)"""
+    if not chart_bundles.object_path(digest).exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown chart bundle {digest}"
+        )
+    return _bundle_response(request, digest, BUNDLE_IMMUTABLE)
+
+@router.get("/charts/published/{week_id}/top100", tags=["Charts"])
+async def get_published_top100(
+    request: Request,
+    week_id: str = FPath(..., pattern=WEEK_ID_PATTERN)
+):
+    """Published Top 100 snapshot for a week, served from its bundle"""
+    try:
+        digest = await asyncio.to_thread(top100_snapshot.top100_bundle, week_id)
+    except Exception as e:
+        logger.error(f"Error loading Top 100 bundle for {week_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to load published chart: {str(e)}"
+        )
+    
+    if digest is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No published Top 100 for week {week_id}"
+        )
+    return _bundle_response(request, digest, BUNDLE_ALIAS_CACHE)
+
+@router.get("/charts/published/{week_id}/regions/{region}", tags=["Charts", "Regions"])
+async def get_published_region(
+    request: Request,
+    week_id: str = FPath(..., pattern=WEEK_ID_PATTERN),
+    region: str = FPath(..., min_length=1, max_length=32)
+):
+    """Published regional snapshot for a week, served from its bundle"""
+    region = region.title()
+    if region not in region_snapshots.VALID_REGIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid region. Must be one of: {', '.join(region_snapshots.VALID_REGIONS)}"
+        )
+    
+    try:
+        digest = await asyncio.to_thread(region_snapshots.region_bundle, region, week_id)
+    except Exception as e:
+        logger.error(f"Error loading {region} bundle for {week_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to load published chart: {str(e)}"
+        )
+    
+    if digest is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No published {region} chart for week {week_id}"
+        )
+    return _bundle_response(request, digest, BUNDLE_ALIAS_CACHE)
+
+# ====== EXPORT ENDPOINTS ======
+
+HISTORY_EXPORT_TABLES = {"raw": None, "hourly": "history_hourly", "daily": "history_daily"}
+
+def _check_export_format(fmt: str):
+    if fmt not in exports.available_formats():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Format {fmt} unavailable (install pyarrow for Parquet). "
+                   f"Available: {', '.join(exports.available_formats())}"
+        )
+
+async def _export_response(request: Request, key: str, fmt: str, filename: str, body) -> Response:
+    """
+    Serve an export. `body` builds the encoded stream and is only called
+    when there is no spool file for `key` yet: a plain download then
+    streams straight from the database, spooling the bytes as they go
+    out. Once spooled, the ETag is the hash of the file. A Range request
+    (resume) is answered 206 from the file its If-Range names, even if
+    newer data has moved the key on; with no file yet, it waits for one
+    shared background build. If-Range with an unknown ETag gets the
+    whole, current export.
+    """
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+    media_type = exports.MEDIA_TYPES[fmt]
+    range_header = request.headers.get("range")
+    if_range = (request.headers.get("if-range") or "").strip('"')
+    
+    spooled = exports.spooled(key, fmt)
+    if range_header and if_range and (spooled is None or spooled[1] != if_range):
+        path = exports.spooled_tag(if_range, fmt)
+        if path is not None:
+            spooled = path, if_range
+    
+    if spooled is None and not range_header:
+        return StreamingResponse(exports.spool(key, fmt, body()), media_type=media_type, headers=headers)
+    
+    if spooled is None:
+        try:
+            spooled = await export_flight.run(key, lambda: exports.build(key, fmt, body()))
+        except SingleFlightTimeout as e:
+            logger.warning(f"Export build for a Range request still in flight: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Export is still being built, retry shortly",
+                headers={"Retry-After": "5"}
+            )
+    path, tag = spooled
+    headers["ETag"] = f'"{tag}"'
+    size = path.stat().st_size
+    
+    if range_header and (not if_range or if_range == tag):
+        try:
+            span = exports.parse_range(range_header, size)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail=f"Range not satisfiable (export is {size} bytes)",
+                headers={"Content-Range": f"bytes */{size}"}
+            )
+        if span:
+            start, end = span
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                exports.read_file(path, start, end),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type=media_type,
+                headers=headers
+            )
+    
+    headers["Content-Length"] = str(size)
+    return StreamingResponse(exports.read_file(path), media_type=media_type, headers=headers)
+
+@router.get("/export/songs", tags=["Export"])
+async def export_songs(
+    request: Request,
+    fmt: str = Query("csv", alias="format", pattern="^(csv|parquet)$"),
+    region: Optional[str] = Query(None),
+    source_type: Optional[str] = Query(None),
+    auth: bool = Depends(AuthService.verify_admin)
+):
+    """
+    Raw songs table as CSV or Parquet, ordered by id.
+    Read in chunks; supports Range requests to resume a download.
+    """
+    _check_export_format(fmt)
+    if region and region not in config.VALID_REGIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid region. Must be one of: {', '.join(sorted(config.VALID_REGIONS))}"
+        )
+    if source_type and source_type not in SEARCH_SOURCE_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid source_type. Must be one of: {', '.join(sorted(SEARCH_SOURCE_TYPES))}"
+        )
+    
+    try:
+        filters = {"region": region, "source_type": source_type}
+        where = " AND ".join(f"{column} = ?" for column, value in filters.items() if value)
+        params = [value for value in filters.values() if value]
+        
+        version = await asyncio.to_thread(db_service.export_version, "songs")
+        key = exports.spool_key("songs", fmt, where, params, version)
+        
+        return await _export_response(
+            request, key, fmt, f"songs.{fmt}",
+            lambda: exports.export(db_service.get_connection, "songs", fmt, where, params)
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in /export/songs: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to export songs: {str(e)}"
+        )
+
+@router.get("/export/charts/{week}", tags=["Export", "Charts"])
+async def export_chart_week(
+    request: Request,
+    week: str = FPath(..., pattern=r"^\d{4}-W\d{2}$"),
+    fmt: str = Query("csv", alias="format", pattern="^(csv|parquet)$"),
+    region: Optional[str] = Query(None, description="Only this region's chart (default: every chart)")
+):
+    """Every archived chart of a week (national and regional) as CSV or Parquet"""
+    _check_export_format(fmt)
+    
+    try:
+        version = await asyncio.to_thread(chart_archive.week_version, week)
+        if version is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No archived chart for week {week}"
+            )
+        
+        where, params = "week_id = ?", [week]
+        if region:
+            where += " AND chart = 'region' AND region = ?"
+            params.append(region.title())
+        key = exports.spool_key("chart_entries", fmt, where, params, version)
+        
+        return await _export_response(
+            request, key, fmt, f"charts-{week}.{fmt}",
+            lambda: exports.export(
+                lambda: sqlite3.connect(chart_archive.ARCHIVE_DB), "chart_entries", fmt, where, params
+            )
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in /export/charts/{week}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to export chart week: {str(e)}"
+        )
+
+@router.get("/export/history", tags=["Export", "Admin"])
+async def export_history(
+    request: Request,
+    source: str = Query("scraper_history", description="scraper_history, youtube_scheduler or streams_history"),
+    granularity: str = Query("raw", pattern="^(raw|hourly|daily)$"),
+    fmt: str = Query("csv", alias="format", pattern="^(csv|parquet)$"),
+    auth: bool = Depends(AuthService.verify_admin)
+):
+    """
+    Scraper/scheduler history as CSV or Parquet: the retained raw rows,
+    or the hourly/daily rollups (which outlive raw retention, and are as
+    of the last retention run).
+    """
+    _check_export_format(fmt)
+    if source not in retention.SOURCES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid source. Must be one of: {', '.join(retention.SOURCES)}"
+        )
+    
+    try:
+        table = HISTORY_EXPORT_TABLES[granularity] or source
+        where, params = ("source = ?", [source]) if table != source else ("", [])
+        
+        version = await asyncio.to_thread(db_service.export_version, table, source)
+        key = exports.spool_key(table, fmt, where, params, version)
+        
+        return await _export_response(
+            request, key, fmt, f"{source}-{granularity}.{fmt}",
+            lambda: exports.export(db_service.get_connection, table, fmt, where, params)
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in /export/history: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to export history: {str(e)}"
         )
 
 # ====== SCORING ENDPOINTS ======
 
-@app.post("/scoring/update", tags=["Scoring"])
+@router.post("/scoring/update", tags=["Scoring"])
 async def update_scoring(auth: bool = Depends(AuthService.verify_admin)):
     """Update unified scores for all songs including streams"""
     try:
@@ -3094,14 +4460,135 @@ async def update_scoring(auth: bool = Depends(AuthService.verify_admin)):
 
 # ====== INGESTION ENDPOINTS ======
 
-@app.post("/ingest/youtube", tags=["Ingestion"])
+IdempotencyKey = Header(None, alias="Idempotency-Key", min_length=1, max_length=255,
+                        description="Retries with the same key get the first response back")
+
+def _begin_idempotent(key: Optional[str], endpoint: str, payload: Any) -> Optional[JSONResponse]:
+    """
+    Stored response for a retried Idempotency-Key, or None after
+    reserving the key (release it with _finish_idempotent). A payload of
+    None defers the fingerprint check until the body has been read.
+    """
+    if not key:
+        return None
+    
+    request_fingerprint = None if payload is None else idempotency.fingerprint(endpoint, payload)
+    try:
+        stored = db_service.idempotency.begin(key, request_fingerprint)
+    except idempotency.KeyReused:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request"
+        )
+    except idempotency.KeyInFlight:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed",
+            headers={"Retry-After": "1"}
+        )
+    
+    if stored is None:
+        return None
+    status_code, body = stored
+    return Response(body, status_code=status_code, media_type="application/json",
+                    headers={"Idempotent-Replayed": "true"})
+
+def _finish_idempotent(key: Optional[str], response: Optional[JSONResponse] = None,
+                       request_fingerprint: Optional[str] = None):
+    """Release a reserved key, storing `response` when it succeeded"""
+    if not key:
+        return
+    if response is not None and response.status_code < 300:
+        db_service.idempotency.finish(key, response.status_code, bytes(response.body),
+                                      request_fingerprint)
+    else:
+        db_service.idempotency.finish(key)
+
+def _accept_batch(endpoint: str, source: str, songs: List[Dict[str, Any]], label: str,
+                  extra: Optional[Dict[str, Any]] = None,
+                  idempotency_key: Optional[str] = None) -> Response:
+    """
+    Queue a validated batch (202 + batch id) or, with the queue disabled,
+    apply it inline (200 + counts). A retried Idempotency-Key gets the
+    stored response; items unchanged since their last commit are dropped.
+    """
+    extra = extra or {}
+    
+    replay = _begin_idempotent(idempotency_key, endpoint, songs)
+    if replay is not None:
+        return replay
+    
+    response = None
+    try:
+        total_items = len(songs)
+        songs = db_service.item_hashes.changed(songs)
+        unchanged = total_items - len(songs)
+        
+        if not songs:
+            response = JSONResponse(content={
+                "status": "success",
+                "message": f"All {total_items} {label} songs unchanged",
+                **extra,
+                "added_count": 0,
+                "unchanged_count": unchanged,
+                "total_items": total_items,
+                "timestamp": datetime.utcnow().isoformat()
+            })
+        
+        elif config.INGEST_QUEUE_ENABLED:
+            try:
+                batch_id = ingest_queue.append(endpoint, source, songs)
+            except QueueFull as e:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"Ingest queue full: {e}",
+                    headers={"Retry-After": "30"}
+                )
+            
+            response = JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content={
+                    "status": "accepted",
+                    "message": f"Queued {len(songs)} {label} songs",
+                    "batch_id": batch_id,
+                    "status_url": f"/ingest/batches/{batch_id}",
+                    **extra,
+                    "unchanged_count": unchanged,
+                    "total_items": total_items,
+                    "timestamp": datetime.utcnow().isoformat()
+                }
+            )
+        
+        else:
+            added_count = 0
+            for song_data in songs:
+                added, song_id = db_service.add_song(song_data)
+                if not added:
+                    added_count += 1
+            
+            response = JSONResponse(content={
+                "status": "success",
+                "message": f"Ingested {added_count} new {label} songs",
+                **extra,
+                "added_count": added_count,
+                "unchanged_count": unchanged,
+                "total_items": total_items,
+                "timestamp": datetime.utcnow().isoformat()
+            })
+        
+        return response
+    finally:
+        _finish_idempotent(idempotency_key, response)
+
+@router.post("/ingest/youtube", tags=["Ingestion"])
 async def ingest_youtube(
     payload: YouTubeIngestPayload,
+    idempotency_key: Optional[str] = IdempotencyKey,
     auth: bool = Depends(AuthService.verify_youtube)
 ):
-    """Ingest YouTube data"""
+    """Ingest YouTube data (queued: 202 with a batch id)"""
     try:
-        added_count = 0
+        songs = []
         
         for item in payload.items:
             song_data = item.model_dump()
@@ -3114,19 +4601,15 @@ async def ingest_youtube(
             if payload.video_id:
                 song_data['youtube_video_id'] = payload.video_id
             
-            added, song_id = db_service.add_song(song_data)
-            if not added:
-                added_count += 1
+            songs.append(song_data)
         
-        return {
-            "status": "success",
-            "message": f"Ingested {added_count} new YouTube songs",
-            "source": payload.source,
-            "added_count": added_count,
-            "total_items": len(payload.items),
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        return await asyncio.to_thread(
+            _accept_batch, "youtube", payload.source, songs, "YouTube", {"source": payload.source},
+            idempotency_key=idempotency_key
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"YouTube ingestion error: {e}")
         raise HTTPException(
@@ -3134,33 +4617,29 @@ async def ingest_youtube(
             detail=f"YouTube ingestion failed: {str(e)}"
         )
 
-@app.post("/ingest/tv", tags=["Ingestion"])
+@router.post("/ingest/tv", tags=["Ingestion"])
 async def ingest_tv(
     payload: IngestPayload,
+    idempotency_key: Optional[str] = IdempotencyKey,
     auth: bool = Depends(AuthService.verify_ingest)
 ):
-    """Ingest TV data"""
+    """Ingest TV data (queued: 202 with a batch id)"""
     try:
-        added_count = 0
+        songs = []
         
         for item in payload.items:
             song_data = item.model_dump()
             song_data['source'] = f"tv_{payload.source}"
             song_data['source_type'] = 'tv'
-            
-            added, song_id = db_service.add_song(song_data)
-            if not added:
-                added_count += 1
+            songs.append(song_data)
         
-        return {
-            "status": "success",
-            "message": f"Ingested {added_count} new TV songs",
-            "source": payload.source,
-            "added_count": added_count,
-            "total_items": len(payload.items),
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        return await asyncio.to_thread(
+            _accept_batch, "tv", payload.source, songs, "TV", {"source": payload.source},
+            idempotency_key=idempotency_key
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"TV ingestion error: {e}")
         raise HTTPException(
@@ -3168,33 +4647,29 @@ async def ingest_tv(
             detail=f"TV ingestion failed: {str(e)}"
         )
 
-@app.post("/ingest/radio", tags=["Ingestion"])
+@router.post("/ingest/radio", tags=["Ingestion"])
 async def ingest_radio(
     payload: IngestPayload,
+    idempotency_key: Optional[str] = IdempotencyKey,
     auth: bool = Depends(AuthService.verify_ingest)
 ):
-    """Ingest radio data"""
+    """Ingest radio data (queued: 202 with a batch id)"""
     try:
-        added_count = 0
+        songs = []
         
         for item in payload.items:
             song_data = item.model_dump()
             song_data['source'] = f"radio_{payload.source}"
             song_data['source_type'] = 'radio'
-            
-            added, song_id = db_service.add_song(song_data)
-            if not added:
-                added_count += 1
+            songs.append(song_data)
         
-        return {
-            "status": "success",
-            "message": f"Ingested {added_count} new radio songs",
-            "source": payload.source,
-            "added_count": added_count,
-            "total_items": len(payload.items),
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        return await asyncio.to_thread(
+            _accept_batch, "radio", payload.source, songs, "radio", {"source": payload.source},
+            idempotency_key=idempotency_key
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Radio ingestion error: {e}")
         raise HTTPException(
@@ -3202,15 +4677,16 @@ async def ingest_radio(
             detail=f"Radio ingestion failed: {str(e)}"
         )
 
-@app.post("/ingest/streams", tags=["Ingestion", "Streams"])
+@router.post("/ingest/streams", tags=["Ingestion", "Streams"])
 async def ingest_streams(
     payload: IngestPayload,
     platform: str = Query(..., description="Streaming platform (spotify, songboost, boomplay, audiomack)"),
+    idempotency_key: Optional[str] = IdempotencyKey,
     auth: bool = Depends(AuthService.verify_ingest)
 ):
-    """Ingest streams data (NEW)"""
+    """Ingest streams data (queued: 202 with a batch id)"""
     try:
-        added_count = 0
+        songs = []
         
         for item in payload.items:
             song_data = item.model_dump()
@@ -3222,19 +4698,16 @@ async def ingest_streams(
             if payload.metadata and 'rank' in payload.metadata:
                 song_data['stream_rank'] = payload.metadata['rank']
             
-            added, song_id = db_service.add_song(song_data)
-            if not added:
-                added_count += 1
+            songs.append(song_data)
         
-        return {
-            "status": "success",
-            "message": f"Ingested {added_count} new streaming songs from {platform}",
-            "platform": platform,
-            "added_count": added_count,
-            "total_items": len(payload.items),
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        return await asyncio.to_thread(
+            _accept_batch, "streams", payload.source, songs,
+            "streaming", {"platform": platform},
+            idempotency_key=idempotency_key
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Streams ingestion error: {e}")
         raise HTTPException(
@@ -3242,44 +4715,232 @@ async def ingest_streams(
             detail=f"Streams ingestion failed: {str(e)}"
         )
 
-# ====== ADMIN ENDPOINTS ======
+# NDJSON backfills: one validated SongItem per line, committed in chunks
+SONG_LINE = TypeAdapter(SongItem)
+NDJSON_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+STREAM_SOURCE_PREFIXES = {"tv": "tv", "radio": "radio", "youtube": "youtube", "streaming": "stream"}
+MAX_STREAM_ERRORS = 100
 
-@app.get("/admin/stats", tags=["Admin"])
-async def admin_stats(auth: bool = Depends(AuthService.verify_admin)):
-    """Get detailed system statistics including streams"""
-    conn = db_service.get_connection()
-    cursor = conn.cursor()
+def _line_error(error: ValidationError) -> str:
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first.get("loc", ()))
+    return f"{location}: {first['msg']}" if location else first["msg"]
+
+@router.post("/ingest/stream", tags=["Ingestion"])
+async def ingest_stream(
+    request: Request,
+    source_type: str = Query(..., pattern="^(tv|radio|youtube|streaming)$"),
+    source: str = Query(..., min_length=1, max_length=100),
+    platform: Optional[str] = Query(None, description="Streaming platform (source_type=streaming)"),
+    idempotency_key: Optional[str] = IdempotencyKey,
+    auth: bool = Depends(AuthService.verify_ingest)
+):
+    """
+    Streaming NDJSON ingest (application/x-ndjson; gzip, deflate or zstd).
+    Lines are parsed and validated as they arrive and committed every
+    INGEST_STREAM_CHUNK songs, so memory stays constant. Invalid lines
+    are reported (first 100) without failing the stream. An
+    Idempotency-Key covers the query parameters and a hash of the raw
+    body, taken as it streams; a retry with a different body gets 422.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in NDJSON_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Expected one of: {', '.join(sorted(NDJSON_TYPES))}"
+        )
+    if source_type == "streaming" and not platform:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="platform is required for source_type=streaming"
+        )
     
-    # Get various stats
-    cursor.execute("SELECT COUNT(*) FROM songs")
-    total_songs = cursor.fetchone()[0]
+    encoding = request.headers.get("content-encoding")
+    try:
+        ndjson.decompressor(encoding)
+    except ndjson.UnsupportedEncoding as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
     
-    cursor.execute("SELECT source_type, COUNT(*) FROM songs GROUP BY source_type")
-    source_stats = dict(cursor.fetchall())
+    params = dict(request.query_params)
+    body_hash = hashlib.sha256()
     
-    cursor.execute("SELECT region, COUNT(*) FROM songs GROUP BY region")
-    region_stats = dict(cursor.fetchall())
+    async def hashed_body():
+        async for piece in request.stream():
+            body_hash.update(piece)
+            yield piece
     
-    cursor.execute("SELECT COUNT(*) FROM scraper_history WHERE status = 'success'")
-    successful_scrapes = cursor.fetchone()[0]
+    def stream_fingerprint() -> str:
+        return idempotency.fingerprint("stream", [params, body_hash.hexdigest()])
     
-    cursor.execute("SELECT COUNT(*) FROM scraper_history WHERE status = 'error'")
-    failed_scrapes = cursor.fetchone()[0]
+    replay = await asyncio.to_thread(_begin_idempotent, idempotency_key, "stream", None)
+    if replay is not None:
+        async for _ in hashed_body():
+            pass
+        if not await asyncio.to_thread(db_service.idempotency.matches, idempotency_key, stream_fingerprint()):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used for a different request"
+            )
+        return replay
     
-    cursor.execute("SELECT COUNT(*) FROM youtube_scheduler")
-    youtube_runs = cursor.fetchone()[0]
+    prefix = STREAM_SOURCE_PREFIXES[source_type]
+    song_source = f"{prefix}_{platform if source_type == 'streaming' else source}"
+    summary = {
+        "lines": 0,
+        "accepted": 0,
+        "rejected": 0,
+        "unchanged": 0,
+        "chunks": 0,
+        "committed_through_line": 0,
+        "errors": [],
+    }
+    chunk: List[Dict[str, Any]] = []
+    chunk_last_line = 0
+    start = time.perf_counter()
     
-    # Streams stats (NEW)
-    cursor.execute("SELECT COUNT(*) FROM streams_history WHERE status = 'success'")
-    successful_streams = cursor.fetchone()[0]
+    def reject(line_number: int, error: str):
+        summary["rejected"] += 1
+        if len(summary["errors"]) < MAX_STREAM_ERRORS:
+            summary["errors"].append({"line": line_number, "error": error})
+    
+    async def commit():
+        if not chunk:
+            return
+        batch = {
+            "id": uuid.uuid4().hex,
+            "endpoint": "stream",
+            "source": source,
+            "received_at": time.time(),
+            "songs": list(chunk),
+        }
+        await asyncio.to_thread(db_service.apply_ingest_batches, [batch])
+        summary["accepted"] += len(chunk)
+        summary["chunks"] += 1
+        summary["committed_through_line"] = chunk_last_line
+        chunk.clear()
     
-    cursor.execute("SELECT COUNT(*) FROM streams_history WHERE status = 'error'")
-    failed_streams = cursor.fetchone()[0]
+    try:
+        async for line_number, line in ndjson.iter_lines(
+            hashed_body(), encoding, max_inflated=config.INGEST_STREAM_MAX_MB * 1024 * 1024
+        ):
+            summary["lines"] += 1
+            if line is None:
+                reject(line_number, f"line longer than {ndjson.MAX_LINE_BYTES} bytes")
+                continue
+            
+            try:
+                item = SONG_LINE.validate_json(line)
+            except ValidationError as e:
+                reject(line_number, _line_error(e))
+                continue
+            
+            song_data = item.model_dump()
+            song_data['source'] = song_source
+            song_data['source_type'] = source_type
+            if source_type == "streaming":
+                song_data['stream_platform'] = platform
+            
+            chunk_last_line = line_number
+            if not db_service.item_hashes.changed([song_data]):
+                summary["unchanged"] += 1
+                continue
+            
+            chunk.append(song_data)
+            if len(chunk) >= config.INGEST_STREAM_CHUNK:
+                await commit()
+        
+        await commit()
+        
+    except TransientError as e:
+        # Everything up to committed_through_line is stored; resume after it
+        logger.warning(f"Stream ingestion deferred: {e}")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "partial", "error": str(e), **summary},
+            headers={"Retry-After": "30"}
+        )
+    except ndjson.BodyTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"{e}; committed through line {summary['committed_through_line']}"
+        )
+    except zlib.error as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Corrupt {encoding} body after line {summary['lines']}: {e}"
+        )
+    except Exception as e:
+        logger.error(f"Stream ingestion error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Stream ingestion failed after line {summary['committed_through_line']}: {str(e)}"
+        )
+    else:
+        response = JSONResponse(content={
+            "status": "success",
+            "message": f"Ingested {summary['accepted']} {source_type} songs ({summary['rejected']} rejected)",
+            "source": source,
+            **summary,
+            "took_ms": round((time.perf_counter() - start) * 1000, 2),
+            "timestamp": datetime.utcnow().isoformat()
+        })
+        await asyncio.to_thread(_finish_idempotent, idempotency_key, response, stream_fingerprint())
+        return response
+    finally:
+        _finish_idempotent(idempotency_key)  # no-op once stored; releases the key on errors
+
+@router.get("/ingest/batches/{batch_id}", tags=["Ingestion"])
+async def get_ingest_batch(
+    batch_id: str = FPath(..., pattern=r"^[0-9a-f]{32}$"),
+    auth: bool = Depends(AuthService.verify_ingest)
+):
+    """Status of a queued ingest batch: queued, applied (with counts) or failed"""
+    try:
+        if is_initialized(ingest_queue):
+            queued = ingest_queue.status(batch_id)
+            if queued:
+                queued["received_at"] = datetime.utcfromtimestamp(queued["received_at"]).isoformat()
+                return queued
+        
+        batch = await asyncio.to_thread(db_service.get_ingest_batch, batch_id)
+        if batch is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Unknown ingest batch {batch_id}"
+            )
+        
+        return {"batch_id": batch.pop("id"), **batch}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in /ingest/batches/{batch_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch ingest batch: {str(e)}"
+        )
+
+# ====== ADMIN ENDPOINTS ======
+
+@router.get("/admin/stats", tags=["Admin"])
+async def admin_stats(auth: bool = Depends(AuthService.verify_admin)):
+    """Get detailed system statistics including streams"""
+    # Maintained counters for songs; all-time run totals from the daily
+    # rollups (raw history is pruned after HISTORY_RETENTION_DAYS)
+    counts = db_service.get_counters()
+    history = db_service.get_history_totals()
     
-    cursor.execute("SELECT platform, COUNT(*) FROM streams_history GROUP BY platform")
-    streams_by_platform = dict(cursor.fetchall())
+    total_songs = counts["songs"]["total"]
+    source_stats = counts["songs"]["source_type"]
+    region_stats = counts["songs"]["region"]
+    successful_scrapes = history["scraper_history"]["status"].get("success", 0)
+    failed_scrapes = history["scraper_history"]["status"].get("error", 0)
+    youtube_runs = history["youtube_scheduler"]["runs"]
     
-    conn.close()
+    # Streams stats (NEW)
+    successful_streams = history["streams_history"]["status"].get("success", 0)
+    failed_streams = history["streams_history"]["status"].get("error", 0)
+    streams_by_platform = history["streams_history"]["key"]
     
     return {
         "status": "admin_stats",
@@ -3314,14 +4975,91 @@ async def admin_stats(auth: bool = Depends(AuthService.verify_admin)):
         },
         "system": {
             "uptime_seconds": int((datetime.utcnow() - app_start_time).total_seconds()),
-            "requests_served": request_count,
-            "environment": config.ENVIRONMENT
+            "requests_served": metrics.total_requests(),
+            "environment": config.ENVIRONMENT,
+            "chart_cache": chart_cache.stats(),
+            "concurrency": concurrency_limits.stats(),
+            "request_coalescing": {
+                "charts": chart_flight.stats(),
+                "top_songs": db_service.top_songs_flight.stats()
+            },
+            "cache_coherence": {"worker": metrics.WORKER, **db_service.coherence.stats()},
+            "live_feed": live_feed.stats(),
+            "telemetry": db_service.telemetry.stats(),
+            "ingest_queue": ingest_queue.stats() if is_initialized(ingest_queue) else None,
+            "scheduler_leader": leader_election.is_leader if is_initialized(leader_election) else None,
+            "idempotency": {
+                **db_service.idempotency.stats(),
+                "unchanged_items_skipped": db_service.item_hashes.skipped
+            }
+        },
+        "retention": {
+            "raw_history_rows": {
+                table: counts[table]["total"] for table in retention.SOURCES
+            },
+            "raw_retention_days": config.HISTORY_RETENTION_DAYS,
+            "last_run": retention_scheduler.last_run.isoformat() if retention_scheduler.last_run else None,
+            "last_result": retention_scheduler.last_result
         }
     }
 
+@router.get("/admin/concurrency", tags=["Admin"])
+async def get_concurrency_limits(auth: bool = Depends(AuthService.verify_admin)):
+    """Per-route-class concurrency limits, queues and shed counts"""
+    return {
+        **concurrency_limits.stats(),
+        "rules": [{"prefix": p, "class": c} for p, c in concurrency_limits.rules]
+    }
+
+@router.post("/admin/concurrency/{route_class}", tags=["Admin"])
+async def update_concurrency_limit(
+    route_class: str,
+    limit: Optional[int] = Query(None, ge=1, le=1024, description="Concurrent requests"),
+    queue_budget_ms: Optional[float] = Query(None, ge=0, le=600000, description="Max queue wait before 503"),
+    auth: bool = Depends(AuthService.verify_admin)
+):
+    """Change a route class's limits at runtime (not persisted)"""
+    limiter = concurrency_limits.limiters.get(route_class)
+    if limiter is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Route class {route_class} not found. Available: {list(concurrency_limits.limiters)}"
+        )
+    
+    old = limiter.stats()
+    limiter.configure(
+        limit=limit,
+        queue_budget=queue_budget_ms / 1000 if queue_budget_ms is not None else None
+    )
+    
+    return {
+        "status": "updated",
+        "route_class": route_class,
+        "old": {"limit": old["limit"], "queue_budget_ms": old["queue_budget_ms"]},
+        "new": {"limit": limiter.limit, "queue_budget_ms": round(limiter.queue_budget * 1000, 1)}
+    }
+
+@router.post("/admin/retention/run", tags=["Admin"])
+async def run_history_retention(auth: bool = Depends(AuthService.verify_admin)):
+    """Run history rollup, pruning and incremental VACUUM now"""
+    try:
+        result = await asyncio.to_thread(retention_scheduler.run_job)
+        
+        return {
+            "status": "success",
+            "result": result,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error in /admin/retention/run: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to run retention: {str(e)}"
+        )
+
 # ====== ERROR HANDLERS ======
 
-@app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     logger.warning(f"HTTP {exc.status_code} at {request.url.path}: {exc.detail}")
     
@@ -3332,10 +5070,10 @@ async def http_exception_handler(request: Request, exc: HTTPException):
             "status_code": exc.status_code,
             "timestamp": datetime.utcnow().isoformat(),
             "path": str(request.url.path)
-        }
+        },
+        headers=exc.headers
     )
 
-@app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     logger.error(f"Unhandled exception at {request.url.path}: {exc}", exc_info=True)
     
@@ -3348,6 +5086,64 @@ async def general_exception_handler(request: Request, exc: Exception):
         }
     )
 
+# ====== APPLICATION FACTORY ======
+def create_app() -> FastAPI:
+    """
+    Build the FastAPI application.
+    Cheap and side-effect free: components, schedulers and directories
+    are set up by lifespan once the server starts.
+    """
+    app = FastAPI(
+        title="UG Board Engine v12.0.0",
+        version="12.0.0",
+        description="Complete Ugandan Music Chart System with Working Scrapers, YouTube Scheduler, and Streams Integration",
+        docs_url="/docs",
+        redoc_url="/redoc",
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
+        openapi_tags=[
+            {"name": "Root", "description": "Service information"},
+            {"name": "Charts", "description": "Music chart endpoints"},
+            {"name": "Regions", "description": "Ugandan regional data"},
+            {"name": "Trending", "description": "Enhanced trending songs"},
+            {"name": "Search", "description": "Song and artist search"},
+            {"name": "Export", "description": "Streaming CSV/Parquet exports"},
+            {"name": "Scrapers", "description": "TV and Radio scraper management"},
+            {"name": "Streams", "description": "Streaming platforms scraping (NEW)"},  # NEW
+            {"name": "Ingestion", "description": "Data ingestion endpoints"},
+            {"name": "YouTube", "description": "YouTube scheduler and integration"},
+            {"name": "Admin", "description": "Administrative functions"},
+            {"name": "Scoring", "description": "Unified scoring system"},
+            {"name": "Monitoring", "description": "Prometheus metrics"},
+        ]
+    )
+    
+    # Middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "HEAD"],
+        allow_headers=["*"],
+    )
+    
+    app.add_middleware(StreamingGZipMiddleware, minimum_size=500)
+    
+    # Inside metrics so shed 503s are counted
+    app.add_middleware(concurrency.ConcurrencyLimitMiddleware, limits=concurrency_limits)
+    
+    # Outermost: sees total latency and on-the-wire (compressed) sizes
+    app.add_middleware(metrics.MetricsMiddleware)
+    
+    app.include_router(router)
+    
+    app.add_exception_handler(HTTPException, http_exception_handler)
+    app.add_exception_handler(Exception, general_exception_handler)
+    
+    return app
+    
+app = create_app()
+
 # ====== STARTUP BANNER ======
 def display_startup_banner():
     """Display production startup banner"""
@@ -3374,6 +5170,8 @@ def display_startup_banner():
 
 # ====== MAIN ENTRY POINT ======
 if __name__ == "__main__":
+    import uvicorn
+    
     display_startup_banner()
     
     uvicorn.run(
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+import sys
+import os
+import sqlite3
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data import search
+
+DATABASE_PATH = os.getenv("DATABASE_PATH", "data/ugboard.db")
+
+
+def backfill_search(db_path: str = DATABASE_PATH):
+    """Build the FTS5 search index for songs already in the database"""
+    if not os.path.exists(db_path):
+        print(f"Error: database not found at {db_path}")
+        return False
+
+    print(f"Rebuilding search index in {db_path}...")
+    conn = sqlite3.connect(db_path)
+
+    try:
+        start = time.perf_counter()
+        search.create_schema(conn)
+        rows = search.backfill(conn)
+        conn.execute("INSERT INTO songs_fts (songs_fts) VALUES ('optimize')")
+        conn.commit()
+    except Exception as e:
+        print(f"Error: {e}")
+        return False
+    finally:
+        conn.close()
+
+    print(f"  {rows} songs indexed in {time.perf_counter() - start:.1f}s")
+    return True
+
+
+if __name__ == "__main__":
+    success = backfill_search(sys.argv[1] if len(sys.argv) > 1 else DATABASE_PATH)
+    sys.exit(0 if success else 1)
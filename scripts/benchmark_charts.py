@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+import sys
+import os
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+import main as ugboard
+from api import responses
+from data import chart_archive
+
+
+def seed(db, size: int, seed: int = 42):
+    """Synthetic songs across sources so the chart has real aggregation work"""
+    rng = random.Random(seed)
+    sources = ["radio", "tv", "youtube", "streaming"]
+    for i in range(size):
+        db.add_song({
+            "title": f"Song {i}",
+            "artist": f"Artist {i % 300}",
+            "plays": rng.randint(0, 50000),
+            "score": rng.uniform(0, 100),
+            "region": rng.choice(sorted(ugboard.config.VALID_REGIONS)),
+            "source_type": rng.choice(sources),
+            "source": f"bench_{i % 40}",
+            "url": f"https://example.com/{i}",
+            "youtube_video_id": f"vid{i}",
+        })
+
+
+def measure(client, path: str, requests: int):
+    """p50/p99 latency (ms) and wire bytes per request"""
+    timings, sizes = [], []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(path, headers={"Accept-Encoding": "gzip"})
+        timings.append((time.perf_counter() - start) * 1000)
+        sizes.append(int(response.headers.get("content-length", len(response.content))))
+
+    timings.sort()
+    return {
+        "p50": statistics.median(timings),
+        "p99": timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+        "bytes": statistics.mean(sizes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chart endpoint latency before/after response caching")
+    parser.add_argument("--songs", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--path", default="/charts/top100?limit=200")
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp())
+    ugboard.config.DATABASE_PATH = tmp / "ugboard.db"
+    chart_archive.ARCHIVE_DB = tmp / "archive.db"
+    ugboard.db_service = ugboard.DatabaseService()
+    seed(ugboard.db_service, args.songs)
+
+    client = TestClient(ugboard.app)
+    orjson = responses.orjson
+
+    # "before": every hit queries, serializes with stdlib json and gzips at
+    # the middleware's level 9
+    modes = [
+        ("before (json, no cache)", None, False, 9),
+        ("orjson, no cache", orjson, False, responses.GZIP_LEVEL),
+        ("orjson + cached bytes", orjson, True, responses.GZIP_LEVEL),
+    ]
+
+    print(f"{args.songs} songs, {args.requests} requests to {args.path}")
+    print(f"{'mode':<26} {'p50 (ms)':>9} {'p99 (ms)':>9} {'bytes/req':>10}")
+
+    for name, serializer, cached, level in modes:
+        responses.orjson = serializer
+        responses.GZIP_LEVEL = level
+        ugboard.chart_cache.enabled = cached
+        ugboard.chart_cache.clear()
+
+        result = measure(client, args.path, args.requests)
+        print(f"{name:<26} {result['p50']:>9.2f} {result['p99']:>9.2f} {result['bytes']:>10.0f}")
+
+    responses.orjson = orjson
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+import sys
+import os
+import argparse
+import random
+import statistics
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.utils import metrics_merge
+
+
+def make_catalog(size: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [
+        {
+            "title": f"Song {i}",
+            "artist": f"Artist {i % 5000}",
+            "youtube_views": rng.randint(0, 500000),
+            "radio_plays": rng.randint(0, 400),
+            "tv_appearances": rng.randint(0, 60),
+        }
+        for i in range(size)
+    ]
+
+
+def make_chart(catalog, size: int, seed: int = 7):
+    """Chart entries spread over the catalog; a few have no catalog match"""
+    rng = random.Random(seed)
+    chart = [{"title": item["title"], "artist": item["artist"]} for item in rng.sample(catalog, size - 5)]
+    chart += [{"title": f"Missing {i}", "artist": "Nobody"} for i in range(5)]
+    return chart
+
+
+def legacy_merge(chart, catalog):
+    """The previous per-entry linear scan, for comparison"""
+    for chart_item in chart:
+        match = next(
+            (
+                m for m in catalog
+                if m.get("title") == chart_item.get("title")
+                and m.get("artist") == chart_item.get("artist")
+            ),
+            None
+        )
+        if match:
+            chart_item["youtube"] = match.get("youtube_views", 0)
+
+
+def timed(fn, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Top 100 metrics merge: linear scan vs hash index")
+    parser.add_argument("--items", type=int, default=1000000)
+    parser.add_argument("--chart", type=int, default=100)
+    args = parser.parse_args()
+
+    catalog = make_catalog(args.items)
+    chart = make_chart(catalog, args.chart)
+    print(f"{args.chart} chart entries x {args.items:,} catalog items")
+
+    legacy_ms = timed(lambda: legacy_merge([dict(c) for c in chart], catalog), 1)
+    build_ms = timed(lambda: metrics_merge.index_items(catalog), 1)
+    index = metrics_merge.index_items(catalog)
+    merge_ms = timed(lambda: metrics_merge.merge([dict(c) for c in chart], index), 50)
+
+    merged = [dict(c) for c in chart]
+    assert metrics_merge.merge(merged, index) == args.chart - 5
+
+    print(f"{'linear scan per entry':<28} {legacy_ms:>10.1f} ms")
+    print(f"{'index build (once/version)':<28} {build_ms:>10.1f} ms")
+    print(f"{'hash join (cached index)':<28} {merge_ms:>10.3f} ms")
+    print(f"speedup per recalculation: {legacy_ms / merge_ms:,.0f}x")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+import sys
+import os
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.scoring import engine
+
+
+def make_dataset(size: int, seed: int = 42):
+    """Synthetic items carrying every field any rule version reads"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    sources = ["youtube", "tv", "radio", "streaming"]
+
+    items = []
+    for i in range(size):
+        youtube = rng.randint(0, 500000)
+        radio = rng.randint(0, 400)
+        tv = rng.randint(0, 60)
+        items.append({
+            "title": f"Song {i}",
+            "artist": f"Artist {i % 500}",
+            "youtube": youtube,
+            "radio": radio,
+            "tv": tv,
+            "youtube_views": youtube,
+            "radio_plays": radio,
+            "tv_appearances": tv,
+            "plays": rng.randint(0, 50000),
+            "source_type": rng.choice(sources),
+            "ingested_at": (now - timedelta(days=rng.randint(0, 60))).isoformat(),
+        })
+    return items
+
+
+def time_version(items, version: str, repeat: int) -> float:
+    """Best-of-N wall time for one batch score (cache bypassed)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        engine.score_items(items, version)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def top_overlap(items, a: str, b: str, n: int = 100) -> int:
+    """How many songs two versions agree on in their Top N"""
+    top_a = {i["title"] for i in engine.rank_items(items, a, limit=n)}
+    top_b = {i["title"] for i in engine.rank_items(items, b, limit=n)}
+    return len(top_a & top_b)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare scoring rule versions")
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--versions", nargs="*", default=sorted(engine.available_versions()))
+    parser.add_argument("--baseline", default=engine.ITEMS_VERSION)
+    args = parser.parse_args()
+
+    items = make_dataset(args.size)
+    backend = "numpy" if engine.np is not None else "pure-python"
+
+    print(f"Scoring {args.size} items, best of {args.repeat} ({backend} kernels)")
+    print(f"{'version':<12} {'time (ms)':>10} {'items/s':>12} {'top100 vs ' + args.baseline:>20}")
+
+    for version in args.versions:
+        elapsed = time_version(items, version, args.repeat)
+        overlap = top_overlap(items, version, args.baseline)
+        print(f"{version:<12} {elapsed * 1000:>10.1f} {args.size / elapsed:>12,.0f} {overlap:>20}")
+
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
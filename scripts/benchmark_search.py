@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+import sys
+import os
+import argparse
+import random
+import statistics
+import string
+import tempfile
+import time
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main as ugboard
+from data import search
+
+
+def _word(rng, low=3, high=9):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(low, high)))
+
+
+def seed(db, size: int, seed: int = 42):
+    """Bulk-insert synthetic songs (~20 per artist); triggers fill the index"""
+    rng = random.Random(seed)
+    artists = [f"{_word(rng)} {_word(rng)}" for _ in range(max(1, size // 20))]
+    regions = sorted(ugboard.config.VALID_REGIONS)
+    sources = ["tv", "radio", "youtube", "streaming"]
+
+    conn = db.get_connection()
+    rows = (
+        (" ".join(_word(rng) for _ in range(rng.randint(1, 4))), rng.choice(artists),
+         rng.randint(0, 50000), rng.uniform(0, 100), rng.choice(regions),
+         rng.choice(sources), f"bench_{rng.randint(0, 9)}")
+        for _ in range(size)
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO songs (title, artist, plays, score, region, source_type, source) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+    )
+    conn.commit()
+    sample = conn.execute(
+        "SELECT title, artist FROM songs ORDER BY RANDOM() LIMIT 200"
+    ).fetchall()
+    conn.close()
+    return sample
+
+
+def measure(db, queries, **filters):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        db.search_songs(query, **filters)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/search latency on a large catalog")
+    parser.add_argument("--songs", type=int, default=1000000)
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp())
+    ugboard.config.DATABASE_PATH = tmp / "ugboard.db"
+    db = ugboard.DatabaseService()
+
+    start = time.perf_counter()
+    sample = seed(db, args.songs)
+    print(f"Inserted and indexed {args.songs:,} songs in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(7)
+    cases = {
+        "artist prefix (4 chars)": [a.split()[0][:4] for _, a in sample],
+        "title + artist words": [f"{t.split()[0]} {a.split()[0]}" for t, a in sample],
+        "full title": [t for t, _ in sample],
+        "2-letter prefix": [t[:2] for t, _ in sample],
+        "typo in artist": [a.split()[0][:-1] + "q" + a.split()[0][-1] for _, a in sample],
+    }
+
+    print(f"{'query':<26} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for name, queries in cases.items():
+        p50, p99 = measure(db, queries)
+        print(f"{name:<26} {p50:>9.2f} {p99:>9.2f}")
+
+    p50, p99 = measure(db, [t for t, _ in sample], region="central", source_type="radio")
+    print(f"{'full title + filters':<26} {p50:>9.2f} {p99:>9.2f}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
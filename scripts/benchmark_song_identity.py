@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+import sys
+import os
+import argparse
+import random
+import string
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data import song_identity
+
+
+def _word(rng, low=3, high=9):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(low, high)))
+
+
+def make_catalog(size: int, seed: int = 42):
+    """Synthetic normalized (title, artist) pairs, ~20 songs per artist"""
+    rng = random.Random(seed)
+    artists = [f"{_word(rng)} {_word(rng)}" for _ in range(max(1, size // 20))]
+    return [
+        (" ".join(_word(rng) for _ in range(rng.randint(1, 4))), rng.choice(artists))
+        for _ in range(size)
+    ]
+
+
+def typo(rng, text: str) -> str:
+    """One substituted letter"""
+    i = rng.randrange(len(text))
+    return text[:i] + rng.choice(string.ascii_lowercase) + text[i + 1:]
+
+
+def time_lookups(index, queries) -> float:
+    start = time.perf_counter()
+    for title, artist in queries:
+        index.lookup(title, artist)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Canonical song resolution latency")
+    parser.add_argument("--size", type=int, default=500000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    catalog = make_catalog(args.size)
+
+    start = time.perf_counter()
+    index = song_identity.CanonicalIndex()
+    for song_id, (title, artist) in enumerate(catalog, start=1):
+        index.add(song_id, title, artist)
+    print(f"Indexed {args.size:,} songs in {time.perf_counter() - start:.1f}s "
+          f"({'rapidfuzz' if song_identity.fuzz is not None else 'difflib'})")
+
+    sample = rng.sample(catalog, args.queries)
+    cases = {
+        "exact": sample,
+        "title typo": [(typo(rng, t), a) for t, a in sample],
+        "unseen": [(_word(rng, 6, 12), a) for _, a in sample],
+    }
+
+    ok = True
+    for name, queries in cases.items():
+        per_lookup = time_lookups(index, queries)
+        ok = ok and per_lookup < 0.001
+        print(f"{name:<12} {per_lookup * 1e6:>8.1f} us/lookup")
+
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.chart_archive import import_legacy_snapshots
+
+
+def import_archive():
+    """Backfill the chart archive from legacy JSON snapshots"""
+    print("Importing legacy chart snapshots...")
+
+    try:
+        counts = import_legacy_snapshots()
+    except Exception as e:
+        print(f"Error: {e}")
+        return False
+
+    if not counts:
+        print("No legacy snapshots found.")
+        return True
+
+    for chart, weeks in sorted(counts.items()):
+        print(f"  {chart}: {weeks} week(s) archived")
+
+    return True
+
+
+if __name__ == "__main__":
+    success = import_archive()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+import sys
+import os
+import argparse
+import json
+from datetime import date
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.scoring.config import CURRENT_VERSION
+from data.replay_engine import replay_range
+
+
+def main():
+    """Re-score historical weeks under a scoring config version"""
+    parser = argparse.ArgumentParser(description="Replay historical chart weeks")
+    parser.add_argument("start", type=date.fromisoformat, help="YYYY-MM-DD")
+    parser.add_argument("end", type=date.fromisoformat, help="YYYY-MM-DD")
+    parser.add_argument("--config-version", default=CURRENT_VERSION)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true", help="Print per-week diffs")
+    args = parser.parse_args()
+
+    try:
+        result = replay_range(
+            args.start,
+            args.end,
+            args.config_version,
+            limit=args.limit,
+            workers=args.workers,
+        )
+    except Exception as e:
+        print(f"Error: {e}")
+        return False
+
+    print(f"Replayed {result['weeks']} week(s) with config {result['config_version']}")
+    print(f"Compared against published: {result['compared_weeks']} week(s)")
+    print(json.dumps(result["summary"], indent=2))
+
+    if args.verbose:
+        for diff in result["diffs"]:
+            print(json.dumps(diff))
+
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
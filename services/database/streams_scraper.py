@@ -16,6 +16,8 @@ import requests
 from bs4 import BeautifulSoup
 from rapidfuzz import fuzz, process
 
+from data import artist_registry
+
 # Playwright for JavaScript-heavy sites
 from playwright.async_api import async_playwright
 
@@ -115,26 +117,10 @@ class StreamsScraper:
             }
         }
         
-        # Common Ugandan artist name variations
-        self.ugandan_artists_patterns = [
-            r"(?i)bobi\s+wine", r"(?i)eddy\s+kenzo", r"(?i)sheebah",
-            r"(?i)azawi", r"(?i)vinka", r"(?i)alien\s+skin",
-            r"(?i)spice\s+diana", r"(?i)rema", r"(?i)winnie\s+nwagi",
-            r"(?i)jose\s+chameleone", r"(?i)bebe\s+cool", r"(?i)pallaso",
-            r"(?i)daddy\s+andre", r"(?i)geosteady", r"(?i)fik\s+fameica",
-            r"(?i)john\s+blaq", r"(?i)vyroota", r"(?i)vivian\s+tosh",
-            r"(?i)king\s+saha", r"(?i)david\s+lutalo", r"(?i)zex\s+bilangilangi"
-        ]
-        
-        # Known Ugandan artists for fuzzy matching
-        self.known_ugandan_artists = [
-            "Bobi Wine", "Eddy Kenzo", "Sheebah", "Azawi", "Vinka",
-            "Alien Skin", "Spice Diana", "Rema", "Winnie Nwagi",
-            "Jose Chameleone", "Bebe Cool", "Pallaso", "Daddy Andre",
-            "Geosteady", "Fik Fameica", "John Blaq", "Vyroota",
-            "Vivian Tosh", "King Saha", "David Lutalo", "Zex Bilangilangi",
-            "B2C", "Chosen Becky", "Karole Kasita", "Ray G", "Truth 256"
-        ]
+    @property
+    def known_ugandan_artists(self) -> List[str]:
+        """Registered artist names (data/artists.json, hot-reloaded)"""
+        return artist_registry.artist_names()
     
     async def _init_playwright(self):
         """Initialize Playwright browser if not already initialized"""
@@ -249,10 +235,9 @@ class StreamsScraper:
         
         artist_lower = artist.lower()
         
-        # Method 1: Pattern matching
-        for pattern in self.ugandan_artists_patterns:
-            if re.search(pattern, artist_lower):
-                return True
+        # Method 1: One pass over the artist registry (names + aliases)
+        if artist_registry.match_artist(artist):
+            return True
         
         # Method 2: Fuzzy matching with known artists
         if len(artist) > 3:  # Avoid matching very short strings
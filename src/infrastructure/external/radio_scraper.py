@@ -12,6 +12,8 @@ from urllib.parse import urlparse
 
 from src.config.settings import settings
 from src.domain.services.music_rules import MusicRulesService
+from data.song_identity import strip_decorations
+from api.utils.metadata_parser import parse_artist_title, stream_title
 
 
 logger = logging.getLogger(__name__)
@@ -202,11 +204,11 @@ class EnhancedRadioScraper:
         import re
         
         # Extract StreamTitle
-        match = re.search(r"StreamTitle='(.*?)';", metadata)
-        if not match:
+        full_title = stream_title(metadata)
+        if full_title is None:
             return None
         
-        full_title = match.group(1).strip()
+        full_title = full_title.strip()
         if not full_title or full_title.lower() in ["", "none", "null"]:
             return None
         
@@ -234,67 +236,12 @@ class EnhancedRadioScraper:
         }
     
     def _parse_artist_title(self, full_title: str) -> Tuple[str, str]:
-        """Parse artist and title from various formats"""
-        # Remove common prefixes
-        prefixes = [
-            "Now Playing:",
-            "Current:",
-            "Playing:",
-            "On Air:",
-            "▶",
-            "●"
-        ]
-        
-        for prefix in prefixes:
-            if full_title.startswith(prefix):
-                full_title = full_title[len(prefix):].strip()
-        
-        # Try different separator patterns
-        patterns = [
-            (r"^(.*?)\s*[-~–—]\s*(.*)$", (0, 1)),  # Artist - Title
-            (r"^(.*?)\s*[|‖]\s*(.*)$", (0, 1)),     # Artist | Title
-            (r"^(.*?)\s*[:：]\s*(.*)$", (0, 1)),     # Artist : Title
-            (r"^(.*)\s+by\s+(.*)$", (1, 0)),        # Title by Artist
-            (r"^(.*?)\s*\(ft\.\s*(.*)\)\s*[-~]\s*(.*)$", (0, 2)),  # Artist (ft. X) - Title
-        ]
-        
-        for pattern, indices in patterns:
-            match = re.match(pattern, full_title, re.IGNORECASE)
-            if match:
-                artist_idx, title_idx = indices
-                artist = match.group(artist_idx + 1).strip()
-                title = match.group(title_idx + 1).strip()
-                
-                # Clean up
-                artist = self._clean_text(artist)
-                title = self._clean_text(title)
-                
-                if artist and title:
-                    return artist, title
-        
-        # If no pattern matches, assume it's just a title
-        return "Unknown Artist", self._clean_text(full_title)
+        """Parse artist and title from various formats (shared, cached parser)"""
+        return parse_artist_title(full_title)
     
     def _clean_text(self, text: str) -> str:
-        """Clean text of common artifacts"""
-        artifacts = [
-            "(Official Audio)",
-            "(Official Video)",
-            "(Official Music Video)",
-            "[Official Audio]",
-            "[Official Video]",
-            "(Audio)",
-            "(Video)",
-            "(Lyrics)",
-            "(Visualizer)",
-            "()",
-            "[]"
-        ]
-        
-        for artifact in artifacts:
-            text = text.replace(artifact, "")
-        
-        return text.strip()
+        """Clean text of common artifacts (shared normalization)"""
+        return strip_decorations(text)
     
     def _validate_song(self, song_data: Dict) -> bool:
         """Validate song against Ugandan music rules"""
@@ -2,6 +2,7 @@
 Test fixtures and configuration
 """
 import pytest
+import sqlite3
 import tempfile
 import json
 from pathlib import Path
@@ -10,9 +11,36 @@ from unittest.mock import Mock, patch
 from fastapi.testclient import TestClient
 from main import app
 
+@pytest.fixture(autouse=True)
+def isolated_archive(tmp_path, monkeypatch):
+    """Keep the chart archive out of the working tree"""
+    from data import chart_archive
+    monkeypatch.setattr(chart_archive, "ARCHIVE_DB", tmp_path / "chart_archive.db")
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A DatabaseService on a temporary database, installed as main.db_service"""
+    import main
+    monkeypatch.setattr(main.config, "DATABASE_PATH", tmp_path / "ugboard.db")
+    service = main.DatabaseService()
+    monkeypatch.setattr(main, "db_service", service)
+    yield service
+    service.telemetry.stop()
+
+@pytest.fixture
+def count_rows(db):
+    """Row count of a table in the temporary database"""
+    def count(table):
+        conn = sqlite3.connect(db.db_path)
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        finally:
+            conn.close()
+    return count
+
 @pytest.fixture
-def client():
-    """Test client fixture"""
+def client(db):
+    """Test client fixture, on the temporary database"""
     return TestClient(app)
 
 @pytest.fixture
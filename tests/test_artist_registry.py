@@ -0,0 +1,69 @@
+"""
+Unit tests for the artist registry matcher.
+"""
+import json
+import os
+
+import pytest
+
+from data import artist_registry
+
+
+def _write(path, artists, keywords=("uganda",)):
+    path.write_text(json.dumps({"version": 1, "keywords": list(keywords), "artists": artists}))
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    path = tmp_path / "artists.json"
+    _write(path, [
+        {"id": "eddy-kenzo", "name": "Eddy Kenzo", "region": "central"},
+        {"id": "rema-namakula", "name": "Rema Namakula", "aliases": ["Rema"], "region": "western"},
+        {"id": "fik-fameica", "name": "Fik Fameica", "region": "central",
+         "regions": ["central", "northern"]},
+    ])
+    monkeypatch.setattr(artist_registry, "ARTISTS_FILE", path)
+    monkeypatch.setattr(artist_registry, "RELOAD_CHECK_SECONDS", 0)
+    artist_registry.reload()
+    yield path
+    monkeypatch.undo()
+    artist_registry.reload()
+
+
+def test_match_returns_id_and_home_region(registry):
+    match = artist_registry.match_artist("Sitya Loss - EDDY KENZO ft. Someone")
+    assert match["id"] == "eddy-kenzo"
+    assert match["region"] == "central"
+
+    assert artist_registry.match_artist("Rema")["id"] == "rema-namakula"
+    # Whole words only
+    assert artist_registry.match_artist("Premature") is None
+    assert [a["id"] for a in artist_registry.find_artists("Rema x Fik Fameica")] == [
+        "rema-namakula", "fik-fameica",
+    ]
+
+
+def test_is_ugandan_and_regions(registry):
+    assert artist_registry.is_ugandan("fik fameica")
+    assert artist_registry.is_ugandan("Kampala Uganda Choir")
+    assert not artist_registry.is_ugandan("Taylor Swift")
+    assert artist_registry.region_artists()["northern"] == ["Fik Fameica"]
+
+
+def test_hot_reload(registry):
+    assert artist_registry.match_artist("Azawi") is None
+
+    _write(registry, [{"id": "azawi", "name": "Azawi", "region": "central"}])
+    stat = registry.stat()
+    os.utime(registry, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert artist_registry.match_artist("Azawi")["id"] == "azawi"
+    assert artist_registry.match_artist("Eddy Kenzo") is None
+
+
+def test_many_artists_single_pass():
+    artists = [{"id": f"a{i}", "name": f"Artist {i:05d}"} for i in range(5000)]
+    matcher = artist_registry._compile({"artists": artists})
+
+    assert matcher.match("Song by Artist 04321 and friends")["id"] == "a4321"
+    assert matcher.match("Artist 4321") is None
@@ -0,0 +1,207 @@
+"""
+Unit tests for incremental auto-recalculation.
+"""
+import json
+import time
+
+import pytest
+
+from api.charts import live_chart
+from api.charts.live_chart import LiveChart
+from api.scoring import auto_recalc, engine
+from data import store
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "ITEMS_FILE", tmp_path / "items.json")
+    monkeypatch.setattr(auto_recalc, "TOP100_PATH", str(tmp_path / "top100.json"))
+    monkeypatch.setattr(auto_recalc, "_chart", LiveChart())
+    monkeypatch.setattr(auto_recalc, "_stats", None)
+    monkeypatch.setattr(auto_recalc, "_item_stats", {})
+    monkeypatch.setattr(auto_recalc, "_published", [])
+    monkeypatch.setattr(auto_recalc, "_dirty", set())
+    monkeypatch.setattr(auto_recalc, "_full", False)
+    monkeypatch.setattr(auto_recalc, "_items_version", None)
+
+    items = [
+        {"title": f"Song {i}", "artist": "A", "youtube_views": 10 * i, "radio_plays": i}
+        for i in range(1, 6)
+    ]
+    store.save_items(items)
+    auto_recalc.mark_ingestion(None)
+    auto_recalc.flush()
+    return tmp_path
+
+
+def _top100(workspace):
+    return json.loads((workspace / "top100.json").read_text())["items"]
+
+
+def _expected():
+    ranked = engine.rank_items(store.load_items(), auto_recalc.VERSION)
+    return [(i["title"], i["score"]) for i in ranked]
+
+
+def test_full_rebuild_publishes_positions(workspace):
+    top = _top100(workspace)
+    assert [i["title"] for i in top] == ["Song 5", "Song 4", "Song 3", "Song 2", "Song 1"]
+    assert [i["position"] for i in top] == [1, 2, 3, 4, 5]
+
+
+def test_incremental_update_matches_full_rescore(workspace):
+    items = store.load_items()
+    items[0]["youtube_views"] = 45  # below the peak: no full rebuild
+    store.save_items(items)
+
+    auto_recalc.mark_ingestion([("Song 1", "A")])
+    auto_recalc.flush()
+
+    assert [(i["title"], i["score"]) for i in _top100(workspace)] == _expected()
+    assert auto_recalc.get_position("song 1", "a") == 3
+
+
+def test_peak_change_rescores_everything(workspace):
+    items = store.load_items()
+    items[0]["youtube_views"] = 1000
+    store.save_items(items)
+
+    auto_recalc.mark_ingestion([items[0]])
+    auto_recalc.flush()
+
+    assert [(i["title"], i["score"]) for i in _top100(workspace)] == _expected()
+
+
+def test_incremental_update_does_not_rescan_the_catalog(workspace, monkeypatch):
+    batches = []
+    real_stats = engine.CompiledRules.stats
+    monkeypatch.setattr(
+        engine.CompiledRules, "stats",
+        lambda self, items: batches.append(len(items)) or real_stats(self, items),
+    )
+
+    items = store.load_items()
+    items[1]["radio_plays"] = 4   # below the peak
+    store.save_items(items)
+    auto_recalc.mark_ingestion([items[1]])
+    auto_recalc.flush()
+    assert batches == []
+
+    # Lowering the song that holds a peak moves it: full rebuild
+    items = store.load_items()
+    items[4]["youtube_views"] = 5
+    store.save_items(items)
+    auto_recalc.mark_ingestion([items[4]])
+    auto_recalc.flush()
+    assert batches == [5]
+    assert [(i["title"], i["score"]) for i in _top100(workspace)] == _expected()
+
+
+def test_concurrent_marks_coalesce(workspace, monkeypatch):
+    calls = []
+    real_apply = auto_recalc._apply
+    monkeypatch.setattr(auto_recalc, "_apply", lambda *args: calls.append(1) or real_apply(*args))
+    monkeypatch.setattr(auto_recalc, "DEBOUNCE_SECONDS", 0.05)
+
+    for i in range(1, 6):
+        auto_recalc.mark_ingestion([(f"Song {i}", "A")])
+
+    time.sleep(0.3)
+    assert len(calls) == 1
+    assert auto_recalc.pending()["dirty"] == 0
+
+
+def test_recompute_reloads_items_only_after_outside_writes(workspace, monkeypatch):
+    calls = []
+    real_load = auto_recalc.load_items
+    monkeypatch.setattr(auto_recalc, "load_items", lambda: calls.append(1) or real_load())
+
+    auto_recalc.mark_ingestion([("Song 2", "A")])
+    auto_recalc.flush()
+    assert calls == []
+
+    items = store.load_items()
+    items[1]["youtube_views"] = 35
+    store.save_items(items)
+    auto_recalc.mark_ingestion([("Song 2", "A")])
+    auto_recalc.flush()
+    assert calls == [1]
+    assert [(i["title"], i["score"]) for i in _top100(workspace)] == _expected()
+
+
+def test_safe_auto_recalculate_marks_without_modifying(workspace):
+    from api.scoring.auto import safe_auto_recalculate
+
+    songs = [{"title": "Song 1", "artist": "A"}, ("Song 2", "A"), None]
+    safe_auto_recalculate(songs)
+    assert songs[0] == {"title": "Song 1", "artist": "A"}
+    assert auto_recalc.pending()["dirty"] == 2
+    auto_recalc.flush()
+
+
+def test_locked_top100_untouched(workspace):
+    path = workspace / "top100.json"
+    path.write_text(json.dumps({"locked": True, "items": []}))
+
+    auto_recalc.mark_ingestion(None)
+    auto_recalc.flush()
+
+    assert json.loads(path.read_text())["items"] == []
+
+
+def test_list_shaped_top100_is_replaced(workspace, monkeypatch):
+    path = workspace / "top100.json"
+    path.write_text(json.dumps([{"title": "Old", "artist": "A"}]))
+    monkeypatch.setattr(auto_recalc, "_published", [])
+
+    auto_recalc.mark_ingestion(None)
+    auto_recalc.flush()
+
+    data = json.loads(path.read_text())
+    assert [i["title"] for i in data["items"]][0] == "Song 5"
+    assert data["scoring_version"] == auto_recalc.VERSION
+
+
+@pytest.mark.parametrize("sorted_backend", [True, False])
+def test_live_chart_order_statistics(monkeypatch, sorted_backend):
+    if not sorted_backend:
+        monkeypatch.setattr(live_chart, "SortedList", None)
+
+    chart = LiveChart()
+    chart.rebuild({"a": 1.0, "b": 3.0, "c": 2.0})
+    assert chart.rank("b") == 1
+
+    chart.update("a", 5.0)
+    assert [k for k, _ in chart.top(3)] == ["a", "b", "c"]
+    assert chart.rank("c") == 3
+
+    chart.discard("b")
+    assert chart.rank("c") == 2
+    assert chart.rank("b") is None
+
+
+def test_metrics_merge_index_is_cached_per_items_version(workspace, monkeypatch):
+    from api.utils import metrics_merge
+
+    metrics_merge.clear_cache()
+    loads = []
+    real_load = metrics_merge.load_items
+    monkeypatch.setattr(metrics_merge, "load_items", lambda: loads.append(1) or real_load())
+
+    chart = [{"title": "song  3", "artist": "a"}, {"title": "Unknown", "artist": "A"}]
+    assert metrics_merge.merge(chart) == 1
+    assert chart[0]["youtube"] == 30 and chart[0]["radio"] == 3 and chart[0]["tv"] == 0
+    assert "youtube" not in chart[1]
+
+    metrics_merge.merge([{"title": "Song 1", "artist": "A"}])
+    assert len(loads) == 1
+
+    items = store.load_items()
+    items[2]["youtube_views"] = 99
+    store.save_items(items)
+
+    chart = [{"title": "Song 3", "artist": "A"}]
+    metrics_merge.merge(chart)
+    assert len(loads) == 2
+    assert chart[0]["youtube"] == 99
+    metrics_merge.clear_cache()
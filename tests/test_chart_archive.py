@@ -0,0 +1,120 @@
+"""
+Unit tests for the chart snapshot archive.
+"""
+import sqlite3
+
+import pytest
+
+from data import chart_archive
+
+
+@pytest.fixture(autouse=True)
+def archive_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(chart_archive, "ARCHIVE_DB", tmp_path / "archive.db")
+
+
+def _chart(*songs):
+    return [
+        {"title": title, "artist": artist, "score": 100 - i}
+        for i, (title, artist) in enumerate(songs)
+    ]
+
+
+def test_history_columns_across_weeks():
+    """last_week_rank / peak_rank / weeks_on_chart are precomputed."""
+    chart_archive.archive_chart("2026-W01", "top100", _chart(("A", "X"), ("B", "Y")))
+    chart_archive.archive_chart("2026-W02", "top100", _chart(("B", "Y"), ("A", "X")))
+    chart_archive.archive_chart("2026-W04", "top100", _chart(("A", "X")))
+
+    week2 = {e["title"]: e for e in chart_archive.get_chart("2026-W02")}
+    assert week2["B"]["last_week_rank"] == 2
+    assert week2["B"]["peak_rank"] == 1
+    assert week2["A"]["weeks_on_chart"] == 2
+
+    # A gap week resets last_week_rank but keeps peak and weeks on chart
+    week4 = chart_archive.get_chart("2026-W04")[0]
+    assert week4["last_week_rank"] is None
+    assert week4["peak_rank"] == 1
+    assert week4["weeks_on_chart"] == 3
+
+
+def test_rearchive_refreshes_later_weeks():
+    chart_archive.archive_chart("2026-W02", "top100", _chart(("A", "X")))
+    chart_archive.archive_chart("2026-W01", "top100", _chart(("B", "Y"), ("A", "X")))
+
+    week2 = chart_archive.get_chart("2026-W02")[0]
+    assert week2["last_week_rank"] == 2
+    assert week2["weeks_on_chart"] == 2
+
+
+def test_song_run_and_week_over_week():
+    chart_archive.archive_chart("2025-W52", "top100", _chart(("A", "X"), ("C", "Z")))
+    chart_archive.archive_chart("2026-W01", "top100", _chart(("B", "Y"), ("A", "X")))
+
+    run = chart_archive.get_song_run(chart_archive.song_key("a", " x "))
+    assert [r["week_id"] for r in run] == ["2025-W52", "2026-W01"]
+
+    diff = chart_archive.week_over_week("2026-W01")
+    assert [e["title"] for e in diff["entered"]] == ["B"]
+    assert [e["title"] for e in diff["dropped"]] == ["C"]
+    assert diff["moved"][0]["change"] == -1
+
+
+def test_attach_history_for_unpublished_week():
+    chart_archive.archive_chart("2026-W01", "top100", _chart(("A", "X")))
+
+    items = [
+        {"position": 1, "title": "B", "artist": "Y"},
+        {"position": 2, "title": "A", "artist": "X"},
+    ]
+    chart_archive.attach_history(items, week_id="2026-W02")
+
+    assert items[0]["weeks_on_chart"] == 1
+    assert items[1]["last_week_rank"] == 1
+    assert items[1]["weeks_on_chart"] == 2
+
+
+def test_region_charts_are_separate():
+    chart_archive.archive_chart("2026-W01", "region", _chart(("A", "X")), region="eastern")
+
+    assert chart_archive.get_chart("2026-W01") == []
+    assert len(chart_archive.get_chart("2026-W01", "region", "Eastern")) == 1
+
+
+def test_week_ids_are_padded_and_ranks_dense():
+    chart = [
+        {"title": "A", "artist": "X", "rank": 1},
+        {"title": "B", "artist": "Y", "rank": 1},
+        {"title": "C", "artist": "Z", "position": 5},
+        {"title": "D", "artist": "W"},
+    ]
+    assert chart_archive.archive_chart("2026-W5", "top100", chart) == 4
+
+    entries = chart_archive.get_chart("2026-W05")
+    assert [(e["title"], e["rank"]) for e in entries] == [("A", 1), ("B", 2), ("D", 3), ("C", 4)]
+    assert chart_archive.get_chart("2026-W5") == entries   # normalised on read
+
+    with pytest.raises(ValueError):
+        chart_archive.archive_chart("2026-W99", "top100", chart)
+
+
+def test_unpadded_week_ids_are_migrated_once():
+    conn = sqlite3.connect(chart_archive.ARCHIVE_DB)
+    for statement in chart_archive._SCHEMA:
+        conn.execute(statement)
+    rows = [("2026-W5", 1, "x|a"), ("2026-W5", 2, "y|b"), ("2026-W06", 1, "y|b")]
+    conn.executemany(
+        "INSERT INTO chart_entries (week_id, chart, region, rank, song_key, "
+        "peak_rank, weeks_on_chart) VALUES (?, 'top100', '', ?, ?, ?, 1)",
+        [(week, rank, key, rank) for week, rank, key in rows],
+    )
+    conn.commit()
+    conn.close()
+
+    week6 = chart_archive.get_chart("2026-W06")
+    assert (week6[0]["last_week_rank"], week6[0]["weeks_on_chart"]) == (2, 2)
+    assert [e["week_id"] for e in chart_archive.get_song_run("y|b")] == ["2026-W05", "2026-W06"]
+
+    conn = sqlite3.connect(chart_archive.ARCHIVE_DB)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == chart_archive.SCHEMA_VERSION
+    conn.close()
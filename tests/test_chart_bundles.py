@@ -0,0 +1,88 @@
+"""
+Tests for immutable published-chart bundles and their file responses.
+"""
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from api import metrics
+from data import chart_bundles, region_snapshots, top100_snapshot
+
+PAYLOAD = {"week_id": "2025-W10", "count": 1, "items": [{"title": "Sitya Loss", "score": 9.5}]}
+
+
+@pytest.fixture
+def bundles(tmp_path, monkeypatch):
+    monkeypatch.setattr(chart_bundles, "BUNDLE_DIR", tmp_path / "bundles")
+    monkeypatch.setattr(top100_snapshot, "TOP100_DIR", tmp_path / "top100_snapshots")
+    monkeypatch.setattr(region_snapshots, "SNAPSHOT_DIR", tmp_path / "region_snapshots")
+    return tmp_path
+
+
+@pytest.fixture
+def client(bundles):
+    return TestClient(main.app)
+
+
+def test_publish_is_content_addressed_and_repoints_on_change(bundles):
+    digest = chart_bundles.publish("top100", "2025-W10", PAYLOAD)
+
+    assert chart_bundles.object_path(digest).read_bytes() == chart_bundles.serialize(PAYLOAD)
+    assert gzip.decompress(chart_bundles.object_path(digest, "gzip").read_bytes()) == \
+        chart_bundles.serialize(PAYLOAD)
+
+    # Republishing the same chart is a no-op; new content repoints the ref
+    assert chart_bundles.publish("top100", "2025-W10", PAYLOAD) == digest
+    changed = chart_bundles.publish("top100", "2025-W10", {"changed": True})
+    assert changed != digest
+    assert chart_bundles.resolve("top100", "2025-W10") == changed
+    assert chart_bundles.object_path(digest).exists()   # old URL still served
+    assert chart_bundles.resolve("top100", "../etc") is None
+
+
+def test_published_week_served_as_file_with_strong_etag(client):
+    digest = chart_bundles.publish("top100", "2025-W10", PAYLOAD)
+
+    response = client.get("/charts/published/2025-W10/top100", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.json() == PAYLOAD
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == f'"{digest}-gzip"'
+
+    cached = client.get(f"/charts/bundles/{digest}",
+                        headers={"Accept-Encoding": "identity", "If-None-Match": f'"{digest}"'})
+    assert cached.status_code == 304
+    assert "immutable" in cached.headers["cache-control"]
+
+    assert client.get("/charts/published/2025-W11/top100").status_code == 404
+
+
+def test_snapshots_saved_before_bundles_are_bundled_on_first_read(client, bundles):
+    path = bundles / "region_snapshots" / "2025-W10" / "eastern.json"
+    path.parent.mkdir(parents=True)
+    path.write_text(json.dumps({**PAYLOAD, "region": "Eastern"}, indent=2))
+
+    response = client.get("/charts/published/2025-W10/regions/eastern")
+    assert response.status_code == 200
+    assert response.json()["region"] == "Eastern"
+    assert chart_bundles.resolve("region", "2025-W10", "Eastern")
+
+    assert client.get("/charts/published/2025-W10/regions/central").status_code == 400
+
+
+def test_failed_publish_is_logged_and_counted(bundles, monkeypatch, caplog):
+    def broken(*args, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(chart_bundles, "publish", broken)
+    monkeypatch.setattr(top100_snapshot, "current_chart_week", lambda: {"week_id": "2025-W10"})
+    monkeypatch.setattr(top100_snapshot, "load_items", lambda: [{"title": "Sitya Loss", "score": 9.5}])
+    failures = metrics.BUNDLE_PUBLISH_FAILURES.labels("top100")
+    before = failures.value
+
+    payload = top100_snapshot.save_top100_snapshot()
+    assert payload["count"] == 1
+    assert failures.value == before + 1
+    assert "Publishing the Top 100 bundle" in caplog.text
@@ -0,0 +1,97 @@
+"""
+Tests for the cached, paginated /charts/top100 response path.
+"""
+import base64
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    main.chart_cache.clear()
+
+    for i in range(25):
+        db.add_song({
+            "title": f"Song {i:02d}", "artist": f"Artist {i:02d}",
+            "plays": 1000 * (25 - i), "score": 50.0,
+            "region": "central", "source_type": "radio", "source": "radio_test",
+            "url": "https://example.com/secret",
+        })
+
+    yield TestClient(main.app)
+    main.chart_cache.clear()
+
+
+def test_projection_and_cursor_pagination(client):
+    first = client.get("/charts/top100?limit=10").json()
+    assert [e["rank"] for e in first["entries"]] == list(range(1, 11))
+    assert "url" not in first["entries"][0]
+    assert first["next_cursor"]
+
+    second = client.get(f"/charts/top100?limit=10&cursor={first['next_cursor']}").json()
+    assert [e["rank"] for e in second["entries"]] == list(range(11, 21))
+    assert not {e["title"] for e in first["entries"]} & {e["title"] for e in second["entries"]}
+
+    last = client.get("/charts/top100?limit=10&offset=20").json()
+    assert last["count"] == 5
+    assert last["next_cursor"] is None
+
+    assert client.get("/charts/top100?cursor=!!").status_code == 400
+    for offset in (-5, main.CHART_PAGE_MAX):
+        cursor = base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip("=")
+        assert client.get(f"/charts/top100?cursor={cursor}").status_code == 400
+
+
+def test_field_selection(client):
+    body = client.get("/charts/top100?limit=3&fields=rank,title").json()
+    assert body["entries"][0] == {"rank": 1, "title": "Song 00"}
+
+    assert client.get("/charts/top100?fields=rank,url").status_code == 400
+
+
+def test_cached_bytes_gzip_etag_and_invalidation(client):
+    headers = {"Accept-Encoding": "gzip"}
+    first = client.get("/charts/top100", headers=headers)
+    assert first.headers["content-encoding"] == "gzip"
+    etag = first.headers["etag"]
+
+    again = client.get("/charts/top100", headers=headers)
+    assert again.headers["etag"] == etag
+    assert main.chart_cache.hits >= 1
+
+    assert client.get("/charts/top100", headers={"If-None-Match": etag}).status_code == 304
+
+    refused = client.get("/charts/top100", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "content-encoding" not in refused.headers
+    assert refused.json()["entries"]
+
+    # A write bumps the chart version and rebuilds the page
+    main.db_service.add_song({
+        "title": "New Hit", "artist": "Newcomer", "plays": 10 ** 6, "score": 99.0,
+        "region": "central", "source_type": "radio", "source": "radio_test",
+    })
+    fresh = client.get("/charts/top100", headers=headers)
+    assert fresh.headers["etag"] != etag
+    assert fresh.json()["entries"][0]["title"] == "New Hit"
+
+
+def test_raw_gzip_body_roundtrips():
+    from api.responses import CachedBody
+
+    cached = CachedBody({"entries": [{"title": "Sitya Loss"}] * 50})
+    assert json.loads(gzip.decompress(cached.gzipped)) == json.loads(cached.body)
+
+
+def test_gzip_is_skipped_for_event_streams_and_exports():
+    from api.responses import StreamingGZipMiddleware
+
+    middleware = StreamingGZipMiddleware(app=None)
+    assert middleware._excluded("/charts/stream")
+    assert middleware._excluded("/export/charts/2026-W10")
+    assert not middleware._excluded("/charts/top100")
+    assert not middleware._excluded("/exporter")
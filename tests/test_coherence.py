@@ -0,0 +1,72 @@
+"""
+Tests for cross-worker cache coherence (shared generation + data_version).
+"""
+import sqlite3
+
+import pytest
+
+import main
+from data import song_identity
+
+SONG = {"title": "Sitya Loss", "artist": "Eddy Kenzo", "plays": 3, "score": 1.0,
+        "region": "central", "source_type": "tv", "source": "tv_ntv"}
+
+
+@pytest.fixture
+def workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(main.config, "DATABASE_PATH", tmp_path / "ugboard.db")
+    monkeypatch.setattr(main.config, "CACHE_COHERENCE_MS", 0)
+    pair = main.DatabaseService(), main.DatabaseService()
+    yield pair
+    for service in pair:
+        service.coherence.close()
+
+
+def test_write_in_one_worker_invalidates_the_other(workers):
+    writer, reader = workers
+    cleared = []
+    reader.coherence.register("charts", lambda: cleared.append(True))
+    before = reader.chart_version
+
+    writer.add_song(SONG)
+
+    assert reader.chart_version == writer.chart_version == before + 1
+    assert cleared == [True]
+    assert reader.coherence.stats()["invalidations"]["charts"] == 1
+
+    # Nothing written: no invalidation, only the pragma check
+    assert reader.chart_version == before + 1
+    assert cleared == [True]
+
+
+def test_non_chart_writes_keep_caches(workers):
+    writer, reader = workers
+    version = reader.chart_version
+    changes = reader.coherence.changes
+
+    conn = sqlite3.connect(writer.db_path)
+    conn.execute("INSERT INTO play_events (title, artist, source, source_type) VALUES ('a', 'b', 'c', 'd')")
+    conn.commit()
+    conn.close()
+
+    assert reader.chart_version == version
+    assert reader.coherence.changes == changes
+
+
+def test_stale_identity_index_picks_up_other_process_rows(workers):
+    writer, _ = workers
+    conn = sqlite3.connect(writer.db_path)
+    index = song_identity.get_index(conn)
+    size = len(index)
+
+    # Another process adds a canonical song behind this index's back
+    conn.execute(
+        "INSERT INTO canonical_songs (song_key, title, artist) VALUES ('azawi|slow dancing', 'Slow Dancing', 'Azawi')"
+    )
+    conn.commit()
+    assert len(song_identity.get_index(conn)) == size
+
+    song_identity.mark_stale()
+    assert len(song_identity.get_index(conn)) == size + 1
+    assert song_identity.get_index(conn).lookup("slow dancing", "azawi") is not None
+    conn.close()
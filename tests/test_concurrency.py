@@ -0,0 +1,89 @@
+"""
+Tests for per-route-class concurrency limits and load shedding.
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from api.concurrency import ADMIN, HEAVY, INGEST, PUBLIC, Limiter, Overloaded
+
+ADMIN_AUTH = {"Authorization": f"Bearer {main.config.ADMIN_TOKEN}"}
+
+# Requests reach the routes: keep them off the real database
+pytestmark = pytest.mark.usefixtures("db")
+
+
+def test_queue_admits_in_order_and_sheds_over_budget():
+    limiter = Limiter("test", limit=1, queue_budget=1.0, service_time=0.4)
+
+    async def scenario():
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())   # estimate 0.4s: queued
+        await asyncio.sleep(0)
+        assert limiter.stats()["waiting"] == 1
+
+        limiter.configure(queue_budget=0.5)
+        with pytest.raises(Overloaded) as shed:              # estimate 0.8s: shed
+            await limiter.acquire()
+        assert shed.value.retry_after == pytest.approx(0.8)
+
+        limiter.release(0.4)
+        assert await waiter >= 0
+        limiter.release(0.4)
+
+    asyncio.run(scenario())
+    assert limiter.stats()["active"] == 0
+    assert (limiter.admitted, limiter.queued, limiter.shed) == (2, 1, 1)
+
+
+def test_busy_admin_class_is_shed_while_public_reads_pass(monkeypatch):
+    busy = Limiter(ADMIN, limit=1, queue_budget=0.0, service_time=30.0)
+    monkeypatch.setitem(main.concurrency_limits.limiters, ADMIN, busy)
+    asyncio.run(busy.acquire())   # a long scrape holds the only slot
+
+    client = TestClient(main.app)
+    response = client.post("/scoring/update", headers=ADMIN_AUTH)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "30"
+    assert response.json()["status_code"] == 503
+
+    assert client.get("/").status_code == 200
+    assert client.get("/health/live").status_code == 200
+    assert busy.shed == 1
+
+
+def test_exports_and_search_queue_in_the_heavy_class(monkeypatch):
+    limits = main.concurrency_limits
+    assert limits.classify("/export/history") == HEAVY
+    assert limits.classify("/export/charts/2026-W41") == HEAVY
+    assert limits.classify("/search") == HEAVY
+
+    busy = Limiter(HEAVY, limit=1, queue_budget=0.0, service_time=10.0)
+    monkeypatch.setitem(limits.limiters, HEAVY, busy)
+    asyncio.run(busy.acquire())   # a long export holds the only slot
+
+    client = TestClient(main.app)
+    assert client.get("/export/history", headers=ADMIN_AUTH).status_code == 503
+    assert client.get("/search?q=kenzo").status_code == 503
+    assert client.get("/").status_code == 200
+    assert busy.shed == 2
+
+
+def test_limits_adjustable_at_runtime(monkeypatch):
+    limits = main.concurrency_limits
+    monkeypatch.setitem(limits.limiters, INGEST, Limiter(INGEST, limit=8, queue_budget=2.0))
+    assert limits.classify("/ingest/tv") == INGEST
+    assert limits.classify("/charts/top100") == PUBLIC
+    assert limits.classify("/admin/concurrency/ingest") is None
+
+    client = TestClient(main.app)
+    response = client.post("/admin/concurrency/ingest?limit=2&queue_budget_ms=500", headers=ADMIN_AUTH)
+    assert response.status_code == 200
+    assert response.json()["new"] == {"limit": 2, "queue_budget_ms": 500.0}
+    assert limits.limiters[INGEST].limit == 2
+
+    stats = client.get("/admin/concurrency", headers=ADMIN_AUTH).json()
+    assert stats["classes"][INGEST]["limit"] == 2
+    assert client.post("/admin/concurrency/bulk?limit=2", headers=ADMIN_AUTH).status_code == 404
@@ -0,0 +1,61 @@
+"""
+Tests for the trigger-maintained row counters.
+"""
+import sqlite3
+
+from data import counters
+
+
+def _schema(conn):
+    conn.execute("CREATE TABLE songs (id INTEGER PRIMARY KEY, source_type TEXT, region TEXT)")
+    conn.execute("CREATE TABLE scraper_history (id INTEGER PRIMARY KEY, status TEXT)")
+    conn.execute("CREATE TABLE youtube_scheduler (id INTEGER PRIMARY KEY, status TEXT)")
+    conn.execute("CREATE TABLE streams_history (id INTEGER PRIMARY KEY, status TEXT, platform TEXT)")
+
+
+def _scan(conn):
+    return {
+        "total": conn.execute("SELECT COUNT(*) FROM songs").fetchone()[0],
+        "source_type": dict(conn.execute(
+            "SELECT source_type, COUNT(*) FROM songs GROUP BY source_type"
+        ).fetchall()),
+    }
+
+
+def test_counters_track_inserts_updates_and_deletes():
+    conn = sqlite3.connect(":memory:")
+    _schema(conn)
+    conn.execute("INSERT INTO songs (source_type, region) VALUES ('tv', 'central')")
+
+    # Existing rows are counted when the table is first created
+    counters.ensure_schema(conn)
+    assert counters.read(conn)["songs"]["total"] == 1
+
+    conn.executemany(
+        "INSERT INTO songs (source_type, region) VALUES (?, ?)",
+        [("radio", "western"), ("radio", "eastern"), ("youtube", "central")]
+    )
+    conn.execute("UPDATE songs SET source_type = 'streaming' WHERE source_type = 'youtube'")
+    conn.execute("UPDATE songs SET region = 'northern' WHERE id = 1")
+    conn.execute("DELETE FROM songs WHERE region = 'western'")
+    conn.execute("INSERT INTO streams_history (status, platform) VALUES ('success', 'spotify')")
+
+    counts = counters.read(conn)
+    assert {k: counts["songs"][k] for k in ("total", "source_type")} == _scan(conn)
+    assert counts["songs"]["region"] == {"northern": 1, "eastern": 1, "central": 1}
+    assert counters.get(counts, "streams_history", "platform", "spotify") == 1
+    assert counters.get(counts, "scraper_history", "status", "error") == 0
+
+
+def test_ensure_schema_is_idempotent_and_rebuild_recounts():
+    conn = sqlite3.connect(":memory:")
+    _schema(conn)
+    counters.ensure_schema(conn)
+    counters.ensure_schema(conn)
+
+    conn.execute("INSERT INTO songs (source_type, region) VALUES ('tv', 'central')")
+    assert counters.read(conn)["songs"]["total"] == 1
+
+    conn.execute("UPDATE table_counters SET count = 99")
+    counters.rebuild(conn)
+    assert counters.read(conn)["songs"]["source_type"] == {"tv": 1}
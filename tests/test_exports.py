@@ -0,0 +1,167 @@
+"""
+Tests for streaming CSV/Parquet exports and resumable byte ranges.
+"""
+import csv
+import hashlib
+import io
+import sqlite3
+
+import pytest
+
+import main
+from data import chart_archive, exports
+
+ADMIN = {"Authorization": f"Bearer {main.config.ADMIN_TOKEN}"}
+
+
+@pytest.fixture
+def db(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(exports, "EXPORT_DIR", tmp_path / "exports")
+    monkeypatch.setattr(exports, "CHUNK_ROWS", 7)
+
+    for i in range(30):
+        db.add_song({
+            "title": f"Song {i}", "artist": "Eddy Kenzo, \"Live\"", "plays": i, "score": i,
+            "region": "central" if i % 2 else "western", "source_type": "radio",
+            "source": "radio_test",
+        })
+    return db
+
+
+def _rows(body: bytes):
+    return list(csv.DictReader(io.StringIO(body.decode("utf-8"))))
+
+
+def test_keyset_chunks_cover_composite_keys(tmp_path):
+    path = tmp_path / "keys.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (a TEXT, b INTEGER, PRIMARY KEY (a, b))")
+    conn.executemany("INSERT INTO t VALUES (?, ?)", [(a, b) for a in "xyz" for b in range(4)])
+    conn.commit()
+    conn.close()
+
+    chunks = list(exports.iter_chunks(
+        lambda: sqlite3.connect(path), "t", ["a", "b"], ["a", "b"], "b != ?", [0], chunk_rows=4
+    ))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 1]
+    assert [row for chunk in chunks for row in chunk][:4] == [("x", 1), ("x", 2), ("x", 3), ("y", 1)]
+
+
+def test_songs_csv_streams_every_row_once(client):
+    assert client.get("/export/songs").status_code == 401
+    response = client.get("/export/songs", headers=ADMIN)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["accept-ranges"] == "bytes"
+    assert "content-encoding" not in client.get("/export/songs", headers={**ADMIN, "Accept-Encoding": "gzip"}).headers
+
+    rows = _rows(response.content)
+    assert [int(row["id"]) for row in rows] == list(range(1, 31))
+    assert rows[0]["artist"] == "Eddy Kenzo, \"Live\""
+
+    western = _rows(client.get("/export/songs?region=western", headers=ADMIN).content)
+    assert len(western) == 15
+    assert client.get("/export/songs?region=mars", headers=ADMIN).status_code == 400
+
+
+def test_range_requests_resume_the_same_bytes(client, db):
+    # No spool file yet: the range request builds it first
+    partial = client.get("/export/songs", headers={**ADMIN, "Range": "bytes=100-"})
+    assert partial.status_code == 206
+    full = client.get("/export/songs", headers=ADMIN)
+    assert full.headers["content-length"] == str(len(full.content))
+    assert partial.content == full.content[100:]
+    assert partial.headers["content-range"] == f"bytes 100-{len(full.content) - 1}/{len(full.content)}"
+
+    tag = full.headers["etag"]
+    assert tag == f'"{hashlib.sha1(full.content).hexdigest()[:24]}"'
+    assert client.get("/export/songs", headers={**ADMIN, "Range": "bytes=0-9", "If-Range": tag}).content == full.content[:10]
+    assert client.get("/export/songs", headers={**ADMIN, "Range": "bytes=-5"}).content == full.content[-5:]
+    assert client.get("/export/songs", headers={**ADMIN, "Range": f"bytes={len(full.content)}-"}).status_code == 416
+
+    # The ETag follows the bytes: a rebuilt spool file still resumes
+    for path in exports.EXPORT_DIR.iterdir():
+        path.unlink()
+    resumed = client.get("/export/songs", headers={**ADMIN, "Range": "bytes=100-", "If-Range": tag})
+    assert resumed.status_code == 206
+    assert resumed.content == full.content[100:]
+
+    # New data moves the key on; a resume still gets the spooled old bytes
+    db.add_song({"title": "New", "artist": "Azawi", "region": "central",
+                 "source_type": "tv", "source": "tv_test"})
+    old = client.get("/export/songs", headers={**ADMIN, "Range": "bytes=100-", "If-Range": tag})
+    assert old.status_code == 206
+    assert old.content == full.content[100:]
+
+    # ...and an unknown If-Range gets the whole new export
+    fresh = client.get("/export/songs", headers={**ADMIN, "Range": "bytes=100-", "If-Range": f'"{"0" * 24}"'})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != tag
+    assert len(_rows(fresh.content)) == 31
+
+
+def test_first_download_streams_and_spools(client, db, monkeypatch):
+    def no_build(*args, **kwargs):
+        raise AssertionError("a plain download must not wait for a build")
+    monkeypatch.setattr(exports, "build", no_build)
+
+    first = client.get("/export/songs", headers=ADMIN)
+    assert first.status_code == 200
+    assert "etag" not in first.headers
+    assert len(_rows(first.content)) == 30
+
+    second = client.get("/export/songs", headers=ADMIN)
+    assert second.content == first.content
+    assert second.headers["etag"] == f'"{hashlib.sha1(first.content).hexdigest()[:24]}"'
+
+
+def test_songs_version_is_shared_by_workers(db):
+    version = db.export_version("songs")
+    assert main.DatabaseService().export_version("songs") == version
+
+    db.add_song({"title": "New", "artist": "Azawi", "region": "central",
+                 "source_type": "tv", "source": "tv_test"})
+    assert db.export_version("songs") != version
+
+
+def test_abandoned_download_leaves_no_spool_file(db, tmp_path):
+    body = exports.spool("tag", "csv", exports.export(db.get_connection, "songs", "csv"))
+    next(body)
+    body.close()
+    assert list((tmp_path / "exports").iterdir()) == []
+
+
+def test_chart_week_export(client):
+    assert client.get("/export/charts/2026-W10").status_code == 404
+
+    chart_archive.archive_chart("2026-W10", "top100", [
+        {"title": "A", "artist": "X", "score": 9}, {"title": "B", "artist": "Y", "score": 5},
+    ])
+    chart_archive.archive_chart("2026-W10", "region", [{"title": "C", "artist": "Z", "score": 3}], region="central")
+
+    rows = _rows(client.get("/export/charts/2026-W10").content)
+    assert [(r["chart"], r["rank"], r["title"]) for r in rows] == [
+        ("region", "1", "C"), ("top100", "1", "A"), ("top100", "2", "B"),
+    ]
+    central = _rows(client.get("/export/charts/2026-W10?region=central").content)
+    assert [r["title"] for r in central] == ["C"]
+
+
+def test_history_export_requires_admin(client, db):
+    for i in range(3):
+        db.add_scraper_history("radio", f"station_{i}", 5, 1, "success")
+
+    assert client.get("/export/history").status_code == 401
+    assert len(_rows(client.get("/export/history", headers=ADMIN).content)) == 3
+
+    db.run_retention()   # rollups are written by the retention job only
+    daily = _rows(client.get("/export/history?granularity=daily", headers=ADMIN).content)
+    assert sum(int(r["runs"]) for r in daily) == 3
+    assert client.get("/export/history?source=songs", headers=ADMIN).status_code == 400
+
+
+@pytest.mark.skipif(exports.pyarrow is not None, reason="pyarrow installed")
+def test_parquet_needs_pyarrow(client):
+    response = client.get("/export/songs?format=parquet", headers=ADMIN)
+    assert response.status_code == 400
+    assert "pyarrow" in response.json()["error"]
@@ -41,3 +41,24 @@ def test_root_endpoint():
     data = response.json()
     assert data["message"] == "UG Board Engine API"
     assert "health" in data
+
+def test_liveness_probe():
+    """Liveness answers without touching components."""
+    response = client.get("/health/live")
+    
+    assert response.status_code == 200
+    assert response.json()["status"] == "alive"
+    
+def test_readiness_probe_reports_saturation(monkeypatch):
+    """Readiness fails once database connections are saturated."""
+    import main
+    
+    response = client.get("/health/ready")
+    data = response.json()
+    assert "saturation" in data["database"]
+    assert "scraper_backlog" in data
+    
+    monkeypatch.setattr(main.metrics, "open_connections", lambda: main.config.DB_MAX_CONNECTIONS)
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "not_ready"
@@ -0,0 +1,86 @@
+"""
+Tests for Idempotency-Key replay and unchanged-item skipping on /ingest/*.
+"""
+import sqlite3
+
+import pytest
+
+import main
+from api.ingestion import idempotency
+
+INGEST = {"Authorization": f"Bearer {main.config.INGEST_TOKEN}"}
+
+PAYLOAD = {"source": "ntv", "items": [
+    {"title": "Sitya Loss", "artist": "Eddy Kenzo", "plays": 3},
+    {"title": "Mbilo Mbilo", "artist": "Eddy Kenzo", "plays": 1},
+]}
+
+
+@pytest.fixture(autouse=True)
+def synchronous_ingest(monkeypatch):
+    monkeypatch.setattr(main.config, "INGEST_QUEUE_ENABLED", False)
+
+
+def test_retry_with_key_replays_stored_response(client, db, count_rows):
+    headers = {**INGEST, "Idempotency-Key": "tv-ntv-0001"}
+
+    first = client.post("/ingest/tv", json=PAYLOAD, headers=headers)
+    events = count_rows("play_events")
+    retry = client.post("/ingest/tv", json=PAYLOAD, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.content == first.content
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert count_rows("play_events") == events == 2
+
+    # Same key, different payload
+    changed = {**PAYLOAD, "items": PAYLOAD["items"][:1]}
+    assert client.post("/ingest/tv", json=changed, headers=headers).status_code == 422
+
+
+def test_stored_keys_survive_restart_and_expire(tmp_path):
+    path = tmp_path / "keys.db"
+
+    def connect():
+        return sqlite3.connect(path)
+
+    conn = connect()
+    idempotency.ensure_schema(conn)
+    conn.commit()
+
+    store = idempotency.IdempotencyStore(connect)
+    assert store.begin("k", "fp") is None
+    with pytest.raises(idempotency.KeyInFlight):
+        store.begin("k", "fp")
+    store.finish("k", 202, b'{"batch_id": "x"}')
+
+    restarted = idempotency.IdempotencyStore(connect)
+    assert restarted.begin("k", "fp") == (202, b'{"batch_id": "x"}')
+    with pytest.raises(idempotency.KeyReused):
+        restarted.begin("k", "other")
+
+    # Another worker sees the reservation through the table
+    store.begin("busy", "fp")
+    with pytest.raises(idempotency.KeyInFlight):
+        restarted.begin("busy", "fp")
+    store.finish("busy")
+    assert restarted.begin("busy", "fp") is None
+
+    expired = idempotency.IdempotencyStore(connect, ttl=-1)
+    assert expired.begin("old", "fp") is None
+    expired.finish("old", 200, b"{}")
+    assert expired.prune(conn) == 1
+    conn.close()
+
+
+def test_unchanged_items_are_skipped_before_db_work(client, db, count_rows):
+    client.post("/ingest/tv", json=PAYLOAD, headers=INGEST)
+
+    resent = {**PAYLOAD, "items": [PAYLOAD["items"][0], {**PAYLOAD["items"][1], "plays": 9}]}
+    result = client.post("/ingest/tv", json=resent, headers=INGEST).json()
+    assert (result["unchanged_count"], result["total_items"]) == (1, 2)
+    assert count_rows("play_events") == 3
+
+    result = client.post("/ingest/tv", json=resent, headers=INGEST).json()
+    assert result["unchanged_count"] == 2
+    assert count_rows("play_events") == 3
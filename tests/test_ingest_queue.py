@@ -0,0 +1,175 @@
+"""
+Tests for the durable ingest queue (segment log, 202 ingest, replay).
+"""
+import os
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from api.ingestion.ingest_queue import IngestQueue, TransientError
+
+INGEST = {"Authorization": f"Bearer {main.config.INGEST_TOKEN}"}
+
+
+def _song(title, source="tv_ntv"):
+    return {"title": title, "artist": "Azawi", "plays": 5, "score": 1.0,
+            "region": "central", "source_type": "tv", "source": source}
+
+
+def _queue(tmp_path, apply, fail=lambda batch, error: None, **kwargs):
+    return IngestQueue(tmp_path / "queue", apply=apply, fail=fail, **kwargs)
+
+
+def test_batches_are_grouped_and_segments_removed(tmp_path):
+    groups = []
+    queue = _queue(tmp_path, groups.append, drain_items=4, segment_bytes=300)
+
+    for i in range(5):
+        queue.append("tv", "ntv", [_song(f"Song {i}"), _song(f"Other {i}")])
+    assert queue.flush()
+
+    # 2 songs per batch, 4 songs per transaction; full segments are deleted
+    assert all(len(group) <= 2 for group in groups)
+    assert sum(len(group) for group in groups) == 5
+    assert len(list((tmp_path / "queue").glob("*.seg"))) == 1
+    queue.stop()
+
+
+def test_recovery_replays_unapplied_batches_and_drops_torn_tail(tmp_path):
+    def unavailable(batches):
+        raise TransientError("database is locked")
+
+    crashed = _queue(tmp_path, unavailable)
+    first = crashed.append("tv", "ntv", [_song("A")])
+    crashed.append("radio", "cbs", [_song("B", "radio_cbs")])
+    crashed.is_running = False  # "crash": nothing applied, files left behind
+
+    segment = sorted((tmp_path / "queue").glob("*.seg"))[-1]
+    with open(segment, "ab") as handle:
+        handle.write(b"\x00\x00\x01\x00torn")
+
+    applied = []
+    recovered = _queue(tmp_path, lambda batches: applied.extend(b["id"] for b in batches))
+    recovered.start()
+    assert recovered.flush()
+    recovered.stop()
+
+    assert applied[0] == first
+    assert len(applied) == 2
+    assert recovered.replayed == 2
+
+
+def test_workers_own_directories_and_adopt_exited_workers_segments(tmp_path):
+    def unavailable(batches):
+        raise TransientError("database is locked")
+
+    root = tmp_path / "queue"
+    first = IngestQueue(root / "worker-1", apply=unavailable, fail=None, adopt_from=root)
+    batch = first.append("tv", "ntv", [_song("A")])
+    second = IngestQueue(root / "worker-2", apply=unavailable, fail=None, adopt_from=root)
+    second.start()
+
+    # worker-1 is alive: its segments stay where they are
+    assert list((root / "worker-1").glob("*.seg"))
+    assert second.stats()["pending_batches"] == 0
+    second.stop()
+
+    # worker-1 exits without draining; the next worker to start adopts it
+    first.is_running = False
+    first._thread.join(timeout=5)
+    os.close(first._owner_fd)
+
+    applied = []
+    third = IngestQueue(root / "worker-3", apply=lambda b: applied.extend(x["id"] for x in b),
+                        fail=None, adopt_from=root)
+    third.start()
+    assert third.flush()
+    third.stop()
+
+    assert applied == [batch]
+    assert not (root / "worker-1").exists()
+
+
+def test_replay_after_commit_is_applied_exactly_once(tmp_path, db, count_rows):
+    def commit_then_crash(batches):
+        db.apply_ingest_batches(batches)
+        raise TransientError("process killed before ack")
+
+    crashed = _queue(tmp_path, commit_then_crash)
+    crashed.append("tv", "ntv", [_song("Once"), _song("Twice")])
+    crashed.is_running = False
+    crashed._wake.set()
+    crashed._thread.join(timeout=5)
+
+    assert count_rows("play_events") == 2
+
+    recovered = _queue(tmp_path, db.apply_ingest_batches)
+    recovered.start()
+    assert recovered.flush()
+    recovered.stop()
+
+    assert count_rows("play_events") == 2
+    assert count_rows("songs") == 2
+
+
+def test_ingest_returns_202_and_batch_status(tmp_path, db, monkeypatch, count_rows):
+    queue = _queue(tmp_path, db.apply_ingest_batches, db.record_ingest_failure)
+    monkeypatch.setattr(main, "ingest_queue", queue)
+    client = TestClient(main.app)
+
+    payload = {"source": "ntv", "items": [
+        {"title": "Sitya Loss", "artist": "Eddy Kenzo", "plays": 3},
+        {"title": "Mbilo Mbilo", "artist": "Eddy Kenzo"},
+    ]}
+    response = client.post("/ingest/tv", json=payload, headers=INGEST)
+    assert response.status_code == 202
+    batch_id = response.json()["batch_id"]
+
+    assert queue.flush()
+    batch = client.get(f"/ingest/batches/{batch_id}", headers=INGEST).json()
+    assert batch["status"] == "applied"
+    assert (batch["added"], batch["updated"]) == (2, 0)
+
+    client.post("/ingest/tv", json=payload, headers=INGEST)
+    assert queue.flush()
+    assert count_rows("songs") == 2
+
+    assert client.get(f"/ingest/batches/{'0' * 32}", headers=INGEST).status_code == 404
+    queue.stop()
+
+
+def test_poison_batch_is_marked_failed(tmp_path, db):
+    queue = _queue(tmp_path, db.apply_ingest_batches, db.record_ingest_failure)
+    good = queue.append("tv", "ntv", [_song("Fine")])
+    bad = queue.append("tv", "ntv", [{"artist": "No title", "source": "tv_ntv"}])
+    assert queue.flush()
+    queue.stop()
+
+    assert db.get_ingest_batch(good)["status"] == "applied"
+    failed = db.get_ingest_batch(bad)
+    assert failed["status"] == "failed"
+    assert "title" in failed["error"]
+
+
+def test_only_lock_errors_are_retried(tmp_path, db, monkeypatch):
+    def locked(conn, song):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(db, "_upsert_song", locked)
+    with pytest.raises(TransientError):
+        db.apply_ingest_batches([{"id": "a" * 32, "endpoint": "tv", "source": "ntv",
+                                  "received_at": 0, "songs": [_song("Locked")]}])
+
+    def broken(conn, song):
+        raise sqlite3.OperationalError("no such column: broken")
+
+    monkeypatch.setattr(db, "_upsert_song", broken)
+    queue = _queue(tmp_path, db.apply_ingest_batches, db.record_ingest_failure)
+    batch_id = queue.append("tv", "ntv", [_song("Broken")])
+    assert queue.flush()
+    queue.stop()
+
+    assert db.get_ingest_batch(batch_id)["status"] == "failed"
+    assert "no such column" in db.get_ingest_batch(batch_id)["error"]
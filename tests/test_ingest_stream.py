@@ -0,0 +1,121 @@
+"""
+Tests for NDJSON streaming ingest (/ingest/stream).
+"""
+import asyncio
+import gzip
+import json
+import sqlite3
+
+import pytest
+
+import main
+from api.ingestion import ndjson
+
+INGEST = {"Authorization": f"Bearer {main.config.INGEST_TOKEN}"}
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(main.config, "INGEST_STREAM_CHUNK", 2)
+
+
+def _lines(*items):
+    return b"".join(
+        (item if isinstance(item, bytes) else json.dumps(item).encode()) + b"\n" for item in items
+    )
+
+
+def _collect(chunks, **kwargs):
+    async def source():
+        for chunk in chunks:
+            yield chunk
+
+    async def run():
+        return [pair async for pair in ndjson.iter_lines(source(), **kwargs)]
+
+    return asyncio.run(run())
+
+
+def test_lines_split_across_chunks_and_overlong_lines_skipped():
+    body = b'{"a": 1}\n\n' + b"x" * 50 + b'\n{"b": 2}'
+    pieces = [body[i:i + 7] for i in range(0, len(body), 7)]
+
+    assert _collect(pieces, max_line=20) == [(1, b'{"a": 1}'), (3, None), (4, b'{"b": 2}')]
+    assert _collect([gzip.compress(body)], encoding="gzip", max_line=20)[-1] == (4, b'{"b": 2}')
+
+
+def test_gzip_stream_commits_in_chunks_and_reports_bad_lines(client, db):
+    body = _lines(
+        {"title": "Sitya Loss", "artist": "Eddy Kenzo", "plays": 4},
+        {"title": "Mbilo Mbilo", "artist": "Eddy Kenzo"},
+        b"{not json",
+        {"title": "Slow Dancing", "artist": "Azawi", "region": "mars"},
+        {"title": "Bweyagala", "artist": "Vinka", "region": "eastern"},
+    )
+    response = client.post(
+        "/ingest/stream?source_type=radio&source=cbs",
+        content=gzip.compress(body),
+        headers={**INGEST, "Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"},
+    )
+    result = response.json()
+
+    assert response.status_code == 200
+    assert (result["accepted"], result["rejected"], result["chunks"]) == (3, 2, 2)
+    assert result["committed_through_line"] == 5
+    assert [e["line"] for e in result["errors"]] == [3, 4]
+    assert result["errors"][1]["error"].startswith("region")
+
+    conn = sqlite3.connect(db.db_path)
+    rows = conn.execute("SELECT source, source_type FROM songs").fetchall()
+    conn.close()
+    assert rows == [("radio_cbs", "radio")] * 3
+
+
+def test_stream_request_validation(client):
+    ndjson_headers = {**INGEST, "Content-Type": "application/x-ndjson"}
+
+    assert client.post("/ingest/stream?source_type=tv&source=ntv", content=b"{}",
+                       headers={**INGEST, "Content-Type": "application/json"}).status_code == 415
+    assert client.post("/ingest/stream?source_type=streaming&source=x", content=b"",
+                       headers=ndjson_headers).status_code == 400
+    assert client.post("/ingest/stream?source_type=tv&source=ntv", content=b"",
+                       headers={**ndjson_headers, "Content-Encoding": "br"}).status_code == 415
+
+
+def test_stream_idempotency_key_covers_the_body(client, db):
+    headers = {**INGEST, "Content-Type": "application/x-ndjson", "Idempotency-Key": "stream-0001"}
+    url = "/ingest/stream?source_type=tv&source=ntv"
+    body = _lines({"title": "Sitya Loss", "artist": "Eddy Kenzo"})
+
+    first = client.post(url, content=body, headers=headers)
+    retry = client.post(url, content=body, headers=headers)
+    assert first.status_code == retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.content == first.content
+
+    changed = _lines({"title": "Mbilo Mbilo", "artist": "Eddy Kenzo"})
+    assert client.post(url, content=changed, headers=headers).status_code == 422
+
+
+def test_compressed_bomb_is_inflated_in_bounded_steps(client, db, monkeypatch):
+    bomb = gzip.compress(b"\n" * (8 * 1024 * 1024))
+    steps = []
+    real_steps = ndjson._steps
+
+    def recording(inflate, data):
+        for piece in real_steps(inflate, data):
+            steps.append(len(piece))
+            yield piece
+
+    monkeypatch.setattr(ndjson, "_steps", recording)
+    with pytest.raises(ndjson.BodyTooLarge):
+        _collect([bomb], encoding="gzip", max_inflated=1024 * 1024)
+    assert max(steps) <= ndjson.INFLATE_STEP
+
+    monkeypatch.setattr(main.config, "INGEST_STREAM_MAX_MB", 1)
+    response = client.post(
+        "/ingest/stream?source_type=radio&source=cbs",
+        content=bomb,
+        headers={**INGEST, "Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"},
+    )
+    assert response.status_code == 413
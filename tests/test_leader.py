@@ -0,0 +1,160 @@
+"""
+Tests for the scheduler leader lease and jobs forwarded to the leader.
+"""
+import sqlite3
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+from data import leader
+
+YOUTUBE = {"Authorization": f"Bearer {main.config.YOUTUBE_TOKEN}"}
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.is_running = False
+        self.interval = 30
+        self.starts = 0
+
+    def start_scheduler(self, initial_delay=0):
+        self.is_running = True
+        self.starts += 1
+
+    def stop_scheduler(self):
+        self.is_running = False
+
+
+def _worker(monkeypatch, lease_seconds=30.0):
+    election = main.LeaderElection(lease_seconds=lease_seconds)
+    election.fake = FakeScheduler()
+    monkeypatch.setattr(election, "_schedulers", lambda: ((election.fake, 0),))
+    monkeypatch.setattr(election, "_settings", lambda: {"youtube_interval_minutes": (election.fake, "interval")})
+    return election
+
+
+def test_lease_has_one_holder_and_expires(db):
+    conn = sqlite3.connect(db.db_path)
+    assert leader.acquire(conn, "s", "a", ttl=30)
+    assert not leader.acquire(conn, "s", "b", ttl=30)
+    assert leader.acquire(conn, "s", "a", ttl=-1)   # renewed, but already expired
+    assert leader.acquire(conn, "s", "b", ttl=30)   # takeover
+    assert leader.current(conn, "s")["holder"] == "b"
+    conn.close()
+
+
+def test_only_the_leader_runs_schedulers_and_release_hands_over(db, monkeypatch):
+    first, second = _worker(monkeypatch), _worker(monkeypatch)
+    first.start()
+    second.start()
+
+    assert (first.is_leader, first.fake.is_running) == (True, True)
+    assert (second.is_follower, second.fake.is_running) == (True, False)
+
+    first.stop()
+    assert not first.fake.is_running
+    assert second.heartbeat()
+    assert second.fake.is_running
+    second.stop()
+
+
+def test_leader_that_cannot_renew_steps_down_when_its_lease_ends(db, monkeypatch):
+    election = _worker(monkeypatch, lease_seconds=30.0)
+    assert election.heartbeat()
+    assert election.fake.is_running
+
+    def locked():
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(db, "get_connection", locked)
+    assert election.heartbeat()          # lease still valid: keeps leading
+    assert election.fake.is_running
+
+    election.renewed_at -= 30.0          # the last renewal has expired
+    assert not election.heartbeat()
+    assert not election.is_leader
+    assert not election.fake.is_running
+
+
+def test_follower_forwards_trigger_to_leader(db, monkeypatch):
+    monkeypatch.setattr(main, "run_scheduler_job", lambda kind, params: {"ran": kind, **params})
+    leading = _worker(monkeypatch)
+    leading.start()
+    follower = _worker(monkeypatch)
+    follower.start()
+    monkeypatch.setattr(main, "leader_election", follower)
+
+    client = TestClient(main.app)
+    response = client.post("/youtube/trigger?channel_id=UC1&background=true", headers=YOUTUBE)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    leading.run_jobs()  # the leader's election loop may have claimed it already
+    deadline = time.monotonic() + 5
+    while client.get(f"/scheduler/jobs/{job_id}", headers=YOUTUBE).json()["status"] in ("pending", "running"):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    job = client.get(f"/scheduler/jobs/{job_id}", headers=YOUTUBE).json()
+    assert job["status"] == "completed"
+    assert job["result"] == {"ran": "youtube", "channel_id": "UC1"}
+    assert job["claimed_by"] == leading.holder
+
+    leading.stop()
+    follower.stop()
+
+
+def test_schedule_change_on_follower_reaches_the_leader(db, monkeypatch):
+    leading, follower = _worker(monkeypatch), _worker(monkeypatch)
+    leading.start()
+    follower.start()
+    monkeypatch.setattr(main, "leader_election", follower)
+    monkeypatch.setattr(main.youtube_scheduler, "interval", main.youtube_scheduler.interval)
+
+    admin = {"Authorization": f"Bearer {main.config.ADMIN_TOKEN}"}
+    response = TestClient(main.app).post("/youtube/schedule?interval=90", headers=admin)
+    assert response.status_code == 200
+
+    assert leading.heartbeat()
+    assert (leading.fake.interval, leading.fake.starts) == (90, 2)   # restarted with it
+    assert follower.sync_settings() == ["youtube_interval_minutes"]
+    assert not follower.fake.is_running
+
+    leading.stop()
+    follower.stop()
+
+
+def test_restarted_scheduler_never_runs_two_loops(monkeypatch):
+    scheduler = main.RetentionScheduler(interval_minutes=0)
+    runs = []
+
+    def run_job():
+        runs.append(threading.current_thread())
+        time.sleep(0.02)
+
+    monkeypatch.setattr(scheduler, "run_job", run_job)
+    scheduler.start_scheduler()
+    time.sleep(0.05)
+    # Demote and re-elect while a job is mid-run
+    scheduler.is_running = False
+    scheduler._stop.set()
+    scheduler.start_scheduler()
+
+    runs.clear()
+    time.sleep(0.1)
+    scheduler.stop_scheduler()
+    assert set(runs) == {scheduler.scheduler_thread}
+
+
+def test_idle_claim_does_not_take_the_write_lock(db):
+    writer = sqlite3.connect(db.db_path)
+    writer.execute("BEGIN IMMEDIATE")
+    conn = sqlite3.connect(db.db_path, timeout=0)
+    try:
+        assert leader.claim(conn, "a") == []
+    finally:
+        conn.close()
+        writer.rollback()
+        writer.close()
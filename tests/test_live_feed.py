@@ -0,0 +1,117 @@
+"""
+Tests for the live chart feed (shared broadcaster, SSE and WebSocket).
+"""
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from api.charts.live_feed import ChartBroadcaster, Subscription, diff_ranks
+
+
+def _entries(*keys):
+    return [{"key": key, "rank": rank} for rank, key in enumerate(keys, 1)]
+
+
+def test_diff_ranks():
+    changes = diff_ranks(_entries("a", "b", "c"), _entries("b", "a", "d"))
+
+    assert [e["key"] for e in changes["entered"]] == ["d"]
+    assert changes["moved"] == [
+        {"key": "b", "rank": 1, "previous_rank": 2},
+        {"key": "a", "rank": 2, "previous_rank": 1},
+    ]
+    assert changes["dropped"] == [{"key": "c", "previous_rank": 3}]
+
+
+def test_slow_subscriber_queue_stays_bounded():
+    async def run():
+        sub = Subscription(None, maxsize=3)
+        snapshot = {"event": "snapshot", "id": 9}
+        for i in range(10):
+            sub.push({"event": "diff", "id": i}, snapshot)
+
+        assert sub.queue.qsize() <= 3
+        assert sub.resets >= 1
+        # The backlog collapses into a resync snapshot
+        return [sub.queue.get_nowait()["event"] for _ in range(sub.queue.qsize())]
+
+    assert "snapshot" in asyncio.run(run())
+
+
+def test_one_computation_per_change_for_all_subscribers():
+    state = {"version": 1, "chart": _entries("a", "b")}
+    calls = []
+
+    def snapshot(chart):
+        calls.append(chart)
+        return state["chart"]
+
+    async def run():
+        feed = ChartBroadcaster(snapshot, lambda: state["version"], poll_interval=0.01)
+        subs = [await feed.subscribe() for _ in range(5)]
+        assert len(calls) == 1
+
+        state["version"], state["chart"] = 2, _entries("b", "a", "c")
+        events = [(await s.get(1), await s.get(1)) for s in subs]
+        await feed.close()
+        return events
+
+    events = asyncio.run(run())
+    assert len(calls) == 2
+    for first, second in events:
+        assert first["event"] == "snapshot"
+        assert second["event"] == "diff"
+        assert [e["key"] for e in second["data"]["entered"]] == ["c"]
+        assert len(second["data"]["moved"]) == 2
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    monkeypatch.setattr(main.live_feed, "poll_interval", 0.05)
+
+    for i in range(5):
+        db.add_song({
+            "title": f"Song {i}", "artist": f"Artist {i}", "plays": 1000 * (5 - i),
+            "score": 50.0, "region": "central", "source_type": "radio", "source": "radio_test",
+        })
+
+    yield TestClient(main.app)
+
+
+def test_websocket_pushes_snapshot_then_diff(client):
+    with client.websocket_connect("/charts/ws") as ws:
+        snapshot = json.loads(ws.receive_text())
+        assert snapshot["event"] == "snapshot"
+        assert [e["title"] for e in snapshot["data"]["entries"]][:2] == ["Song 0", "Song 1"]
+
+        main.db_service.add_song({
+            "title": "New Hit", "artist": "Newcomer", "plays": 10 ** 6, "score": 99.0,
+            "region": "central", "source_type": "radio", "source": "radio_test",
+        })
+
+        diff = json.loads(ws.receive_text())
+        assert diff["event"] == "diff"
+        assert diff["data"]["entered"][0]["title"] == "New Hit"
+        assert diff["data"]["entered"][0]["rank"] == 1
+        assert {m["previous_rank"] for m in diff["data"]["moved"]} == {1, 2, 3, 4, 5}
+
+    assert main.live_feed.stats()["subscribers"] == 0
+
+
+def test_sse_stream_format_and_region_validation(client):
+    assert client.get("/charts/stream?region=mars").status_code == 400
+
+    async def first_event():
+        stream = main.live_feed.sse("central")
+        try:
+            return await stream.__anext__()
+        finally:
+            await stream.aclose()
+
+    event = asyncio.run(first_event())
+    assert event.startswith("id: 0\nevent: snapshot\ndata: ")
+    assert json.loads(event.split("data: ", 1)[1])["chart"] == "central"
+    assert main.live_feed.stats()["subscribers"] == 0
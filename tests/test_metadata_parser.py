@@ -0,0 +1,41 @@
+"""
+Golden-corpus tests for the shared metadata parser.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from api.utils import metadata_parser
+
+GOLDEN = json.loads((Path(__file__).parent / "metadata_golden.json").read_text())
+
+
+@pytest.mark.parametrize("case", GOLDEN, ids=[c["raw"] or "<empty>" for c in GOLDEN])
+def test_golden_corpus(case):
+    parsed = metadata_parser.parse(case["raw"])
+
+    if case["title"] is None:
+        assert parsed is None
+    else:
+        assert parsed.artist == case["artist"]
+        assert parsed.title == case["title"]
+        assert list(parsed.featured) == case["featured"]
+
+
+def test_stream_title_and_placeholder_artist():
+    block = "StreamTitle='Eddy Kenzo - Sitya Loss';StreamUrl='';"
+    assert metadata_parser.stream_title(block) == "Eddy Kenzo - Sitya Loss"
+    assert metadata_parser.stream_title("icy-br:128") is None
+
+    assert metadata_parser.parse_artist_title("Just A Title") == ("Unknown Artist", "Just A Title")
+
+
+def test_repeated_strings_hit_the_cache():
+    metadata_parser.clear_cache()
+    for _ in range(10):
+        metadata_parser.parse("Azawi - Slow Dancing")
+
+    info = metadata_parser.cache_info()
+    assert info.misses == 1
+    assert info.hits == 9
@@ -0,0 +1,56 @@
+"""
+Throughput benchmarks for the metadata parser (pytest-benchmark).
+
+    pytest tests/test_metadata_parser_benchmark.py --benchmark-only
+
+Skipped when pytest-benchmark is not installed.
+"""
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from api.utils import metadata_parser
+
+ROWS = 10000
+GOLDEN = [
+    c["raw"] for c in json.loads((Path(__file__).parent / "metadata_golden.json").read_text())
+]
+
+
+def _unique_rows():
+    rng = random.Random(1)
+    rows = []
+    for i in range(ROWS):
+        raw = rng.choice(GOLDEN)
+        rows.append(f"{raw} {i}" if raw else raw)
+    return rows
+
+
+def _run(rows):
+    parse = metadata_parser.parse
+    for raw in rows:
+        parse(raw)
+
+
+def _report(benchmark):
+    benchmark.extra_info["rows"] = ROWS
+    benchmark.extra_info["rows_per_sec"] = round(ROWS / benchmark.stats.stats.mean)
+
+
+def test_parse_unique_rows(benchmark):
+    """Every row distinct: cache misses, compiled patterns only."""
+    rows = _unique_rows()
+    benchmark.pedantic(_run, args=(rows,), setup=metadata_parser.clear_cache, rounds=5)
+    _report(benchmark)
+
+
+def test_parse_repeated_stream_titles(benchmark):
+    """Radio-like input: the same few StreamTitles over and over."""
+    rng = random.Random(2)
+    rows = [rng.choice(GOLDEN[:8]) for _ in range(ROWS)]
+    benchmark(_run, rows)
+    _report(benchmark)
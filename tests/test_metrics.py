@@ -0,0 +1,55 @@
+"""
+Unit tests for built-in instrumentation and /metrics.
+"""
+import sqlite3
+
+from fastapi.testclient import TestClient
+
+from api import metrics
+from main import app
+
+client = TestClient(app)
+
+
+def test_metrics_endpoint_exposes_route_templates():
+    client.get("/charts/archive/2000-W01")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    body = response.text
+    assert "# TYPE ugboard_http_request_duration_seconds histogram" in body
+    assert 'route="/charts/archive/{week_id}"' in body
+    assert "2000-W01" not in body
+    assert "ugboard_http_requests_in_flight" in body
+    assert 'ugboard_db_query_duration_seconds_count{operation="' in body
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = metrics.Histogram("t_seconds", "test", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        hist.observe(value)
+
+    lines = hist.samples()
+    assert 't_seconds_bucket{le="0.1"} 1' in lines
+    assert 't_seconds_bucket{le="1"} 2' in lines
+    assert 't_seconds_bucket{le="+Inf"} 3' in lines
+    assert "t_seconds_count 3" in lines
+
+
+def test_timed_connection_records_statements():
+    before = metrics.DB_QUERY_LATENCY.labels("INSERT").counts[:]
+
+    conn = sqlite3.connect(":memory:", factory=metrics.TimedConnection)
+    conn.execute("CREATE TABLE t (x)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(1,), (2,)])
+
+    assert sum(metrics.DB_QUERY_LATENCY.labels("INSERT").counts) == sum(before) + 1
+
+
+def test_track_job_counts_handled_errors():
+    with metrics.track_job("unit-test") as job:
+        job["status"] = "error"
+
+    assert metrics.JOB_RUNS.labels("unit-test", "error").value == 1
@@ -0,0 +1,83 @@
+"""
+Unit tests for historical chart replays.
+"""
+import json
+import sqlite3
+from datetime import date
+
+import pytest
+
+from data import chart_archive, replay_engine
+
+
+@pytest.fixture
+def events_db(tmp_path, monkeypatch):
+    db = tmp_path / "events.db"
+    monkeypatch.setattr(replay_engine, "EVENTS_DB", db)
+    monkeypatch.setattr(replay_engine, "REPLAY_DIR", tmp_path / "replays")
+    monkeypatch.setattr(replay_engine, "LOG_FILE", tmp_path / "replays" / "logs.jsonl")
+    monkeypatch.setattr(chart_archive, "ARCHIVE_DB", tmp_path / "archive.db")
+
+    conn = sqlite3.connect(db)
+    conn.execute("""
+        CREATE TABLE play_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT, artist TEXT, source TEXT, source_type TEXT,
+            region TEXT, plays INTEGER, observed_at TIMESTAMP
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO play_events (title, artist, source, source_type, region, plays, observed_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            ("Song A", "Artist A", "yt", "youtube", "central", 100, "2026-01-06 10:00:00"),
+            ("Song B", "Artist B", "radio", "radio", "central", 50, "2026-01-07 10:00:00"),
+            # Week 3: B overtakes A (counters are cumulative)
+            ("Song B", "Artist B", "radio", "radio", "central", 400, "2026-01-13 10:00:00"),
+            ("Song C", "Artist C", "tv", "tv", "central", 50, "2026-01-14 10:00:00"),
+        ],
+    )
+    conn.commit()
+    conn.close()
+    return db
+
+
+def test_rebuild_uses_events_as_of_week_end(events_db):
+    week2 = replay_engine.rebuild_week("2026-W02", "v1")
+    week3 = replay_engine.rebuild_week("2026-W03", "v1")
+
+    assert [i["title"] for i in week2] == ["Song A", "Song B"]
+    assert [i["title"] for i in week3] == ["Song B", "Song A", "Song C"]
+    assert week3[0]["plays"] == 400
+
+
+def test_rebuild_is_deterministic(events_db):
+    first = replay_engine.rebuild_week("2026-W03", "v1")
+    assert replay_engine.rebuild_week("2026-W03", "v1") == first
+
+
+def test_replay_range_diffs_published(events_db):
+    chart_archive.archive_chart("2026-W03", "top100", [
+        {"title": "Song A", "artist": "Artist A"},
+        {"title": "Song B", "artist": "Artist B"},
+    ])
+
+    result = replay_engine.replay_range(
+        date(2026, 1, 5), date(2026, 1, 18), "v1", workers=2
+    )
+
+    assert result["weeks"] == 2
+    assert result["compared_weeks"] == 1
+
+    week3 = result["diffs"][1]
+    assert week3["entered"] == 1
+    assert week3["moved"] == 2
+    assert week3["max_rank_change"] == 1
+
+    logs = replay_engine.LOG_FILE.read_text().splitlines()
+    assert [json.loads(line)["week_id"] for line in logs] == ["2026-W02", "2026-W03"]
+
+
+def test_unknown_config_version(events_db):
+    with pytest.raises(ValueError):
+        replay_engine.replay_range(date(2026, 1, 5), date(2026, 1, 11), "v0")
@@ -0,0 +1,129 @@
+"""
+Tests for history rollups, pruning and incremental VACUUM.
+"""
+import sqlite3
+
+import pytest
+
+from data import retention
+
+
+def _age_rows(service, days):
+    conn = sqlite3.connect(service.db_path)
+    conn.execute("UPDATE streams_history SET created_at = datetime('now', ?)", (f"-{days} days",))
+    conn.execute("UPDATE scraper_history SET created_at = datetime('now', ?)", (f"-{days} days",))
+    conn.commit()
+    conn.close()
+
+
+def test_rollup_counts_each_row_once(db):
+    for i in range(5):
+        db.add_streams_history("spotify", 10, 2, 1, "success", execution_time=1.5)
+    db.add_streams_history("boomplay", 0, 0, 0, "error", error_message="timeout")
+
+    first = db.get_streams_stats(7)
+    again = db.get_streams_stats(7)
+    assert first["total_stats"] == again["total_stats"]
+    assert first["total_stats"]["total_scrapes"] == 6
+    assert first["total_stats"]["total_found"] == 50
+    assert first["total_stats"]["failed"] == 1
+
+    spotify = next(p for p in first["platform_stats"] if p["platform"] == "spotify")
+    assert spotify["scrape_count"] == 5
+    assert spotify["avg_time"] == pytest.approx(1.5)
+    assert len(first["recent_scrapes"]) == 6
+
+
+def test_prune_keeps_totals_in_rollups(db, monkeypatch):
+    monkeypatch.setattr(retention, "PRUNE_BATCH", 3)
+    monkeypatch.setattr(retention, "PRUNE_PAUSE", 0)
+
+    for i in range(10):
+        db.add_scraper_history("radio", f"station_{i % 2}", 5, 1, "success")
+    db.add_scraper_history("tv", "ntv", 0, 0, "error")
+    _age_rows(db, 20)
+
+    before = db.get_history_totals()
+    result = db.run_retention()
+    assert result["deleted"]["scraper_history"] == 11
+
+    conn = sqlite3.connect(db.db_path)
+    assert conn.execute("SELECT COUNT(*) FROM scraper_history").fetchone()[0] == 0
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    conn.close()
+
+    after = db.get_history_totals()
+    assert after == before
+    assert after["scraper_history"]["status"] == {"success": 10, "error": 1}
+    assert after["scraper_history"]["key"] == {"station_0": 5, "station_1": 5, "ntv": 1}
+
+
+def test_recent_rows_are_not_pruned(db):
+    db.add_youtube_schedule_history("channel", "success", 3, 3)
+    result = db.run_retention()
+
+    assert result["deleted"]["youtube_scheduler"] == 0
+    assert db.get_history_totals()["youtube_scheduler"]["runs"] == 1
+
+
+def test_old_play_events_are_compacted_without_changing_replays(db, monkeypatch):
+    from datetime import date
+
+    from data import replay_engine
+
+    monkeypatch.setattr(retention, "COMPACT_BATCH", 1)
+    monkeypatch.setattr(retention, "PRUNE_PAUSE", 0)
+    conn = sqlite3.connect(db.db_path)
+    events = (
+        ("Sitya Loss", 3, "2026-01-06 10:00:00"), ("Sitya Loss", 9, "2026-01-08 10:00:00"),  # W02
+        ("Sitya Loss", 5, "2026-01-13 10:00:00"), ("Sitya Loss", 4, "2026-01-14 10:00:00"),  # W03
+        ("Mbilo Mbilo", 1, "2026-01-06 10:00:00"), ("Mbilo Mbilo", 2, "2026-01-07 10:00:00"),
+        ("Mbilo Mbilo", 6, "2026-01-11 22:00:00"),   # Monday 01:00 EAT: W03, not W02
+        ("Nkwagala", 4, "2026-01-20 10:00:00"),
+    )
+    for title, plays, observed_at in events:
+        conn.execute(
+            "INSERT INTO play_events (title, artist, source, source_type, region, plays, observed_at) "
+            "VALUES (?, 'Eddy Kenzo', 'tv_ntv', 'tv', 'central', ?, ?)",
+            (title, plays, observed_at)
+        )
+    conn.execute(
+        "INSERT INTO play_events (title, artist, source, source_type, region, plays) "
+        "VALUES ('Sitya Loss', 'Eddy Kenzo', 'tv_ntv', 'tv', 'central', 7)"
+    )
+    conn.commit()
+
+    weeks = replay_engine.weeks_in_range(date(2026, 1, 5), date.today())
+    before = [replay_engine.rebuild_week(w, "v1", events_db=db.db_path) for w in weeks]
+
+    assert db.run_retention()["deleted"]["play_events"] == 3
+    rows = conn.execute(
+        "SELECT title, plays, observed_at FROM play_events ORDER BY title, observed_at"
+    ).fetchall()
+    conn.close()
+    assert [r[:2] for r in rows] == [
+        ("Mbilo Mbilo", 2), ("Mbilo Mbilo", 6), ("Nkwagala", 4),
+        ("Sitya Loss", 9), ("Sitya Loss", 5), ("Sitya Loss", 7),
+    ]
+    assert rows[0][2] == "2026-01-06 10:00:00"   # first observation kept
+    assert [replay_engine.rebuild_week(w, "v1", events_db=db.db_path) for w in weeks] == before
+
+
+def test_stats_readers_do_not_write(db):
+    db.add_streams_history("spotify", 10, 2, 1, "success", execution_time=1.5)
+    db.run_retention()
+    db.add_streams_history("spotify", 4, 1, 0, "error")
+
+    conn = sqlite3.connect(db.db_path)
+    changes = conn.total_changes
+    version = conn.execute("PRAGMA data_version").fetchone()[0]
+
+    stats = db.get_streams_stats(7)["total_stats"]
+    assert (stats["total_scrapes"], stats["total_found"], stats["failed"]) == (2, 14, 1)
+    assert db.get_history_totals()["streams_history"]["status"] == {"success": 1, "error": 1}
+
+    # Nobody committed: the un-rolled row was summarised on the fly
+    assert conn.execute("PRAGMA data_version").fetchone()[0] == version
+    assert conn.execute("SELECT last_id FROM rollup_watermarks WHERE source = 'streams_history'").fetchone()[0] == 1
+    assert conn.total_changes == changes
+    conn.close()
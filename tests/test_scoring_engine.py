@@ -0,0 +1,102 @@
+"""
+Unit tests for the shared scoring engine.
+"""
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from api.scoring import config, engine
+from api.charts.boost import apply_boosts
+from api.charts.scoring import calculate_scores
+from api.scoring.scoring import calculate_score
+from data.scoring import compute_score
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    engine.clear_cache()
+
+
+def test_legacy_formulas_preserved():
+    item = {
+        "youtube": 10, "radio": 2, "tv": 1,
+        "youtube_views": 100, "radio_plays": 2, "tv_appearances": 1,
+    }
+
+    assert calculate_score(item) == 10 + 6 + 2
+    assert compute_score(item) == 100 + 1000 + 1000
+    assert apply_boosts([dict(item)])[0]["score"] == 10 + 6 + 5
+
+
+def test_normalized_chart_scores():
+    scored = calculate_scores([
+        {"youtube_views": 100, "radio_plays": 10, "tv_appearances": 0},
+        {"youtube_views": 50, "radio_plays": 20, "tv_appearances": 4},
+    ])
+
+    assert scored[0]["score"] == pytest.approx(0.60 + 0.125)
+    assert scored[1]["score"] == pytest.approx(0.30 + 0.25 + 0.15)
+
+
+def test_rank_items_is_stable_and_limited():
+    items = [{"title": t, "youtube": 1} for t in "abc"]
+    ranked = engine.rank_items(items, "simple-v1", limit=2)
+
+    assert [i["title"] for i in ranked] == ["a", "b"]
+    assert "score" not in items[0]
+
+
+def test_cache_keyed_by_data_version():
+    items = [{"youtube": 1}]
+    assert engine.score_items(items, "simple-v1", data_version=1) == [1]
+
+    items[0]["youtube"] = 5
+    assert engine.score_items(items, "simple-v1", data_version=1) == [1]
+    assert engine.score_items(items, "simple-v1", data_version=2) == [5]
+
+
+def test_sql_expression_matches_kernels():
+    now = datetime.utcnow()
+    rows = [
+        ("youtube", 1000, now - timedelta(days=2)),
+        ("radio", 50, now - timedelta(days=20)),
+        ("unknown", 7, now - timedelta(days=90)),
+    ]
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE songs (source_type TEXT, plays INTEGER, ingested_at TIMESTAMP)")
+    conn.executemany(
+        "INSERT INTO songs VALUES (?, ?, ?)",
+        [(s, p, t.strftime("%Y-%m-%d %H:%M:%S")) for s, p, t in rows],
+    )
+
+    for version in ("v1", "v2", "stored-v1"):
+        sql_scores = [
+            r[0] for r in conn.execute(
+                f"SELECT {engine.sql_score_expression(version)} FROM songs ORDER BY rowid"
+            )
+        ]
+        items = [
+            {"source_type": s, "plays": p, "ingested_at": t.isoformat()}
+            for s, p, t in rows
+        ]
+        assert sql_scores == pytest.approx(engine.score_items(items, version, now=now), abs=0.01)
+
+
+def test_released_v1_config_scores_like_v2():
+    assert config.get_scoring_config("v1")["weights"] == {
+        "plays": 0.4, "recency": 0.3, "source_type": 0.2,
+    }
+    now = datetime.utcnow()
+    items = [
+        {"source_type": "tv", "plays": 120, "ingested_at": (now - timedelta(days=3)).isoformat()},
+        {"source_type": "streaming", "plays": 9, "ingested_at": (now - timedelta(days=45)).isoformat()},
+    ]
+    assert engine.score_items(items, "v1", now=now) == engine.score_items(items, "v2", now=now)
+    assert {"v1", "v2"} <= set(engine.available_versions())
+
+
+def test_unknown_version():
+    with pytest.raises(ValueError):
+        engine.score_items([], "nope")
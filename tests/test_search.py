@@ -0,0 +1,111 @@
+"""
+Tests for FTS5 song/artist search and the /search endpoint.
+"""
+import sqlite3
+
+import pytest
+
+from data import search
+
+
+@pytest.fixture
+def db(db):
+    songs = [
+        ("Sitya Loss", "Eddy Kenzo", 90.0, "central", "radio"),
+        ("Sitya Loss", "Eddy Kenzo", 70.0, "central", "tv"),
+        ("Mbilo Mbilo", "Eddy Kenzo", 40.0, "western", "youtube"),
+        ("Slow Dancing", "Azawi", 80.0, "central", "streaming"),
+        ("Kenzo Tribute", "Sheebah", 10.0, "eastern", "radio"),
+        ("Nkwagala Nnyo", "José Chameleone", 60.0, "central", "radio"),
+    ]
+    for title, artist, score, region, source_type in songs:
+        db.add_song({
+            "title": title, "artist": artist, "plays": 100, "score": score,
+            "region": region, "source_type": source_type, "source": f"{source_type}_test",
+        })
+    return db
+
+
+def test_prefix_search_ranks_by_chart_score_and_merges_sources(db):
+    result = db.search_songs("kenz")
+    titles = [s["title"] for s in result["songs"]]
+
+    assert titles == ["Sitya Loss", "Mbilo Mbilo", "Kenzo Tribute"]
+    assert result["songs"][0]["source_types"] == ["radio", "tv"]
+    assert result["artists"][0]["artist"] == "Eddy Kenzo"
+    assert result["artists"][0]["songs"] == 2
+
+
+def test_each_source_type_counts_once_like_the_chart(db, monkeypatch):
+    for station in ("radio_cbs", "radio_simba", "radio_capital"):
+        db.add_song({"title": "Bweyagala", "artist": "Vinka", "plays": 100, "score": 0.0,
+                     "region": "central", "source_type": "radio", "source": station})
+    db.add_song({"title": "Bweyagala Remix", "artist": "Vinka", "plays": 100, "score": 0.0,
+                 "region": "central", "source_type": "youtube", "source": "youtube_test"})
+
+    result = db.search_songs("vinka")
+    chart = {s["title"]: s["unified_score"] for s in db.get_top_songs(20)}
+    assert [s["title"] for s in result["songs"]] == ["Bweyagala Remix", "Bweyagala"]
+    assert {s["title"]: s["chart_score"] for s in result["songs"]} == {
+        t: chart[t] for t in ("Bweyagala Remix", "Bweyagala")
+    }
+    assert result["artists"][0]["chart_score"] == round(
+        chart["Bweyagala Remix"] + chart["Bweyagala"], 2
+    )
+    assert result["truncated"] is False
+
+    monkeypatch.setattr(search, "SEARCH_CANDIDATES", 2)
+    assert db.search_songs("vinka")["truncated"] is True
+
+
+def test_diacritics_filters_and_typos(db):
+    assert db.search_songs("jose cham")["songs"][0]["artist"] == "José Chameleone"
+    assert [s["title"] for s in db.search_songs("kenzo", region="western")["songs"]] == ["Mbilo Mbilo"]
+    assert db.search_songs("kenzo", source_type="streaming")["songs"] == []
+
+    typo = db.search_songs("azwai slow")
+    assert typo["corrected"] == "azawi slow"
+    assert typo["songs"][0]["title"] == "Slow Dancing"
+
+
+def test_index_follows_updates_and_deletes(db):
+    conn = sqlite3.connect(db.db_path)
+    conn.execute("UPDATE songs SET title = 'Renamed Hit' WHERE title = 'Slow Dancing'")
+    conn.execute("DELETE FROM songs WHERE artist = 'Sheebah'")
+    conn.commit()
+    conn.close()
+
+    assert db.search_songs("renamed")["songs"][0]["artist"] == "Azawi"
+    assert db.search_songs("sheebah")["songs"] == []
+    assert db.search_songs("slow")["corrected"] is None
+
+
+def test_backfill_indexes_existing_catalog(tmp_path):
+    conn = sqlite3.connect(tmp_path / "legacy.db")
+    conn.execute(
+        "CREATE TABLE songs (id INTEGER PRIMARY KEY, title TEXT, artist TEXT, score REAL, "
+        "region TEXT, source_type TEXT, canonical_song_id INTEGER)"
+    )
+    conn.execute("INSERT INTO songs (title, artist, score) VALUES ('Tweyagale', 'Bebe Cool', 5)")
+
+    search.create_schema(conn)
+    assert search.search(conn, "bebe")["songs"] == []
+
+    assert search.backfill(conn) == 1
+    assert search.search(conn, "bebe")["songs"][0]["title"] == "Tweyagale"
+
+
+def test_search_endpoint(client):
+    body = client.get("/search?q=sitya&limit=1").json()
+    assert body["count"] == 1
+    assert body["songs"][0]["artist"] == "Eddy Kenzo"
+
+    assert client.get("/search?q=x&region=mars").status_code == 400
+    assert client.get("/search?q=x&week=41").status_code == 422
+    assert client.get("/search?q=kenzo&week=2001-W01").json()["count"] == 0
+    assert client.get("/search?q=kenzo&week=2026-W99").status_code == 400
+
+
+def test_week_bounds_follow_iso_weeks():
+    assert search.week_bounds("2026-W41") == ("2026-10-05 00:00:00", "2026-10-12 00:00:00")
+    assert search.week_bounds("2021-W01")[0] == "2021-01-04 00:00:00"
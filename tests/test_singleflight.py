@@ -0,0 +1,83 @@
+"""
+Tests for single-flight coalescing of identical concurrent chart computations.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from api.singleflight import SingleFlight, SingleFlightTimeout
+
+
+def _slow(calls, result=None, error=None, delay=0.2):
+    def compute():
+        calls.append(threading.get_ident())
+        time.sleep(delay)
+        if error:
+            raise error
+        return result
+    return compute
+
+
+def test_threads_share_one_result_and_one_error():
+    flight = SingleFlight("test")
+    calls = []
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: flight.do("k", _slow(calls, result=[1, 2])), range(8)))
+    assert results == [[1, 2]] * 8
+    assert len(calls) == 1
+    assert flight.stats()["coalesced"] == 7
+
+    calls.clear()
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(flight.do, "k", _slow(calls, error=ValueError("boom"))) for _ in range(4)]
+        for future in futures:
+            with pytest.raises(ValueError, match="boom"):
+                future.result()
+    assert len(calls) == 1
+    assert flight.in_flight() == 0
+
+
+def test_async_waiters_are_bounded_while_the_leader_finishes():
+    flight = SingleFlight("test", timeout=0.05)
+    calls = []
+
+    async def burst():
+        compute = _slow(calls, result="chart", delay=0.3)
+        leader = asyncio.ensure_future(flight.run("k", compute, timeout=5))
+        await asyncio.sleep(0)
+        with pytest.raises(SingleFlightTimeout):
+            await flight.run("k", compute)
+        return await leader
+
+    assert asyncio.run(burst()) == "chart"
+    assert len(calls) == 1
+    assert flight.stats()["timeouts"] == 1
+
+
+def test_concurrent_region_requests_run_each_query_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(main.config, "DATABASE_PATH", tmp_path / "ugboard.db")
+    db = main.DatabaseService()
+    monkeypatch.setattr(main, "db_service", db)
+
+    queries = []
+    query = db._query_top_songs
+
+    def slow_query(limit, region, offset):
+        queries.append(region)
+        time.sleep(0.1)
+        return query(limit, region, offset)
+
+    monkeypatch.setattr(db, "_query_top_songs", slow_query)
+    client = TestClient(main.app)
+
+    with ThreadPoolExecutor(6) as pool:
+        responses = list(pool.map(lambda _: client.get("/charts/regions"), range(6)))
+
+    assert all(r.status_code == 200 for r in responses)
+    assert sorted(queries) == sorted(main.config.UGANDAN_REGIONS)
+    assert main.chart_flight.stats()["coalesced"] >= 1
@@ -0,0 +1,94 @@
+"""
+Unit tests for canonical song identity.
+"""
+import sqlite3
+
+import pytest
+
+import main
+from data import song_identity
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(tmp_path / "songs.db")
+    conn.execute(
+        "CREATE TABLE songs (id INTEGER PRIMARY KEY, title TEXT, artist TEXT, source TEXT)"
+    )
+    song_identity.ensure_schema(conn)
+    yield conn
+    song_identity.reset_index(conn)
+    conn.close()
+
+
+def test_normalization_strips_artifacts_and_featuring():
+    assert song_identity.canonical_key(
+        "Sitya Loss (Official Video) [HD]", "Eddy Kenzo ft. Bebe Cool"
+    ) == "eddy kenzo|sitya loss"
+    assert song_identity.normalize_title("Nkwagala (feat. Sheebah)") == "nkwagala"
+    assert song_identity.normalize_artist("Vinka x Rema") == "vinka"
+    assert song_identity.normalize_title("Bébé - Official Audio") == "bebe"
+    # Meaningful brackets survive
+    assert song_identity.strip_decorations("Song (Remix)") == "Song (Remix)"
+
+
+def test_fuzzy_lookup_and_variants():
+    index = song_identity.CanonicalIndex()
+    index.add(1, "sitya loss", "eddy kenzo")
+    index.add(2, "sitya loss 2", "eddy kenzo")
+
+    assert index.lookup("sitya loss", "eddy kenzo") == 1
+    assert index.lookup("sitya los", "eddy kenzo") == 1        # typo
+    assert index.lookup("sitya loss", "edy kenzo") == 1        # artist typo
+    assert index.lookup("sitya loss 2", "eddy kenzo") == 2     # sequel kept apart
+    assert index.lookup("sitya loss remix", "eddy kenzo") is None
+    assert index.lookup("sitya loss", "unknown artist") == 1   # title-only block
+    assert index.lookup("different song", "eddy kenzo") is None
+
+    created = []
+    assert index.lookup_or_add("sitya los", "eddy kenzo", lambda: created.append(3) or 3) == 1
+    assert index.lookup_or_add("nkwagala", "azawi", lambda: created.append(3) or 3) == 3
+    assert index.lookup("nkwagala", "azawi") == 3
+    assert created == [3]
+
+
+def test_assign_links_sources_to_one_canonical_song(conn):
+    rows = [
+        ("Sitya Loss", "Eddy Kenzo", "tv_ntv"),
+        ("Sitya Loss (Official Video)", "Eddy Kenzo", "youtube_x"),
+        ("SITYA LOSS", "Eddy Kenzo feat. Bebe Cool", "radio_cbs"),
+        ("Nkwagala", "Azawi", "radio_cbs"),
+    ]
+    conn.executemany("INSERT INTO songs (title, artist, source) VALUES (?, ?, ?)", rows)
+
+    assert song_identity.backfill(conn) == 4
+    ids = [r[0] for r in conn.execute("SELECT canonical_song_id FROM songs ORDER BY id")]
+    assert ids[0] == ids[1] == ids[2] != ids[3]
+
+    # Ids survive a reload from the database
+    song_identity.reset_index(conn)
+    assert song_identity.assign(conn, "Sitya Loss", "Eddy Kenzo") == ids[0]
+    assert conn.execute("SELECT COUNT(*) FROM canonical_songs").fetchone()[0] == 2
+
+
+def test_each_source_type_counts_once_in_the_chart(tmp_path, monkeypatch):
+    monkeypatch.setattr(main.config, "DATABASE_PATH", tmp_path / "ugboard.db")
+    db = main.DatabaseService()
+
+    def play(title, artist, source_type, source):
+        db.add_song({"title": title, "artist": artist, "plays": 1000, "score": 50.0,
+                     "region": "central", "source_type": source_type, "source": source})
+
+    for station in ("radio_cbs", "radio_simba", "radio_capital"):
+        play("Sitya Loss", "Eddy Kenzo", "radio", station)
+    play("Nkwagala", "Azawi", "radio", "radio_cbs")
+    play("Nkwagala", "Azawi", "tv", "tv_ntv")
+    play("Bweyagala", "Vinka", "radio", "radio_cbs")
+
+    songs = {s["title"]: s for s in db.get_top_songs(10)}
+    kenzo = songs["Sitya Loss"]
+    assert (kenzo["source_count"], kenzo["total_plays"]) == (3, 3000)
+    # Three radio stations weigh as much as one, not three times as much
+    assert kenzo["unified_score"] == songs["Bweyagala"]["unified_score"]
+    assert songs["Nkwagala"]["unified_score"] > kenzo["unified_score"]
+    assert [s["title"] for s in db.get_top_songs(1)] == ["Nkwagala"]
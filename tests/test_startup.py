@@ -0,0 +1,75 @@
+"""
+Startup tests: `import main` stays cheap and side-effect free
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Seconds; generous so slow CI boxes pass, tight enough to catch an
+# eager Playwright/scraper/database setup creeping back into import
+IMPORT_BUDGET = float(os.getenv("UGBOARD_IMPORT_BUDGET", "5.0"))
+
+PROBE = """
+import json, logging, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+handlers = [
+    h for name in ("ugboard", "scrapers", "youtube", "streams")
+    for h in logging.getLogger(name).handlers
+    if isinstance(h, logging.FileHandler)
+]
+print(json.dumps({
+    "elapsed": elapsed,
+    "initialized": [
+        name for name in ("db_service", "tv_scraper", "radio_scraper",
+                          "streams_scraper", "streams_scheduler", "youtube_scheduler")
+        if main.is_initialized(getattr(main, name))
+    ],
+    "open_log_files": sum(1 for h in handlers if h.stream is not None),
+    "heavy_modules": [m for m in ("playwright", "bs4", "librosa", "requests", "uvicorn")
+                      if m in sys.modules],
+}))
+"""
+
+
+def _probe():
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_is_side_effect_free():
+    report = _probe()
+
+    assert report["initialized"] == []
+    assert report["open_log_files"] == 0
+    assert report["heavy_modules"] == []
+
+
+def test_import_time_budget():
+    report = _probe()
+    assert report["elapsed"] < IMPORT_BUDGET, (
+        f"import main took {report['elapsed']:.2f}s (budget {IMPORT_BUDGET}s)"
+    )
+
+
+def test_scheduler_first_run_is_delayed():
+    import main
+
+    scheduler = main.YouTubeScheduler()
+    runs = []
+    scheduler.run_scheduled_job = lambda: runs.append(1)
+
+    scheduler.start_scheduler(initial_delay=30)
+    scheduler.stop_scheduler()
+
+    assert runs == []
+    assert not scheduler.scheduler_thread.is_alive()
@@ -0,0 +1,65 @@
+"""
+Tests for the buffered scraper/scheduler history writer.
+"""
+import sqlite3
+import time
+
+from api.telemetry import TelemetrySink
+
+
+def test_rows_are_written_in_batches(db, count_rows):
+    sink = TelemetrySink(db.get_connection, flush_interval=60, flush_rows=3)
+    sink.start()
+
+    sink.emit("scraper_history", ("radio", "cbs", 5, 1, "success", None, 0.4))
+    sink.emit("youtube_scheduler", ("UC1", "success", 3, 3, None))
+    assert sink.pending() == 2
+    assert count_rows("scraper_history") == 0
+
+    sink.emit("streams_history", ("spotify", 10, 2, 1, "success", None, 1.5, "requests"))
+    deadline = time.monotonic() + 5
+    while sink.pending() or sink.flushes == 0:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    assert [count_rows(t) for t in ("scraper_history", "youtube_scheduler", "streams_history")] == [1, 1, 1]
+    assert sink.stats()["flushes"] == 1
+    sink.stop()
+
+
+def test_full_buffer_drops_oldest_and_stop_flushes(db):
+    sink = TelemetrySink(db.get_connection, flush_interval=60, flush_rows=100, capacity=3)
+    sink.start()
+    for i in range(5):
+        sink.emit("scraper_history", ("tv", f"station_{i}", i, 0, "success", None, None))
+
+    assert sink.dropped == 2
+    assert sink.stop() == 3
+
+    conn = sqlite3.connect(db.db_path)
+    stations = [r[0] for r in conn.execute("SELECT station_id FROM scraper_history ORDER BY id")]
+    conn.close()
+    assert stations == ["station_2", "station_3", "station_4"]
+
+
+def test_failed_flush_keeps_rows_and_readers_see_buffered_rows(db):
+    attempts = []
+
+    def flaky_connect():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return db.get_connection()
+
+    db.telemetry.connect = flaky_connect
+    db.telemetry.flush_interval = 60
+    db.telemetry.start()
+
+    db.add_streams_history("boomplay", 4, 1, 0, "success", execution_time=2.0)
+    assert db.telemetry.flush() == 0
+    assert db.telemetry.pending() == 1
+
+    # Stats readers flush first
+    assert db.get_streams_stats(7)["total_stats"]["total_scrapes"] == 1
+    assert db.telemetry.stats()["failed_flushes"] == 1
+    assert db.telemetry.pending() == 0